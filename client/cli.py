@@ -0,0 +1,300 @@
+"""
+Command Line Interface
+Headless batch conversion on top of the Qt-free ConversionEngine.
+
+    python -m client.cli convert photos/ "clips/*.mov" --params web.json --jobs 4
+    python -m client.cli watch watch.json
+
+Inputs may be files, folders or glob patterns. Progress is streamed to stdout
+as JSON lines, one event per line:
+
+    {"event": "start", "files": 12, "jobs": 4}
+    {"event": "status", "message": "Processing: a.png"}
+    {"event": "progress", "overall": 25}
+    {"event": "file_progress", "index": 0, "file": "/in/a.png", "progress": 0.5}
+    {"event": "file_completed", "source": "/in/a.png", "output": "/in/a_converted.webp"}
+    {"event": "finished", "success": true, "message": "...", "elapsed": 3.2}
+
+`watch` runs the hot-folder daemon (client.core.watch_folder) and streams its
+queued / file_completed / converted / failed / skipped events the same way.
+
+The engine's own diagnostic prints are sent to stderr so stdout stays
+machine-readable. Nothing here imports PyQt6.
+
+Exit codes: 0 success, 1 conversion failed, 2 usage error, 130 cancelled.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, TextIO
+
+
+# Output settings the GUI's command panel supplies as its base params
+DEFAULT_PARAMS = {
+    'output_dir': '',
+    'use_nested_output': False,
+    'nested_output_name': 'output',
+    'suffix': '_converted',
+    'overwrite': True,
+    'skip_up_to_date': True,
+}
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+_GLOB_CHARS = ('*', '?', '[')
+
+
+class CliError(Exception):
+    """Invalid command line input (reported on stderr, exit code 2)."""
+
+
+def load_params(value: Optional[str]) -> Dict:
+    """Params from an inline JSON object or a path to a JSON file."""
+    if not value:
+        return {}
+    text = value
+    if not value.lstrip().startswith('{'):
+        try:
+            with open(value, 'r', encoding='utf-8') as fh:
+                text = fh.read()
+        except OSError as e:
+            raise CliError(f"Cannot read params file {value}: {e}")
+    try:
+        params = json.loads(text)
+    except ValueError as e:
+        raise CliError(f"Invalid params JSON: {e}")
+    if not isinstance(params, dict):
+        raise CliError("Params JSON must be an object")
+    return params
+
+
+def parse_assignment(assignment: str):
+    """'key=value' override; value is parsed as JSON when possible (numbers, bools, lists)."""
+    key, sep, raw = assignment.partition('=')
+    if not sep or not key:
+        raise CliError(f"Expected KEY=VALUE, got {assignment!r}")
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+
+def expand_inputs(inputs: Iterable[str], extensions: Iterable[str], recursive: bool = False) -> List[str]:
+    """
+    Expand files, folders and glob patterns into a de-duplicated file list (input order).
+
+    Folders and glob matches are filtered to supported extensions; explicitly
+    named files are passed through (the engine reports ones it can't convert).
+    """
+    from client.core.folder_scan import iter_supported_files
+
+    extensions = frozenset(extensions)
+    files: List[str] = []
+    seen = set()
+
+    def add(path: str):
+        path = os.path.abspath(path)
+        if path not in seen:
+            seen.add(path)
+            files.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for batch in iter_supported_files([item], extensions, recursive=recursive):
+                for path in batch:
+                    add(path)
+        elif os.path.isfile(item):
+            add(item)
+        elif any(ch in item for ch in _GLOB_CHARS):
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path) and os.path.splitext(path)[1].lower() in extensions:
+                    add(path)
+        else:
+            raise CliError(f"No such file or folder: {item}")
+    return files
+
+
+class JsonLinesReporter:
+    """Writes engine signals to a stream as JSON lines (thread-safe, flushed per event)."""
+
+    def __init__(self, stream: TextIO, files: List[str]):
+        self.stream = stream
+        self.files = files
+        self.finished = None  # (success, message) once conversion_finished fired
+        self._lock = threading.Lock()
+
+    def write(self, event: str, **fields) -> None:
+        line = json.dumps({'event': event, **fields})
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def attach(self, engine) -> None:
+        engine.status_updated.connect(lambda message: self.write('status', message=message))
+        engine.progress_updated.connect(lambda overall: self.write('progress', overall=overall))
+        engine.file_progress_updated.connect(self._on_file_progress)
+        engine.file_completed.connect(lambda source, output: self.write('file_completed', source=source, output=output))
+        engine.conversion_finished.connect(self._on_finished)
+
+    def _on_file_progress(self, index: int, progress: float) -> None:
+        file_path = self.files[index] if 0 <= index < len(self.files) else None
+        self.write('file_progress', index=index, file=file_path, progress=round(progress, 4))
+
+    def _on_finished(self, success: bool, message: str) -> None:
+        self.finished = (success, message)
+
+
+def _configure_caches() -> None:
+    """Persist the same caches the GUI keeps between sessions."""
+    from client.core.media_probe import configure_probe_cache
+    from client.core.calibration_cache import configure_calibration_cache
+    from client.core.size_model import configure_size_model
+    from client.core.output_index import configure_output_index
+
+    for configure in (configure_probe_cache, configure_calibration_cache,
+                      configure_size_model, configure_output_index):
+        try:
+            configure(persist=True)
+        except Exception as e:
+            print(f"Warning: Could not enable persistent cache ({configure.__name__}): {e}", file=sys.stderr)
+
+
+def cmd_convert(args, stdout: TextIO) -> int:
+    params = dict(DEFAULT_PARAMS)
+    params.update(load_params(args.params))
+    for assignment in args.set or []:
+        key, value = parse_assignment(assignment)
+        params[key] = value
+    if args.output_dir is not None:
+        params['output_dir'] = args.output_dir
+    if args.jobs is not None:
+        params['parallel_jobs'] = args.jobs
+    if args.force:
+        params['skip_up_to_date'] = False
+
+    # Engine prints go to stderr from here on; stdout carries only JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        from client.core.conversion_engine import (
+            ConversionEngine, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS,
+            init_bundled_tools, get_parallel_job_count,
+        )
+        init_bundled_tools()
+        if not args.no_cache:
+            _configure_caches()
+
+        files = expand_inputs(args.inputs, IMAGE_EXTENSIONS | VIDEO_EXTENSIONS, recursive=args.recursive)
+        reporter = JsonLinesReporter(stdout, files)
+        reporter.write('start', files=len(files), jobs=get_parallel_job_count(params, len(files)))
+        if not files:
+            reporter.write('finished', success=False, message="No supported input files", elapsed=0.0)
+            return EXIT_FAILED
+
+        engine = ConversionEngine(files, params)
+        reporter.attach(engine)
+
+        started = time.monotonic()
+        worker = threading.Thread(target=engine.run, name='conversion', daemon=True)
+        worker.start()
+        cancelled = False
+        while worker.is_alive():
+            try:
+                worker.join(0.2)
+            except KeyboardInterrupt:
+                cancelled = True
+                engine.stop_conversion()
+
+    success, message = reporter.finished or (False, "Conversion ended without a result")
+    reporter.write('finished', success=success, message=message,
+                   elapsed=round(time.monotonic() - started, 3))
+    if cancelled:
+        return EXIT_CANCELLED
+    return EXIT_OK if success else EXIT_FAILED
+
+
+def cmd_watch(args, stdout: TextIO) -> int:
+    reporter = JsonLinesReporter(stdout, [])
+    with contextlib.redirect_stdout(sys.stderr):
+        from client.core.conversion_engine import init_bundled_tools
+        from client.core.watch_folder import WatchDaemon, load_watch_config
+
+        try:
+            config = load_watch_config(args.config, DEFAULT_PARAMS)
+        except (OSError, ValueError) as e:
+            raise CliError(f"Invalid watch config {args.config}: {e}")
+        if args.workers is not None:
+            config.max_workers = max(1, args.workers)
+        init_bundled_tools()
+        if not args.no_cache:
+            _configure_caches()
+
+        daemon = WatchDaemon(config, on_event=reporter.write)
+        stop_event = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        worker = threading.Thread(target=daemon.run, args=(stop_event, args.once), name='watch', daemon=True)
+        worker.start()
+        cancelled = False
+        while worker.is_alive():
+            try:
+                worker.join(0.5)
+            except KeyboardInterrupt:
+                cancelled = True
+                stop_event.set()
+
+    reporter.write('stopped')
+    return EXIT_CANCELLED if cancelled else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m client.cli',
+                                     description="Headless batch conversion (JSON-lines progress on stdout)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="Convert files, folders or glob patterns")
+    convert.add_argument('inputs', nargs='+', help="Files, folders or glob patterns")
+    convert.add_argument('-p', '--params', help="Conversion params: a JSON object or a path to a JSON file")
+    convert.add_argument('-s', '--set', action='append', metavar='KEY=VALUE',
+                         help="Override one param (VALUE parsed as JSON when possible); repeatable")
+    convert.add_argument('-j', '--jobs', type=int,
+                         help="Parallel conversions (0 = auto, 1 = serial)")
+    convert.add_argument('-o', '--output-dir', help="Output folder (default: next to each source)")
+    convert.add_argument('-r', '--recursive', action='store_true', help="Include subfolders of folder inputs")
+    convert.add_argument('--force', action='store_true', help="Re-encode sources whose outputs are up to date")
+    convert.add_argument('--no-cache', action='store_true',
+                         help="Don't read or write the persistent probe/calibration/output caches")
+
+    watch = commands.add_parser('watch', help="Convert files as they arrive in watched folders")
+    watch.add_argument('config', help="Watch config JSON (folders, per-folder params and output dirs)")
+    watch.add_argument('-w', '--workers', type=int, help="Concurrent conversions (overrides max_workers)")
+    watch.add_argument('--once', action='store_true',
+                       help="Process what is there (and whatever lands meanwhile), then exit when idle")
+    watch.add_argument('--no-cache', action='store_true',
+                       help="Don't read or write the persistent probe/calibration/output caches")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, stdout: Optional[TextIO] = None) -> int:
+    args = build_parser().parse_args(argv)
+    stdout = stdout or sys.stdout
+    try:
+        if args.command == 'convert':
+            return cmd_convert(args, stdout)
+        if args.command == 'watch':
+            return cmd_watch(args, stdout)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return EXIT_USAGE
+
+
+if __name__ == '__main__':
+    sys.exit(main())
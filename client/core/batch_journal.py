@@ -0,0 +1,335 @@
+"""
+Batch Journal
+On-disk record of a conversion batch so an interrupted batch (crash, sleep,
+cancel) can be resumed without redoing finished work.
+
+Each unit is one (input, variant, params-hash) triple with a state
+(pending / running / done / failed / skipped), the outputs it wrote and their
+sizes, and the outputs it was about to write. Variant expansion happens inside
+the engine for a single input (size/quality variants share one decode), so the
+engine journals whole inputs with variant '' and every variant shows up as an
+output of that unit.
+
+Storage is a JSON snapshot written atomically (temp file + rename) plus an
+append-only event log next to it. Events are appended as they happen and folded
+into a new snapshot every CHECKPOINT_EVENTS events and on close; loading replays
+the log over the snapshot, ignoring a torn last line.
+
+Planned outputs are logged (and fsync'ed) before FFmpeg/Pillow opens them, so a
+file that exists on disk but never completed can be deleted on resume instead
+of being mistaken for a finished variant by the overwrite-off skip logic. Only
+outputs that didn't exist when they were planned are ever deleted.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from client.core.cache_utils import get_app_cache_dir, atomic_write_json
+from client.core.calibration_cache import settings_hash
+
+
+JOURNAL_VERSION = 1
+CHECKPOINT_EVENTS = 200
+LAST_BATCH_FILENAME = 'last_batch.json'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# States that still need work on resume
+UNFINISHED_STATES = (PENDING, RUNNING)
+
+
+def default_journal_path() -> str:
+    """Location of the most recent batch's journal."""
+    return os.path.join(get_app_cache_dir('journals'), LAST_BATCH_FILENAME)
+
+
+def unit_key(input_path: str, variant: str, params_hash: str) -> str:
+    return f"{os.path.abspath(input_path)}|{variant}|{params_hash}"
+
+
+def _json_safe(value):
+    """Round-trip through JSON so stored params are exactly what a resume will see."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class BatchJournal:
+    """
+    Thread-safe journal of one conversion batch.
+
+    Usage:
+        journal = BatchJournal.create(path, files, params)
+        journal.mark_running(f); journal.output_planned(f, out)
+        journal.output_written(f, out); journal.mark_finished(f, True)
+        journal.close()
+
+        journal = BatchJournal.load(path)
+        files = journal.prepare_resume()   # unfinished inputs, partial outputs removed
+    """
+
+    def __init__(self, path: str, params: Dict, batch_id: Optional[str] = None,
+                 created: Optional[float] = None, units: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.params = params
+        self.params_hash = settings_hash(params)
+        self.batch_id = batch_id or time.strftime('%Y%m%d-%H%M%S')
+        self.created = created if created is not None else time.time()
+        self.units: Dict[str, Dict] = units if units is not None else {}
+        self._lock = threading.Lock()
+        self._log = None
+        self._events_since_checkpoint = 0
+
+    # ------------------------------------------------------------------ creation
+
+    @classmethod
+    def create(cls, path: str, files: List[str], params: Dict) -> 'BatchJournal':
+        """Start a new journal for files, replacing any previous journal at path."""
+        journal = cls(path, _json_safe(params))
+        for file_path in files:
+            journal._ensure_unit(file_path)
+        with journal._lock:
+            journal._checkpoint()
+        return journal
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BatchJournal']:
+        """Load a journal (snapshot + event log), or None if missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != JOURNAL_VERSION:
+            return None
+
+        journal = cls(path, data.get('params', {}), batch_id=data.get('batch_id'),
+                      created=data.get('created'), units=data.get('units', {}))
+        journal._replay_log()
+        return journal
+
+    def _replay_log(self) -> None:
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as fh:
+                lines = fh.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break  # Torn write at crash time; nothing after it was acknowledged
+            self._apply(event)
+
+    # ------------------------------------------------------------------ events
+
+    def _ensure_unit(self, input_path: str, variant: str = '') -> Dict:
+        key = unit_key(input_path, variant, self.params_hash)
+        unit = self.units.get(key)
+        if unit is None:
+            unit = {
+                'input': os.path.abspath(input_path),
+                'variant': variant,
+                'params_hash': self.params_hash,
+                'state': PENDING,
+                'outputs': {},
+                'planned': [],
+            }
+            self.units[key] = unit
+        return unit
+
+    def _apply(self, event: Dict) -> None:
+        unit = self._ensure_unit(event['input'], event.get('variant', ''))
+        kind = event.get('event')
+        if kind == 'state':
+            unit['state'] = event['state']
+            if event.get('error'):
+                unit['error'] = event['error']
+        elif kind == 'planned':
+            if event['output'] not in unit['planned']:
+                unit['planned'].append(event['output'])
+        elif kind == 'written':
+            unit['outputs'][event['output']] = event.get('size')
+
+    def _record(self, event: Dict, durable: bool = False) -> None:
+        """Apply an event and append it to the log (caller holds the lock)."""
+        self._apply(event)
+        try:
+            if self._log is None:
+                self._log = open(self.log_path, 'a', encoding='utf-8')
+            self._log.write(json.dumps(event) + '\n')
+            self._log.flush()
+            if durable:
+                os.fsync(self._log.fileno())
+        except OSError as e:
+            print(f"[BatchJournal] Failed to append event: {e}")
+        self._events_since_checkpoint += 1
+        if self._events_since_checkpoint >= CHECKPOINT_EVENTS:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        """Fold the log into a fresh snapshot (caller holds the lock)."""
+        data = {
+            'version': JOURNAL_VERSION,
+            'batch_id': self.batch_id,
+            'created': self.created,
+            'updated': time.time(),
+            'params': self.params,
+            'params_hash': self.params_hash,
+            'units': self.units,
+        }
+        try:
+            atomic_write_json(self.path, data)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[BatchJournal] Failed to write snapshot: {e}")
+            return
+        # Snapshot now holds every event; replaying a stale log would be harmless
+        # (events are idempotent) but truncate it to keep loads cheap
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        try:
+            open(self.log_path, 'w').close()
+        except OSError:
+            pass
+        self._events_since_checkpoint = 0
+
+    def mark_running(self, input_path: str) -> None:
+        with self._lock:
+            self._record({'event': 'state', 'input': os.path.abspath(input_path), 'state': RUNNING})
+
+    def mark_finished(self, input_path: str, result: Optional[bool], error: Optional[str] = None) -> None:
+        """Record a convert_file result (True = done, None = skipped, False = failed)."""
+        state = SKIPPED if result is None else (DONE if result else FAILED)
+        event = {'event': 'state', 'input': os.path.abspath(input_path), 'state': state}
+        if error:
+            event['error'] = error
+        with self._lock:
+            self._record(event)
+
+    def output_planned(self, input_path: str, output_path: str) -> None:
+        """Note an output about to be written. Pre-existing files are never recorded."""
+        output_path = os.path.abspath(output_path)
+        if os.path.exists(output_path):
+            return
+        with self._lock:
+            unit = self.units.get(unit_key(input_path, '', self.params_hash))
+            if unit is not None and output_path in unit['planned']:
+                return
+            self._record({'event': 'planned', 'input': os.path.abspath(input_path),
+                          'output': output_path}, durable=True)
+
+    def output_written(self, input_path: str, output_path: str) -> None:
+        output_path = os.path.abspath(output_path)
+        try:
+            size = os.path.getsize(output_path)
+        except OSError:
+            size = None
+        with self._lock:
+            self._record({'event': 'written', 'input': os.path.abspath(input_path),
+                          'output': output_path, 'size': size})
+
+    def close(self) -> None:
+        """Write a final snapshot and release the log."""
+        with self._lock:
+            self._checkpoint()
+
+    # ------------------------------------------------------------------ resume
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {state: 0 for state in (PENDING, RUNNING, DONE, FAILED, SKIPPED)}
+            for unit in self.units.values():
+                counts[unit['state']] = counts.get(unit['state'], 0) + 1
+            return counts
+
+    def unfinished_files(self) -> List[str]:
+        """Inputs that still need converting, in batch order."""
+        with self._lock:
+            return [unit['input'] for unit in self.units.values() if self._needs_work(unit)]
+
+    @staticmethod
+    def _needs_work(unit: Dict) -> bool:
+        if unit['state'] in UNFINISHED_STATES:
+            return True
+        if unit['state'] == DONE:
+            # A finished unit whose outputs vanished or changed size is redone too
+            for output, size in unit['outputs'].items():
+                try:
+                    if size is not None and os.path.getsize(output) != size:
+                        return True
+                except OSError:
+                    return True
+        return False
+
+    def prepare_resume(self) -> List[str]:
+        """
+        Delete partial outputs of unfinished units, reset them to pending and
+        return their inputs for re-queueing. Completed variants of a partly done
+        input are kept, so the engine's skip-existing logic only redoes the rest.
+        """
+        with self._lock:
+            files = []
+            for unit in self.units.values():
+                if not self._needs_work(unit):
+                    continue
+                for output in unit['planned']:
+                    if output in unit['outputs'] and self._output_intact(output, unit['outputs'][output]):
+                        continue
+                    try:
+                        os.remove(output)
+                        print(f"[BatchJournal] Removed partial output: {output}")
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"[BatchJournal] Could not remove partial output {output}: {e}")
+                    unit['outputs'].pop(output, None)
+                unit['planned'] = []
+                unit['state'] = PENDING
+                files.append(unit['input'])
+            self._checkpoint()
+            return files
+
+    @staticmethod
+    def _output_intact(output: str, size: Optional[int]) -> bool:
+        try:
+            return size is None or os.path.getsize(output) == size
+        except OSError:
+            return False
+
+    def discard(self) -> None:
+        """Delete the journal files (e.g. the user declined to resume)."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for path in (self.path, self.log_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def start_batch(files: List[str], params: Dict, path: Optional[str] = None) -> Optional[BatchJournal]:
+    """Create the journal for a new batch (None if the cache dir is unavailable)."""
+    try:
+        return BatchJournal.create(path or default_journal_path(), files, params)
+    except OSError as e:
+        print(f"[BatchJournal] Journal disabled: {e}")
+        return None
+
+
+def load_last_batch(path: Optional[str] = None) -> Optional[BatchJournal]:
+    """Load the most recent batch journal if it still has unfinished units."""
+    try:
+        journal = BatchJournal.load(path or default_journal_path())
+    except OSError:
+        return None
+    if journal is None or not journal.unfinished_files():
+        return None
+    return journal
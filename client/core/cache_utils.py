@@ -0,0 +1,71 @@
+"""
+Cache Utilities
+Shared helpers for the on-disk caches used by the conversion core
+(probe results, calibration data, journals, ...).
+"""
+import json
+import os
+import tempfile
+from typing import Optional, Tuple
+
+from client.version import APP_NAME
+
+
+def get_app_cache_dir(*parts: str) -> str:
+    """
+    Get (and create) a per-user cache directory for the app.
+
+    Uses the same roots as the bundled tools cache:
+    LOCALAPPDATA/APPDATA on Windows, XDG_CACHE_HOME or ~/.cache elsewhere.
+    """
+    if os.name == 'nt':
+        cache_root = os.getenv('LOCALAPPDATA') or os.getenv('APPDATA') or os.path.expanduser('~')
+    else:
+        cache_root = os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+
+    cache_dir = os.path.join(cache_root, APP_NAME, *parts)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def file_fingerprint(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Cheap identity of a file's current content: (absolute path, mtime_ns, size).
+
+    Returns None if the file cannot be stat'ed.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+
+def fingerprint_key(fingerprint: Tuple[str, int, int]) -> str:
+    """Serialize a file fingerprint into a stable string key for JSON stores."""
+    path, mtime_ns, size = fingerprint
+    return f"{path}|{mtime_ns}|{size}"
+
+
+def atomic_write_json(path: str, data) -> None:
+    """
+    Write JSON to path via temp file + rename so readers never see a partial file.
+
+    Each call writes its own uniquely named temp file in the target directory, so
+    concurrent writers cannot interleave; callers still serialise writes per path
+    (normally under the owning cache's lock) so an older snapshot never replaces
+    a newer one.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
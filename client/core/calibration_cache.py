@@ -0,0 +1,170 @@
+"""
+Calibration Cache
+Persists Max Size calibration results (reference encode size + preset size table)
+so re-running a batch or changing an unrelated option skips the reference encode.
+
+Entries are keyed on the source fingerprint (path, mtime, size), the estimator
+kind (gif/image/video) and a hash of the settings that change the encoded size
+(codec/format, resize, cut, retime, preset table). The store is an LRU bounded
+by entry count and persisted to the app cache dir.
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from client.core.cache_utils import (
+    get_app_cache_dir,
+    file_fingerprint,
+    fingerprint_key,
+    atomic_write_json,
+)
+
+
+DEFAULT_MAX_ENTRIES = 2048
+
+# Params that change the calibrated size, per estimator kind. Anything else in
+# the params dict (output dir, suffix, overwrite, ...) must not invalidate entries.
+GIF_CALIBRATION_KEYS = (
+    'enable_time_cutting', 'time_start', 'time_end',
+    'retime_enabled', 'enable_retime', 'retime_speed',
+    'gif_resize_mode', 'gif_resize_values',
+)
+
+# Fields of an estimate result that are worth persisting
+_STORED_FIELDS = (
+    'preset_sizes', 'reference_size', 'sample_size', 'sample_duration',
+    'total_duration', 'calibration_time', 'method',
+    'sample_points', 'confidence', 'confidence_interval',
+)
+
+
+def settings_hash(settings: Dict) -> str:
+    """Stable short hash of the size-relevant settings."""
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class CalibrationCache:
+    """
+    Thread-safe LRU store of calibration results.
+
+    Only measured calibrations should be stored; heuristic fallbacks are cheap
+    to recompute and would pin a bad estimate.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if persist_path:
+            self._load()
+
+    @staticmethod
+    def make_key(kind: str, file_path: str, settings: Dict) -> Optional[str]:
+        """Cache key for a calibration, or None if the source can't be fingerprinted."""
+        fingerprint = file_fingerprint(file_path)
+        if fingerprint is None:
+            return None
+        return f"{fingerprint_key(fingerprint)}|{kind}|{settings_hash(settings)}"
+
+    def get(self, kind: str, file_path: str, settings: Dict) -> Optional[Dict]:
+        """Return a copy of the cached calibration, or None on a miss."""
+        key = self.make_key(kind, file_path, settings)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, kind: str, file_path: str, settings: Dict, calibration: Dict) -> None:
+        """Store a calibration result and persist the store."""
+        key = self.make_key(kind, file_path, settings)
+        if key is None:
+            return
+        entry = {k: calibration[k] for k in _STORED_FIELDS if k in calibration}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.flush()
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drop cached calibrations for one file (any version), or everything when file_path is None."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                prefix = f"{os.path.abspath(file_path)}|"
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the store to persist_path (no-op when persistence is disabled)."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            data = dict(self._entries)
+            try:
+                atomic_write_json(self.persist_path, data)
+            except Exception as e:
+                print(f"[CalibrationCache] Failed to persist cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        for key, entry in data.items():
+            if isinstance(entry, dict) and entry.get('preset_sizes'):
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_calibration_cache = CalibrationCache()
+
+
+def configure_calibration_cache(max_entries: int = DEFAULT_MAX_ENTRIES, persist: bool = False,
+                                persist_path: Optional[str] = None) -> CalibrationCache:
+    """
+    Replace the shared calibration cache.
+
+    Args:
+        max_entries: LRU capacity
+        persist: Persist entries to the app cache dir between sessions
+        persist_path: Explicit location for the persisted cache (implies persist)
+    """
+    global _calibration_cache
+    if persist and not persist_path:
+        persist_path = os.path.join(get_app_cache_dir('cache'), 'calibration.json')
+    _calibration_cache.flush()
+    _calibration_cache = CalibrationCache(max_entries=max_entries, persist_path=persist_path)
+    return _calibration_cache
+
+
+def get_calibration_cache() -> CalibrationCache:
+    """Get the shared calibration cache instance."""
+    return _calibration_cache
+
+
+atexit.register(lambda: _calibration_cache.flush())
@@ -228,10 +228,13 @@ def init_bundled_tools() -> str:
     return _USER_BIN_CACHE
 
 import ffmpeg
+import copy
+import glob
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional, Callable
-from PyQt6.QtCore import QThread, pyqtSignal
-import tempfile
+from client.core.signals import Signal
 from client.core.presets import (
     SOCIAL_PLATFORM_PRESETS,
     RATIO_MAPS,
@@ -340,12 +343,14 @@ from client.core.size_estimator import (
     estimate_image_size_at_preset,
     estimate_all_image_preset_sizes,
     find_optimal_image_params_for_size,
+    find_exact_image_params_for_size,
     VIDEO_QUALITY_PRESETS_STANDARD,
     VIDEO_QUALITY_PRESETS_AUTORESIZE,
     VIDEO_REFERENCE_PRESET_IDX,
     estimate_video_size_at_preset,
     estimate_all_video_preset_sizes,
-    find_optimal_video_params_for_size
+    find_optimal_video_params_for_size,
+    refine_max_size_result
 )
 from client.core.ffmpeg_utils import (
     map_ui_quality_to_crf,
@@ -355,156 +360,389 @@ from client.core.ffmpeg_utils import (
     has_audio_stream,
     clamp_resize_width,
     calculate_longer_edge_resize,
-    ensure_output_directory_exists
+    ensure_output_directory_exists,
+    MAX_VARIANT_OUTPUTS_PER_PROCESS
 )
 from client.core.gif_converter import GifConverter
+from client.core.size_model import record_size_outcome
+from client.core.ffmpeg_supervisor import compile_ffmpeg_args, get_supervisor
 from client.core.suffix_manager import SuffixManager
+from client.core.batch_journal import BatchJournal
+from client.core.output_index import get_output_index, output_params_hash
+from client.core.image_backend import (
+    can_convert_with_pillow, convert_image_pillow, finish_image, iter_resize_cascade, open_still_image, save_image,
+)
+
+
+# Approximate number of cores a single FFmpeg job keeps busy, keyed by the
+# encoder it ends up using. Used to size the parallel worker pool so that
+# N concurrent jobs don't oversubscribe the machine.
+CODEC_THREAD_USAGE = {
+    'image': 1,
+    'gif': 2,
+    'libx264': 8,
+    'libx265': 8,
+    'libvpx-vp9': 4,
+    'libaom-av1': 8,
+}
+
+# Hard cap on concurrent FFmpeg processes regardless of core count
+MAX_PARALLEL_JOBS = 8
+
+# Concurrent in-process encodes of one image's quality/size variants
+MAX_CONCURRENT_VARIANT_ENCODES = 4
+
+# Strict Max Size: total encodes per file (first encode + refinements)
+MAX_SIZE_DEFAULT_ATTEMPTS = 3
+
+# Encoders that support -pass 1/2 average-bitrate targeting
+TWO_PASS_CODECS = {'libx264', 'libvpx-vp9', 'libaom-av1'}
+
+# Fraction of the target bitrate actually requested (container overhead, rate control slack)
+TWO_PASS_BITRATE_BUDGET = 0.95
+MIN_TWO_PASS_VIDEO_KBPS = 50
+
+VIDEO_FORMAT_MAP = {
+    'H.264 (MP4)': 'mp4',
+    'H.265 (MP4)': 'mp4',
+    'WebM (VP9, faster)': 'webm',
+    'WebM (AV1, slower)': 'webm',
+    'AV1 (MP4)': 'mp4'
+}
+
+VIDEO_CODEC_MAP = {
+    'H.264 (MP4)': 'libx264',
+    'H.265 (MP4)': 'libx265',
+    'WebM (VP9, faster)': 'libvpx-vp9',
+    'WebM (AV1, slower)': 'libaom-av1',
+    'AV1 (MP4)': 'libaom-av1'
+}
+
+
+# Source extensions convert_file accepts per conversion type (loop/gif take videos)
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.tiff', '.bmp', '.gif'})
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv', '.m4v'})
+
+
+def _job_encoder_key(params: Dict) -> str:
+    """Return the CODEC_THREAD_USAGE key for the job type described by params."""
+    conversion_type = params.get('type', 'image')
+    if conversion_type == 'image':
+        return 'image'
+    if conversion_type == 'gif' or (conversion_type == 'loop' and params.get('loop_format', 'GIF') == 'GIF'):
+        return 'gif'
+
+    if conversion_type == 'loop':
+        selected_codec = 'WebM (AV1, slower)' if 'AV1' in params.get('loop_format', '') else 'WebM (VP9, faster)'
+    else:
+        selected_codec = params.get('codec', 'H.264 (MP4)')
+    return VIDEO_CODEC_MAP.get(selected_codec, 'libx264')
+
+
+def get_parallel_job_count(params: Dict, file_count: int, cpu_count: Optional[int] = None) -> int:
+    """
+    Resolve how many files may be converted concurrently.
+
+    params['parallel_jobs'] controls the mode:
+    - 1: serial mode (legacy one-file-at-a-time behaviour)
+    - N > 1: use exactly N workers (still capped by file count)
+    - 0 / None / missing: auto-size from CPU count and codec thread usage
+
+    Returns a value >= 1. A result of 1 means the serial path should be used.
+    """
+    if file_count <= 1:
+        return 1
+
+    requested = params.get('parallel_jobs')
+    try:
+        requested = int(requested) if requested is not None else 0
+    except (TypeError, ValueError):
+        requested = 0
 
+    if requested >= 1:
+        return max(1, min(requested, file_count))
 
-class ConversionEngine(QThread):
-    """Main conversion engine running in separate thread"""
+    cpus = cpu_count or os.cpu_count() or 1
+    threads_per_job = CODEC_THREAD_USAGE.get(_job_encoder_key(params), 1)
+    auto_jobs = max(1, cpus // threads_per_job)
+    return max(1, min(auto_jobs, MAX_PARALLEL_JOBS, file_count))
+
+
+class ConversionEngine:
+    """
+    Qt-free conversion core.
     
-    progress_updated = pyqtSignal(int)  # Progress percentage
-    file_progress_updated = pyqtSignal(int, float)  # (file_index, progress 0.0-1.0) for individual file progress
-    status_updated = pyqtSignal(str)    # Status message
-    file_completed = pyqtSignal(str, str)  # (source, output) file paths
-    conversion_finished = pyqtSignal(bool, str)  # (success, message)
+    run() converts the batch on the calling thread and reports through plain
+    signals (slots run on the emitting thread). The GUI drives it from a QThread
+    via client.gui.utils.conversion_thread.ConversionThread; the CLI calls run()
+    directly.
+    """
     
-    def __init__(self, files: List[str], params: Dict):
-        super().__init__()
+    progress_updated = Signal(int)  # Progress percentage
+    file_progress_updated = Signal(int, float)  # (file_index, progress 0.0-1.0) for individual file progress
+    status_updated = Signal(str)    # Status message
+    file_completed = Signal(str, str)  # (source, output) file paths
+    conversion_finished = Signal(bool, str)  # (success, message)
+    
+    def __init__(self, files: List[str], params: Dict, journal: Optional[BatchJournal] = None):
+        # Per-worker state (params copy, file index, process) for parallel mode.
+        # In serial mode the thread-local is empty and the shared attributes are used.
+        self._job_state = threading.local()
+        self._progress_lock = threading.Lock()
+        self._file_progress = None  # Per-index progress table, only set in parallel mode
         self.files = files
         self.params = params
         self.should_stop = False
         self.current_process = None
+        self._active_jobs = set()  # Supervised FFmpeg jobs, cancelled on stop
+        self._jobs_lock = threading.Lock()
         self._current_file_index = 0
         self._total_files = len(files)
+        # Optional on-disk record of unit states/outputs so the batch can be resumed
+        self.journal = journal
+        if journal is not None:
+            self.file_completed.connect(journal.output_written)
+        # Incremental mode: skip sources whose outputs are up to date for these params
+        self.output_index = get_output_index() if params.get('skip_up_to_date', False) else None
+        self._output_params_hash = output_params_hash(params)
+        self._up_to_date_count = 0
+        if self.output_index is not None:
+            self.file_completed.connect(self.output_index.record_output)
         # Initialize sub-converters
         self.gif_converter = GifConverter(self)
 
+    @property
+    def params(self) -> Dict:
+        """Conversion params for the file being processed on the calling thread."""
+        return getattr(self._job_state, 'params', self._shared_params)
+
+    @params.setter
+    def params(self, value: Dict):
+        if hasattr(self._job_state, 'params'):
+            self._job_state.params = value
+        else:
+            self._shared_params = value
+
+    @property
+    def current_process(self):
+        return getattr(self._job_state, 'process', self._shared_process)
+
+    @current_process.setter
+    def current_process(self, value):
+        if hasattr(self._job_state, 'file_index'):
+            self._job_state.process = value
+        else:
+            self._shared_process = value
+
+    @property
+    def _current_file_index(self) -> int:
+        return getattr(self._job_state, 'file_index', self._shared_file_index)
+
+    @_current_file_index.setter
+    def _current_file_index(self, value: int):
+        if hasattr(self._job_state, 'file_index'):
+            self._job_state.file_index = value
+        else:
+            self._shared_file_index = value
+
+    def _update_parallel_progress(self, file_index: int, file_progress: float):
+        """Record per-file progress in parallel mode and emit the aggregate percentage."""
+        with self._progress_lock:
+            if self._file_progress is None:
+                return
+            self._file_progress[file_index] = max(self._file_progress[file_index], file_progress)
+            overall = sum(self._file_progress) * 100.0 / max(1, self._total_files)
+        self.progress_updated.emit(int(overall))
+
     def run_ffmpeg_with_cancellation(self, stream_spec, **kwargs):
-        """Run FFmpeg with cancellation support and progress tracking"""
-        import re
-        import threading
-        import time
+        """Run FFmpeg via the shared supervisor with cancellation support and progress tracking"""
+        # Capture per-job state here: progress callbacks run on the supervisor
+        # thread, which doesn't see the worker's thread-local state in parallel mode.
+        file_index = self._current_file_index
+        last_progress_percent = -1.0  # Use float for smooth progress tracking
         
-        try:
-            # Add -progress pipe:1 to output progress to stdout in parseable format
-            stream_spec = stream_spec.global_args('-progress', 'pipe:1', '-stats_period', '0.1')
-            
-            # Use run_async with pipes for progress tracking
-            self.current_process = ffmpeg.run_async(
-                stream_spec, 
-                pipe_stderr=True,
-                pipe_stdout=True,
-                **{k: v for k, v in kwargs.items() if k != 'quiet'}
-            )
+        def on_progress(progress):
+            nonlocal last_progress_percent
+            if progress.fraction is None:
+                return
             
-            stderr_data = []
-            stdout_data = []
-            last_progress_percent = -1.0  # Use float for smooth progress tracking
-            duration = None
-            duration_lock = threading.Lock()
-            
-            # Thread to read stderr (for duration and errors)
-            def read_stderr():
-                nonlocal duration
-                for line in iter(self.current_process.stderr.readline, b''):
-                    stderr_data.append(line)
-                    line_str = line.decode('utf-8', errors='replace')
-                    
-                    # Extract duration from FFmpeg output
-                    if 'Duration:' in line_str:
-                        duration_match = re.search(r'Duration: (\d+):(\d+):(\d+[\.,]\d+)', line_str)
-                        if duration_match:
-                            h, m, s = duration_match.groups()
-                            s = s.replace(',', '.')
-                            with duration_lock:
-                                duration = int(h) * 3600 + int(m) * 60 + float(s)
-            
-            # Thread to read stdout (for progress)
-            def read_stdout():
-                nonlocal last_progress_percent
-                buffer = ""
-                for line in iter(self.current_process.stdout.readline, b''):
-                    stdout_data.append(line)
-                    buffer += line.decode('utf-8', errors='replace')
-                    
-                    # Parse progress output: out_time_ms=123456
-                    if 'out_time_ms=' in buffer:
-                        out_time_match = re.search(r'out_time_ms=(\d+)', buffer)
-                        if out_time_match:
-                            with duration_lock:
-                                dur = duration
-                            if dur and dur > 0:
-                                out_time_ms = int(out_time_match.group(1))
-                                current_time = out_time_ms / 1000000.0  # microseconds to seconds
-                                
-                                # Calculate smooth file progress (0.0 to 1.0)
-                                smooth_file_progress = min(0.95, current_time / dur)
-                                
-                                # Emit smooth file progress for list item visualization
-                                if hasattr(self, '_current_file_index'):
-                                    self.file_progress_updated.emit(self._current_file_index, smooth_file_progress)
-                                
-                                # Calculate smooth overall progress as float (0-100)
-                                file_progress_float = min(95.0, (current_time / dur) * 100.0)
-                                
-                                # Emit progress for every 0.5% change for smooth animation
-                                if abs(file_progress_float - last_progress_percent) >= 0.5:
-                                    last_progress_percent = file_progress_float
-                                    
-                                    if hasattr(self, '_current_file_index') and hasattr(self, '_total_files'):
-                                        base_progress = (self._current_file_index * 100.0) / self._total_files
-                                        file_weight = 100.0 / self._total_files
-                                        overall = base_progress + (file_progress_float * file_weight) / 100.0
-                                        self.progress_updated.emit(int(overall))
-                                    else:
-                                        self.progress_updated.emit(int(file_progress_float))
-                        
-                        # Clear buffer after parsing progress block
-                        if 'progress=' in buffer:
-                            buffer = ""
-            
-            # Start reader threads
-            stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-            stdout_thread = threading.Thread(target=read_stdout, daemon=True)
-            stderr_thread.start()
-            stdout_thread.start()
-            
-            # Wait for process while checking for cancellation
-            while self.current_process.poll() is None:
-                if self.should_stop:
-                    self.current_process.kill()
-                    return False
-                time.sleep(0.1)
+            # Calculate smooth file progress (0.0 to 1.0)
+            smooth_file_progress = min(0.95, progress.fraction)
             
-            # Wait for threads to finish
-            stderr_thread.join(timeout=2)
-            stdout_thread.join(timeout=2)
-                
-            # Check exit code
-            if self.current_process.returncode != 0:
-                if self.should_stop:
-                    return False
-                    
-                stderr_str = b''.join(stderr_data).decode('utf-8', errors='replace')
-                error_msg = f"FFmpeg process exited with code {self.current_process.returncode}"
-                if stderr_str:
-                    error_msg += f"\nStderr: {stderr_str}"
-                raise Exception(error_msg)
+            # Emit smooth file progress for list item visualization
+            self.file_progress_updated.emit(file_index, smooth_file_progress)
+            
+            # Calculate smooth overall progress as float (0-100)
+            file_progress_float = min(95.0, progress.fraction * 100.0)
+            
+            # Emit progress for every 0.5% change for smooth animation
+            if abs(file_progress_float - last_progress_percent) >= 0.5:
+                last_progress_percent = file_progress_float
                 
-            return True
+                if self._file_progress is not None:
+                    # Parallel mode: aggregate over all in-flight files
+                    self._update_parallel_progress(file_index, smooth_file_progress)
+                else:
+                    base_progress = (file_index * 100.0) / self._total_files
+                    file_weight = 100.0 / self._total_files
+                    overall = base_progress + (file_progress_float * file_weight) / 100.0
+                    self.progress_updated.emit(int(overall))
+        
+        job = None
+        try:
+            args = compile_ffmpeg_args(stream_spec, overwrite_output=kwargs.get('overwrite_output', False),
+                                       cmd=kwargs.get('cmd'))
+            job = get_supervisor().start(args, on_progress=on_progress)
+            self.current_process = job
+            with self._jobs_lock:
+                self._active_jobs.add(job)
+            # stop_conversion() cancels active jobs directly; should_stop covers a stop
+            # requested between the check and registration above
+            return job.result(should_stop=lambda: self.should_stop)
         except Exception as e:
             if self.should_stop:
                 return False
             raise e
         finally:
+            if job is not None:
+                with self._jobs_lock:
+                    self._active_jobs.discard(job)
             self.current_process = None
         
     def run(self):
         """Main conversion thread execution"""
         print(f"Starting conversion with {len(self.files)} files")
         print(f"Conversion parameters: {self.params}")
+        
+        max_workers = get_parallel_job_count(self.params, len(self.files))
+        try:
+            if max_workers > 1:
+                self._run_parallel(max_workers)
+            else:
+                self._run_serial()
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            if self.output_index is not None:
+                self.output_index.flush()
+    
+    def convert_source(self, file_path: str):
+        """
+        Convert one source: convert_file plus the up-to-date check and journal/index
+        bookkeeping. Returns True/False, or None when skipped (unsupported or up to date).
+        """
+        if self.output_index is not None and self.output_index.is_up_to_date(file_path, self._output_params_hash):
+            self.status_updated.emit(f"Up to date, skipping: {os.path.basename(file_path)}")
+            with self._progress_lock:
+                self._up_to_date_count += 1
+            if self.journal is not None:
+                self.journal.mark_finished(file_path, None)
+            return None
+        
+        if self.journal is not None:
+            self.journal.mark_running(file_path)
+        try:
+            result = self.convert_file(file_path)
+        except Exception as e:
+            if self.output_index is not None:
+                self.output_index.complete(file_path, self._output_params_hash, False)
+            if self.journal is not None:
+                self.journal.mark_finished(file_path, False, error=str(e))
+            raise
+        interrupted = self.should_stop and not result
+        if self.output_index is not None:
+            self.output_index.complete(file_path, self._output_params_hash, bool(result) and not interrupted)
+        # Interrupted mid-file: leave it running in the journal so a resume redoes it
+        if self.journal is not None and not interrupted:
+            self.journal.mark_finished(file_path, result)
+        return result
+    
+    def _completion_message(self, successful_conversions: int) -> str:
+        message = f"Conversion completed: {successful_conversions} files processed successfully"
+        if self._up_to_date_count:
+            message += f", {self._up_to_date_count} up to date (skipped)"
+        return message
+    
+    def _run_parallel(self, max_workers: int):
+        """
+        Convert files on a bounded pool of worker threads, each driving its own FFmpeg process.
+        
+        Every worker gets a private copy of params (convert_file mutates params per file),
+        its own file index and its own process handle via thread-local state, so the
+        per-index signal contract is identical to serial mode.
+        """
+        total_files = len(self.files)
+        base_params = self.params
+        self._file_progress = [0.0] * total_files
+        self.status_updated.emit(f"Parallel mode: {max_workers} concurrent jobs")
+        print(f"Running {total_files} files on {max_workers} workers")
+        
+        def convert_job(index: int, file_path: str):
+            if self.should_stop:
+                return None
+            self._job_state.params = copy.deepcopy(base_params)
+            self._job_state.file_index = index
+            self._job_state.process = None
+            try:
+                self.status_updated.emit(f"Processing: {os.path.basename(file_path)}")
+                self.file_progress_updated.emit(index, 0.0)
+                self.file_progress_updated.emit(index, 0.1)
+                self._update_parallel_progress(index, 0.1)
+                
+                result = self.convert_source(file_path)
+                
+                self.file_progress_updated.emit(index, 0.95)
+                return result
+            finally:
+                self._update_parallel_progress(index, 1.0)
+                del self._job_state.params
+                del self._job_state.file_index
+                del self._job_state.process
+        
+        try:
+            successful_conversions = 0
+            self.progress_updated.emit(0)
+            
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='conversion') as pool:
+                futures = {
+                    pool.submit(convert_job, i, file_path): file_path
+                    for i, file_path in enumerate(self.files)
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.status_updated.emit(f"Error converting {os.path.basename(file_path)}: {str(e)}")
+                        result = False
+                    
+                    if result is None:
+                        print(f"Skipped file: {file_path}")
+                    elif result:
+                        successful_conversions += 1
+                        print(f"Successfully converted: {file_path}")
+                    else:
+                        print(f"Failed to convert: {file_path}")
+                    # On stop, queued jobs return immediately and running jobs kill their
+                    # FFmpeg process from run_ffmpeg_with_cancellation.
+            
+            if self.should_stop:
+                print("Conversion cancelled by user")
+                self.conversion_finished.emit(False, "Conversion cancelled by user")
+            else:
+                message = self._completion_message(successful_conversions)
+                print(message)
+                self.conversion_finished.emit(True, message)
+                
+        except Exception as e:
+            error_msg = f"Error during conversion: {str(e)}"
+            print(error_msg)
+            self.conversion_finished.emit(False, error_msg)
+        finally:
+            self._file_progress = None
+    
+    def _run_serial(self):
+        """Convert files one at a time (legacy mode)"""
         try:
             total_files = len(self.files)
             successful_conversions = 0
@@ -538,18 +776,15 @@ class ConversionEngine(QThread):
                 self.progress_updated.emit(progress_start)
                 
                 # Emit file-specific progress start
-                print(f"🔵 EMITTING file_progress_updated({i}, 0.0)")
                 self.file_progress_updated.emit(i, 0.0)
                 
                 # For non-FFmpeg conversions (images), emit progress updates during conversion
                 # Simulate progress: 0% at start, then 50% midway, 100% when done
-                print(f"🔵 EMITTING file_progress_updated({i}, 0.1)")
                 self.file_progress_updated.emit(i, 0.1)  # 10% when starting
                 
-                result = self.convert_file(file_path)
+                result = self.convert_source(file_path)
                 
                 # Emit near-complete progress for image conversions (instant completion)
-                print(f"🔵 EMITTING file_progress_updated({i}, 0.95)")
                 self.file_progress_updated.emit(i, 0.95)  # 95% when file conversion completes
                 
                 if result is None:
@@ -586,7 +821,7 @@ class ConversionEngine(QThread):
                 # But the user asked: "If you converted 2 video files and skipped 5 photos, dont tell in teh popup converted 7 files, but say converted 2 files"
                 # So we should just report successful_conversions.
                 
-                message = f"Conversion completed: {successful_conversions} files processed successfully"
+                message = self._completion_message(successful_conversions)
                 print(message)
                 self.conversion_finished.emit(True, message)
                 
@@ -602,8 +837,8 @@ class ConversionEngine(QThread):
             conversion_type = self.params.get('type', 'image')
             
             # Define valid extensions
-            image_exts = {'.jpg', '.jpeg', '.png', '.webp', '.tiff', '.bmp', '.gif'}
-            video_exts = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv', '.m4v'}
+            image_exts = IMAGE_EXTENSIONS
+            video_exts = VIDEO_EXTENSIONS
             
             # Filter files based on conversion type
             if conversion_type == 'image':
@@ -753,6 +988,8 @@ class ConversionEngine(QThread):
                 self.params['current_resize'] = str(self.params['resize'])
             
             # Check if Max Size mode is enabled
+            optimal = None
+            target_bytes = 0
             image_size_mode = self.params.get('image_size_mode', 'manual')
             if image_size_mode == 'max_size':
                 target_mb = self.params.get('image_max_size_mb')
@@ -764,26 +1001,33 @@ class ConversionEngine(QThread):
                     # Find optimal parameters for target size
                     self.status_updated.emit(f"Optimizing for target size: {target_mb:.1f} MB...")
                     
-                    optimal = find_optimal_image_params_for_size(
-                        file_path, format_ext, target_bytes,
-                        status_callback=lambda msg: self.status_updated.emit(msg),
-                        auto_resize=auto_resize
-                    )
+                    # Exact in-memory search when the output will be encoded in-process
+                    if can_convert_with_pillow(file_path, format_ext, self.params):
+                        optimal = find_exact_image_params_for_size(
+                            file_path, format_ext, self.params, target_bytes,
+                            status_callback=lambda msg: self.status_updated.emit(msg),
+                            auto_resize=auto_resize
+                        )
+                    if optimal is None:
+                        optimal = find_optimal_image_params_for_size(
+                            file_path, format_ext, target_bytes,
+                            status_callback=lambda msg: self.status_updated.emit(msg),
+                            auto_resize=auto_resize
+                        )
                     
-                    # Apply optimized quality
-                    self.params['quality'] = optimal.get('quality', self.params.get('quality', 75))
+                    # Apply optimized quality and resolution scale
+                    self._apply_image_max_size_result(optimal)
                     
-                    # Apply resolution scale if present
                     if '_resolution_scale' in optimal:
                         scale = optimal['_resolution_scale']
-                        self.params['_max_size_resolution_scale'] = scale
                         self.status_updated.emit(f"Applied resolution scale: {int(scale * 100)}%")
                     
                     # Log optimization result
                     preset_info = optimal.get('_preset_info', '')
                     est_size = optimal.get('_estimated_size', 0)
+                    size_label = 'exact' if optimal.get('_exact_size') else 'est.'
                     self.status_updated.emit(
-                        f"✓ Optimized: {preset_info} (est. {est_size/(1024*1024):.2f} MB)"
+                        f"✓ Optimized: {preset_info} ({size_label} {est_size/(1024*1024):.2f} MB)"
                     )
             
             # Check if multiple qualities or resize variants are requested
@@ -795,7 +1039,30 @@ class ConversionEngine(QThread):
             else:
                 # Single conversion
                 output_path = self.get_output_path(file_path, format_ext)
-                return self._convert_single_image(file_path, output_path, format_ext)
+                if not (optimal and self.params.get('max_size_strict')):
+                    success = self._convert_single_image(file_path, output_path, format_ext)
+                    if success and optimal:
+                        # Teach the size model how far off the estimate was
+                        record_size_outcome(optimal, output_path)
+                    return success
+                
+                # Strict Max Size: verify the real size and step down presets until it fits
+                if not self._convert_single_image(file_path, output_path, format_ext, emit_completed=False):
+                    return False
+                
+                def encode_again():
+                    path = self.get_output_path(file_path, format_ext)
+                    return path if self._convert_single_image(file_path, path, format_ext, emit_completed=False) else None
+                
+                output_path = self._enforce_max_size(
+                    file_path, optimal, target_bytes, output_path,
+                    lambda r, actual: refine_max_size_result('image', r, actual, target_bytes),
+                    self._apply_image_max_size_result, encode_again
+                )
+                if output_path is None:
+                    return False
+                self.file_completed.emit(file_path, output_path)
+                return True
                 
         except Exception as e:
             self.status_updated.emit(f"Image conversion error: {str(e)}")
@@ -818,6 +1085,17 @@ class ConversionEngine(QThread):
         successful_conversions = 0
         total_variants = len(quality_variants) * len(resize_variants)
         
+        if (total_variants > 1 and self.params.get('single_decode_variants', True)
+                and can_convert_with_pillow(file_path, format_ext, self.params)):
+            try:
+                image = open_still_image(file_path)
+            except Exception as e:
+                self.status_updated.emit(f"Pillow could not decode {os.path.basename(file_path)} ({e}), "
+                                         f"using FFmpeg per variant")
+            else:
+                return self._convert_image_variants_single_decode(
+                    file_path, format_ext, image, quality_variants, resize_variants)
+        
         for quality in quality_variants:
             if self.should_stop:
                 break
@@ -860,12 +1138,83 @@ class ConversionEngine(QThread):
             self.status_updated.emit(f"Image variants conversion stopped by user")
         
         return successful_conversions > 0
+    
+    def _convert_image_variants_single_decode(self, file_path: str, format_ext: str, image,
+                                              quality_variants: List, resize_variants: List) -> bool:
+        """
+        Image variants from one decode: each resize is rendered once (largest first,
+        cascading down) and every quality is encoded from that buffer concurrently.
+        """
+        # Encode threads can't see this job's thread-local params; hand them explicit copies
+        params = dict(self.params)
+        
+        def encode(rendered, output_path: str, variant_params: Dict):
+            # save() keeps encoder options on the Image, so each encode gets its own copy
+            save_image(rendered.copy(), output_path, format_ext, variant_params)
         
-    def _convert_single_image(self, file_path: str, output_path: str, format_ext: str) -> bool:
-        """Convert a single image with current settings using FFmpeg"""
-        return self._convert_image_ffmpeg(file_path, output_path)
+        pending = {}
+        max_workers = min(len(quality_variants) * len(resize_variants), MAX_CONCURRENT_VARIANT_ENCODES)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-variant') as pool:
+            for resize, resized in iter_resize_cascade(image, params, resize_variants):
+                if self.should_stop:
+                    break
+                rendered = finish_image(resized, dict(params, current_resize=resize), self.status_updated.emit)
+                for quality in quality_variants:
+                    output_path = self.get_output_path_with_variants(file_path, format_ext, quality, resize)
+                    variant_params = dict(params, current_resize=resize, quality=quality)
+                    future = pool.submit(encode, rendered, output_path, variant_params)
+                    pending[future] = (quality, resize, output_path)
             
-    def _convert_image_ffmpeg(self, file_path: str, output_path: str) -> bool:
+            successful_conversions = 0
+            for future in as_completed(pending):
+                quality, resize, output_path = pending[future]
+                variant_desc = f"Quality {quality}%"
+                if resize:
+                    variant_desc += f", Resize {resize}"
+                if self.should_stop:
+                    for other in pending:
+                        other.cancel()
+                if future.cancelled():
+                    continue
+                try:
+                    future.result()
+                except Exception as e:
+                    self.status_updated.emit(f"✗ {variant_desc} failed: {e}")
+                    continue
+                successful_conversions += 1
+                self.file_completed.emit(file_path, output_path)
+                self.status_updated.emit(f"✓ {variant_desc} completed")
+        
+        if self.should_stop:
+            self.status_updated.emit(f"Image variants conversion stopped by user")
+        
+        return successful_conversions > 0
+        
+    def _apply_image_max_size_result(self, result: Dict) -> None:
+        """Put an image Max Size optimizer result (or refinement) into params"""
+        self.params['quality'] = result.get('quality', self.params.get('quality', 75))
+        if '_resolution_scale' in result:
+            self.params['_max_size_resolution_scale'] = result['_resolution_scale']
+        else:
+            self.params.pop('_max_size_resolution_scale', None)
+    
+    def _convert_single_image(self, file_path: str, output_path: str, format_ext: str,
+                              emit_completed: bool = True) -> bool:
+        """Convert a single image with current settings (in-process with Pillow when possible, else FFmpeg)"""
+        if can_convert_with_pillow(file_path, format_ext, self.params):
+            try:
+                convert_image_pillow(file_path, output_path, format_ext, self.params,
+                                     status_callback=self.status_updated.emit)
+                if emit_completed:
+                    self.file_completed.emit(file_path, output_path)
+                return True
+            except FileExistsError:
+                raise
+            except Exception as e:
+                self.status_updated.emit(f"Pillow could not convert {os.path.basename(file_path)} ({e}), using FFmpeg")
+        return self._convert_image_ffmpeg(file_path, output_path, emit_completed=emit_completed)
+            
+    def _convert_image_ffmpeg(self, file_path: str, output_path: str, emit_completed: bool = True) -> bool:
         """Convert image using FFmpeg"""
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -988,7 +1337,8 @@ class ConversionEngine(QThread):
             error_msg = str(e)
             raise Exception(f"FFmpeg conversion failed: {error_msg}")
             
-        self.file_completed.emit(file_path, output_path)
+        if emit_completed:
+            self.file_completed.emit(file_path, output_path)
         return True
         
 
@@ -1009,6 +1359,8 @@ class ConversionEngine(QThread):
             output_format = format_map.get(selected_codec, 'mp4')
             
             # Check if Max Size mode is enabled
+            optimal = None
+            target_bytes = 0
             video_size_mode = self.params.get('video_size_mode', 'manual')
             if video_size_mode == 'max_size':
                 target_mb = self.params.get('video_max_size_mb')
@@ -1026,20 +1378,16 @@ class ConversionEngine(QThread):
                         auto_resize=auto_resize
                     )
                     
-                    # Apply optimized CRF and audio bitrate
-                    optimized_crf = optimal.get('crf', 28)
-                    optimized_audio = optimal.get('audio_bitrate', 96)
-                    
-                    # Store for use in output_args
-                    self.params['_optimized_crf'] = optimized_crf
-                    self.params['_optimized_audio_bitrate'] = optimized_audio
+                    self._apply_video_max_size_result(optimal)
                     
                     # Apply resolution scale if present
                     if '_resolution_scale' in optimal:
                         scale = optimal['_resolution_scale']
-                        self.params['_max_size_resolution_scale'] = scale
                         self.status_updated.emit(f"Applied resolution scale: {int(scale * 100)}%")
                     
+                    if self.params.get('max_size_strict') and self.params.get('max_size_two_pass'):
+                        optimal = self._plan_two_pass_max_size(file_path, selected_codec, optimal, target_bytes)
+                    
                     # Log optimization result
                     preset_info = optimal.get('_preset_info', '')
                     est_size = optimal.get('_estimated_size', 0)
@@ -1055,342 +1403,558 @@ class ConversionEngine(QThread):
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Handle time cutting - apply to input for better performance and compatibility
-            input_args = {}
-            enable_time_cutting = self.params.get('enable_time_cutting', False)
-            if enable_time_cutting:
-                time_start = self.params.get('time_start')
-                time_end = self.params.get('time_end')
-                if time_start is not None and time_end is not None and time_start < time_end:
-                    # Get video duration to convert normalized time to actual time
-                    video_duration = get_video_duration(file_path)
-                    if video_duration > 0:
-                        start_time = time_start * video_duration
-                        end_time = time_end * video_duration
-                        self.status_updated.emit(f"DEBUG: Applying time cutting - start: {start_time:.2f}s, end: {end_time:.2f}s (duration: {video_duration:.2f}s)")
-                        input_args['ss'] = start_time
-                        input_args['to'] = end_time
-                    else:
-                        self.status_updated.emit("DEBUG: Could not determine video duration for time cutting")
-            
-            input_stream = ffmpeg.input(file_path, **input_args)
-            video_stream = input_stream.video
+            encoded = self._encode_video(file_path, output_path, selected_codec)
+            if not encoded and self.should_stop:
+                return False
             
-            # Check if video has audio stream before creating reference
-            has_audio = has_audio_stream(file_path)
-            audio_stream = input_stream.audio if has_audio else None
-
-            # Apply retime (speed change) after cutting and before other filters
-            retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
-            retime_speed = self.params.get('retime_speed', 1.0)
-            if retime_enabled and retime_speed and retime_speed != 1.0:
-                try:
-                    speed = float(retime_speed)
-                    speed = max(0.1, min(3.0, speed))
-                    self.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x (setpts/atempo)")
-                    video_stream = video_stream.filter('setpts', f'PTS/{speed}')
-                    if audio_stream is not None:
-                        try:
-                            if speed <= 2.0:
-                                audio_stream = audio_stream.filter('atempo', speed)
-                            else:
-                                # Chain atempo to stay within valid range per filter
-                                audio_stream = audio_stream.filter('atempo', 2.0).filter('atempo', speed / 2.0)
-                        except Exception as audio_err:
-                            self.status_updated.emit(f"DEBUG: Skipping audio retime due to error: {audio_err}")
-                            audio_stream = None
+            if optimal and not self.should_stop:
+                if self.params.get('max_size_strict'):
+                    if '_two_pass_video_kbps' in optimal:
+                        next_result = lambda r, actual: self._refine_two_pass(r, actual, target_bytes)
                     else:
-                        self.status_updated.emit("DEBUG: No audio stream detected for retime")
-                except Exception as e:
-                    self.status_updated.emit(f"DEBUG: Skipping retime due to error: {e}")
-            else:
-                video_stream = video_stream
-            
-            # Video encoding options
-            codec_map = {
-                'H.264 (MP4)': 'libx264',
-                'H.265 (MP4)': 'libx265', 
-                'WebM (VP9, faster)': 'libvpx-vp9',
-                'WebM (AV1, slower)': 'libaom-av1',
-                'AV1 (MP4)': 'libaom-av1'
-            }
-            
-            codec = codec_map.get(selected_codec, 'libx264')
-            
-            # Debug: Print FFmpeg codec being used
-            self.status_updated.emit(f"DEBUG: FFmpeg codec: {codec}")
+                        next_result = lambda r, actual: refine_max_size_result('video', r, actual, target_bytes)
+                    
+                    def encode_again():
+                        path = self.get_output_path(file_path, output_format)
+                        return path if self._encode_video(file_path, path, selected_codec) else None
+                    
+                    output_path = self._enforce_max_size(
+                        file_path, optimal, target_bytes, output_path,
+                        next_result, self._apply_video_max_size_result, encode_again
+                    )
+                    if output_path is None:
+                        return False
+                else:
+                    # Teach the size model how far off the estimate was
+                    record_size_outcome(optimal, output_path)
             
-            output_args = {'vcodec': codec}
+            self.file_completed.emit(file_path, output_path)
+            return True
             
-            # Get quality parameter - use optimized CRF in Max Size mode
-            optimized_crf = self.params.get('_optimized_crf')
-            optimized_audio = self.params.get('_optimized_audio_bitrate')
-            quality = self.params.get('quality')
+        except Exception as e:
+            error_msg = f"FFmpeg error: {str(e)}"
+            if hasattr(e, 'stderr') and e.stderr:
+                stderr_output = e.stderr.decode('utf-8', errors='ignore')
+                error_msg += f" (stderr: {stderr_output})"
+            self.status_updated.emit(error_msg)
+            return False
+        except Exception as e:
+            self.status_updated.emit(f"Video conversion error: {e}")
+            return False
             
-            # Social Presets Overrides (e.g. Instagram)
-            # Use presets from configuration
-            preset_social = self.params.get('video_preset_social')
-            social_config = SOCIAL_PLATFORM_PRESETS.get(preset_social)
+    def _apply_video_max_size_result(self, result: Dict) -> None:
+        """Put a video Max Size optimizer result (or refinement) into params"""
+        if '_two_pass_video_kbps' in result:
+            self.params['_two_pass_video_kbps'] = result['_two_pass_video_kbps']
+            return
+        # Store for use in output_args
+        self.params['_optimized_crf'] = result.get('crf', 28)
+        self.params['_optimized_audio_bitrate'] = result.get('audio_bitrate', 96)
+        if '_resolution_scale' in result:
+            self.params['_max_size_resolution_scale'] = result['_resolution_scale']
+        else:
+            self.params.pop('_max_size_resolution_scale', None)
+    
+    def _plan_two_pass_max_size(self, file_path: str, selected_codec: str, optimal: Dict, target_bytes: int) -> Dict:
+        """
+        Switch a strict Max Size video job to two-pass bitrate targeting when the codec allows it.
+        
+        The preset's audio bitrate and resolution scale are kept; the video bitrate is
+        derived from the target size and the output duration.
+        """
+        codec = VIDEO_CODEC_MAP.get(selected_codec, 'libx264')
+        duration = self._get_effective_duration(file_path)
+        if codec not in TWO_PASS_CODECS or duration <= 0:
+            return optimal
+        
+        audio_kbps = 0
+        if selected_codec not in ['WebM (VP9, faster)', 'WebM (AV1, slower)'] and has_audio_stream(file_path):
+            audio_kbps = optimal.get('audio_bitrate', 96)
+        
+        total_kbps = target_bytes * 8 / duration / 1000 * TWO_PASS_BITRATE_BUDGET
+        video_kbps = max(MIN_TWO_PASS_VIDEO_KBPS, int(total_kbps - audio_kbps))
+        self.params['_two_pass_video_kbps'] = video_kbps
+        
+        # Size model stats are for CRF presets, so two-pass outcomes are not recorded
+        return {
+            '_two_pass_video_kbps': video_kbps,
+            '_estimated_size': target_bytes,
+            '_preset_info': f"two-pass {video_kbps} kbps",
+        }
+    
+    def _refine_two_pass(self, result: Dict, actual_size: int, target_bytes: int) -> Optional[Dict]:
+        """Scale the two-pass video bitrate down by the observed overshoot"""
+        current_kbps = result['_two_pass_video_kbps']
+        if current_kbps <= MIN_TWO_PASS_VIDEO_KBPS:
+            return None
+        video_kbps = max(MIN_TWO_PASS_VIDEO_KBPS, int(current_kbps * (target_bytes / actual_size) * TWO_PASS_BITRATE_BUDGET))
+        return {
+            '_two_pass_video_kbps': video_kbps,
+            '_estimated_size': target_bytes,
+            '_preset_info': f"two-pass {video_kbps} kbps",
+        }
+    
+    def _encode_video(self, file_path: str, output_path: str, selected_codec: str) -> bool:
+        """
+        Build and run the FFmpeg job for a single video conversion from current params.
+        
+        Returns False if cancelled; raises on FFmpeg errors.
+        """
+        # Handle time cutting - apply to input for better performance and compatibility
+        input_args = {}
+        enable_time_cutting = self.params.get('enable_time_cutting', False)
+        if enable_time_cutting:
+            time_start = self.params.get('time_start')
+            time_end = self.params.get('time_end')
+            if time_start is not None and time_end is not None and time_start < time_end:
+                # Get video duration to convert normalized time to actual time
+                video_duration = get_video_duration(file_path)
+                if video_duration > 0:
+                    start_time = time_start * video_duration
+                    end_time = time_end * video_duration
+                    self.status_updated.emit(f"DEBUG: Applying time cutting - start: {start_time:.2f}s, end: {end_time:.2f}s (duration: {video_duration:.2f}s)")
+                    input_args['ss'] = start_time
+                    input_args['to'] = end_time
+                else:
+                    self.status_updated.emit("DEBUG: Could not determine video duration for time cutting")
+        
+        input_stream = ffmpeg.input(file_path, **input_args)
+        video_stream = input_stream.video
+        
+        # Check if video has audio stream before creating reference
+        has_audio = has_audio_stream(file_path)
+        audio_stream = input_stream.audio if has_audio else None
+
+        # Apply retime (speed change) after cutting and before other filters
+        retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
+        retime_speed = self.params.get('retime_speed', 1.0)
+        if retime_enabled and retime_speed and retime_speed != 1.0:
+            try:
+                speed = float(retime_speed)
+                speed = max(0.1, min(3.0, speed))
+                self.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x (setpts/atempo)")
+                video_stream = video_stream.filter('setpts', f'PTS/{speed}')
+                if audio_stream is not None:
+                    try:
+                        if speed <= 2.0:
+                            audio_stream = audio_stream.filter('atempo', speed)
+                        else:
+                            # Chain atempo to stay within valid range per filter
+                            audio_stream = audio_stream.filter('atempo', 2.0).filter('atempo', speed / 2.0)
+                    except Exception as audio_err:
+                        self.status_updated.emit(f"DEBUG: Skipping audio retime due to error: {audio_err}")
+                        audio_stream = None
+                else:
+                    self.status_updated.emit("DEBUG: No audio stream detected for retime")
+            except Exception as e:
+                self.status_updated.emit(f"DEBUG: Skipping retime due to error: {e}")
+        else:
+            video_stream = video_stream
+        
+        # Video encoding options
+        codec_map = {
+            'H.264 (MP4)': 'libx264',
+            'H.265 (MP4)': 'libx265', 
+            'WebM (VP9, faster)': 'libvpx-vp9',
+            'WebM (AV1, slower)': 'libaom-av1',
+            'AV1 (MP4)': 'libaom-av1'
+        }
+        
+        codec = codec_map.get(selected_codec, 'libx264')
+        
+        # Debug: Print FFmpeg codec being used
+        self.status_updated.emit(f"DEBUG: FFmpeg codec: {codec}")
+        
+        output_args = {'vcodec': codec}
+        
+        # Get quality parameter - use optimized CRF in Max Size mode
+        optimized_crf = self.params.get('_optimized_crf')
+        optimized_audio = self.params.get('_optimized_audio_bitrate')
+        quality = self.params.get('quality')
+        
+        # Social Presets Overrides (e.g. Instagram)
+        # Use presets from configuration
+        preset_social = self.params.get('video_preset_social')
+        social_config = SOCIAL_PLATFORM_PRESETS.get(preset_social)
+        
+        if social_config:
+            self.status_updated.emit(f"Applying specialized settings for {preset_social}")
+            # Apply core settings from config, excluding internal logic keys
+            logic_keys = ['scaling_flags', 'f', 'force_original_aspect_ratio', 'use_padding', 'supported_background_styles']
+            
+            # Update output_args with social config
+            for k, v in social_config.items():
+                if k not in logic_keys:
+                    output_args[k] = v
+                    
+            # Ensure format is set
+            output_args['f'] = social_config.get('f', 'mp4')
             
-            if social_config:
-                self.status_updated.emit(f"Applying specialized settings for {preset_social}")
-                # Apply core settings from config, excluding internal logic keys
-                logic_keys = ['scaling_flags', 'f', 'force_original_aspect_ratio', 'use_padding', 'supported_background_styles']
+            # Override codec if specified (e.g. force h264 for insta)
+            if 'vcodec' in social_config:
+                codec = social_config['vcodec']
                 
-                # Update output_args with social config
-                for k, v in social_config.items():
-                    if k not in logic_keys:
-                        output_args[k] = v
-                        
-                # Ensure format is set
-                output_args['f'] = social_config.get('f', 'mp4')
+        else:
+            # For WebM/VP9/AV1, we need to handle audio codec and format-specific parameters
+            if selected_codec in ['WebM (VP9, faster)', 'WebM (AV1, slower)']:
+                # WebM: Strip audio completely (no audio stream)
+                audio_stream = None  # Remove audio stream
+                output_args['an'] = None  # No audio flag
+                output_args['f'] = 'webm'  # WebM container format
                 
-                # Override codec if specified (e.g. force h264 for insta)
-                if 'vcodec' in social_config:
-                    codec = social_config['vcodec']
-                    
+                # Apply CRF quality - use optimized value if in Max Size mode
+                if optimized_crf is not None:
+                    output_args['crf'] = optimized_crf
+                    self.status_updated.emit(f"DEBUG: WebM CRF set to {optimized_crf} (max size optimized)")
+                elif quality is not None:
+                    crf_value = map_ui_quality_to_crf(quality, codec)
+                    output_args['crf'] = crf_value
+                    self.status_updated.emit(f"DEBUG: WebM CRF set to {crf_value} (quality: {quality})")
+                
+                # No audio bitrate needed since we're stripping audio
+                
+                # Optimize AV1 speed
+                if codec == 'libaom-av1':
+                    output_args['cpu-used'] = 4
+                    self.status_updated.emit("DEBUG: Applied AV1 speed optimization (cpu-used=4)")
             else:
-                # For WebM/VP9/AV1, we need to handle audio codec and format-specific parameters
-                if selected_codec in ['WebM (VP9, faster)', 'WebM (AV1, slower)']:
-                    # WebM: Strip audio completely (no audio stream)
-                    audio_stream = None  # Remove audio stream
-                    output_args['an'] = None  # No audio flag
-                    output_args['f'] = 'webm'  # WebM container format
-                    
-                    # Apply CRF quality - use optimized value if in Max Size mode
-                    if optimized_crf is not None:
-                        output_args['crf'] = optimized_crf
-                        self.status_updated.emit(f"DEBUG: WebM CRF set to {optimized_crf} (max size optimized)")
-                    elif quality is not None:
-                        crf_value = map_ui_quality_to_crf(quality, codec)
-                        output_args['crf'] = crf_value
-                        self.status_updated.emit(f"DEBUG: WebM CRF set to {crf_value} (quality: {quality})")
-                    
-                    # No audio bitrate needed since we're stripping audio
-                    
-                    # Optimize AV1 speed
-                    if codec == 'libaom-av1':
-                        output_args['cpu-used'] = 4
-                        self.status_updated.emit("DEBUG: Applied AV1 speed optimization (cpu-used=4)")
-                else:
-                    # For MP4 codecs, ensure MP4 format
-                    output_args['f'] = 'mp4'
-                    
-                    # Optimize AV1 speed for MP4 container too
-                    if codec == 'libaom-av1':
-                        output_args['cpu-used'] = 4
-                        self.status_updated.emit("DEBUG: Applied AV1 speed optimization (cpu-used=4)")
-                    
-                    # Apply CRF quality - use optimized value if in Max Size mode
-                    if optimized_crf is not None:
-                        output_args['crf'] = optimized_crf
-                        self.status_updated.emit(f"DEBUG: MP4 CRF set to {optimized_crf} (max size optimized)")
-                    elif quality is not None:
-                        crf_value = map_ui_quality_to_crf(quality, codec)
-                        output_args['crf'] = crf_value
-                        self.status_updated.emit(f"DEBUG: MP4 CRF set to {crf_value} (quality: {quality})")
-                    
-                    # Apply optimized audio bitrate if in Max Size mode
-                    if optimized_audio is not None:
-                        output_args['audio_bitrate'] = f'{optimized_audio}k'
-                        self.status_updated.emit(f"DEBUG: Audio bitrate set to {optimized_audio}k (max size optimized)")
+                # For MP4 codecs, ensure MP4 format
+                output_args['f'] = 'mp4'
                 
-            # Frame rate (always use original as per user request)
-            # fps = self.params.get('fps', 'Keep Original')
-            # if fps != 'Keep Original':
-            #     output_args['r'] = fps
+                # Optimize AV1 speed for MP4 container too
+                if codec == 'libaom-av1':
+                    output_args['cpu-used'] = 4
+                    self.status_updated.emit("DEBUG: Applied AV1 speed optimization (cpu-used=4)")
                 
-            # Apply Max Size mode resolution scale FIRST (before other resize)
-            max_size_scale = self.params.get('_max_size_resolution_scale')
-            if max_size_scale and max_size_scale < 1.0:
-                scale_w = f'trunc(iw*{max_size_scale}/2)*2'
-                scale_h = f'trunc(ih*{max_size_scale}/2)*2'
-                video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h)
-                self.status_updated.emit(f"DEBUG: Applied max size resolution scale: {int(max_size_scale * 100)}%")
-            
-            # Aspect Ratio & Smart Scaling
-            preset_ratio = self.params.get('video_preset_ratio')
-            bg_style = self.params.get('video_background_style')
-            
-            # Default to social preset ratio if not manually set
-            target_ratio = preset_ratio
-            if not target_ratio and social_config:
-                 target_ratio = '9:16' # Default for social
-            
-            if target_ratio and target_ratio in RATIO_MAPS:
-                 tw, th = RATIO_MAPS[target_ratio]
-                 self.status_updated.emit(f"Applying smart scaling: {target_ratio} ({tw}x{th})")
-                 
-                 # 'Fit & Blur' Safety: Vertical input -> Widescreen output
-                 try:
-                     original_width, original_height = get_video_dimensions(file_path)
-                     if target_ratio == '16:9' and original_height > original_width:
-                         self.status_updated.emit("Safety: Vertical video detected in Widescreen mode. Forcing 'Fit & Blur'.")
-                         bg_style = BG_STYLE_BLURRED
-                 except Exception as e:
-                     self.status_updated.emit(f"Warning: Could not check dimensions for safety logic: {e}")
-
-                 # Determine strategy
-                 is_blurred = bg_style == BG_STYLE_BLURRED
-                 is_fill = bg_style == BG_STYLE_FILL_ZOOM
-                 # Default to Black Bars if no style selected or explicit Black Bars, unless Fill forced in logic (but here handled by style)
-                 
-                 scaling_flags = social_config.get('scaling_flags', 'lanczos') if social_config else 'lanczos'
-                 
-                 if is_blurred:
-                      self.status_updated.emit("Scaling Mode: Blurred Background")
-                      s1, s2 = video_stream.split()
-                      
-                      # Background: Fill + Blur
-                      bg = s1.filter('scale', tw, th, force_original_aspect_ratio='increase', flags=scaling_flags)
-                      bg = bg.filter('crop', tw, th)
-                      bg = bg.filter('boxblur', '20:10')
-                      
-                      # Foreground: Fit
-                      fg = s2.filter('scale', tw, th, force_original_aspect_ratio='decrease', flags=scaling_flags)
-                      
-                      # Overlay
-                      video_stream = ffmpeg.overlay(bg, fg, x='(W-w)/2', y='(H-h)/2')
-                      
-                 elif is_fill:
-                      self.status_updated.emit("Scaling Mode: Fill/Zoom")
-                      video_stream = video_stream.filter('scale', tw, th, force_original_aspect_ratio='increase', flags=scaling_flags)
-                      video_stream = video_stream.filter('crop', tw, th)
-                      
-                 else:
-                      # Default: Black Bars (Fit with Padding)
-                      # Or just Fit if padding not required (logic from presets use_padding)
-                      use_pad = social_config.get('use_padding', True) if social_config else True
-                      
-                      self.status_updated.emit("Scaling Mode: Black Bars (Fit)")
-                      video_stream = video_stream.filter('scale', tw, th, force_original_aspect_ratio='decrease', flags=scaling_flags)
-                      if use_pad:
-                          video_stream = video_stream.filter('pad', tw, th, '(ow-iw)/2', '(oh-ih)/2')
-                      
-                 # Disable other scaling as this takes precedence
-                 self.params['scale'] = False
-            
-            # Handle current_resize parameter (from Lab mode)
-            current_resize = self.params.get('current_resize')
-            if current_resize:
-                original_width, original_height = get_video_dimensions(file_path)
+                # Apply CRF quality - use optimized value if in Max Size mode
+                if optimized_crf is not None:
+                    output_args['crf'] = optimized_crf
+                    self.status_updated.emit(f"DEBUG: MP4 CRF set to {optimized_crf} (max size optimized)")
+                elif quality is not None:
+                    crf_value = map_ui_quality_to_crf(quality, codec)
+                    output_args['crf'] = crf_value
+                    self.status_updated.emit(f"DEBUG: MP4 CRF set to {crf_value} (quality: {quality})")
                 
-                if current_resize.startswith('L'):
-                    # Longer edge resize
-                    target_longer_edge = int(current_resize[1:])
-                    longer_edge = max(original_width, original_height)
-                    
-                    # Don't upscale if longer edge is already smaller than target
-                    if longer_edge >= target_longer_edge:
-                        if original_width > original_height:
-                            # Width is longer: scale by width
-                            video_stream = ffmpeg.filter(video_stream, 'scale', target_longer_edge, -2, flags='lanczos')
-                        else:
-                            # Height is longer: scale by height
-                            video_stream = ffmpeg.filter(video_stream, 'scale', -2, target_longer_edge, flags='lanczos')
-                        self.status_updated.emit(f"DEBUG: Applied longer edge scaling: {target_longer_edge}px")
-                elif current_resize.endswith('%'):
-                    # Percentage resize
-                    percent = float(current_resize[:-1]) / 100.0
+                # Apply optimized audio bitrate if in Max Size mode
+                if optimized_audio is not None:
+                    output_args['audio_bitrate'] = f'{optimized_audio}k'
+                    self.status_updated.emit(f"DEBUG: Audio bitrate set to {optimized_audio}k (max size optimized)")
+            
+        # Frame rate (always use original as per user request)
+        # fps = self.params.get('fps', 'Keep Original')
+        # if fps != 'Keep Original':
+        #     output_args['r'] = fps
+            
+        # Apply Max Size mode resolution scale FIRST (before other resize)
+        max_size_scale = self.params.get('_max_size_resolution_scale')
+        if max_size_scale and max_size_scale < 1.0:
+            scale_w = f'trunc(iw*{max_size_scale}/2)*2'
+            scale_h = f'trunc(ih*{max_size_scale}/2)*2'
+            video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h)
+            self.status_updated.emit(f"DEBUG: Applied max size resolution scale: {int(max_size_scale * 100)}%")
+        
+        # Aspect Ratio & Smart Scaling
+        preset_ratio = self.params.get('video_preset_ratio')
+        bg_style = self.params.get('video_background_style')
+        
+        # Default to social preset ratio if not manually set
+        target_ratio = preset_ratio
+        if not target_ratio and social_config:
+             target_ratio = '9:16' # Default for social
+        
+        if target_ratio and target_ratio in RATIO_MAPS:
+             tw, th = RATIO_MAPS[target_ratio]
+             self.status_updated.emit(f"Applying smart scaling: {target_ratio} ({tw}x{th})")
+             
+             # 'Fit & Blur' Safety: Vertical input -> Widescreen output
+             try:
+                 original_width, original_height = get_video_dimensions(file_path)
+                 if target_ratio == '16:9' and original_height > original_width:
+                     self.status_updated.emit("Safety: Vertical video detected in Widescreen mode. Forcing 'Fit & Blur'.")
+                     bg_style = BG_STYLE_BLURRED
+             except Exception as e:
+                 self.status_updated.emit(f"Warning: Could not check dimensions for safety logic: {e}")
+
+             # Determine strategy
+             is_blurred = bg_style == BG_STYLE_BLURRED
+             is_fill = bg_style == BG_STYLE_FILL_ZOOM
+             # Default to Black Bars if no style selected or explicit Black Bars, unless Fill forced in logic (but here handled by style)
+             
+             scaling_flags = social_config.get('scaling_flags', 'lanczos') if social_config else 'lanczos'
+             
+             if is_blurred:
+                  self.status_updated.emit("Scaling Mode: Blurred Background")
+                  s1, s2 = video_stream.split()
+                  
+                  # Background: Fill + Blur
+                  bg = s1.filter('scale', tw, th, force_original_aspect_ratio='increase', flags=scaling_flags)
+                  bg = bg.filter('crop', tw, th)
+                  bg = bg.filter('boxblur', '20:10')
+                  
+                  # Foreground: Fit
+                  fg = s2.filter('scale', tw, th, force_original_aspect_ratio='decrease', flags=scaling_flags)
+                  
+                  # Overlay
+                  video_stream = ffmpeg.overlay(bg, fg, x='(W-w)/2', y='(H-h)/2')
+                  
+             elif is_fill:
+                  self.status_updated.emit("Scaling Mode: Fill/Zoom")
+                  video_stream = video_stream.filter('scale', tw, th, force_original_aspect_ratio='increase', flags=scaling_flags)
+                  video_stream = video_stream.filter('crop', tw, th)
+                  
+             else:
+                  # Default: Black Bars (Fit with Padding)
+                  # Or just Fit if padding not required (logic from presets use_padding)
+                  use_pad = social_config.get('use_padding', True) if social_config else True
+                  
+                  self.status_updated.emit("Scaling Mode: Black Bars (Fit)")
+                  video_stream = video_stream.filter('scale', tw, th, force_original_aspect_ratio='decrease', flags=scaling_flags)
+                  if use_pad:
+                      video_stream = video_stream.filter('pad', tw, th, '(ow-iw)/2', '(oh-ih)/2')
+                  
+             # Disable other scaling as this takes precedence
+             self.params['scale'] = False
+        
+        # Handle current_resize parameter (from Lab mode)
+        current_resize = self.params.get('current_resize')
+        if current_resize:
+            original_width, original_height = get_video_dimensions(file_path)
+            
+            if current_resize.startswith('L'):
+                # Longer edge resize
+                target_longer_edge = int(current_resize[1:])
+                longer_edge = max(original_width, original_height)
+                
+                # Don't upscale if longer edge is already smaller than target
+                if longer_edge >= target_longer_edge:
+                    if original_width > original_height:
+                        # Width is longer: scale by width
+                        video_stream = ffmpeg.filter(video_stream, 'scale', target_longer_edge, -2, flags='lanczos')
+                    else:
+                        # Height is longer: scale by height
+                        video_stream = ffmpeg.filter(video_stream, 'scale', -2, target_longer_edge, flags='lanczos')
+                    self.status_updated.emit(f"DEBUG: Applied longer edge scaling: {target_longer_edge}px")
+            elif current_resize.endswith('%'):
+                # Percentage resize
+                percent = float(current_resize[:-1]) / 100.0
+                target_w = int(original_width * percent) if original_width else None
+                if target_w:
+                    target_w = clamp_resize_width(original_width, target_w)
+                    # Use -2 for height to ensure even dimensions
+                    video_stream = ffmpeg.filter(video_stream, 'scale', target_w, -2, flags='lanczos')
+                else:
+                    scale_w = f'trunc(iw*{percent}/2)*2'
+                    scale_h = f'trunc(ih*{percent}/2)*2'
+                    video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h, flags='lanczos')
+                self.status_updated.emit(f"DEBUG: Applied percentage scaling: {percent*100}%")
+            else:
+                # Width-based resize
+                new_width = int(current_resize)
+                if not self.params.get('allow_upscaling', False):
+                    new_width = clamp_resize_width(original_width, new_width)
+                video_stream = ffmpeg.filter(video_stream, 'scale', new_width, -2, flags='lanczos')
+                self.status_updated.emit(f"DEBUG: Applied width scaling: {new_width}px")
+        
+        # Legacy scaling (for backwards compatibility)
+        elif self.params.get('scale', False):
+            width = self.params.get('width', None)
+            if width is not None:
+                self.status_updated.emit(f"DEBUG: Applying video scaling - width: {width}")
+                if isinstance(width, str) and width.endswith('%'):
+                    percent = float(width[:-1]) / 100.0
+                    original_width, original_height = get_video_dimensions(file_path)
                     target_w = int(original_width * percent) if original_width else None
                     if target_w:
                         target_w = clamp_resize_width(original_width, target_w)
-                        # Use -2 for height to ensure even dimensions
-                        video_stream = ffmpeg.filter(video_stream, 'scale', target_w, -2, flags='lanczos')
+                        target_h = int((target_w * original_height) / original_width) if original_height else -1
+                        video_stream = ffmpeg.filter(video_stream, 'scale', target_w, target_h, flags='lanczos')
                     else:
                         scale_w = f'trunc(iw*{percent}/2)*2'
                         scale_h = f'trunc(ih*{percent}/2)*2'
                         video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h, flags='lanczos')
                     self.status_updated.emit(f"DEBUG: Applied percentage scaling: {percent*100}%")
                 else:
-                    # Width-based resize
-                    new_width = int(current_resize)
+                    new_width = int(width)
+                    original_width, _ = get_video_dimensions(file_path)
+                    
+                    # Only clamp if upscaling is disabled (default)
                     if not self.params.get('allow_upscaling', False):
                         new_width = clamp_resize_width(original_width, new_width)
-                    video_stream = ffmpeg.filter(video_stream, 'scale', new_width, -2, flags='lanczos')
+                        
+                    video_stream = ffmpeg.filter(video_stream, 'scale', new_width, -1, flags='lanczos')
                     self.status_updated.emit(f"DEBUG: Applied width scaling: {new_width}px")
+            else:
+                self.status_updated.emit("DEBUG: Scale enabled but no width parameter found")
             
-            # Legacy scaling (for backwards compatibility)
-            elif self.params.get('scale', False):
-                width = self.params.get('width', None)
-                if width is not None:
-                    self.status_updated.emit(f"DEBUG: Applying video scaling - width: {width}")
-                    if isinstance(width, str) and width.endswith('%'):
-                        percent = float(width[:-1]) / 100.0
-                        original_width, original_height = get_video_dimensions(file_path)
-                        target_w = int(original_width * percent) if original_width else None
-                        if target_w:
-                            target_w = clamp_resize_width(original_width, target_w)
-                            target_h = int((target_w * original_height) / original_width) if original_height else -1
-                            video_stream = ffmpeg.filter(video_stream, 'scale', target_w, target_h, flags='lanczos')
-                        else:
-                            scale_w = f'trunc(iw*{percent}/2)*2'
-                            scale_h = f'trunc(ih*{percent}/2)*2'
-                            video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h, flags='lanczos')
-                        self.status_updated.emit(f"DEBUG: Applied percentage scaling: {percent*100}%")
-                    else:
-                        new_width = int(width)
-                        original_width, _ = get_video_dimensions(file_path)
-                        
-                        # Only clamp if upscaling is disabled (default)
-                        if not self.params.get('allow_upscaling', False):
-                            new_width = clamp_resize_width(original_width, new_width)
-                            
-                        video_stream = ffmpeg.filter(video_stream, 'scale', new_width, -1, flags='lanczos')
-                        self.status_updated.emit(f"DEBUG: Applied width scaling: {new_width}px")
-                else:
-                    self.status_updated.emit("DEBUG: Scale enabled but no width parameter found")
-                
-            # Handle rotation (skip rotation when using longer edge resize unless explicitly toggled)
-            current_resize = self.params.get('current_resize')
-            rotation_angle = self.params.get('rotation_angle')
-            # Skip rotation for longer edge mode UNLESS rotation is explicitly set to a real rotation value
-            skip_rotation_for_longer_edge = (
-                current_resize and 
-                current_resize.startswith('L') and 
-                (not rotation_angle or rotation_angle == "No rotation")
-            )
-            if rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge:
-                if rotation_angle == "90° clockwise":
-                    video_stream = ffmpeg.filter(video_stream, 'transpose', 1)  # 90 degrees clockwise
-                elif rotation_angle == "180°":
-                    video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # 180 degrees
-                    video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # Apply twice for 180
-                elif rotation_angle == "270° clockwise":
-                    video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # 270 degrees clockwise
-            
-            # Apply extra args (e.g. from Loop presets)
-            if 'extra_ffmpeg_args' in self.params:
-                output_args.update(self.params['extra_ffmpeg_args'])
+        # Handle rotation (skip rotation when using longer edge resize unless explicitly toggled)
+        current_resize = self.params.get('current_resize')
+        rotation_angle = self.params.get('rotation_angle')
+        # Skip rotation for longer edge mode UNLESS rotation is explicitly set to a real rotation value
+        skip_rotation_for_longer_edge = (
+            current_resize and 
+            current_resize.startswith('L') and 
+            (not rotation_angle or rotation_angle == "No rotation")
+        )
+        if rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge:
+            if rotation_angle == "90° clockwise":
+                video_stream = ffmpeg.filter(video_stream, 'transpose', 1)  # 90 degrees clockwise
+            elif rotation_angle == "180°":
+                video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # 180 degrees
+                video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # Apply twice for 180
+            elif rotation_angle == "270° clockwise":
+                video_stream = ffmpeg.filter(video_stream, 'transpose', 2)  # 270 degrees clockwise
+        
+        # Apply extra args (e.g. from Loop presets)
+        if 'extra_ffmpeg_args' in self.params:
+            output_args.update(self.params['extra_ffmpeg_args'])
+        
+        # Strict Max Size two-pass: target an average bitrate instead of CRF
+        two_pass_kbps = self.params.get('_two_pass_video_kbps')
+        if two_pass_kbps and output_args.get('vcodec') in TWO_PASS_CODECS:
+            return self._encode_video_two_pass(video_stream, audio_stream, output_path, output_args, two_pass_kbps)
 
+        if audio_stream is not None:
+            output = ffmpeg.output(video_stream, audio_stream, output_path, **output_args)
+        else:
+            output = ffmpeg.output(video_stream, output_path, **output_args)
+        
+        if self.params.get('overwrite', False):
+            output = ffmpeg.overwrite_output(output)
+            
+        # Check for cancellation before starting
+        if self.should_stop:
+            return False
+            
+        # Use run_ffmpeg_with_cancellation
+        return self.run_ffmpeg_with_cancellation(output)
+    
+    def _encode_video_two_pass(self, video_stream, audio_stream, output_path: str,
+                               output_args: Dict, video_kbps: int) -> bool:
+        """Two-pass average-bitrate encode (analysis pass to null, then the real encode)"""
+        output_args = dict(output_args)
+        output_args.pop('crf', None)
+        output_args['video_bitrate'] = f'{int(video_kbps)}k'
+        
+        passlog_prefix = os.path.join(
+            tempfile.gettempdir(), f"{APP_NAME}_2pass_{os.getpid()}_{threading.get_ident()}"
+        )
+        try:
+            self.status_updated.emit(f"Two-pass encode at {int(video_kbps)} kbps: analysis pass")
+            pass1_args = {k: v for k, v in output_args.items() if k not in ('audio_bitrate', 'acodec', 'f')}
+            pass1_args.update({'pass': 1, 'passlogfile': passlog_prefix, 'an': None, 'f': 'null'})
+            pass1 = ffmpeg.overwrite_output(ffmpeg.output(video_stream, os.devnull, **pass1_args))
+            
+            if self.should_stop or not self.run_ffmpeg_with_cancellation(pass1):
+                return False
+            
+            self.status_updated.emit("Two-pass encode: final pass")
+            output_args.update({'pass': 2, 'passlogfile': passlog_prefix})
             if audio_stream is not None:
                 output = ffmpeg.output(video_stream, audio_stream, output_path, **output_args)
             else:
                 output = ffmpeg.output(video_stream, output_path, **output_args)
-            
             if self.params.get('overwrite', False):
                 output = ffmpeg.overwrite_output(output)
-                
-            # Check for cancellation before starting
+            
             if self.should_stop:
                 return False
-                
-            # Use run_ffmpeg_with_cancellation
-            self.run_ffmpeg_with_cancellation(output)
-            
-            self.file_completed.emit(file_path, output_path)
-            return True
+            return self.run_ffmpeg_with_cancellation(output)
+        finally:
+            for log_file in glob.glob(f"{passlog_prefix}*"):
+                try:
+                    os.remove(log_file)
+                except OSError:
+                    pass
+    
+    def _get_effective_duration(self, file_path: str) -> float:
+        """Output duration in seconds after time cutting and retime"""
+        duration = get_video_duration(file_path)
+        if self.params.get('enable_time_cutting', False):
+            time_start = self.params.get('time_start')
+            time_end = self.params.get('time_end')
+            if time_start is not None and time_end is not None and time_start < time_end:
+                duration *= (time_end - time_start)
+        retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
+        retime_speed = self.params.get('retime_speed', 1.0)
+        if retime_enabled and retime_speed and retime_speed > 0:
+            duration /= max(0.1, min(3.0, float(retime_speed)))
+        return duration
+    
+    def _enforce_max_size(self, file_path: str, result: Dict, target_bytes: int, output_path: str,
+                          next_result: Callable[[Dict, int], Optional[Dict]],
+                          apply_result: Callable[[Dict], None],
+                          encode: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Strict Max Size: verify the encoded size and re-encode until it fits.
+        
+        After each encode the real output size is checked. On overshoot
+        `next_result` picks smaller settings, `apply_result` puts them into params
+        and `encode` re-runs the conversion (returning its output path, or None).
+        Stops after `max_size_max_attempts` encodes in total.
+        
+        Returns:
+            Path of the final output (the last successful attempt), or None if
+            there is no output at all
+        """
+        try:
+            max_attempts = max(1, int(self.params.get('max_size_max_attempts', MAX_SIZE_DEFAULT_ATTEMPTS)))
+        except (TypeError, ValueError):
+            max_attempts = MAX_SIZE_DEFAULT_ATTEMPTS
+        target_mb = target_bytes / (1024 * 1024)
+        attempt = 1
+        
+        while True:
+            try:
+                actual_size = os.path.getsize(output_path)
+            except OSError:
+                return None
+            record_size_outcome(result, output_path)
+            actual_mb = actual_size / (1024 * 1024)
+            
+            if actual_size <= target_bytes:
+                self.status_updated.emit(f"✓ Output {actual_mb:.2f} MB fits {target_mb:.2f} MB (attempt {attempt})")
+                return output_path
+            if self.should_stop:
+                return output_path
+            if attempt >= max_attempts:
+                self.status_updated.emit(
+                    f"⚠ Output {actual_mb:.2f} MB still exceeds {target_mb:.2f} MB after {attempt} attempts"
+                )
+                return output_path
+            
+            refined = next_result(result, actual_size)
+            if refined is None:
+                self.status_updated.emit(
+                    f"⚠ Output {actual_mb:.2f} MB exceeds {target_mb:.2f} MB at the smallest preset"
+                )
+                return output_path
+            
+            attempt += 1
+            self.status_updated.emit(
+                f"Output {actual_mb:.2f} MB exceeds {target_mb:.2f} MB - "
+                f"re-encoding (attempt {attempt}/{max_attempts}): {refined.get('_preset_info', '')}"
+            )
+            apply_result(refined)
             
-        except Exception as e:
-            error_msg = f"FFmpeg error: {str(e)}"
-            if hasattr(e, 'stderr') and e.stderr:
-                stderr_output = e.stderr.decode('utf-8', errors='ignore')
-                error_msg += f" (stderr: {stderr_output})"
-            self.status_updated.emit(error_msg)
-            return False
-        except Exception as e:
-            self.status_updated.emit(f"Video conversion error: {e}")
-            return False
+            # Retries replace the oversized output even when overwrite is off
+            overwrite = self.params.get('overwrite', False)
+            self.params['overwrite'] = True
+            try:
+                new_path = encode()
+            except Exception as e:
+                self.status_updated.emit(f"Re-encode failed, keeping previous output: {e}")
+                new_path = None
+            finally:
+                self.params['overwrite'] = overwrite
+            
+            if not new_path:
+                return output_path if os.path.exists(output_path) else None
+            if new_path != output_path and os.path.exists(output_path):
+                # Suffixes reflect the settings, so a retry may write a new file name
+                os.remove(output_path)
+            output_path = new_path
+            result = refined
+        
             
     def video_to_gif(self, file_path: str) -> bool:
         """Convert video to GIF using FFmpeg (delegated to GifConverter)"""
@@ -1421,200 +1985,43 @@ class ConversionEngine(QThread):
             if not quality_variants:
                 quality_variants = [None]  # No quality variants
             
-            all_success = True
             total_combinations = len(video_variants) * len(quality_variants)
-            current_combination = 0
-            
             self.status_updated.emit(f"Creating {total_combinations} video variants")
             
-            # Generate all combinations of size and quality variants
+            selected_codec = self.params.get('codec', 'H.264 (MP4)')
+            output_format = VIDEO_FORMAT_MAP.get(selected_codec, 'mp4')
+            
+            # Resolve output paths up front (same naming for both encode modes)
+            variants = []
             for size_variant in video_variants:
-                if self.should_stop:
-                    break
                 for quality_variant in quality_variants:
-                    if self.should_stop:
-                        break
-                    current_combination += 1
+                    # Generate output path with both size and quality variant suffixes
+                    output_path = self.get_output_path_with_video_variants(file_path, output_format, size_variant, quality_variant)
                     
-                    try:
-                        # Determine output format based on codec
-                        format_map = {
-                            'H.264 (MP4)': 'mp4',
-                            'H.265 (MP4)': 'mp4', 
-                            'WebM (VP9, faster)': 'webm',
-                            'WebM (AV1, slower)': 'webm',
-                            'AV1 (MP4)': 'mp4'
-                        }
-                        selected_codec = self.params.get('codec', 'H.264 (MP4)')
-                        output_format = format_map.get(selected_codec, 'mp4')
-                        
-                        # Generate output path with both size and quality variant suffixes
-                        output_path = self.get_output_path_with_video_variants(file_path, output_format, size_variant, quality_variant)
-                        
-                        # Ensure output directory exists
-                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                        
-                        if not self.params.get('overwrite', False) and os.path.exists(output_path):
-                            self.status_updated.emit(f"Skipping existing file: {os.path.basename(output_path)}")
-                            continue
-                        
-                        variant_desc = []
-                        if size_variant:
-                            variant_desc.append(f"Size: {size_variant}")
-                        if quality_variant is not None:
-                            variant_desc.append(f"Quality: {quality_variant}")
-                        variant_info = ", ".join(variant_desc) if variant_desc else "default"
-                        
-                        self.status_updated.emit(f"Processing variant {current_combination}/{total_combinations}: {variant_info}")
-                        
-                        # Prepare video input
-                        input_args = {}
-                        
-                        # Handle time cutting first (apply to input)
-                        enable_time_cutting = self.params.get('enable_time_cutting', False)
-                        if enable_time_cutting:
-                            time_start = self.params.get('time_start', 0.0)
-                            time_end = self.params.get('time_end', 1.0)
-                            if time_start is not None and time_end is not None and time_start < time_end:
-                                video_duration = get_video_duration(file_path)
-                                if video_duration and video_duration > 0:
-                                    start_time = time_start * video_duration
-                                    end_time = time_end * video_duration
-                                    input_args['ss'] = start_time
-                                    input_args['to'] = end_time
-                        
-                        input_stream = ffmpeg.input(file_path, **input_args)
-                        video_stream = input_stream.video
-                        
-                        # Check if video has audio stream before creating reference
-                        has_audio = has_audio_stream(file_path)
-                        audio_stream = input_stream.audio if has_audio else None
-                        
-                        # Apply retime (speed change) after cutting and before other filters
-                        retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
-                        retime_speed = self.params.get('retime_speed', 1.0)
-                        if retime_enabled and retime_speed and retime_speed != 1.0:
-                            try:
-                                speed = float(retime_speed)
-                                speed = max(0.1, min(3.0, speed))
-                                self.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x to variant")
-                                video_stream = video_stream.filter('setpts', f'PTS/{speed}')
-                                if audio_stream is not None:
-                                    try:
-                                        if speed <= 2.0:
-                                            audio_stream = audio_stream.filter('atempo', speed)
-                                        else:
-                                            # Chain atempo to stay within valid range
-                                            audio_stream = audio_stream.filter('atempo', 2.0).filter('atempo', speed / 2.0)
-                                    except Exception as audio_err:
-                                        self.status_updated.emit(f"DEBUG: Skipping audio retime: {audio_err}")
-                                        audio_stream = None
-                            except Exception as e:
-                                self.status_updated.emit(f"DEBUG: Skipping retime: {e}")
-                        
-                        # Video encoding options
-                        codec_map = {
-                            'H.264 (MP4)': 'libx264',
-                            'H.265 (MP4)': 'libx265', 
-                            'WebM (VP9, faster)': 'libvpx-vp9',
-                            'WebM (AV1, slower)': 'libaom-av1',
-                            'AV1 (MP4)': 'libaom-av1'
-                        }
-                        
-                        codec = codec_map.get(selected_codec, 'libx264')
-                        output_args = {'vcodec': codec}
-                        
-                        # For WebM/VP9/AV1, we need to handle audio codec and format-specific parameters
-                        if selected_codec in ['WebM (VP9, faster)', 'WebM (AV1, slower)']:
-                            # WebM: Strip audio completely (no audio stream)
-                            variant_audio_stream = None  # Remove audio stream
-                            output_args['an'] = None  # No audio flag
-                            output_args['f'] = 'webm'  # WebM container format
-                            
-                            # Apply CRF quality for VP9
-                            if quality_variant is not None:
-                                output_args['crf'] = map_ui_quality_to_crf(quality_variant, codec)
-                            
-                            # Optimize AV1 speed
-                            if codec == 'libaom-av1':
-                                output_args['cpu-used'] = 4
-                        else:
-                            # For MP4 codecs, ensure MP4 format
-                            output_args['f'] = 'mp4'
-                            
-                            # Apply CRF quality for MP4 codecs
-                            if quality_variant is not None:
-                                output_args['crf'] = map_ui_quality_to_crf(quality_variant, codec)
-                            
-                            # Optimize AV1 speed for MP4 container too
-                            if codec == 'libaom-av1':
-                                output_args['cpu-used'] = 4
-                                
-                        # Frame rate (always use original as per user request)
-                        # fps = self.params.get('fps', 'Keep Original')
-                        # if fps != 'Keep Original':
-                        #     output_args['r'] = fps
-                        
-                        # Apply video size variant
-                        if size_variant:
-                            original_width, original_height = get_video_dimensions(file_path)
-                            
-                            if str(size_variant).startswith('L'):
-                                # Longer edge resize
-                                target_longer_edge = int(str(size_variant)[1:])
-                                longer_edge = max(original_width, original_height)
-                                
-                                # Don't upscale if longer edge is already smaller than target
-                                if longer_edge >= target_longer_edge:
-                                    if original_width > original_height:
-                                        # Width is longer: scale by width
-                                        video_stream = ffmpeg.filter(video_stream, 'scale', target_longer_edge, -2, flags='lanczos')
-                                    else:
-                                        # Height is longer: scale by height
-                                        video_stream = ffmpeg.filter(video_stream, 'scale', -2, target_longer_edge, flags='lanczos')
-                            elif str(size_variant).endswith('%'):
-                                # Percentage resize
-                                percent = float(str(size_variant)[:-1]) / 100
-                                scale_w = f"trunc(iw*{percent}/2)*2"
-                                scale_h = f"trunc(ih*{percent}/2)*2"
-                                video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h)
-                            else:
-                                # Width-based resize (maintain aspect ratio)
-                                new_width = int(size_variant)
-                                video_stream = ffmpeg.filter(video_stream, 'scale', str(new_width), '-2')  # -2 maintains aspect ratio and ensures even height
-                        
-                        # Combine video and audio streams for output
-                        if audio_stream is not None:
-                            output = ffmpeg.output(video_stream, audio_stream, output_path, **output_args)
-                        else:
-                            output = ffmpeg.output(video_stream, output_path, **output_args)
-                        
-                        if self.params.get('overwrite', False):
-                            output = ffmpeg.overwrite_output(output)
-                        
-                        # Check for cancellation
-                        if self.should_stop:
-                            return False
-                            
-                        # Run video conversion with cancellation support
-                        self.run_ffmpeg_with_cancellation(output)
-                        
-                        self.file_completed.emit(file_path, output_path)
-                        self.status_updated.emit(f"✓ Video variant {variant_info} completed")
-                        
-                    except Exception as e:
-                        # More detailed FFmpeg error reporting
-                        error_msg = f"FFmpeg error with video variant {current_combination}: {str(e)}"
-                        self.status_updated.emit(error_msg)
-                        all_success = False
+                    # Ensure output directory exists
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    
+                    if not self.params.get('overwrite', False) and os.path.exists(output_path):
+                        self.status_updated.emit(f"Skipping existing file: {os.path.basename(output_path)}")
                         continue
-                    except Exception as e:
-                        self.status_updated.emit(f"Error with video variant {current_combination}: {str(e)}")
+                    variants.append((size_variant, quality_variant, output_path))
+            
+            if self.params.get('single_decode_variants', True) and len(variants) > 1:
+                all_success = self._convert_video_variants_single_decode(file_path, selected_codec, variants)
+            else:
+                all_success = True
+                for current_combination, (size_variant, quality_variant, output_path) in enumerate(variants, 1):
+                    if self.should_stop:
+                        break
+                    self.status_updated.emit(
+                        f"Processing variant {current_combination}/{len(variants)}: "
+                        f"{self._describe_video_variant(size_variant, quality_variant)}"
+                    )
+                    if not self._convert_single_video_variant(file_path, selected_codec, size_variant, quality_variant, output_path):
                         all_success = False
-                        continue
             
             if self.should_stop:
-                self.status_updated.emit(f"Video variants conversion stopped by user: {current_combination}/{total_combinations} completed")
+                self.status_updated.emit(f"Video variants conversion stopped by user")
             else:
                 self.status_updated.emit(f"Video variants completed: {total_combinations} files created")
             
@@ -1624,9 +2031,257 @@ class ConversionEngine(QThread):
             self.status_updated.emit(f"Error in video multiple variants conversion: {str(e)}")
             return False
     
+    @staticmethod
+    def _describe_video_variant(size_variant, quality_variant) -> str:
+        """Human-readable variant description for status messages"""
+        variant_desc = []
+        if size_variant:
+            variant_desc.append(f"Size: {size_variant}")
+        if quality_variant is not None:
+            variant_desc.append(f"Quality: {quality_variant}")
+        return ", ".join(variant_desc) if variant_desc else "default"
+    
+    def _build_video_variant_input(self, file_path: str):
+        """
+        Build the shared decode stage for video variants (time cut + retime).
+        
+        Returns (video_stream, audio_stream); audio_stream is None when the source has no audio.
+        """
+        input_args = {}
+        
+        # Handle time cutting first (apply to input)
+        enable_time_cutting = self.params.get('enable_time_cutting', False)
+        if enable_time_cutting:
+            time_start = self.params.get('time_start', 0.0)
+            time_end = self.params.get('time_end', 1.0)
+            if time_start is not None and time_end is not None and time_start < time_end:
+                video_duration = get_video_duration(file_path)
+                if video_duration and video_duration > 0:
+                    start_time = time_start * video_duration
+                    end_time = time_end * video_duration
+                    input_args['ss'] = start_time
+                    input_args['to'] = end_time
+        
+        input_stream = ffmpeg.input(file_path, **input_args)
+        video_stream = input_stream.video
+        
+        # Check if video has audio stream before creating reference
+        has_audio = has_audio_stream(file_path)
+        audio_stream = input_stream.audio if has_audio else None
+        
+        # Apply retime (speed change) after cutting and before other filters
+        retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
+        retime_speed = self.params.get('retime_speed', 1.0)
+        if retime_enabled and retime_speed and retime_speed != 1.0:
+            try:
+                speed = float(retime_speed)
+                speed = max(0.1, min(3.0, speed))
+                self.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x to variant")
+                video_stream = video_stream.filter('setpts', f'PTS/{speed}')
+                if audio_stream is not None:
+                    try:
+                        if speed <= 2.0:
+                            audio_stream = audio_stream.filter('atempo', speed)
+                        else:
+                            # Chain atempo to stay within valid range
+                            audio_stream = audio_stream.filter('atempo', 2.0).filter('atempo', speed / 2.0)
+                    except Exception as audio_err:
+                        self.status_updated.emit(f"DEBUG: Skipping audio retime: {audio_err}")
+                        audio_stream = None
+            except Exception as e:
+                self.status_updated.emit(f"DEBUG: Skipping retime: {e}")
+        
+        return video_stream, audio_stream
+    
+    def _video_variant_output_args(self, selected_codec: str, quality_variant) -> tuple:
+        """
+        Build encoder output args for one video variant.
+        
+        Returns (output_args, keep_audio). WebM variants are written without audio.
+        """
+        codec = VIDEO_CODEC_MAP.get(selected_codec, 'libx264')
+        output_args = {'vcodec': codec}
+        
+        # For WebM/VP9/AV1, we need to handle audio codec and format-specific parameters
+        if selected_codec in ['WebM (VP9, faster)', 'WebM (AV1, slower)']:
+            # WebM: Strip audio completely (no audio stream)
+            output_args['an'] = None  # No audio flag
+            output_args['f'] = 'webm'  # WebM container format
+            keep_audio = False
+        else:
+            # For MP4 codecs, ensure MP4 format
+            output_args['f'] = 'mp4'
+            keep_audio = True
+        
+        # Apply CRF quality
+        if quality_variant is not None:
+            output_args['crf'] = map_ui_quality_to_crf(quality_variant, codec)
+        
+        # Optimize AV1 speed
+        if codec == 'libaom-av1':
+            output_args['cpu-used'] = 4
+        
+        # Frame rate (always use original as per user request)
+        return output_args, keep_audio
+    
+    def _apply_video_size_variant(self, video_stream, file_path: str, size_variant):
+        """Apply a size variant ('L<edge>', '<percent>%' or '<width>') to a video stream"""
+        if not size_variant:
+            return video_stream
+        
+        original_width, original_height = get_video_dimensions(file_path)
+        
+        if str(size_variant).startswith('L'):
+            # Longer edge resize
+            target_longer_edge = int(str(size_variant)[1:])
+            longer_edge = max(original_width, original_height)
+            
+            # Don't upscale if longer edge is already smaller than target
+            if longer_edge >= target_longer_edge:
+                if original_width > original_height:
+                    # Width is longer: scale by width
+                    video_stream = ffmpeg.filter(video_stream, 'scale', target_longer_edge, -2, flags='lanczos')
+                else:
+                    # Height is longer: scale by height
+                    video_stream = ffmpeg.filter(video_stream, 'scale', -2, target_longer_edge, flags='lanczos')
+        elif str(size_variant).endswith('%'):
+            # Percentage resize
+            percent = float(str(size_variant)[:-1]) / 100
+            scale_w = f"trunc(iw*{percent}/2)*2"
+            scale_h = f"trunc(ih*{percent}/2)*2"
+            video_stream = ffmpeg.filter(video_stream, 'scale', scale_w, scale_h)
+        else:
+            # Width-based resize (maintain aspect ratio)
+            new_width = int(size_variant)
+            video_stream = ffmpeg.filter(video_stream, 'scale', str(new_width), '-2')  # -2 maintains aspect ratio and ensures even height
+        
+        return video_stream
+    
+    def _convert_single_video_variant(self, file_path: str, selected_codec: str, size_variant,
+                                      quality_variant, output_path: str) -> bool:
+        """Encode one video variant in its own FFmpeg process"""
+        variant_info = self._describe_video_variant(size_variant, quality_variant)
+        try:
+            video_stream, audio_stream = self._build_video_variant_input(file_path)
+            output_args, keep_audio = self._video_variant_output_args(selected_codec, quality_variant)
+            video_stream = self._apply_video_size_variant(video_stream, file_path, size_variant)
+            
+            # Combine video and audio streams for output
+            if audio_stream is not None and keep_audio:
+                output = ffmpeg.output(video_stream, audio_stream, output_path, **output_args)
+            else:
+                output = ffmpeg.output(video_stream, output_path, **output_args)
+            
+            if self.params.get('overwrite', False):
+                output = ffmpeg.overwrite_output(output)
+            
+            # Check for cancellation
+            if self.should_stop:
+                return False
+            
+            # Run video conversion with cancellation support
+            if not self.run_ffmpeg_with_cancellation(output):
+                return False
+            
+            self.file_completed.emit(file_path, output_path)
+            self.status_updated.emit(f"✓ Video variant {variant_info} completed")
+            return True
+            
+        except Exception as e:
+            self.status_updated.emit(f"FFmpeg error with video variant {variant_info}: {str(e)}")
+            return False
+    
+    def _convert_video_variants_single_decode(self, file_path: str, selected_codec: str, variants: list) -> bool:
+        """
+        Encode several video variants from a single decode.
+        
+        Builds one filter graph per group: the decoded (cut/retimed) stream is split,
+        each branch is scaled for its size variant and written to its own output.
+        At most `max_outputs_per_process` variants share one FFmpeg process to bound
+        memory; a group that fails is retried variant by variant.
+        """
+        try:
+            max_outputs = int(self.params.get('max_outputs_per_process', MAX_VARIANT_OUTPUTS_PER_PROCESS))
+        except (TypeError, ValueError):
+            max_outputs = MAX_VARIANT_OUTPUTS_PER_PROCESS
+        max_outputs = max(1, max_outputs)
+        
+        groups = [variants[i:i + max_outputs] for i in range(0, len(variants), max_outputs)]
+        all_success = True
+        completed = 0
+        
+        for group in groups:
+            if self.should_stop:
+                break
+            
+            descriptions = [self._describe_video_variant(size, quality) for size, quality, _ in group]
+            self.status_updated.emit(
+                f"Encoding variants {completed + 1}-{completed + len(group)}/{len(variants)} "
+                f"from a single decode: {'; '.join(descriptions)}"
+            )
+            
+            group_failed = False
+            try:
+                video_stream, audio_stream = self._build_video_variant_input(file_path)
+                _, keep_audio = self._video_variant_output_args(selected_codec, None)
+                use_audio = audio_stream is not None and keep_audio
+                
+                video_branches = video_stream.split()
+                audio_branches = audio_stream.asplit() if use_audio else None
+                
+                outputs = []
+                for j, (size_variant, quality_variant, output_path) in enumerate(group):
+                    output_args, _ = self._video_variant_output_args(selected_codec, quality_variant)
+                    branch = self._apply_video_size_variant(video_branches[j], file_path, size_variant)
+                    if use_audio:
+                        outputs.append(ffmpeg.output(branch, audio_branches[j], output_path, **output_args))
+                    else:
+                        outputs.append(ffmpeg.output(branch, output_path, **output_args))
+                
+                output = ffmpeg.merge_outputs(*outputs)
+                if self.params.get('overwrite', False):
+                    output = ffmpeg.overwrite_output(output)
+                
+                if self.should_stop:
+                    return False
+                
+                if not self.run_ffmpeg_with_cancellation(output):
+                    return False
+            except Exception as e:
+                if self.should_stop:
+                    return False
+                self.status_updated.emit(f"Single-decode group failed, retrying variants individually: {str(e)}")
+                group_failed = True
+            
+            for (size_variant, quality_variant, output_path), variant_info in zip(group, descriptions):
+                if group_failed:
+                    if self.should_stop:
+                        break
+                    success = self._convert_single_video_variant(file_path, selected_codec, size_variant, quality_variant, output_path)
+                else:
+                    # Per-variant check: every output of the shared process must exist and be non-empty
+                    success = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+                    if success:
+                        self.file_completed.emit(file_path, output_path)
+                        self.status_updated.emit(f"✓ Video variant {variant_info} completed")
+                    else:
+                        self.status_updated.emit(f"✗ Video variant {variant_info} produced no output")
+                if not success:
+                    all_success = False
+            
+            completed += len(group)
+        
+        return all_success
+    
+    def _planned_output(self, file_path: str, output_path: str) -> str:
+        """Journal an output path before it is written (so partial files can be cleaned on resume)"""
+        if self.journal is not None:
+            self.journal.output_planned(file_path, output_path)
+        return output_path
+    
     def get_output_path(self, file_path: str, format_ext: str) -> str:
         """Generate output path for converted file"""
-        return SuffixManager.get_output_path(file_path, self.params, format_ext)
+        return self._planned_output(file_path, SuffixManager.get_output_path(file_path, self.params, format_ext))
 
     def get_output_path_with_video_variants(self, file_path: str, format_ext: str, size_variant: str = None, quality_variant: int = None) -> str:
         """Generate output path for video variant with size and quality suffixes"""
@@ -1636,7 +2291,7 @@ class ConversionEngine(QThread):
         if quality_variant is not None:
              variants.append({'type': 'quality', 'value': quality_variant})
              
-        return SuffixManager.get_output_path(file_path, self.params, format_ext, variants)
+        return self._planned_output(file_path, SuffixManager.get_output_path(file_path, self.params, format_ext, variants))
 
     def get_output_path_with_variants(self, file_path: str, format_ext: str, quality_variant: int = None, size_variant: str = None) -> str:
         """Generate output path for image variants with quality and resize"""
@@ -1646,13 +2301,17 @@ class ConversionEngine(QThread):
         if size_variant:
              variants.append({'type': 'resize', 'value': size_variant})
              
-        return SuffixManager.get_output_path(file_path, self.params, format_ext, variants)
+        return self._planned_output(file_path, SuffixManager.get_output_path(file_path, self.params, format_ext, variants))
 
 
         
     def stop_conversion(self):
         """Stop the conversion process"""
         self.should_stop = True
+        with self._jobs_lock:
+            jobs = list(self._active_jobs)
+        for job in jobs:
+            job.cancel()
 
 
 class ToolChecker:
@@ -0,0 +1,423 @@
+"""
+FFmpeg Supervisor
+Runs FFmpeg child processes from one background event-loop thread.
+
+Instead of two reader threads and a poll loop per encode, every FFmpeg process
+(conversion engine, GIF converter, size estimator sample encodes) is driven by
+a single asyncio loop that multiplexes all their pipes:
+
+- `-progress pipe:1` key/value blocks are parsed incrementally into
+  FFmpegProgress events (or, for encodes that write their output to pipe:1,
+  the streamed bytes are just counted)
+- stderr is kept in a bounded ring buffer (for error reports) and scanned
+  once for the input duration
+- cancel sends FFmpeg's interactive quit command ('q') and kills the process
+  if it hasn't exited after a grace period
+
+asyncio is used rather than selectors because selectors can't wait on pipes on
+Windows; the default Proactor loop can.
+"""
+import asyncio
+import atexit
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional
+
+
+READ_CHUNK_SIZE = 64 * 1024
+STDERR_TAIL_LINES = 200
+CANCEL_GRACE_SECONDS = 2.0
+# Fallback polling of caller-side stop flags (explicit cancel() is immediate)
+STOP_POLL_INTERVAL = 0.25
+# Emit progress blocks this often (FFmpeg's default is 0.5s)
+PROGRESS_PERIOD = 0.1
+
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+[\.,]\d+)')
+
+
+def ffmpeg_cmd() -> str:
+    """ffmpeg binary configured by init_bundled_tools / the tool registry, else rely on PATH."""
+    return os.environ.get('FFMPEG_BINARY') or 'ffmpeg'
+
+
+def compile_ffmpeg_args(stream_spec, overwrite_output: bool = False, progress: bool = True,
+                        cmd: Optional[str] = None) -> List[str]:
+    """
+    Build the argv for an ffmpeg-python stream spec.
+
+    Args:
+        stream_spec: ffmpeg-python output stream (or merged outputs)
+        overwrite_output: Add -y
+        progress: Report machine-readable progress on stdout (and drop the stderr stats line)
+        cmd: ffmpeg binary (default: ffmpeg_cmd())
+    """
+    if progress:
+        stream_spec = stream_spec.global_args('-progress', 'pipe:1', '-stats_period', str(PROGRESS_PERIOD),
+                                              '-nostats')
+    args = stream_spec.compile(cmd=cmd or ffmpeg_cmd(), overwrite_output=overwrite_output)
+    if '-y' not in args:
+        # stdin is a pipe (for 'q'), so FFmpeg would block on its overwrite prompt:
+        # fail on existing outputs instead, as it does with a closed stdin
+        args.insert(1, '-n')
+    return args
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value.rstrip('x'))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class FFmpegProgress:
+    """One `-progress` block"""
+    out_time: float = 0.0                # Output timestamp reached (seconds)
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0                   # Realtime multiple (0.0 if unknown)
+    total_size: int = 0                  # Bytes written so far
+    finished: bool = False               # progress=end
+    duration: Optional[float] = None     # Input duration from stderr, if known yet
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Progress 0.0-1.0 (None while the duration is unknown)"""
+        if not self.duration or self.duration <= 0:
+            return None
+        return min(1.0, max(0.0, self.out_time / self.duration))
+
+
+class ProgressParser:
+    """Incremental parser for FFmpeg `-progress` output (key=value lines, blocks end with progress=...)."""
+
+    def __init__(self):
+        self._partial = b''
+        self._fields = {}
+
+    def feed(self, data: bytes) -> List[FFmpegProgress]:
+        """Consume a chunk of stdout; returns the blocks completed by it."""
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        events = []
+        for raw in lines:
+            key, sep, value = raw.decode('utf-8', errors='replace').strip().partition('=')
+            if not sep:
+                continue
+            if key != 'progress':
+                self._fields[key] = value
+                continue
+            events.append(self._build(value == 'end'))
+            self._fields = {}
+        return events
+
+    def _build(self, finished: bool) -> FFmpegProgress:
+        fields = self._fields
+        out_time = 0.0
+        # out_time_ms is (despite its name) in microseconds, like out_time_us
+        for key in ('out_time_us', 'out_time_ms'):
+            value = _parse_float(fields.get(key))
+            if value is not None and value >= 0:
+                out_time = value / 1_000_000.0
+                break
+        frame = _parse_float(fields.get('frame'))
+        total_size = _parse_float(fields.get('total_size'))
+        return FFmpegProgress(
+            out_time=out_time,
+            frame=int(frame or 0),
+            fps=_parse_float(fields.get('fps')) or 0.0,
+            speed=_parse_float(fields.get('speed')) or 0.0,
+            total_size=int(total_size or 0),
+            finished=finished,
+        )
+
+
+class StderrTail:
+    """Bounded ring buffer of FFmpeg's stderr lines; also picks up the input duration."""
+
+    def __init__(self, max_lines: int = STDERR_TAIL_LINES):
+        self._lines = deque(maxlen=max_lines)
+        self._partial = b''
+        self.duration: Optional[float] = None
+
+    def feed(self, data: bytes) -> None:
+        lines = re.split(rb'[\r\n]', self._partial + data)
+        self._partial = lines.pop()
+        for raw in lines:
+            if raw:
+                self._add(raw.decode('utf-8', errors='replace'))
+
+    def close(self) -> None:
+        if self._partial:
+            self._add(self._partial.decode('utf-8', errors='replace'))
+            self._partial = b''
+
+    def text(self) -> str:
+        return '\n'.join(self._lines)
+
+    def _add(self, line: str) -> None:
+        self._lines.append(line)
+        if self.duration is None and 'Duration:' in line:
+            match = _DURATION_RE.search(line)
+            if match:
+                h, m, s = match.groups()
+                self.duration = int(h) * 3600 + int(m) * 60 + float(s.replace(',', '.'))
+
+
+class FFmpegError(Exception):
+    """FFmpeg exited with an error (or could not be started / timed out)"""
+
+    def __init__(self, message: str, returncode: Optional[int] = None, stderr: str = ''):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class FFmpegJob:
+    """
+    Handle for one supervised FFmpeg process.
+
+    Thread-safe: cancel(), wait() and result() may be called from any thread.
+    on_progress is called on the supervisor thread and must be quick.
+
+    With count_stdout, stdout carries the encoded output (`pipe:1`) rather than
+    progress blocks; its bytes are discarded and counted in stdout_bytes.
+    """
+
+    def __init__(self, args: List[str], loop: asyncio.AbstractEventLoop,
+                 on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+                 count_stdout: bool = False):
+        self.args = list(args)
+        self.on_progress = on_progress
+        self.count_stdout = count_stdout
+        self.stdout_bytes = 0
+        self.returncode: Optional[int] = None
+        self.cancelled = False
+        self.start_error: Optional[BaseException] = None
+        self._loop = loop
+        self._process = None
+        self._kill_handle = None
+        self._progress = ProgressParser()
+        self._stderr = StderrTail()
+        self._done = threading.Event()
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Input duration as reported on stderr (None until FFmpeg printed it)"""
+        return self._stderr.duration
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def stderr_text(self) -> str:
+        """The last STDERR_TAIL_LINES lines of stderr"""
+        return self._stderr.text()
+
+    def cancel(self, grace: float = CANCEL_GRACE_SECONDS) -> None:
+        """Ask FFmpeg to quit ('q'), killing it if it is still running after `grace` seconds."""
+        if self._done.is_set():
+            return
+        self.cancelled = True
+        try:
+            self._loop.call_soon_threadsafe(self._request_quit, grace)
+        except RuntimeError:
+            pass  # Loop already closed (interpreter shutdown)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the process has exited; False on timeout."""
+        return self._done.wait(timeout)
+
+    def result(self, should_stop: Optional[Callable[[], bool]] = None,
+               timeout: Optional[float] = None) -> bool:
+        """
+        Wait for completion.
+
+        Args:
+            should_stop: Polled as a fallback stop flag; the job is cancelled once it returns True
+            timeout: Give up (cancel and raise) after this many seconds
+
+        Returns:
+            True on success, False if the job was cancelled
+
+        Raises:
+            FFmpegError: FFmpeg failed, could not be started or timed out
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait_for = STOP_POLL_INTERVAL if should_stop is not None else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+            if self._done.wait(wait_for):
+                break
+            if should_stop is not None and should_stop():
+                self.cancel()
+                self._done.wait()
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                self.cancel(grace=0)
+                self._done.wait()
+                raise FFmpegError(f"FFmpeg timed out after {timeout:.0f}s", self.returncode, self.stderr_text())
+
+        if self.cancelled:
+            return False
+        if self.start_error is not None:
+            raise FFmpegError(f"Could not start FFmpeg: {self.start_error}")
+        if self.returncode != 0:
+            stderr = self.stderr_text()
+            message = f"FFmpeg process exited with code {self.returncode}"
+            if stderr:
+                message += f"\nStderr: {stderr}"
+            raise FFmpegError(message, self.returncode, stderr)
+        return True
+
+    # --- supervisor thread ---
+
+    def _request_quit(self, grace: float) -> None:
+        process = self._process
+        if process is None or process.returncode is not None:
+            return  # Not started yet (handled on start) or already exited
+        try:
+            process.stdin.write(b'q')
+        except (OSError, RuntimeError, AttributeError):
+            pass
+        if self._kill_handle is None or grace <= 0:
+            if self._kill_handle is not None:
+                self._kill_handle.cancel()
+            self._kill_handle = self._loop.call_later(max(0.0, grace), self._kill)
+
+    def _kill(self) -> None:
+        process = self._process
+        if process is not None and process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    def _on_stdout(self, data: bytes) -> None:
+        if self.count_stdout:
+            self.stdout_bytes += len(data)
+            return
+        for progress in self._progress.feed(data):
+            if self.on_progress is None:
+                continue
+            try:
+                self.on_progress(replace(progress, duration=self.duration))
+            except Exception as e:
+                print(f"[FFmpegSupervisor] Progress callback failed: {e}")
+
+    def _finish(self) -> None:
+        if self._kill_handle is not None:
+            self._kill_handle.cancel()
+            self._kill_handle = None
+        self._stderr.close()
+        self._process = None
+        self._done.set()
+
+
+class FFmpegSupervisor:
+    """Starts FFmpeg processes and services all their pipes on one event-loop thread."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._jobs = set()
+
+    def start(self, args: List[str], on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+              count_stdout: bool = False) -> FFmpegJob:
+        """Launch FFmpeg with the given argv; returns immediately."""
+        loop = self._ensure_loop()
+        job = FFmpegJob(args, loop, on_progress, count_stdout)
+        with self._lock:
+            self._jobs.add(job)
+        asyncio.run_coroutine_threadsafe(self._run_job(job), loop)
+        return job
+
+    def run(self, args: List[str], on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None, timeout: Optional[float] = None) -> bool:
+        """Launch FFmpeg and wait for it (see FFmpegJob.result)."""
+        return self.start(args, on_progress).result(should_stop=should_stop, timeout=timeout)
+
+    def active_jobs(self) -> List[FFmpegJob]:
+        with self._lock:
+            return list(self._jobs)
+
+    def cancel_all(self, grace: float = CANCEL_GRACE_SECONDS) -> None:
+        for job in self.active_jobs():
+            job.cancel(grace)
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Kill remaining FFmpeg processes (called at interpreter exit)."""
+        jobs = self.active_jobs()
+        for job in jobs:
+            job.cancel(grace=0)
+        for job in jobs:
+            job.wait(timeout)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='ffmpeg-supervisor', daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _run_job(self, job: FFmpegJob) -> None:
+        try:
+            kwargs = {}
+            if os.name == 'nt':
+                kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *job.args,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    **kwargs
+                )
+            except Exception as e:
+                job.start_error = e
+                return
+
+            job._process = process
+            if job.cancelled:
+                job._request_quit(CANCEL_GRACE_SECONDS)
+            await asyncio.gather(
+                self._pump(process.stdout, job._on_stdout),
+                self._pump(process.stderr, job._stderr.feed),
+            )
+            job.returncode = await process.wait()
+        except Exception as e:
+            if job.returncode is None:
+                job.start_error = job.start_error or e
+        finally:
+            with self._lock:
+                self._jobs.discard(job)
+            job._finish()
+
+    @staticmethod
+    async def _pump(stream: asyncio.StreamReader, sink: Callable[[bytes], None]) -> None:
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            sink(chunk)
+
+
+_supervisor = FFmpegSupervisor()
+
+
+def get_supervisor() -> FFmpegSupervisor:
+    """Get the shared FFmpeg supervisor."""
+    return _supervisor
+
+
+atexit.register(lambda: _supervisor.shutdown())
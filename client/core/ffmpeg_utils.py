@@ -2,8 +2,12 @@
 FFmpeg Utility Functions
 Shared helper functions for media analysis and manipulation.
 """
-import ffmpeg
 import os
+from client.core.media_probe import probe_media
+
+# Max variants encoded from one shared decode (one FFmpeg process). Each extra
+# output keeps its own filtered frames and encoder state in memory.
+MAX_VARIANT_OUTPUTS_PER_PROCESS = 4
 
 def map_ui_quality_to_crf(ui_quality: int, codec: str = 'generic') -> int:
     """
@@ -29,79 +33,40 @@ def map_ui_quality_to_crf(ui_quality: int, codec: str = 'generic') -> int:
 
 def get_image_dimensions(file_path: str) -> tuple:
     """
-    Get image dimensions using FFmpeg probe, accounting for EXIF rotation
+    Get image dimensions from the shared probe cache, accounting for EXIF rotation
     Returns (width, height) after applying rotation, or (0, 0) if unable to determine
     """
-    try:
-        probe = ffmpeg.probe(file_path)
-        # Try video stream first (for images, they're treated as single-frame videos)
-        video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
-        if video_stream:
-            width = int(video_stream['width'])
-            height = int(video_stream['height'])
-            
-            # Check for EXIF rotation (side_data_list or tags.rotate)
-            rotation = 0
-            
-            # Method 1: Check side_data_list for displaymatrix rotation
-            if 'side_data_list' in video_stream:
-                for side_data in video_stream['side_data_list']:
-                    if side_data.get('side_data_type') == 'Display Matrix':
-                        rotation = side_data.get('rotation', 0)
-                        break
-            
-            # Method 2: Check tags.rotate
-            if rotation == 0 and 'tags' in video_stream:
-                rotation = int(video_stream['tags'].get('rotate', 0))
-            
-            # Swap dimensions if rotation is 90 or 270 degrees
-            if abs(rotation) == 90 or abs(rotation) == 270:
-                return (height, width)  # Swap for portrait orientation
-            
-            return (width, height)
-    except Exception:
-        pass
+    info = probe_media(file_path)
+    if info and info.has_video:
+        # Images are treated as single-frame videos; width/height already swapped for 90/270
+        return (info.width, info.height)
     return (0, 0)
 
 def get_video_dimensions(file_path: str) -> tuple:
     """
-    Get video dimensions using FFmpeg
+    Get video dimensions from the shared probe cache
     Returns (width, height) or (0, 0) if unable to determine
     """
-    try:
-        probe = ffmpeg.probe(file_path)
-        video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
-        if video_stream:
-            width = int(video_stream['width'])
-            height = int(video_stream['height'])
-            return (width, height)
-    except Exception:
-        pass
+    info = probe_media(file_path)
+    if info and info.has_video:
+        return (info.stream_width, info.stream_height)
     return (0, 0)
 
 def get_video_duration(file_path: str) -> float:
     """
-    Get video duration in seconds using FFmpeg probe
+    Get video duration in seconds from the shared probe cache
     Returns duration in seconds or 0.0 if unable to determine
     """
-    try:
-        probe = ffmpeg.probe(file_path)
-        duration = float(probe['format']['duration'])
-        return duration
-    except Exception:
-        return 0.0
+    info = probe_media(file_path)
+    return info.duration if info else 0.0
 
 def has_audio_stream(file_path: str) -> bool:
     """
-    Check if video file has an audio stream using FFmpeg probe
+    Check if video file has an audio stream using the shared probe cache
     Returns True if audio stream exists, False otherwise
     """
-    try:
-        probe = ffmpeg.probe(file_path)
-        audio_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'audio'), None)
-        return audio_stream is not None
-    except Exception:
-        return False
+    info = probe_media(file_path)
+    return info.has_audio if info else False
 
 
 # Import dimension calculation functions from centralized module
@@ -0,0 +1,87 @@
+"""
+Folder Scan
+Single-pass os.scandir walk that streams supported files in batches.
+
+Used by the GUI's background folder scanner (and anything else that needs to
+expand dropped folders) instead of Path.rglob, which stats every entry again
+and can't be interrupted. Each directory is listed once; DirEntry type info
+comes from the directory listing itself on most platforms, so no extra stat
+is needed per file.
+"""
+import os
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+DEFAULT_BATCH_SIZE = 256
+# Flush a partial batch after this long so slow (network) trees still stream
+DEFAULT_BATCH_INTERVAL = 0.1
+
+
+def iter_supported_files(roots: Iterable[str], extensions: Iterable[str], recursive: bool = False,
+                         should_stop: Optional[Callable[[], bool]] = None,
+                         batch_size: int = DEFAULT_BATCH_SIZE,
+                         batch_interval: float = DEFAULT_BATCH_INTERVAL,
+                         on_error: Optional[Callable[[str, OSError], None]] = None) -> Iterator[List[str]]:
+    """
+    Walk folders and yield batches of supported file paths.
+
+    Entries are visited in name order per directory (files of a directory before
+    its subdirectories), so results are stable between scans. Symlinked
+    directories are not followed to avoid cycles.
+
+    Args:
+        roots: Folders to scan
+        extensions: Lower-case extensions including the dot (e.g. '.mp4')
+        recursive: Descend into subfolders
+        should_stop: Polled between entries; the walk ends early when it returns True
+        batch_size: Max paths per yielded batch
+        batch_interval: Max seconds to hold back a non-empty partial batch
+        on_error: Called with (path, error) for folders that can't be listed;
+                  unreadable subfolders are skipped either way
+    """
+    extensions = frozenset(ext.lower() for ext in extensions)
+    batch: List[str] = []
+    last_flush = time.monotonic()
+
+    for root in roots:
+        stack = [os.fspath(root)]
+        while stack:
+            if should_stop and should_stop():
+                return
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                if on_error:
+                    on_error(folder, e)
+                continue
+
+            subfolders = []
+            for entry in entries:
+                if should_stop and should_stop():
+                    return
+                try:
+                    if entry.is_file():
+                        if os.path.splitext(entry.name)[1].lower() in extensions:
+                            batch.append(entry.path)
+                            if len(batch) >= batch_size:
+                                yield batch
+                                batch = []
+                                last_flush = time.monotonic()
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        subfolders.append(entry.path)
+                except OSError:
+                    continue
+
+            # Depth-first in name order
+            stack.extend(reversed(subfolders))
+
+            if batch and time.monotonic() - last_flush >= batch_interval:
+                yield batch
+                batch = []
+                last_flush = time.monotonic()
+
+    if batch:
+        yield batch
@@ -9,9 +9,25 @@ from client.core.ffmpeg_utils import (
     get_video_duration,
     get_video_dimensions,
     clamp_resize_width,
-    calculate_longer_edge_resize
+    calculate_longer_edge_resize,
+    MAX_VARIANT_OUTPUTS_PER_PROCESS
 )
-from client.core.size_estimator import find_optimal_gif_params_for_size
+from client.core.size_estimator import find_optimal_gif_params_for_size, refine_max_size_result
+from client.core.size_model import record_size_outcome
+
+# Dither setting (0-5) -> FFmpeg paletteuse dither algorithm
+GIF_DITHER_MAP = {
+    0: 'none',
+    1: 'bayer:bayer_scale=1',
+    2: 'bayer:bayer_scale=3',
+    3: 'sierra2_4a',
+    4: 'sierra2',
+    5: 'floyd_steinberg'
+}
+
+# Params that only affect palettegen/paletteuse. Variants differing only in
+# these share one decode + filter chain.
+GIF_PALETTE_PARAM_KEYS = frozenset({'colors', 'ffmpeg_colors', 'dither', 'ffmpeg_dither'})
 
 class GifConverter:
     def __init__(self, engine):
@@ -108,8 +124,41 @@ class GifConverter:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Always use FFmpeg-only mode
-        return self._convert_video_to_gif_ffmpeg_only(file_path, output_path)
+        max_size = self.params.get('gif_size_mode') == 'max_size' and '_preset_index' in self.params
+        if not (max_size and self.params.get('max_size_strict')):
+            # Always use FFmpeg-only mode
+            success = self._convert_video_to_gif_ffmpeg_only(file_path, output_path)
+            if success and max_size and not self.engine.should_stop:
+                # Teach the size model how far off the estimate was
+                record_size_outcome(self.params, output_path)
+            return success
+        
+        # Strict Max Size: verify the real size and step down presets until it fits
+        if not self._convert_video_to_gif_ffmpeg_only(file_path, output_path, emit_completed=False):
+            return False
+        if self.engine.should_stop:
+            return False
+        
+        target_bytes = int(self.params.get('gif_max_size_mb', 5.0) * 1024 * 1024)
+        
+        def apply_result(result):
+            self.params.update(result)
+            if '_resolution_scale' not in result:
+                self.params.pop('_resolution_scale', None)
+        
+        def encode_again():
+            path = self.engine.get_output_path(file_path, 'gif')
+            return path if self._convert_video_to_gif_ffmpeg_only(file_path, path, emit_completed=False) else None
+        
+        output_path = self.engine._enforce_max_size(
+            file_path, dict(self.params), target_bytes, output_path,
+            lambda r, actual: refine_max_size_result('gif', r, actual, target_bytes),
+            apply_result, encode_again
+        )
+        if output_path is None:
+            return False
+        self.engine.file_completed.emit(file_path, output_path)
+        return True
 
     def _convert_video_to_gif_multiple_variants(self, file_path: str) -> bool:
         """Convert video to GIF with multiple variants using FFmpeg"""
@@ -143,6 +192,8 @@ class GifConverter:
             # Store original params to restore later
             original_params = self.params.copy()
             
+            # Plan every variant first so shared decode/palette work can be grouped
+            planned_variants = []
             for resize in resize_variants:
                 if self.engine.should_stop: break
                 for fps in fps_variants:
@@ -177,12 +228,7 @@ class GifConverter:
                             output_path = self.engine.get_output_path(file_path, 'gif')
                             
                             variant_desc = f"resize={resize}, fps={fps}, colors={colors}, dither={dither}"
-                            self.engine.status_updated.emit(f"Processing variant {current_combination}/{total_combinations}: {variant_desc}")
-                            
-                            success = self._convert_video_to_gif_ffmpeg_only(file_path, output_path)
-                            
-                            if success:
-                                successful_conversions += 1
+                            planned_variants.append((self.params.copy(), output_path, variant_desc))
                             
                             # Restore params for next iteration
                             # Note: we must update the dict content in place if self.params is a reference
@@ -192,6 +238,8 @@ class GifConverter:
                             # replacing self.engine.params is safe IF usage is via self.engine.params.
                             self.engine.params = original_params.copy()
             
+            successful_conversions = self._run_gif_variant_plan(file_path, planned_variants)
+            
             if self.engine.should_stop:
                 self.engine.status_updated.emit(f"Video-to-GIF variants stopped by user: {successful_conversions}/{current_combination} completed")
             else:
@@ -206,186 +254,194 @@ class GifConverter:
             if original_type:
                 self.params['type'] = original_type
 
-    def _convert_video_to_gif_ffmpeg_only(self, file_path: str, output_path: str) -> bool:
-        """Convert video to GIF using advanced FFmpeg filters (palettegen/paletteuse)"""
-        self.engine.status_updated.emit(f"Converting to GIF using FFmpeg engine: {os.path.basename(file_path)}")
+    def _build_gif_filter_chain(self, file_path: str):
+        """
+        Build the decode/filter stage of a GIF encode from current params:
+        time cut, retime, fps, resize, auto-resize, preset ratio, rotation and blur.
         
-        try:
-            # Input args
-            input_args = {}
-            
-            # Time cutting
-            enable_time_cutting = self.params.get('enable_time_cutting', False)
-            if enable_time_cutting:
-                time_start = self.params.get('time_start')
-                time_end = self.params.get('time_end')
-                if time_start is not None and time_end is not None and time_start < time_end:
-                    video_duration = get_video_duration(file_path)
-                    if video_duration > 0:
-                        start_time = time_start * video_duration
-                        end_time = time_end * video_duration
-                        self.engine.status_updated.emit(f"DEBUG: Applying time cutting - start: {start_time:.2f}s, end: {end_time:.2f}s")
-                        input_args['ss'] = start_time
-                        input_args['to'] = end_time
-            
-            input_stream = ffmpeg.input(file_path, **input_args)
-            
-            # Retime
-            retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
-            retime_speed = self.params.get('retime_speed', 1.0)
-            if retime_enabled and retime_speed and retime_speed != 1.0:
-                try:
-                    speed = float(retime_speed)
-                    speed = max(0.1, min(3.0, speed))
-                    self.engine.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x")
-                    input_stream = ffmpeg.filter(input_stream, 'setpts', f'PTS/{speed}')
-                except Exception:
-                    pass
-            
-            # FPS
-            fps = self.params.get('ffmpeg_fps', 15)
-            input_stream = ffmpeg.filter(input_stream, 'fps', fps=fps)
-            
-            # Resize
-            original_width, original_height = get_video_dimensions(file_path)
-            resize_mode = self.params.get('gif_resize_mode', 'No resize')
-            resize_values = self.params.get('gif_resize_values', [])
-            
-            # Check if resize_values contains "L" prefix (longer edge format)
-            has_longer_edge_prefix = resize_values and isinstance(resize_values[0], str) and resize_values[0].startswith('L')
-            
-            if (resize_mode != 'No resize' or has_longer_edge_prefix) and resize_values:
-                resize_value = resize_values[0]
-                # Check for "L" prefix first (longer edge format)
-                if isinstance(resize_value, str) and resize_value.startswith('L'):
-                    # Handle "L" prefix format for longer edge
-                    target_longer_edge = int(resize_value[1:])
-                    longer_edge = max(original_width, original_height)
-                    # Don't upscale if longer edge is already smaller than target
-                    if longer_edge >= target_longer_edge:
-                        if original_width > original_height:
-                            # Width is longer: scale by width
-                            input_stream = ffmpeg.filter(input_stream, 'scale', str(target_longer_edge), '-2', flags='lanczos')
-                        else:
-                            # Height is longer: calculate width to maintain aspect ratio
-                            ratio = target_longer_edge / original_height
-                            new_w = int(original_width * ratio)
-                            # Ensure even dimensions
-                            new_w = new_w if new_w % 2 == 0 else new_w - 1
-                            input_stream = ffmpeg.filter(input_stream, 'scale', str(new_w), str(target_longer_edge), flags='lanczos')
-                elif resize_mode == 'By ratio (percent)':
-                    if resize_value.endswith('%'):
-                        percent = float(resize_value[:-1]) / 100.0
-                        new_width = int(original_width * percent)
-                        new_width = clamp_resize_width(original_width, new_width)
-                        input_stream = ffmpeg.filter(input_stream, 'scale', str(new_width), '-2', flags='lanczos')
-                elif resize_mode == 'By width (pixels)':
-                    new_width = int(resize_value)
+        Everything up to (not including) palettegen/paletteuse.
+        """
+        # Input args
+        input_args = {}
+        
+        # Time cutting
+        enable_time_cutting = self.params.get('enable_time_cutting', False)
+        if enable_time_cutting:
+            time_start = self.params.get('time_start')
+            time_end = self.params.get('time_end')
+            if time_start is not None and time_end is not None and time_start < time_end:
+                video_duration = get_video_duration(file_path)
+                if video_duration > 0:
+                    start_time = time_start * video_duration
+                    end_time = time_end * video_duration
+                    self.engine.status_updated.emit(f"DEBUG: Applying time cutting - start: {start_time:.2f}s, end: {end_time:.2f}s")
+                    input_args['ss'] = start_time
+                    input_args['to'] = end_time
+        
+        input_stream = ffmpeg.input(file_path, **input_args)
+        
+        # Retime
+        retime_enabled = self.params.get('retime_enabled') or self.params.get('enable_retime')
+        retime_speed = self.params.get('retime_speed', 1.0)
+        if retime_enabled and retime_speed and retime_speed != 1.0:
+            try:
+                speed = float(retime_speed)
+                speed = max(0.1, min(3.0, speed))
+                self.engine.status_updated.emit(f"DEBUG: Applying retime at {speed:.2f}x")
+                input_stream = ffmpeg.filter(input_stream, 'setpts', f'PTS/{speed}')
+            except Exception:
+                pass
+        
+        # FPS
+        fps = self.params.get('ffmpeg_fps', 15)
+        input_stream = ffmpeg.filter(input_stream, 'fps', fps=fps)
+        
+        # Resize
+        original_width, original_height = get_video_dimensions(file_path)
+        resize_mode = self.params.get('gif_resize_mode', 'No resize')
+        resize_values = self.params.get('gif_resize_values', [])
+        
+        # Check if resize_values contains "L" prefix (longer edge format)
+        has_longer_edge_prefix = resize_values and isinstance(resize_values[0], str) and resize_values[0].startswith('L')
+        
+        if (resize_mode != 'No resize' or has_longer_edge_prefix) and resize_values:
+            resize_value = resize_values[0]
+            # Check for "L" prefix first (longer edge format)
+            if isinstance(resize_value, str) and resize_value.startswith('L'):
+                # Handle "L" prefix format for longer edge
+                target_longer_edge = int(resize_value[1:])
+                longer_edge = max(original_width, original_height)
+                # Don't upscale if longer edge is already smaller than target
+                if longer_edge >= target_longer_edge:
+                    if original_width > original_height:
+                        # Width is longer: scale by width
+                        input_stream = ffmpeg.filter(input_stream, 'scale', str(target_longer_edge), '-2', flags='lanczos')
+                    else:
+                        # Height is longer: calculate width to maintain aspect ratio
+                        ratio = target_longer_edge / original_height
+                        new_w = int(original_width * ratio)
+                        # Ensure even dimensions
+                        new_w = new_w if new_w % 2 == 0 else new_w - 1
+                        input_stream = ffmpeg.filter(input_stream, 'scale', str(new_w), str(target_longer_edge), flags='lanczos')
+            elif resize_mode == 'By ratio (percent)':
+                if resize_value.endswith('%'):
+                    percent = float(resize_value[:-1]) / 100.0
+                    new_width = int(original_width * percent)
                     new_width = clamp_resize_width(original_width, new_width)
                     input_stream = ffmpeg.filter(input_stream, 'scale', str(new_width), '-2', flags='lanczos')
-                elif resize_mode == 'By longer edge (pixels)':
-                    # Handle mode name format for longer edge
-                    # Check if resize_value has 'L' prefix and strip it
-                    if isinstance(resize_value, str) and resize_value.startswith('L'):
-                        target_longer_edge = int(resize_value[1:])
+            elif resize_mode == 'By width (pixels)':
+                new_width = int(resize_value)
+                new_width = clamp_resize_width(original_width, new_width)
+                input_stream = ffmpeg.filter(input_stream, 'scale', str(new_width), '-2', flags='lanczos')
+            elif resize_mode == 'By longer edge (pixels)':
+                # Handle mode name format for longer edge
+                # Check if resize_value has 'L' prefix and strip it
+                if isinstance(resize_value, str) and resize_value.startswith('L'):
+                    target_longer_edge = int(resize_value[1:])
+                else:
+                    target_longer_edge = int(resize_value)
+                longer_edge = max(original_width, original_height)
+                # Don't upscale if longer edge is already smaller than target
+                if longer_edge >= target_longer_edge:
+                    if original_width > original_height:
+                        # Width is longer: scale by width
+                        input_stream = ffmpeg.filter(input_stream, 'scale', str(target_longer_edge), '-2', flags='lanczos')
                     else:
-                        target_longer_edge = int(resize_value)
-                    longer_edge = max(original_width, original_height)
-                    # Don't upscale if longer edge is already smaller than target
-                    if longer_edge >= target_longer_edge:
-                        if original_width > original_height:
-                            # Width is longer: scale by width
-                            input_stream = ffmpeg.filter(input_stream, 'scale', str(target_longer_edge), '-2', flags='lanczos')
-                        else:
-                            # Height is longer: calculate width to maintain aspect ratio
-                            ratio = target_longer_edge / original_height
-                            new_w = int(original_width * ratio)
-                            # Ensure even dimensions
-                            new_w = new_w if new_w % 2 == 0 else new_w - 1
-                            input_stream = ffmpeg.filter(input_stream, 'scale', str(new_w), str(target_longer_edge), flags='lanczos')
-            
-            # Apply auto-resize resolution scale (from size optimization)
-            # This is applied ON TOP of user's resize choice
-            resolution_scale = self.params.get('_resolution_scale')
-            if resolution_scale and resolution_scale < 1.0:
-                # Scale to percentage of current size
-                scale_w = f'iw*{resolution_scale:.2f}'
-                scale_h = f'ih*{resolution_scale:.2f}'
-                self.engine.status_updated.emit(f"Applying auto-resize: {resolution_scale*100:.0f}% of current size")
-                input_stream = ffmpeg.filter(input_stream, 'scale', scale_w, scale_h)
-                # Ensure even dimensions
-                input_stream = ffmpeg.filter(input_stream, 'scale', 'trunc(iw/2)*2', 'trunc(ih/2)*2')
-            
-            # Aspect Ratio Presets (GIF)
-            preset_ratio = self.params.get('gif_preset_ratio')
-            is_instagram = self.params.get('gif_preset_social') == 'Instagram'
-            if is_instagram or preset_ratio:
-                target_ratio = preset_ratio or ('9:16' if is_instagram else None)
-                if target_ratio:
-                    ratio_map = {
-                        '4:3': (1440, 1080),
-                        '1:1': (1080, 1080),
-                        '16:9': (1920, 1080),
-                        '9:16': (1080, 1920),
-                        '3:4': (1080, 1350)
-                    }
-                    if target_ratio in ratio_map:
-                        tw, th = ratio_map[target_ratio]
-                        self.engine.status_updated.emit(f"Applying GIF preset ratio: {target_ratio} ({tw}x{th})")
-                        input_stream = ffmpeg.filter(input_stream, 'scale', tw, th, force_original_aspect_ratio='decrease')
-                        input_stream = ffmpeg.filter(input_stream, 'pad', tw, th, '(ow-iw)/2', '(oh-ih)/2')
-            
-            # Rotation
-            rotation_angle = self.params.get('rotation')
-            skip_rotation_for_longer_edge = (
-                resize_mode == 'By longer edge (pixels)' and 
-                (not rotation_angle or rotation_angle == "No rotation")
-            )
-            if rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "90° clockwise":
-                input_stream = ffmpeg.filter(input_stream, 'transpose', 1)
-            elif rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "180°":
-                input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
-                input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
-            elif rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "270° clockwise":
-                input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
-                
-            # Blur
-            if self.params.get('ffmpeg_blur', False):
-                input_stream = ffmpeg.filter(input_stream, 'smartblur', lr='1.0', ls='-0.5', lt='-3.0')
+                        # Height is longer: calculate width to maintain aspect ratio
+                        ratio = target_longer_edge / original_height
+                        new_w = int(original_width * ratio)
+                        # Ensure even dimensions
+                        new_w = new_w if new_w % 2 == 0 else new_w - 1
+                        input_stream = ffmpeg.filter(input_stream, 'scale', str(new_w), str(target_longer_edge), flags='lanczos')
+        
+        # Apply auto-resize resolution scale (from size optimization)
+        # This is applied ON TOP of user's resize choice
+        resolution_scale = self.params.get('_resolution_scale')
+        if resolution_scale and resolution_scale < 1.0:
+            # Scale to percentage of current size
+            scale_w = f'iw*{resolution_scale:.2f}'
+            scale_h = f'ih*{resolution_scale:.2f}'
+            self.engine.status_updated.emit(f"Applying auto-resize: {resolution_scale*100:.0f}% of current size")
+            input_stream = ffmpeg.filter(input_stream, 'scale', scale_w, scale_h)
+            # Ensure even dimensions
+            input_stream = ffmpeg.filter(input_stream, 'scale', 'trunc(iw/2)*2', 'trunc(ih/2)*2')
+        
+        # Aspect Ratio Presets (GIF)
+        preset_ratio = self.params.get('gif_preset_ratio')
+        is_instagram = self.params.get('gif_preset_social') == 'Instagram'
+        if is_instagram or preset_ratio:
+            target_ratio = preset_ratio or ('9:16' if is_instagram else None)
+            if target_ratio:
+                ratio_map = {
+                    '4:3': (1440, 1080),
+                    '1:1': (1080, 1080),
+                    '16:9': (1920, 1080),
+                    '9:16': (1080, 1920),
+                    '3:4': (1080, 1350)
+                }
+                if target_ratio in ratio_map:
+                    tw, th = ratio_map[target_ratio]
+                    self.engine.status_updated.emit(f"Applying GIF preset ratio: {target_ratio} ({tw}x{th})")
+                    input_stream = ffmpeg.filter(input_stream, 'scale', tw, th, force_original_aspect_ratio='decrease')
+                    input_stream = ffmpeg.filter(input_stream, 'pad', tw, th, '(ow-iw)/2', '(oh-ih)/2')
+        
+        # Rotation
+        rotation_angle = self.params.get('rotation')
+        skip_rotation_for_longer_edge = (
+            resize_mode == 'By longer edge (pixels)' and 
+            (not rotation_angle or rotation_angle == "No rotation")
+        )
+        if rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "90° clockwise":
+            input_stream = ffmpeg.filter(input_stream, 'transpose', 1)
+        elif rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "180°":
+            input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
+            input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
+        elif rotation_angle and rotation_angle != "No rotation" and not skip_rotation_for_longer_edge and rotation_angle == "270° clockwise":
+            input_stream = ffmpeg.filter(input_stream, 'transpose', 2)
+            
+        # Blur
+        if self.params.get('ffmpeg_blur', False):
+            input_stream = ffmpeg.filter(input_stream, 'smartblur', lr='1.0', ls='-0.5', lt='-3.0')
+        
+        return input_stream
+
+    def _gif_palette_colors(self) -> int:
+        """Palette size for palettegen (a colors variant overrides the base setting)"""
+        return self.params.get('ffmpeg_colors', self.params.get('colors', 256))
+
+    def _gif_paletteuse_args(self) -> dict:
+        """Map dither value (0-5) to paletteuse arguments"""
+        dither_value = self.params.get('dither', 3)
+        
+        dither = GIF_DITHER_MAP.get(dither_value, 'sierra2_4a')
+        paletteuse_args = {}
+        
+        if dither.startswith('bayer:bayer_scale='):
+            try:
+                scale = int(dither.split('=')[1])
+                paletteuse_args['dither'] = 'bayer'
+                paletteuse_args['bayer_scale'] = scale
+            except:
+                paletteuse_args['dither'] = dither
+        else:
+            paletteuse_args['dither'] = dither
+        return paletteuse_args
+
+    def _convert_video_to_gif_ffmpeg_only(self, file_path: str, output_path: str, emit_completed: bool = True) -> bool:
+        """Convert video to GIF using advanced FFmpeg filters (palettegen/paletteuse)"""
+        self.engine.status_updated.emit(f"Converting to GIF using FFmpeg engine: {os.path.basename(file_path)}")
+        
+        try:
+            input_stream = self._build_gif_filter_chain(file_path)
             
             # Split stream for palette generation
             split = input_stream.split()
             
             # Palette generation
-            colors = self.params.get('colors', 256)
-            palette = split[0].filter('palettegen', max_colors=colors)
-            
-            # Palette use - map dither value (0-5) to FFmpeg dither algorithm
-            dither_value = self.params.get('dither', 3)
+            palette = split[0].filter('palettegen', max_colors=self._gif_palette_colors())
             
-            dither_map = {
-                0: 'none',
-                1: 'bayer:bayer_scale=1',
-                2: 'bayer:bayer_scale=3',
-                3: 'sierra2_4a',
-                4: 'sierra2',
-                5: 'floyd_steinberg'
-            }
-            
-            dither = dither_map.get(dither_value, 'sierra2_4a')
-            paletteuse_args = {}
-            
-            if dither.startswith('bayer:bayer_scale='):
-                try:
-                    scale = int(dither.split('=')[1])
-                    paletteuse_args['dither'] = 'bayer'
-                    paletteuse_args['bayer_scale'] = scale
-                except:
-                    paletteuse_args['dither'] = dither
-            else:
-                paletteuse_args['dither'] = dither
-                
-            final = ffmpeg.filter([split[1], palette], 'paletteuse', **paletteuse_args)
+            # Palette use
+            final = ffmpeg.filter([split[1], palette], 'paletteuse', **self._gif_paletteuse_args())
             
             # Output
             out = ffmpeg.output(final, output_path)
@@ -395,7 +451,8 @@ class GifConverter:
             self.engine.run_ffmpeg_with_cancellation(out, overwrite_output=True)
             
             self.engine.status_updated.emit(f"Successfully converted to GIF: {os.path.basename(output_path)}")
-            self.engine.file_completed.emit(file_path, output_path)
+            if emit_completed:
+                self.engine.file_completed.emit(file_path, output_path)
             return True
             
         except Exception as e:
@@ -403,6 +460,148 @@ class GifConverter:
             self.engine.status_updated.emit(error_msg)
             return False
 
+    def _plan_gif_variant_groups(self, variants: list) -> list:
+        """
+        Group planned GIF variants by shared upstream work.
+        
+        Variants whose params differ only in palette settings (colors/dither) share
+        one decode + filter chain; within that, variants with the same palette size
+        share one palettegen. Each returned group is encoded by one FFmpeg process
+        and holds at most `max_outputs_per_process` variants.
+        
+        Args:
+            variants: List of (variant_params, output_path, variant_desc)
+            
+        Returns:
+            List of groups, each a list of palette sub-groups (lists of variants)
+        """
+        try:
+            max_outputs = int(self.params.get('max_outputs_per_process', MAX_VARIANT_OUTPUTS_PER_PROCESS))
+        except (TypeError, ValueError):
+            max_outputs = MAX_VARIANT_OUTPUTS_PER_PROCESS
+        max_outputs = max(1, max_outputs)
+        
+        decode_groups = {}
+        for variant in variants:
+            variant_params = variant[0]
+            decode_key = repr(sorted(
+                (k, repr(v)) for k, v in variant_params.items() if k not in GIF_PALETTE_PARAM_KEYS
+            ))
+            decode_groups.setdefault(decode_key, []).append(variant)
+        
+        groups = []
+        for decode_variants in decode_groups.values():
+            for i in range(0, len(decode_variants), max_outputs):
+                palette_groups = {}
+                for variant in decode_variants[i:i + max_outputs]:
+                    variant_params = variant[0]
+                    colors = variant_params.get('ffmpeg_colors', variant_params.get('colors', 256))
+                    palette_groups.setdefault(colors, []).append(variant)
+                groups.append(list(palette_groups.values()))
+        return groups
+
+    def _encode_gif_variant_group(self, file_path: str, palette_groups: list) -> bool:
+        """
+        Encode one planned group with a single FFmpeg process.
+        
+        The shared filter chain is split into one palettegen per palette group plus
+        one paletteuse branch per variant; palettes are split again when several
+        variants (e.g. dither values) use the same one.
+        """
+        variants = [variant for palette_group in palette_groups for variant in palette_group]
+        original_params = self.engine.params
+        try:
+            # All variants in a group share the filter chain params
+            self.engine.params = variants[0][0]
+            base_split = self._build_gif_filter_chain(file_path).split()
+            
+            outputs = []
+            branch = 0
+            for palette_group in palette_groups:
+                self.engine.params = palette_group[0][0]
+                palette = base_split[branch].filter('palettegen', max_colors=self._gif_palette_colors())
+                branch += 1
+                palette_split = palette.split() if len(palette_group) > 1 else None
+                
+                for j, (variant_params, output_path, _) in enumerate(palette_group):
+                    self.engine.params = variant_params
+                    variant_palette = palette_split[j] if palette_split is not None else palette
+                    final = ffmpeg.filter([base_split[branch], variant_palette], 'paletteuse', **self._gif_paletteuse_args())
+                    branch += 1
+                    outputs.append(ffmpeg.output(final, output_path))
+            
+            out = ffmpeg.merge_outputs(*outputs)
+            if variants[0][0].get('overwrite', False):
+                out = ffmpeg.overwrite_output(out)
+        finally:
+            self.engine.params = original_params
+        
+        return self.engine.run_ffmpeg_with_cancellation(out, overwrite_output=True)
+
+    def _run_gif_variant_plan(self, file_path: str, variants: list) -> int:
+        """
+        Encode planned GIF variants group by group and report each variant.
+        
+        Args:
+            variants: List of (variant_params, output_path, variant_desc)
+            
+        Returns:
+            Number of variants written successfully
+        """
+        groups = self._plan_gif_variant_groups(variants)
+        self.engine.status_updated.emit(
+            f"Encoding {len(variants)} GIF variants in {len(groups)} FFmpeg pass(es)"
+        )
+        
+        successful_conversions = 0
+        processed = 0
+        original_params = self.engine.params
+        
+        for palette_groups in groups:
+            if self.engine.should_stop:
+                break
+            group_variants = [variant for palette_group in palette_groups for variant in palette_group]
+            self.engine.status_updated.emit(
+                f"Processing variants {processed + 1}-{processed + len(group_variants)}/{len(variants)}: "
+                f"{'; '.join(desc for _, _, desc in group_variants)}"
+            )
+            
+            group_failed = False
+            if len(group_variants) > 1:
+                try:
+                    if not self._encode_gif_variant_group(file_path, palette_groups):
+                        break  # Cancelled
+                except Exception as e:
+                    if self.engine.should_stop:
+                        break
+                    self.engine.status_updated.emit(f"Shared GIF pass failed, retrying variants individually: {str(e)}")
+                    group_failed = True
+            
+            for variant_params, output_path, variant_desc in group_variants:
+                if len(group_variants) == 1 or group_failed:
+                    if self.engine.should_stop:
+                        break
+                    # Encodes on its own and reports completion itself
+                    self.engine.params = variant_params
+                    try:
+                        success = self._convert_video_to_gif_ffmpeg_only(file_path, output_path)
+                    finally:
+                        self.engine.params = original_params
+                else:
+                    success = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+                    if success:
+                        self.engine.file_completed.emit(file_path, output_path)
+                
+                if success:
+                    successful_conversions += 1
+                    self.engine.status_updated.emit(f"✓ GIF {variant_desc} completed")
+                else:
+                    self.engine.status_updated.emit(f"✗ GIF {variant_desc} failed")
+            
+            processed += len(group_variants)
+        
+        return successful_conversions
+
     def _convert_video_to_temp_gif(self, file_path: str, resize_variant: str = None, fps_variant: str = None) -> str:
         """Convert video to temporary GIF for variant processing"""
         try:
@@ -488,7 +687,8 @@ class GifConverter:
             if self.engine.should_stop:
                 return None
                 
-            ffmpeg.run(output, quiet=True, overwrite_output=True)
+            if not self.engine.run_ffmpeg_with_cancellation(output, overwrite_output=True):
+                return None
             
             return temp_gif
             
@@ -574,7 +774,8 @@ class GifConverter:
         # Store original params
         original_params = self.params.copy()
         
-        # Generate all combinations of variants
+        # Plan all combinations of variants, then encode them grouped by shared work
+        planned_variants = []
         for size in size_variants:
             if self.engine.should_stop: break
             for fps in fps_variants:
@@ -610,23 +811,15 @@ class GifConverter:
                             os.makedirs(os.path.dirname(output_path), exist_ok=True)
                             
                             variant_desc = f"size={size}, fps={fps}, colors={colors}, dither={dither}"
-                            self.engine.status_updated.emit(f"Processing variant {current_combination}/{total_combinations}: {variant_desc}")
-                            
-                            # Convert with these parameters using FFmpeg
-                            success = self._convert_video_to_gif_ffmpeg_only(file_path, output_path)
-                            
-                            if success:
-                                successful_conversions += 1
-                                self.engine.file_completed.emit(file_path, output_path)
-                                self.engine.status_updated.emit(f"✓ GIF {variant_desc} completed")
-                            else:
-                                self.engine.status_updated.emit(f"✗ GIF {variant_desc} failed")
-                            
-                            # Restore original parameters
-                            self.engine.params = original_params.copy()
+                            planned_variants.append((self.params.copy(), output_path, variant_desc))
                                     
                         except Exception as e:
                             self.engine.status_updated.emit(f"GIF variant conversion error: {str(e)}")
+                        finally:
+                            # Restore original parameters
+                            self.engine.params = original_params.copy()
+        
+        successful_conversions = self._run_gif_variant_plan(file_path, planned_variants)
         
         if self.engine.should_stop:
             self.engine.status_updated.emit(f"GIF variants conversion stopped by user: {successful_conversions}/{current_combination} completed")
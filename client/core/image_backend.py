@@ -0,0 +1,284 @@
+"""
+Image Backend
+In-process still-image conversion with Pillow.
+
+Spawning ffmpeg (plus an ffprobe for the resize branches) per image dominates
+the wall time of batches of small JPEG/PNG/WebP files. This backend runs the
+same pipeline as ConversionEngine._convert_image_ffmpeg inside the worker
+thread instead (Pillow releases the GIL while decoding, resampling and
+encoding, so the engine's parallel worker pool scales across cores):
+
+    EXIF orientation -> Max Size resolution scale -> current_resize / legacy
+    width resize -> ratio preset (fit + centered black pad) -> rotation ->
+    JPEG / PNG / WebP encode with the engine's quality mapping
+
+Quality / size variant sweeps decode the source once: iter_resize_cascade()
+renders each size from the previous larger one and the engine encodes every
+quality of a size from that buffer.
+
+Anything outside that (other source or target formats, FFmpeg-estimated Max
+Size, animated or high bit depth sources) stays on FFmpeg: can_convert_with_pillow()
+screens the request and convert_image_pillow() raises for what it can't decode.
+"""
+import io
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from client.core.dimension_utils import clamp_resize_width
+
+try:
+    from PIL import Image, ImageOps
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+
+# Sources Pillow decodes reliably as single still frames (GIF goes through FFmpeg)
+PILLOW_SOURCE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.tif'})
+PILLOW_SAVE_FORMATS = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP'}
+
+# Same canvases as the FFmpeg path's image ratio presets
+RATIO_CANVASES = {
+    '4:3': (1440, 1080),
+    '1:1': (1080, 1080),
+    '16:9': (1920, 1080),
+    '9:16': (1080, 1920),
+}
+
+
+def can_convert_with_pillow(file_path: str, format_ext: str, params: Dict) -> bool:
+    """True if this conversion can run in-process (params 'image_backend': 'ffmpeg' forces FFmpeg)."""
+    if not PILLOW_AVAILABLE or params.get('image_backend', 'auto') == 'ffmpeg':
+        return False
+    if format_ext.lower() not in PILLOW_SAVE_FORMATS:
+        return False
+    # Max Size with image_max_size_exact off is estimated with FFmpeg encodes; encode with the same encoder
+    if params.get('image_size_mode') == 'max_size' and not params.get('image_max_size_exact', True):
+        return False
+    return os.path.splitext(file_path)[1].lower() in PILLOW_SOURCE_EXTENSIONS
+
+
+def _keep_aspect(width: int, height: int, target_w: Optional[int], target_h: Optional[int]) -> Tuple[int, int]:
+    """Fill in a missing dimension like FFmpeg's scale=-1 (rounded to nearest)."""
+    if target_h is None or target_h < 0:
+        target_h = int(target_w * height / width + 0.5) if width else height
+    if target_w is None or target_w < 0:
+        target_w = int(target_h * width / height + 0.5) if height else width
+    return max(1, int(target_w)), max(1, int(target_h))
+
+
+def plan_image_size(orig_size: Tuple[int, int], params: Dict) -> Tuple[int, int]:
+    """
+    Output size before ratio presets / rotation.
+
+    Mirrors the scale filters of the FFmpeg path: percentage / pixel / longer
+    edge values are computed from the original dimensions, '-1' sides follow
+    the aspect of the frame being scaled.
+    """
+    orig_w, orig_h = orig_size
+    current_w, current_h = orig_w, orig_h
+
+    max_size_scale = params.get('_max_size_resolution_scale')
+    if max_size_scale and max_size_scale < 1.0:
+        current_w, current_h = max(1, int(orig_w * max_size_scale)), max(1, int(orig_h * max_size_scale))
+
+    current_resize = params.get('current_resize')
+    if current_resize:
+        if current_resize.endswith('%'):
+            percent = float(current_resize[:-1]) / 100
+            target_w = clamp_resize_width(orig_w, int(orig_w * percent))
+            target_h = int((target_w * orig_h) / orig_w) if orig_h else -1
+            return _keep_aspect(current_w, current_h, target_w, target_h)
+        if current_resize.startswith('L'):
+            target_longer_edge = int(current_resize[1:])
+            if max(orig_w, orig_h) < target_longer_edge:
+                return (current_w, current_h)  # No upscaling
+            if orig_w > orig_h:
+                return _keep_aspect(current_w, current_h, target_longer_edge, -1)
+            new_w = int(orig_w * (target_longer_edge / orig_h))
+            new_w = new_w if new_w % 2 == 0 else new_w - 1
+            return (max(1, new_w), target_longer_edge)
+        width = clamp_resize_width(orig_w, int(current_resize))
+        return _keep_aspect(current_w, current_h, width, -1)
+
+    if params.get('resize', False):
+        width = params.get('width', 1920)
+        if width is None:
+            return (current_w, current_h)
+        width = clamp_resize_width(orig_w, int(width))
+        return _keep_aspect(current_w, current_h, width, -1)
+
+    return (current_w, current_h)
+
+
+def _target_ratio(params: Dict) -> Optional[str]:
+    preset_ratio = params.get('image_preset_ratio')
+    is_instagram = params.get('image_preset_social') == 'Instagram'
+    return preset_ratio or ('9:16' if is_instagram else None)
+
+
+def _rotation_transpose(params: Dict):
+    """PIL transpose for the rotation param (None for no rotation), same skip rule as the FFmpeg path."""
+    rotation_angle = params.get('rotation_angle')
+    if not rotation_angle or rotation_angle == "No rotation":
+        return None
+    # PIL rotations are counter-clockwise
+    return {
+        "90° clockwise": Image.Transpose.ROTATE_270,
+        "180°": Image.Transpose.ROTATE_180,
+        "270° clockwise": Image.Transpose.ROTATE_90,
+    }.get(rotation_angle)
+
+
+def _normalize_mode(image: 'Image.Image') -> 'Image.Image':
+    """Bring decoded pixels into an 8-bit mode that resamples well (palette/bilevel/CMYK are expanded)."""
+    if image.mode in ('RGB', 'RGBA', 'L', 'LA'):
+        return image
+    if image.mode == 'P':
+        return image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    if image.mode == '1':
+        return image.convert('L')
+    if image.mode in ('CMYK', 'YCbCr'):
+        return image.convert('RGB')
+    # 16-bit / float sources keep their depth through FFmpeg
+    raise ValueError(f"Unsupported image mode for in-process conversion: {image.mode}")
+
+
+def _prepare_mode(image: 'Image.Image', save_format: str) -> 'Image.Image':
+    """Convert to a mode the encoder accepts, dropping alpha only where FFmpeg does (JPEG)."""
+    if save_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    if save_format == 'WEBP' and image.mode in ('L', 'LA'):
+        return image.convert('RGBA' if image.mode == 'LA' else 'RGB')
+    return image
+
+
+def encode_options(format_ext: str, params: Dict) -> Dict:
+    """Pillow save() options equivalent to the FFmpeg path's quality mapping."""
+    quality = int(params.get('quality', 85))
+    save_format = PILLOW_SAVE_FORMATS[format_ext.lower()]
+    if save_format == 'JPEG':
+        return {'quality': max(1, min(95, quality))}
+    if save_format == 'PNG':
+        return {'compress_level': min(9, max(0, (100 - quality) // 10))}
+    return {'quality': max(0, min(100, quality)), 'method': 4}
+
+
+def open_still_image(file_path: str) -> 'Image.Image':
+    """Decode a still source: EXIF orientation applied, pixels in a mode that resamples well."""
+    with Image.open(file_path) as source:
+        if getattr(source, 'n_frames', 1) > 1:
+            raise ValueError("Animated images are converted with FFmpeg")
+        source.load()
+        return _normalize_mode(ImageOps.exif_transpose(source))
+
+
+def resize_image(image: 'Image.Image', params: Dict) -> 'Image.Image':
+    """Apply the Max Size scale and current_resize / legacy width resize."""
+    target = plan_image_size(image.size, params)
+    if target != image.size:
+        image = image.resize(target, Image.Resampling.BICUBIC)
+    return image
+
+
+def iter_resize_cascade(image: 'Image.Image', params: Dict, resize_variants: List[Optional[str]]
+                        ) -> Iterator[Tuple[Optional[str], 'Image.Image']]:
+    """
+    Yield (resize variant, resized image) largest first.
+
+    Each size is resampled from the previous (larger) result rather than from
+    the full-resolution decode, so a sweep over a large photo pays for one
+    full-size resample instead of one per variant. Sizes are planned from the
+    original dimensions exactly as resize_image() would.
+    """
+    planned = [(resize, plan_image_size(image.size, dict(params, current_resize=resize)))
+               for resize in resize_variants]
+    planned.sort(key=lambda item: item[1][0] * item[1][1], reverse=True)
+
+    base = image
+    for resize, target in planned:
+        if target == base.size:
+            resized = base
+        elif target[0] <= base.width and target[1] <= base.height:
+            resized = base.resize(target, Image.Resampling.BICUBIC)
+        else:
+            # Aspect rounding made this one wider or taller than the last: go back to the decode
+            resized = image.resize(target, Image.Resampling.BICUBIC)
+        yield resize, resized
+        base = resized
+
+
+def finish_image(image: 'Image.Image', params: Dict,
+                 status_callback: Optional[Callable[[str], None]] = None) -> 'Image.Image':
+    """Apply the ratio preset (fit + centered black pad) and rotation to a resized image."""
+    target_ratio = _target_ratio(params)
+    if target_ratio in RATIO_CANVASES:
+        tw, th = RATIO_CANVASES[target_ratio]
+        if status_callback:
+            status_callback(f"Applying image preset ratio: {target_ratio} ({tw}x{th})")
+        fitted = ImageOps.contain(image, (tw, th), Image.Resampling.BICUBIC)
+        mode = 'RGBA' if 'A' in fitted.mode else 'RGB'
+        canvas = Image.new(mode, (tw, th), (0, 0, 0, 255) if mode == 'RGBA' else (0, 0, 0))
+        canvas.paste(fitted.convert(mode), ((tw - fitted.width) // 2, (th - fitted.height) // 2))
+        image = canvas
+
+    transpose = _rotation_transpose(params)
+    if transpose is not None:
+        image = image.transpose(transpose)
+    return image
+
+
+def render_image(image: 'Image.Image', params: Dict,
+                 status_callback: Optional[Callable[[str], None]] = None) -> 'Image.Image':
+    """Apply the engine's resize / ratio preset / rotation pipeline to a decoded image."""
+    return finish_image(resize_image(image, params), params, status_callback)
+
+
+def _encode(image: 'Image.Image', fp, format_ext: str, params: Dict) -> None:
+    save_format = PILLOW_SAVE_FORMATS[format_ext.lower()]
+    _prepare_mode(image, save_format).save(fp, save_format, **encode_options(format_ext, params))
+
+
+def encoded_size(image: 'Image.Image', format_ext: str, params: Dict) -> int:
+    """Bytes save_image() would write for this image and params (encoded into memory)."""
+    buffer = io.BytesIO()
+    _encode(image, buffer, format_ext, params)
+    return buffer.tell()
+
+
+def save_image(image: 'Image.Image', output_path: str, format_ext: str, params: Dict) -> None:
+    """
+    Encode a rendered image to output_path (written to a .part file, then renamed).
+
+    Image.save() stores the encoder options on the Image object, so concurrent
+    encodes of one rendered image must each be given their own copy().
+
+    Raises:
+        FileExistsError: output exists and params 'overwrite' is off (FFmpeg -n behaviour)
+    """
+    if os.path.exists(output_path) and not params.get('overwrite', False):
+        raise FileExistsError(f"Output already exists: {output_path}")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    tmp_path = f"{output_path}.part"
+    try:
+        _encode(image, tmp_path, format_ext, params)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def convert_image_pillow(file_path: str, output_path: str, format_ext: str, params: Dict,
+                         status_callback: Optional[Callable[[str], None]] = None) -> None:
+    """
+    Convert one still image in-process.
+
+    Raises:
+        FileExistsError: output exists and params 'overwrite' is off (FFmpeg -n behaviour)
+        OSError / ValueError: Pillow could not decode or encode the file (caller falls back)
+    """
+    if os.path.exists(output_path) and not params.get('overwrite', False):
+        raise FileExistsError(f"Output already exists: {output_path}")
+    image = render_image(open_still_image(file_path), params, status_callback)
+    save_image(image, output_path, format_ext, params)
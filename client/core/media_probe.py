@@ -0,0 +1,291 @@
+"""
+Media Probe Cache
+Runs ffprobe at most once per file version and shares the parsed result
+between the engine, the size estimator, suffix generation and the presets plugin.
+
+Entries are keyed on (path, mtime, size) so an edited file is re-probed
+automatically. The cache is an in-memory LRU that can optionally be
+persisted to disk between sessions.
+"""
+import atexit
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+from client.core.cache_utils import (
+    get_app_cache_dir,
+    file_fingerprint,
+    fingerprint_key,
+    atomic_write_json,
+)
+
+
+DEFAULT_MAX_ENTRIES = 1024
+PROBE_TIMEOUT_SECONDS = 10
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """Parsed ffprobe result for a single media file"""
+    width: int = 0             # Display width (after rotation metadata is applied)
+    height: int = 0            # Display height (after rotation metadata is applied)
+    stream_width: int = 0      # Coded width as stored in the stream
+    stream_height: int = 0     # Coded height as stored in the stream
+    rotation: int = 0          # Rotation from display matrix / rotate tag (degrees)
+    duration: float = 0.0      # Container duration in seconds
+    fps: float = 0.0           # r_frame_rate of the first video stream (0.0 if unknown)
+    has_video: bool = False
+    has_audio: bool = False
+    codec: str = "unknown"     # Video codec name
+    pix_fmt: str = ""
+    bitrate: int = 0           # Video stream bitrate (bits/s), 0 if unknown
+
+    @property
+    def is_landscape(self) -> bool:
+        return self.width > self.height
+
+    @classmethod
+    def from_probe(cls, probe: Dict) -> 'MediaInfo':
+        """Build a MediaInfo from ffprobe's JSON output."""
+        streams = probe.get('streams', [])
+        video_stream = next((s for s in streams if s.get('codec_type') == 'video'), None)
+        audio_stream = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+        duration = 0.0
+        try:
+            duration = float(probe.get('format', {}).get('duration', 0.0))
+        except (TypeError, ValueError):
+            pass
+
+        if not video_stream:
+            return cls(duration=duration, has_audio=audio_stream is not None)
+
+        stream_width = int(video_stream.get('width', 0) or 0)
+        stream_height = int(video_stream.get('height', 0) or 0)
+
+        # Method 1: side_data_list display matrix, Method 2: tags.rotate
+        rotation = 0
+        for side_data in video_stream.get('side_data_list', []):
+            if side_data.get('side_data_type') == 'Display Matrix':
+                try:
+                    rotation = int(float(side_data.get('rotation', 0)))
+                except (TypeError, ValueError):
+                    rotation = 0
+                break
+        if rotation == 0:
+            try:
+                rotation = int(video_stream.get('tags', {}).get('rotate', 0))
+            except (TypeError, ValueError):
+                rotation = 0
+
+        if abs(rotation) in (90, 270):
+            width, height = stream_height, stream_width
+        else:
+            width, height = stream_width, stream_height
+
+        fps = 0.0
+        fps_str = str(video_stream.get('r_frame_rate', ''))
+        try:
+            if '/' in fps_str:
+                num, den = map(int, fps_str.split('/'))
+                fps = num / den if den > 0 else 0.0
+            elif fps_str:
+                fps = float(fps_str)
+        except ValueError:
+            fps = 0.0
+
+        bitrate = 0
+        try:
+            bitrate = int(video_stream.get('bit_rate', 0))
+        except (TypeError, ValueError):
+            pass
+
+        return cls(
+            width=width,
+            height=height,
+            stream_width=stream_width,
+            stream_height=stream_height,
+            rotation=rotation,
+            duration=duration,
+            fps=fps,
+            has_video=True,
+            has_audio=audio_stream is not None,
+            codec=video_stream.get('codec_name', 'unknown'),
+            pix_fmt=video_stream.get('pix_fmt', ''),
+            bitrate=bitrate,
+        )
+
+
+def _default_ffprobe_cmd() -> str:
+    """ffprobe binary configured by init_bundled_tools, else rely on PATH."""
+    return os.environ.get('FFPROBE_BINARY') or 'ffprobe'
+
+
+def run_ffprobe(file_path: str, ffprobe_cmd: Optional[str] = None) -> Dict:
+    """Run ffprobe and return its parsed JSON output. Raises on failure."""
+    cmd = [
+        ffprobe_cmd or _default_ffprobe_cmd(),
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        str(file_path)
+    ]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=PROBE_TIMEOUT_SECONDS,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed ({result.returncode}): {result.stderr[:200]}")
+    return json.loads(result.stdout)
+
+
+class MediaProbeCache:
+    """
+    Thread-safe LRU cache of MediaInfo keyed on file fingerprint.
+
+    Concurrent lookups of the same file (parallel workers) share one ffprobe run.
+    Failed probes are not cached so a file that is still being written can be retried.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._entries: 'OrderedDict[Tuple[str, int, int], MediaInfo]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, int, int], threading.Lock] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if persist_path:
+            self._load()
+
+    def get(self, file_path: str, ffprobe_cmd: Optional[str] = None) -> Optional[MediaInfo]:
+        """Return MediaInfo for file_path, probing only on a cache miss. None if probing fails."""
+        key = file_fingerprint(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            info = self._lookup(key)
+            if info is not None:
+                self.hits += 1
+                return info
+            probe_lock = self._inflight.setdefault(key, threading.Lock())
+
+        with probe_lock:
+            # Another thread may have probed this file while we waited
+            with self._lock:
+                info = self._lookup(key)
+                if info is not None:
+                    self.hits += 1
+                    return info
+                self.misses += 1
+
+            try:
+                info = MediaInfo.from_probe(run_ffprobe(file_path, ffprobe_cmd))
+            except Exception as e:
+                print(f"[MediaProbeCache] Probe failed for {file_path}: {e}")
+                info = None
+
+            with self._lock:
+                self._inflight.pop(key, None)
+                if info is not None:
+                    self._store(key, info)
+            return info
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drop cached entries for one file (any version), or everything when file_path is None."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                abs_path = os.path.abspath(file_path)
+                for key in [k for k in self._entries if k[0] == abs_path]:
+                    del self._entries[key]
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Write the cache to persist_path (no-op when persistence is disabled or nothing changed)."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {fingerprint_key(k): asdict(v) for k, v in self._entries.items()}
+            self._dirty = False
+            try:
+                atomic_write_json(self.persist_path, data)
+            except Exception as e:
+                print(f"[MediaProbeCache] Failed to persist cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key) -> Optional[MediaInfo]:
+        info = self._entries.get(key)
+        if info is not None:
+            self._entries.move_to_end(key)
+        return info
+
+    def _store(self, key, info: MediaInfo) -> None:
+        self._entries[key] = info
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def _load(self) -> None:
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        for key_str, fields in data.items():
+            try:
+                path, mtime_ns, size = key_str.rsplit('|', 2)
+                self._store((path, int(mtime_ns), int(size)), MediaInfo(**fields))
+            except (TypeError, ValueError):
+                continue
+        self._dirty = False
+
+
+_probe_cache = MediaProbeCache()
+
+
+def configure_probe_cache(max_entries: int = DEFAULT_MAX_ENTRIES, persist: bool = False,
+                          persist_path: Optional[str] = None) -> MediaProbeCache:
+    """
+    Replace the shared probe cache.
+
+    Args:
+        max_entries: LRU capacity
+        persist: Persist entries to the app cache dir between sessions
+        persist_path: Explicit location for the persisted cache (implies persist)
+    """
+    global _probe_cache
+    if persist and not persist_path:
+        persist_path = os.path.join(get_app_cache_dir('cache'), 'media_probe.json')
+    _probe_cache.flush()
+    _probe_cache = MediaProbeCache(max_entries=max_entries, persist_path=persist_path)
+    return _probe_cache
+
+
+def get_probe_cache() -> MediaProbeCache:
+    """Get the shared probe cache instance."""
+    return _probe_cache
+
+
+def probe_media(file_path: str, ffprobe_cmd: Optional[str] = None) -> Optional[MediaInfo]:
+    """Get cached MediaInfo for a file (one ffprobe per file version). None if probing fails."""
+    return _probe_cache.get(file_path, ffprobe_cmd)
+
+
+atexit.register(lambda: _probe_cache.flush())
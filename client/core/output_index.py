@@ -0,0 +1,205 @@
+"""
+Output Index
+Make-like "skip up-to-date outputs" support for re-running the same folder
+with the same settings.
+
+For every source converted successfully the index stores the source
+fingerprint (path, mtime, size), a canonical hash of the conversion params and
+the fingerprint of each output written. A later run skips a source when all of
+those still match: unchanged input, same settings, every output still present
+and untouched. Anything else (edited input, changed setting, deleted or
+modified output, failed or partial previous run) re-encodes it.
+
+Params that only affect how the batch runs, not what gets written, are left
+out of the hash. Output location params stay in: a different output folder or
+suffix means different outputs.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from client.core.cache_utils import (
+    get_app_cache_dir,
+    file_fingerprint,
+    fingerprint_key,
+    atomic_write_json,
+)
+from client.core.calibration_cache import settings_hash
+
+
+DEFAULT_MAX_SOURCES = 20000
+# Batches complete many sources per second; coalesce index writes
+FLUSH_INTERVAL = 2.0
+INDEX_VERSION = 1
+
+# Params that don't change the outputs
+NON_OUTPUT_KEYS = frozenset({
+    'overwrite', 'parallel_jobs', 'skip_up_to_date',
+})
+
+
+def output_params_hash(params: Dict) -> str:
+    """Canonical hash of the params that determine a batch's outputs."""
+    effective = {k: v for k, v in params.items() if k not in NON_OUTPUT_KEYS}
+    effective['_index_version'] = INDEX_VERSION
+    return settings_hash(effective)
+
+
+class OutputIndex:
+    """
+    Thread-safe LRU (by source) of completed conversions.
+
+    Outputs reported while a source converts are staged with record_output()
+    and only committed by complete(..., success=True), so a partly finished
+    multi-variant source is never mistaken for an up-to-date one.
+    """
+
+    def __init__(self, max_sources: int = DEFAULT_MAX_SOURCES, persist_path: Optional[str] = None):
+        self.max_sources = max_sources
+        self.persist_path = persist_path
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._staged: Dict[str, Dict[str, None]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = 0.0
+        if persist_path:
+            self._load()
+
+    def is_up_to_date(self, source_path: str, params_hash: str) -> bool:
+        """True if source was converted with these params and all its outputs are unchanged."""
+        fingerprint = file_fingerprint(source_path)
+        if fingerprint is None:
+            return False
+        with self._lock:
+            entry = self._entries.get(fingerprint[0])
+            if (entry is None or entry['params_hash'] != params_hash
+                    or entry['source_key'] != fingerprint_key(fingerprint)):
+                return False
+            outputs = dict(entry['outputs'])
+            self._entries.move_to_end(fingerprint[0])
+        for output_path, output_key in outputs.items():
+            output_fingerprint = file_fingerprint(output_path)
+            if output_fingerprint is None or fingerprint_key(output_fingerprint) != output_key:
+                return False
+        return bool(outputs)
+
+    def record_output(self, source_path: str, output_path: str) -> None:
+        """Stage an output written for source (committed by complete())."""
+        with self._lock:
+            self._staged.setdefault(os.path.abspath(source_path), {})[os.path.abspath(output_path)] = None
+
+    def complete(self, source_path: str, params_hash: str, success: bool) -> None:
+        """
+        Commit (success) or discard the staged outputs of source.
+
+        A failed or interrupted source loses its entry since its outputs may have
+        been partly overwritten. A successful source that wrote nothing (e.g.
+        every output already existed with overwrite off) keeps its previous entry.
+        """
+        source = os.path.abspath(source_path)
+        with self._lock:
+            staged = self._staged.pop(source, {})
+            if not success:
+                if self._entries.pop(source, None) is not None:
+                    self._dirty = True
+                return
+            if not staged:
+                return
+        fingerprint = file_fingerprint(source)
+        outputs = {}
+        for output_path in staged:
+            output_fingerprint = file_fingerprint(output_path)
+            if output_fingerprint is not None:
+                outputs[output_path] = fingerprint_key(output_fingerprint)
+        with self._lock:
+            if fingerprint is None or not outputs:
+                self._entries.pop(source, None)
+            else:
+                self._entries[source] = {
+                    'source_key': fingerprint_key(fingerprint),
+                    'params_hash': params_hash,
+                    'outputs': outputs,
+                }
+                self._entries.move_to_end(source)
+                while len(self._entries) > self.max_sources:
+                    self._entries.popitem(last=False)
+            self._dirty = True
+        self.flush(force=False)
+
+    def invalidate(self, source_path: Optional[str] = None) -> None:
+        """Forget one source, or everything when source_path is None."""
+        with self._lock:
+            if source_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(source_path), None)
+            self._dirty = True
+        self.flush()
+
+    def flush(self, force: bool = True) -> None:
+        """Write the index to persist_path if changed (throttled unless force)."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.monotonic()
+            if not force and now - self._last_flush < FLUSH_INTERVAL:
+                return
+            data = {'version': INDEX_VERSION, 'sources': dict(self._entries)}
+            self._dirty = False
+            self._last_flush = now
+            try:
+                atomic_write_json(self.persist_path, data)
+            except Exception as e:
+                print(f"[OutputIndex] Failed to persist index: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return
+        for source, entry in data.get('sources', {}).items():
+            if isinstance(entry, dict) and entry.get('outputs'):
+                self._entries[source] = entry
+        while len(self._entries) > self.max_sources:
+            self._entries.popitem(last=False)
+
+
+_output_index = OutputIndex()
+
+
+def configure_output_index(max_sources: int = DEFAULT_MAX_SOURCES, persist: bool = False,
+                           persist_path: Optional[str] = None) -> OutputIndex:
+    """
+    Replace the shared output index.
+
+    Args:
+        max_sources: LRU capacity (sources, each with all its outputs)
+        persist: Persist the index to the app cache dir between sessions
+        persist_path: Explicit location for the persisted index (implies persist)
+    """
+    global _output_index
+    if persist and not persist_path:
+        persist_path = os.path.join(get_app_cache_dir('cache'), 'output_index.json')
+    _output_index.flush()
+    _output_index = OutputIndex(max_sources=max_sources, persist_path=persist_path)
+    return _output_index
+
+
+def get_output_index() -> OutputIndex:
+    """Get the shared output index instance."""
+    return _output_index
+
+
+atexit.register(lambda: _output_index.flush())
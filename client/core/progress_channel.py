@@ -0,0 +1,143 @@
+"""
+Progress Channel
+Coalesces a ConversionEngine's progress and status signals into at most one
+GUI update per frame.
+
+The engine reports progress for every FFmpeg progress block and a status line
+for nearly every filter decision; delivering each of those as its own queued
+signal floods the Qt event queue during large batches. The channel listens to
+the engine signals on the emitting (worker) thread, keeps only the latest
+overall/per-file values, drops status messages below the configured log level,
+and hands the GUI one ProgressUpdate per timer tick.
+
+file_completed / conversion_finished stay separate signals; the channel flushes
+pending progress right before them so the GUI sees updates in order.
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+
+DEFAULT_FRAME_RATE = 30
+# Statuses kept per update when the engine is very chatty (oldest are dropped)
+MAX_STATUSES_PER_UPDATE = 100
+
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+
+def status_level(message: str) -> int:
+    """Log level of an engine status message (engine debug lines are prefixed 'DEBUG:')."""
+    if message.startswith('DEBUG'):
+        return LOG_LEVELS['debug']
+    if message.startswith('Error') or message.startswith('❌'):
+        return LOG_LEVELS['error']
+    if message.startswith('Warning') or message.startswith('⚠'):
+        return LOG_LEVELS['warning']
+    return LOG_LEVELS['info']
+
+
+@dataclass
+class ProgressUpdate:
+    """One coalesced batch of engine updates"""
+    overall: Optional[int] = None        # Latest overall percentage
+    # Latest progress per file index, most recently updated last
+    file_progress: Dict[int, float] = field(default_factory=dict)
+    statuses: List[str] = field(default_factory=list)  # At or above the log level, in order
+    dropped_statuses: int = 0            # Messages discarded to bound the batch
+
+
+class ProgressCoalescer:
+    """
+    Thread-safe accumulator behind ProgressChannel (Qt-free).
+
+    post_* may be called from any thread; take() returns everything posted since
+    the previous take(), or None if nothing changed.
+    """
+
+    def __init__(self, log_level: str = 'info', max_statuses: int = MAX_STATUSES_PER_UPDATE):
+        self.min_level = LOG_LEVELS.get(log_level, LOG_LEVELS['info'])
+        self._lock = threading.Lock()
+        self._overall: Optional[int] = None
+        self._files: Dict[int, float] = {}
+        self._statuses = deque(maxlen=max_statuses)
+        self._dropped = 0
+
+    def post_overall(self, value: int) -> None:
+        with self._lock:
+            self._overall = value
+
+    def post_file_progress(self, file_index: int, progress: float) -> None:
+        with self._lock:
+            # Superseded values are dropped; re-insert so the dict stays in update order
+            self._files.pop(file_index, None)
+            self._files[file_index] = progress
+
+    def post_status(self, message: str) -> None:
+        if status_level(message) < self.min_level:
+            return
+        with self._lock:
+            if len(self._statuses) == self._statuses.maxlen:
+                self._dropped += 1
+            self._statuses.append(message)
+
+    def take(self) -> Optional[ProgressUpdate]:
+        with self._lock:
+            if self._overall is None and not self._files and not self._statuses:
+                return None
+            update = ProgressUpdate(
+                overall=self._overall,
+                file_progress=self._files,
+                statuses=list(self._statuses),
+                dropped_statuses=self._dropped,
+            )
+            self._overall = None
+            self._files = {}
+            self._statuses.clear()
+            self._dropped = 0
+        return update
+
+
+class ProgressChannel(QObject):
+    """
+    Rate-limited bridge between a ConversionEngine and the GUI.
+
+    Create it (in the GUI thread) before connecting other slots to the engine's
+    file_completed / conversion_finished so its pre-completion flush runs first.
+    """
+    updates_ready = pyqtSignal(object)  # ProgressUpdate
+    _flush_requested = pyqtSignal()
+
+    def __init__(self, engine, frame_rate: int = DEFAULT_FRAME_RATE, log_level: str = 'info', parent=None):
+        super().__init__(parent)
+        self._coalescer = ProgressCoalescer(log_level)
+        direct = Qt.ConnectionType.DirectConnection
+        engine.progress_updated.connect(self._coalescer.post_overall, direct)
+        engine.file_progress_updated.connect(self._coalescer.post_file_progress, direct)
+        engine.status_updated.connect(self._coalescer.post_status, direct)
+        engine.file_completed.connect(self._request_flush, direct)
+        engine.conversion_finished.connect(self._request_flush, direct)
+        # Emitted from worker threads, delivered (queued) on the GUI thread ahead of
+        # the completion signal that triggered it
+        self._flush_requested.connect(self.flush)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / max(1, frame_rate))))
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Deliver pending updates now (GUI thread)."""
+        update = self._coalescer.take()
+        if update is not None:
+            self.updates_ready.emit(update)
+
+    def stop(self) -> None:
+        """Stop the frame timer after a final flush."""
+        self._timer.stop()
+        self.flush()
+
+    def _request_flush(self, *args) -> None:
+        self._flush_requested.emit()
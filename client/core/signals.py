@@ -0,0 +1,71 @@
+"""
+Signals
+Minimal Qt-free signal/slot for the conversion core.
+
+The engine reports progress through these instead of pyqtSignal so it can run
+without PyQt6 (CLI, watch folder, tests). Slots are called synchronously on the
+emitting thread, like a Qt DirectConnection; the GUI's QThread adapter forwards
+them to real pyqtSignals, which take care of cross-thread delivery.
+
+    class Worker:
+        progress = Signal(int)
+
+    worker.progress.connect(print)
+    worker.progress.emit(50)
+"""
+import threading
+from typing import Callable, List
+
+
+class BoundSignal:
+    """Per-instance slot list of a Signal."""
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self._slots: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot: Callable) -> None:
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot: Callable = None) -> None:
+        """Remove one slot, or all slots when slot is None. Raises TypeError if not connected (like Qt)."""
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+                return
+            try:
+                self._slots.remove(slot)
+            except ValueError:
+                raise TypeError(f"{self.name or 'signal'}: slot is not connected") from None
+
+    def emit(self, *args) -> None:
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
+
+
+class Signal:
+    """
+    Class-level signal declaration; each instance gets its own BoundSignal.
+
+    Argument types are documentation only (mirrors the pyqtSignal declarations
+    the engine used to have).
+    """
+
+    def __init__(self, *types):
+        self.types = types
+        self.name = ''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        bound = obj.__dict__.get(self.name)
+        if bound is None:
+            bound = obj.__dict__.setdefault(self.name, BoundSignal(self.name))
+        return bound
@@ -12,12 +12,20 @@ Supports:
 - Video (H.264/H.265/VP9/AV1) size estimation
 """
 
+import json
 import os
-import tempfile
-import subprocess
+import threading
 import time
 import ffmpeg
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Callable, Optional
+from client.core.cache_utils import file_fingerprint, fingerprint_key
+from client.core.image_backend import encoded_size, open_still_image, render_image
+from client.core.media_probe import probe_media
+from client.core.ffmpeg_supervisor import compile_ffmpeg_args, get_supervisor
+from client.core.calibration_cache import get_calibration_cache, GIF_CALIBRATION_KEYS
+from client.core.size_model import get_size_model, content_class
 
 
 # =============================================================================
@@ -169,6 +177,13 @@ QUALITY_PRESETS_AUTORESIZE = [
 # Reference preset index for calibration (middle quality for best accuracy)
 REFERENCE_PRESET_IDX = 8
 
+# Stratified sampling: segments spread across the timeline per calibration
+DEFAULT_SAMPLE_POINTS = 4
+MAX_CONCURRENT_SAMPLES = 4
+
+# Two-sided 95% Student-t critical values by degrees of freedom
+T_95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26}
+
 # Dither level to FFmpeg string mapping
 DITHER_MAP = {
     0: 'none',
@@ -325,38 +340,51 @@ VIDEO_QUALITY_PRESETS_AUTORESIZE = [
 VIDEO_REFERENCE_PRESET_IDX = 8
 
 
+# Sample encodes stream their output to stdout and are measured by counting
+# bytes; nothing is written to disk.
+SAMPLE_PIPE = 'pipe:1'
+
+# image2pipe encoder per still-image output format
+IMAGE_PIPE_CODECS = {'jpg': 'mjpeg', 'jpeg': 'mjpeg', 'png': 'png', 'webp': 'libwebp'}
+
+# MP4 needs a seekable output to write its index at the end; fragmented MP4
+# (moov up front, one fragment per keyframe) streams to a pipe instead
+STREAMABLE_MP4_FLAGS = 'frag_keyframe+empty_moov+default_base_moof'
+
+
+def _measure_sample_ffmpeg(stream_spec, timeout: Optional[float] = None) -> int:
+    """Run a sample encode that outputs to SAMPLE_PIPE; returns the bytes it streamed (0 on failure)"""
+    try:
+        job = get_supervisor().start(compile_ffmpeg_args(stream_spec, progress=False), count_stdout=True)
+        if job.result(timeout=timeout):
+            return job.stdout_bytes
+    except Exception:
+        pass
+    return 0
+
+
 # =============================================================================
 # GIF SIZE ESTIMATION UTILITIES
 # =============================================================================
 
 def get_video_frame_rate(file_path: str) -> float:
     """
-    Get video frame rate using FFmpeg probe
+    Get video frame rate from the shared probe cache
     Returns fps as float or 30.0 as default
     """
-    try:
-        probe = ffmpeg.probe(file_path)
-        video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
-        if video_stream:
-            fps_str = video_stream.get('r_frame_rate', '30/1')
-            if '/' in fps_str:
-                num, den = map(int, fps_str.split('/'))
-                return num / den if den > 0 else 30.0
-            return float(fps_str)
-    except Exception:
-        pass
+    info = probe_media(file_path)
+    if info and info.fps > 0:
+        return info.fps
     return 30.0
 
 
-def extract_frame_as_gif_sample(file_path: str, time_offset: float, params: dict, temp_dir: str) -> int:
+def extract_frame_as_gif_sample(file_path: str, time_offset: float, params: dict) -> int:
     """
     Extract a single frame at the given time offset, apply GIF-like processing,
     and return the resulting file size in bytes.
     
     This mimics the GIF conversion pipeline to get accurate per-frame size estimates.
     """
-    temp_output = os.path.join(temp_dir, f"frame_sample_{time_offset:.3f}.gif")
-    
     try:
         # Build input with seek
         input_stream = ffmpeg.input(file_path, ss=time_offset)
@@ -420,20 +448,12 @@ def extract_frame_as_gif_sample(file_path: str, time_offset: float, params: dict
         final = ffmpeg.filter([split[1], palette], 'paletteuse', **paletteuse_args)
         
         # Output single frame as GIF
-        out = ffmpeg.output(final, temp_output, vframes=1)
-        out = ffmpeg.overwrite_output(out)
+        out = ffmpeg.output(final, SAMPLE_PIPE, vframes=1, format='gif')
         
         # Run silently
-        ffmpeg.run(out, quiet=True)
-        
-        if os.path.exists(temp_output):
-            size = os.path.getsize(temp_output)
-            os.remove(temp_output)
-            return size
+        return _measure_sample_ffmpeg(out)
     except Exception:
-        pass
-    
-    return 0
+        return 0
 
 
 def estimate_gif_size_fast_preview(file_path: str, params: dict, sample_seconds: float = 2.0) -> dict:
@@ -472,12 +492,7 @@ def estimate_gif_size_fast_preview(file_path: str, params: dict, sample_seconds:
         # Video too short, use heuristic
         return estimate_gif_size_heuristic(file_path, params)
     
-    # Create temp file for sample GIF
-    temp_output = None
     try:
-        with tempfile.NamedTemporaryFile(suffix='.gif', delete=False) as tmp_file:
-            temp_output = tmp_file.name
-        
         # Build FFmpeg command for sample encoding (same as full conversion)
         input_args = {}
         
@@ -547,17 +562,11 @@ def estimate_gif_size_fast_preview(file_path: str, params: dict, sample_seconds:
         final = ffmpeg.filter([split[1], palette], 'paletteuse', **paletteuse_args)
         
         # Output
-        out = ffmpeg.output(final, temp_output)
-        out = ffmpeg.overwrite_output(out)
+        out = ffmpeg.output(final, SAMPLE_PIPE, format='gif')
         
-        # Run encoding
-        ffmpeg.run(out, quiet=True)
-        
-        # Measure sample size
-        if os.path.exists(temp_output):
-            sample_size = os.path.getsize(temp_output)
-            os.remove(temp_output)
-            
+        # Run encoding, measuring the streamed sample
+        sample_size = _measure_sample_ffmpeg(out)
+        if sample_size > 0:
             # Extrapolate to full duration
             size_per_second = sample_size / actual_sample_seconds
             estimated_size = int(size_per_second * effective_duration)
@@ -575,12 +584,6 @@ def estimate_gif_size_fast_preview(file_path: str, params: dict, sample_seconds:
             return estimate_gif_size_heuristic(file_path, params)
             
     except Exception as e:
-        # Clean up temp file if it exists
-        if temp_output and os.path.exists(temp_output):
-            try:
-                os.remove(temp_output)
-            except:
-                pass
         # Fallback to heuristic
         return estimate_gif_size_heuristic(file_path, params)
 
@@ -666,85 +669,176 @@ def estimate_gif_size_heuristic(file_path: str, params: dict) -> dict:
 
 
 
-def estimate_all_preset_sizes(file_path: str, base_params: dict, sample_seconds: float = 1.5,
-                               auto_resize: bool = False) -> dict:
+def _load_cached_calibration(kind: str, file_path: str, settings: dict, presets: list) -> Optional[dict]:
+    """Return a stored calibration for these settings (marked 'cached'), or None."""
+    cached = get_calibration_cache().get(kind, file_path, settings)
+    if cached is None or len(cached.get('preset_sizes', [])) != len(presets):
+        return None
+    cached['presets_used'] = presets
+    cached['cached'] = True
+    return cached
+
+
+def _store_calibration(kind: str, file_path: str, settings: dict, calibration: dict) -> None:
+    """Persist a measured calibration (heuristic fallbacks are never stored)."""
+    if calibration.get('method') != 'calibrated':
+        return
+    try:
+        get_calibration_cache().put(kind, file_path, settings, calibration)
+    except Exception as e:
+        print(f"[size_estimator] Failed to store calibration: {e}")
+
+
+def _apply_size_model(kind: str, file_path: str, variant: str, calibration: dict) -> dict:
     """
-    Ultra-fast estimation: encode ONE sample at reference preset,
-    then calculate ALL preset sizes using pre-computed ratios.
-    
-    Args:
-        auto_resize: If True, uses QUALITY_PRESETS_AUTORESIZE which includes
-                     resolution scaling tiers before low quality presets.
-    
-    Returns dict with:
-        - preset_sizes: list of estimated sizes for each preset (bytes)
-        - reference_size: actual encoded size at reference preset
-        - calibration_time: time taken for the single encode
-        - presets_used: the preset list used (for external reference)
+    Scale a measured preset size table by the corrections learned for this
+    content class. The uncorrected table is kept as 'raw_preset_sizes' so
+    finished conversions can be compared against it.
     """
-    # Select preset list based on auto_resize option
-    presets = QUALITY_PRESETS_AUTORESIZE if auto_resize else QUALITY_PRESETS_STANDARD
-    
-    duration = get_video_duration(file_path)
-    if duration <= 0:
-        return {'error': 'Could not determine video duration'}
-    
-    # Calculate effective duration (time cutting + retime)
-    enable_time_cutting = base_params.get('enable_time_cutting', False)
-    if enable_time_cutting:
-        time_start = base_params.get('time_start', 0.0)
-        time_end = base_params.get('time_end', 1.0)
-        effective_duration = (time_end - time_start) * duration
+    try:
+        class_key = content_class(kind, file_path, variant)
+    except Exception:
+        class_key = None
+    raw_sizes = calibration['preset_sizes']
+    calibration['raw_preset_sizes'] = list(raw_sizes)
+    calibration['preset_sizes'] = get_size_model().correct_sizes(class_key, raw_sizes)
+    calibration['size_class'] = class_key
+    return calibration
+
+
+def _size_model_fields(calibration: dict, best_idx: int) -> dict:
+    """Optimizer result fields needed to learn from the finished conversion."""
+    if not calibration.get('size_class'):
+        return {}
+    return {
+        '_size_class': calibration['size_class'],
+        '_raw_estimated_size': calibration['raw_preset_sizes'][best_idx],
+        '_raw_preset_sizes': list(calibration['raw_preset_sizes']),
+    }
+
+
+def _log_calibration(log, calibration: dict) -> None:
+    """Report how the preset size table was obtained."""
+    if calibration.get('cached'):
+        log("✓ Using cached calibration (reference encode skipped)")
+    elif 'error' in calibration and calibration.get('method') == 'heuristic_fallback':
+        log(f"⚠ Using heuristic estimation (encode failed)")
     else:
-        effective_duration = duration
+        log(f"✓ Calibration complete in {calibration.get('calibration_time', 0):.1f}s")
     
-    retime_enabled = base_params.get('retime_enabled', False) or base_params.get('enable_retime', False)
-    retime_speed = base_params.get('retime_speed', 1.0)
-    if retime_enabled and retime_speed > 0:
-        effective_duration = effective_duration / retime_speed
+    interval = calibration.get('confidence_interval')
+    if interval and calibration.get('reference_size'):
+        spread = (interval[1] - interval[0]) / 2 / calibration['reference_size'] * 100
+        log(f"  {calibration.get('sample_points', 1)} samples, confidence {calibration['confidence']} (±{spread:.0f}%)")
     
-    # Sample duration
-    actual_sample_seconds = min(sample_seconds, effective_duration * 0.8)
-    if actual_sample_seconds < 0.3:
-        # Video too short, use heuristic for all
-        heuristic = estimate_gif_size_heuristic(file_path, base_params)
-        base_size = heuristic.get('estimated_size', 1000000)
-        preset_sizes = [int(base_size * p[4]) for p in presets]
-        return {
-            'preset_sizes': preset_sizes,
-            'reference_size': base_size,
-            'calibration_time': 0,
-            'method': 'heuristic_fallback',
-            'presets_used': presets,
-        }
+    raw_sizes = calibration.get('raw_preset_sizes')
+    if raw_sizes and raw_sizes != calibration['preset_sizes'] and sum(raw_sizes) > 0:
+        factor = sum(calibration['preset_sizes']) / sum(raw_sizes)
+        log(f"  Learned size correction for {calibration['size_class']}: ×{factor:.2f}")
+
+
+def stratified_sample_offsets(range_start: float, range_length: float, points: int,
+                              segment_seconds: float) -> list:
+    """
+    Start offsets for `points` segments spread evenly across a time range.
     
-    # Build params for reference preset
-    ref_preset = presets[REFERENCE_PRESET_IDX]
-    ref_params = base_params.copy()
-    ref_params['ffmpeg_dither'] = DITHER_MAP[ref_preset[0]]
-    ref_params['ffmpeg_fps'] = ref_preset[1]
-    ref_params['ffmpeg_colors'] = ref_preset[2]
-    # Resolution: preserve user's resize choice (preset[3] is placeholder at 100%)
+    The range is cut into equal strata and one segment is centred in each,
+    clamped so every segment lies inside the range.
+    """
+    if points <= 1:
+        return [range_start]
+    stratum = range_length / points
+    latest_start = range_start + max(0.0, range_length - segment_seconds)
+    offsets = []
+    for i in range(points):
+        centre = range_start + (i + 0.5) * stratum
+        offsets.append(min(latest_start, max(range_start, centre - segment_seconds / 2)))
+    return offsets
+
+
+def combine_stratified_samples(samples: list) -> dict:
+    """
+    Combine per-segment sample encodes into one bytes-per-second rate.
     
-    # Create temp file for sample
-    temp_output = None
-    try:
-        import time
-        start_time = time.time()
-        
-        with tempfile.NamedTemporaryFile(suffix='.gif', delete=False) as tmp_file:
-            temp_output = tmp_file.name
+    Each segment stands for an equal share of the timeline, so the rate is
+    total bytes over total sampled seconds: an atypical segment (a static title
+    card) counts in full. The spread between per-segment rates only sets the
+    95% confidence interval for the rate.
+    
+    Args:
+        samples: List of (encoded_bytes, sampled_seconds) per segment
         
+    Returns dict with: rate, rate_low, rate_high, relative_error (CI half-width / rate)
+    """
+    samples = [(size, seconds) for size, seconds in samples if size > 0 and seconds > 0]
+    if not samples:
+        return {}
+    
+    total_seconds = sum(seconds for _, seconds in samples)
+    rate = sum(size for size, _ in samples) / total_seconds
+    if len(samples) < 2:
+        return {'rate': rate, 'rate_low': None, 'rate_high': None, 'relative_error': None}
+    
+    # Duration-weighted variance of per-segment rates, with its effective sample size
+    weights = [seconds for _, seconds in samples]
+    rates = [size / seconds for size, seconds in samples]
+    weight_sum_sq = sum(w * w for w in weights)
+    denom = total_seconds - weight_sum_sq / total_seconds
+    variance = sum(w * (r - rate) ** 2 for w, r in zip(weights, rates)) / denom if denom > 0 else 0.0
+    effective_n = total_seconds ** 2 / weight_sum_sq
+    
+    t_value = T_95.get(len(samples) - 1, 1.96)
+    half_width = t_value * (variance / effective_n) ** 0.5
+    return {
+        'rate': rate,
+        'rate_low': max(0.0, rate - half_width),
+        'rate_high': rate + half_width,
+        'relative_error': half_width / rate if rate > 0 else None,
+    }
+
+
+def _confidence_fields(combined: dict, total_duration: float) -> dict:
+    """Confidence level + interval (bytes, for the full duration) for a calibration result"""
+    relative_error = combined.get('relative_error')
+    if relative_error is None:
+        return {'confidence': 'low', 'confidence_interval': None}
+    if relative_error <= 0.10:
+        confidence = 'high'
+    elif relative_error <= 0.25:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+    return {
+        'confidence': confidence,
+        'confidence_interval': [int(combined['rate_low'] * total_duration),
+                                int(combined['rate_high'] * total_duration)],
+    }
+
+
+def _run_sample_encodes(encode_segment: Callable[[float], int], offsets: list) -> list:
+    """Run segment encodes concurrently; returns encoded sizes in offset order (0 = failed)"""
+    if len(offsets) == 1:
+        return [encode_segment(offsets[0])]
+    with ThreadPoolExecutor(max_workers=min(len(offsets), MAX_CONCURRENT_SAMPLES),
+                            thread_name_prefix='size-sample') as pool:
+        return list(pool.map(encode_segment, offsets))
+
+
+def _encode_gif_sample(file_path: str, base_params: dict, ref_params: dict,
+                       start_time: Optional[float], sample_seconds: float) -> int:
+    """Encode one GIF sample segment at the reference preset; returns its size in bytes (0 on failure)"""
+    try:
         # Build FFmpeg command
         input_args = {}
-        if enable_time_cutting:
-            time_start = base_params.get('time_start', 0.0)
-            input_args['ss'] = time_start * duration
-        input_args['t'] = actual_sample_seconds
+        if start_time:
+            input_args['ss'] = start_time
+        input_args['t'] = sample_seconds
         
         input_stream = ffmpeg.input(file_path, **input_args)
         
         # Retime
+        retime_enabled = base_params.get('retime_enabled', False) or base_params.get('enable_retime', False)
+        retime_speed = base_params.get('retime_speed', 1.0)
         if retime_enabled and retime_speed != 1.0:
             input_stream = ffmpeg.filter(input_stream, 'setpts', f'PTS/{retime_speed}')
         
@@ -799,48 +893,139 @@ def estimate_all_preset_sizes(file_path: str, base_params: dict, sample_seconds:
         final = ffmpeg.filter([split[1], palette], 'paletteuse', **paletteuse_args)
         
         # Output
-        out = ffmpeg.output(final, temp_output)
-        out = ffmpeg.overwrite_output(out)
-        ffmpeg.run(out, quiet=True)
+        out = ffmpeg.output(final, SAMPLE_PIPE, format='gif')
+        return _measure_sample_ffmpeg(out)
+    except Exception:
+        return 0
+
+
+def estimate_all_preset_sizes(file_path: str, base_params: dict, sample_seconds: float = 1.5,
+                               auto_resize: bool = False, sample_points: Optional[int] = None) -> dict:
+    """
+    Ultra-fast estimation: encode samples at reference preset,
+    then calculate ALL preset sizes using pre-computed ratios.
+    
+    With sample_points > 1, that many segments spread across the effective
+    range are encoded concurrently (so wall time stays close to a single sample)
+    and combined as total bytes over total sampled seconds, each segment
+    standing for an equal share of the range; the spread between them only
+    sets the confidence interval. sample_points=1 samples the start of the range only.
+    
+    Args:
+        auto_resize: If True, uses QUALITY_PRESETS_AUTORESIZE which includes
+                     resolution scaling tiers before low quality presets.
+        sample_points: Number of sample segments (default: base_params
+                       'estimate_sample_points', else DEFAULT_SAMPLE_POINTS)
+    
+    Returns dict with:
+        - preset_sizes: list of estimated sizes for each preset (bytes)
+        - reference_size: estimated full size at reference preset
+        - calibration_time: time taken for the sample encodes
+        - confidence / confidence_interval: reliability of reference_size
+        - presets_used: the preset list used (for external reference)
+    """
+    # Select preset list based on auto_resize option
+    presets = QUALITY_PRESETS_AUTORESIZE if auto_resize else QUALITY_PRESETS_STANDARD
+    if sample_points is None:
+        sample_points = base_params.get('estimate_sample_points', DEFAULT_SAMPLE_POINTS)
+    sample_points = max(1, int(sample_points))
+    
+    # Reuse a previous calibration of the same source + size-relevant settings
+    cache_settings = {k: base_params.get(k) for k in GIF_CALIBRATION_KEYS}
+    cache_settings.update({'sample_seconds': sample_seconds, 'sample_points': sample_points,
+                           'presets': presets})
+    cached = _load_cached_calibration('gif', file_path, cache_settings, presets)
+    if cached is not None:
+        return _apply_size_model('gif', file_path, '', cached)
+    
+    duration = get_video_duration(file_path)
+    if duration <= 0:
+        return {'error': 'Could not determine video duration'}
+    
+    # Calculate effective duration (time cutting + retime)
+    enable_time_cutting = base_params.get('enable_time_cutting', False)
+    range_start = 0.0
+    if enable_time_cutting:
+        time_start = base_params.get('time_start', 0.0)
+        time_end = base_params.get('time_end', 1.0)
+        effective_duration = (time_end - time_start) * duration
+        range_start = time_start * duration
+    else:
+        effective_duration = duration
+    range_length = effective_duration
+    
+    retime_enabled = base_params.get('retime_enabled', False) or base_params.get('enable_retime', False)
+    retime_speed = base_params.get('retime_speed', 1.0)
+    if retime_enabled and retime_speed > 0:
+        effective_duration = effective_duration / retime_speed
+    
+    # Sample duration
+    actual_sample_seconds = min(sample_seconds, effective_duration * 0.8)
+    if actual_sample_seconds < 0.3:
+        # Video too short, use heuristic for all
+        heuristic = estimate_gif_size_heuristic(file_path, base_params)
+        base_size = heuristic.get('estimated_size', 1000000)
+        preset_sizes = [int(base_size * p[4]) for p in presets]
+        return {
+            'preset_sizes': preset_sizes,
+            'reference_size': base_size,
+            'calibration_time': 0,
+            'method': 'heuristic_fallback',
+            'presets_used': presets,
+        }
+    
+    # Only spread samples when the range holds them without overlapping
+    points = max(1, min(sample_points, int(range_length / (2 * actual_sample_seconds))))
+    offsets = stratified_sample_offsets(range_start, range_length, points, actual_sample_seconds)
+    
+    # Build params for reference preset
+    ref_preset = presets[REFERENCE_PRESET_IDX]
+    ref_params = base_params.copy()
+    ref_params['ffmpeg_dither'] = DITHER_MAP[ref_preset[0]]
+    ref_params['ffmpeg_fps'] = ref_preset[1]
+    ref_params['ffmpeg_colors'] = ref_preset[2]
+    # Resolution: preserve user's resize choice (preset[3] is placeholder at 100%)
+    
+    try:
+        start_time = time.time()
         
+        sample_sizes = _run_sample_encodes(
+            lambda offset: _encode_gif_sample(file_path, base_params, ref_params, offset, actual_sample_seconds),
+            offsets
+        )
         calibration_time = time.time() - start_time
         
-        # Measure reference size
-        if os.path.exists(temp_output):
-            sample_size = os.path.getsize(temp_output)
-            os.remove(temp_output)
-            
-            # Extrapolate reference size to full duration
-            size_per_second = sample_size / actual_sample_seconds
-            reference_full_size = size_per_second * effective_duration
-            
-            # Calculate all preset sizes using ratios relative to reference
-            ref_factor = presets[REFERENCE_PRESET_IDX][4]
-            preset_sizes = []
-            for preset in presets:
-                # Scale by ratio of this preset's factor to reference factor
-                ratio = preset[4] / ref_factor
-                preset_sizes.append(int(reference_full_size * ratio))
-            
-            return {
-                'preset_sizes': preset_sizes,
-                'reference_size': int(reference_full_size),
-                'sample_size': sample_size,
-                'sample_duration': actual_sample_seconds,
-                'total_duration': effective_duration,
-                'calibration_time': calibration_time,
-                'method': 'calibrated',
-                'presets_used': presets,
-            }
-        else:
+        combined = combine_stratified_samples([(size, actual_sample_seconds) for size in sample_sizes])
+        if not combined:
             raise Exception("Sample encoding failed")
+        
+        # Extrapolate reference size to full duration
+        reference_full_size = combined['rate'] * effective_duration
+        
+        # Calculate all preset sizes using ratios relative to reference
+        ref_factor = presets[REFERENCE_PRESET_IDX][4]
+        preset_sizes = []
+        for preset in presets:
+            # Scale by ratio of this preset's factor to reference factor
+            ratio = preset[4] / ref_factor
+            preset_sizes.append(int(reference_full_size * ratio))
+        
+        calibration = {
+            'preset_sizes': preset_sizes,
+            'reference_size': int(reference_full_size),
+            'sample_size': sum(sample_sizes),
+            'sample_duration': actual_sample_seconds * len([size for size in sample_sizes if size > 0]),
+            'sample_points': len(offsets),
+            'total_duration': effective_duration,
+            'calibration_time': calibration_time,
+            'method': 'calibrated',
+            'presets_used': presets,
+        }
+        calibration.update(_confidence_fields(combined, effective_duration))
+        _store_calibration('gif', file_path, cache_settings, calibration)
+        return _apply_size_model('gif', file_path, '', calibration)
             
     except Exception as e:
-        if temp_output and os.path.exists(temp_output):
-            try:
-                os.remove(temp_output)
-            except:
-                pass
         # Fallback to heuristic
         heuristic = estimate_gif_size_heuristic(file_path, base_params)
         base_size = heuristic.get('estimated_size', 1000000)
@@ -889,11 +1074,7 @@ def find_optimal_gif_params_for_size(file_path: str, base_params: dict, target_s
     # Phase 1: Single calibration encode
     calibration = estimate_all_preset_sizes(file_path, base_params, sample_seconds=1.5, 
                                             auto_resize=auto_resize)
-    
-    if 'error' in calibration and calibration.get('method') == 'heuristic_fallback':
-        log(f"⚠ Using heuristic estimation (encode failed)")
-    else:
-        log(f"✓ Calibration complete in {calibration.get('calibration_time', 0):.1f}s")
+    _log_calibration(log, calibration)
     
     preset_sizes = calibration.get('preset_sizes', [])
     if not preset_sizes:
@@ -957,32 +1138,47 @@ def find_optimal_gif_params_for_size(file_path: str, base_params: dict, target_s
             log(f"✓ Binary search complete in {iterations} iterations")
     
     # Build output params from best preset
-    best_preset = presets[best_idx]
-    dither, fps, colors, resolution, factor = best_preset
+    optimized_params = _gif_preset_result(base_params, presets, best_idx, calibration,
+                                          target_size_bytes, auto_resize)
+    
+    # Handle resolution scaling from preset
+    if '_resolution_scale' in optimized_params:
+        log(f"  Resolution scale: {presets[best_idx][3]}% (applied on top of user resize)")
+    
+    log(f"✓ Selected preset[{best_idx}]: {optimized_params['_preset_info']}")
+    log(f"  Estimated size: {optimized_params['_estimated_size']/(1024*1024):.2f} MB ({optimized_params['_budget_utilization']:.1f}% of target)")
+    
+    return optimized_params
+
+
+def _gif_preset_result(base_params: dict, presets: list, best_idx: int, calibration: dict,
+                       target_size_bytes: int, auto_resize: bool) -> dict:
+    """Build optimized GIF params for one preset of a calibrated preset table"""
+    dither, fps, colors, resolution, factor = presets[best_idx]
+    preset_sizes = calibration['preset_sizes']
     
     optimized_params = base_params.copy()
     optimized_params['ffmpeg_dither'] = DITHER_MAP[dither]
     optimized_params['ffmpeg_fps'] = fps
     optimized_params['ffmpeg_colors'] = colors
     
-    # Handle resolution scaling from preset
     if resolution != 100:
         # Store resolution scale factor to apply on top of user's resize choice
         optimized_params['_resolution_scale'] = resolution / 100.0
-        log(f"  Resolution scale: {resolution}% (applied on top of user resize)")
+    else:
+        optimized_params.pop('_resolution_scale', None)
     
     estimated_size = preset_sizes[best_idx]
     optimized_params['_estimated_size'] = estimated_size
     optimized_params['_preset_index'] = best_idx
+    optimized_params['_preset_sizes'] = list(preset_sizes)
     res_str = f" @{resolution}%" if resolution != 100 else ""
     optimized_params['_preset_info'] = f"D{dither} {fps}fps {colors}col{res_str}"
     optimized_params['_calibration_time'] = calibration.get('calibration_time', 0)
     optimized_params['_auto_resize'] = auto_resize
     optimized_params['_budget_utilization'] = (estimated_size / target_size_bytes) * 100
-    
-    log(f"✓ Selected preset[{best_idx}]: {optimized_params['_preset_info']}")
-    log(f"  Estimated size: {estimated_size/(1024*1024):.2f} MB ({optimized_params['_budget_utilization']:.1f}% of target)")
-    
+    optimized_params['_confidence'] = calibration.get('confidence', 'low')
+    optimized_params.update(_size_model_fields(calibration, best_idx))
     return optimized_params
 
 def estimate_image_size_at_preset(file_path: str, output_format: str, preset: tuple) -> int:
@@ -992,11 +1188,7 @@ def estimate_image_size_at_preset(file_path: str, output_format: str, preset: tu
     """
     quality, resolution, _ = preset
     
-    temp_output = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=f'.{output_format}', delete=False) as tmp_file:
-            temp_output = tmp_file.name
-        
         # Build FFmpeg command
         input_stream = ffmpeg.input(file_path)
         stream = input_stream
@@ -1014,32 +1206,15 @@ def estimate_image_size_at_preset(file_path: str, output_format: str, preset: tu
         elif output_format == 'png':
             output_args['compression_level'] = max(0, 9 - int(quality / 11))  # 0-9
         
-        stream = ffmpeg.output(stream, temp_output, **output_args)
-        stream = ffmpeg.overwrite_output(stream)
+        # Single still frame to the pipe, encoded as the output format would be
+        output_args['vcodec'] = IMAGE_PIPE_CODECS.get(output_format, output_format)
+        stream = ffmpeg.output(stream, SAMPLE_PIPE, format='image2pipe', vframes=1, **output_args)
         
         # Run FFmpeg silently
-        ffmpeg_path = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
-        cmd = stream.compile(cmd=ffmpeg_path)
-        
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=30
-        )
-        
-        if result.returncode == 0 and os.path.exists(temp_output):
-            return os.path.getsize(temp_output)
-        return 0
+        return _measure_sample_ffmpeg(stream, timeout=30)
         
     except Exception as e:
         return 0
-    finally:
-        if temp_output and os.path.exists(temp_output):
-            try:
-                os.remove(temp_output)
-            except:
-                pass
 
 
 def estimate_all_image_preset_sizes(file_path: str, output_format: str, 
@@ -1049,14 +1224,21 @@ def estimate_all_image_preset_sizes(file_path: str, output_format: str,
     """
     presets = IMAGE_QUALITY_PRESETS_AUTORESIZE if auto_resize else IMAGE_QUALITY_PRESETS_STANDARD
     
+    cache_settings = {'format': output_format, 'presets': presets}
+    cached = _load_cached_calibration('image', file_path, cache_settings, presets)
+    if cached is not None:
+        return _apply_size_model('image', file_path, output_format, cached)
+    
     import time
     start_time = time.time()
     
     # Encode at reference preset
     ref_preset = presets[IMAGE_REFERENCE_PRESET_IDX]
     reference_size = estimate_image_size_at_preset(file_path, output_format, ref_preset)
+    method = 'calibrated'
     
     if reference_size <= 0:
+        method = 'heuristic_fallback'
         # Fallback: estimate based on original file size
         try:
             original_size = os.path.getsize(file_path)
@@ -1075,12 +1257,17 @@ def estimate_all_image_preset_sizes(file_path: str, output_format: str,
     
     calibration_time = time.time() - start_time
     
-    return {
+    calibration = {
         'preset_sizes': preset_sizes,
         'reference_size': reference_size,
         'calibration_time': calibration_time,
+        'method': method,
         'presets_used': presets,
     }
+    _store_calibration('image', file_path, cache_settings, calibration)
+    if method == 'calibrated':
+        calibration = _apply_size_model('image', file_path, output_format, calibration)
+    return calibration
 
 
 def find_optimal_image_params_for_size(file_path: str, output_format: str, target_size_bytes: int,
@@ -1112,7 +1299,7 @@ def find_optimal_image_params_for_size(file_path: str, output_format: str, targe
         log("Error: Could not estimate preset sizes")
         return {'quality': 75}  # Default fallback
     
-    log(f"✓ Calibration complete in {calibration.get('calibration_time', 0):.1f}s")
+    _log_calibration(log, calibration)
     
     # Check max quality size vs target
     max_quality_size = preset_sizes[0]
@@ -1142,50 +1329,211 @@ def find_optimal_image_params_for_size(file_path: str, output_format: str, targe
                     left = mid + 1
     
     # Build output params
-    best_preset = presets[best_idx]
-    quality, resolution, factor = best_preset
+    result = _image_preset_result(presets, best_idx, calibration, target_size_bytes, auto_resize)
+    
+    log(f"✓ Selected: {result['_preset_info']}, Est: {preset_sizes[best_idx]/(1024*1024):.2f} MB")
+    
+    return result
+
+
+def _image_preset_result(presets: list, best_idx: int, calibration: dict,
+                         target_size_bytes: int, auto_resize: bool) -> dict:
+    """Build optimized image params for one preset of a calibrated preset table"""
+    quality, resolution, factor = presets[best_idx]
+    preset_sizes = calibration['preset_sizes']
     
     result = {
         'quality': quality,
         '_estimated_size': preset_sizes[best_idx],
         '_preset_index': best_idx,
+        '_preset_sizes': list(preset_sizes),
         '_preset_info': f"Q{quality}",
         '_calibration_time': calibration.get('calibration_time', 0),
         '_auto_resize': auto_resize,
         '_budget_utilization': (preset_sizes[best_idx] / target_size_bytes) * 100,
     }
+    result.update(_size_model_fields(calibration, best_idx))
     
     if resolution != 100:
         result['_resolution_scale'] = resolution / 100.0
         result['_preset_info'] = f"Q{quality} @{resolution}%"
     
-    log(f"✓ Selected: {result['_preset_info']}, Est: {preset_sizes[best_idx]/(1024*1024):.2f} MB")
-    
     return result
 
 
 # =============================================================================
-# VIDEO MAX SIZE ESTIMATION AND OPTIMIZATION
+# IMAGE MAX SIZE: EXACT IN-MEMORY SEARCH
 # =============================================================================
+# Pillow-encodable images are decoded once and the real quality / scale space
+# is binary-searched by encoding into memory. The chosen settings are then
+# encoded by the same in-process backend, so the returned size is exactly
+# the size of the output. Preference order follows the preset tables: keep
+# 100% resolution down to the resize floor quality, then (auto-resize) trade
+# resolution down to EXACT_IMAGE_MIN_SCALE_PERCENT, then drop quality further.
 
-def estimate_video_size_at_preset(file_path: str, preset: tuple, codec: str,
-                                   sample_seconds: float = 2.0) -> int:
+EXACT_IMAGE_MAX_QUALITY = 95          # Pillow JPEG quality above 95 only grows the file
+EXACT_IMAGE_MIN_QUALITY = IMAGE_QUALITY_PRESETS_STANDARD[-1][0]
+EXACT_IMAGE_RESIZE_QUALITY = 50       # Auto-resize: lowest quality before scaling down
+EXACT_IMAGE_MIN_SCALE_PERCENT = 60
+EXACT_IMAGE_MEMO_SIZE = 256
+# PNG is lossless: 'quality' only picks the zlib level, and size is not monotonic
+# in it, so PNG keeps one level (40 -> compress_level 6, Pillow's default) and
+# only the scale is searched, with no quality fallback below the scale floor
+EXACT_IMAGE_PNG_QUALITY = 40
+EXACT_IMAGE_PNG_MIN_SCALE_PERCENT = 25
+
+# Params that change the rendered pixels (and so the encoded size)
+_EXACT_IMAGE_RENDER_KEYS = ('current_resize', 'resize', 'width', 'image_preset_ratio',
+                            'image_preset_social', 'rotation_angle')
+
+_exact_image_memo: 'OrderedDict[tuple, dict]' = OrderedDict()
+_exact_image_memo_lock = threading.Lock()
+
+
+def _exact_image_memo_key(file_path: str, output_format: str, params: Dict,
+                          target_size_bytes: int, auto_resize: bool) -> Optional[tuple]:
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None:
+        return None
+    render = json.dumps({k: params.get(k) for k in _EXACT_IMAGE_RENDER_KEYS}, sort_keys=True, default=str)
+    return (fingerprint_key(fingerprint), output_format.lower(), int(target_size_bytes), bool(auto_resize), render)
+
+
+def _search_highest(lo: int, hi: int, fits: Callable[[int], bool]) -> Optional[int]:
+    """Highest value in [lo, hi] for which fits() holds (fits assumed monotonic), or None."""
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            best = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+def find_exact_image_params_for_size(file_path: str, output_format: str, params: Dict,
+                                     target_size_bytes: int, status_callback=None,
+                                     auto_resize: bool = False) -> Optional[dict]:
     """
-    Estimate video size by encoding a short sample at a specific preset.
-    Returns estimated full video size in bytes.
+    Find image parameters for a target size by encoding into memory.
+    
+    Args:
+        params: Conversion params; resize / ratio preset / rotation settings are
+                rendered exactly as the in-process backend will render them
+    
+    Returns dict with quality, _resolution_scale (if scaled down), _estimated_size
+    (the exact output size) and _preset_info, or None if the image can't be
+    decoded in-process (callers fall back to find_optimal_image_params_for_size).
+    Results are memoized per (source fingerprint, format, target, render settings).
     """
-    crf, resolution, audio_kbps, _ = preset
+    def log(msg):
+        if status_callback:
+            status_callback(msg)
     
-    duration = get_video_duration(file_path)
-    if duration <= 0:
-        return 0
+    memo_key = _exact_image_memo_key(file_path, output_format, params, target_size_bytes, auto_resize)
+    if memo_key is not None:
+        with _exact_image_memo_lock:
+            cached = _exact_image_memo.get(memo_key)
+            if cached is not None:
+                _exact_image_memo.move_to_end(memo_key)
+        if cached is not None:
+            log(f"✓ Exact size search (cached): {cached['_preset_info']}")
+            return dict(cached)
     
-    # Sample a portion of the video
-    sample_duration = min(sample_seconds, duration * 0.5)
-    if sample_duration < 0.5:
-        sample_duration = duration
+    start_time = time.time()
+    try:
+        decoded = open_still_image(file_path)
+    except Exception as e:
+        log(f"Exact size search unavailable ({e}), estimating with FFmpeg")
+        return None
+    
+    log(f"Image target size: {target_size_bytes / (1024*1024):.2f} MB (exact search)")
+    
+    rendered = {}  # Only the scale being searched is kept rendered
+    sizes = {}
+    encodes = 0
+    
+    def size_at(quality: int, scale_percent: int) -> int:
+        nonlocal encodes
+        if (quality, scale_percent) not in sizes:
+            if scale_percent not in rendered:
+                render_params = dict(params)
+                render_params.pop('_max_size_resolution_scale', None)
+                if scale_percent < 100:
+                    render_params['_max_size_resolution_scale'] = scale_percent / 100.0
+                rendered.clear()
+                rendered[scale_percent] = render_image(decoded, render_params)
+            sizes[(quality, scale_percent)] = encoded_size(
+                rendered[scale_percent], output_format, dict(params, quality=quality))
+            encodes += 1
+        return sizes[(quality, scale_percent)]
+    
+    def fits(quality: int, scale_percent: int) -> bool:
+        return size_at(quality, scale_percent) <= target_size_bytes
+    
+    scale_percent = 100
+    lossless = output_format.lower() == 'png'
+    if lossless:
+        quality = EXACT_IMAGE_PNG_QUALITY
+        if not fits(quality, 100):
+            scale = None
+            if auto_resize:
+                scale = _search_highest(EXACT_IMAGE_PNG_MIN_SCALE_PERCENT, 99, lambda pct: fits(quality, pct))
+            if scale is None:
+                log("⚠ Even the smallest allowed PNG exceeds target")
+                scale = EXACT_IMAGE_PNG_MIN_SCALE_PERCENT if auto_resize else 100
+            scale_percent = scale
+    else:
+        floor_quality = EXACT_IMAGE_RESIZE_QUALITY if auto_resize else EXACT_IMAGE_MIN_QUALITY
+        quality = _search_highest(floor_quality, EXACT_IMAGE_MAX_QUALITY, lambda q: fits(q, 100))
+        if quality is None and auto_resize:
+            scale = _search_highest(EXACT_IMAGE_MIN_SCALE_PERCENT, 99,
+                                    lambda pct: fits(EXACT_IMAGE_RESIZE_QUALITY, pct))
+            if scale is not None:
+                quality, scale_percent = EXACT_IMAGE_RESIZE_QUALITY, scale
+            else:
+                quality = _search_highest(EXACT_IMAGE_MIN_QUALITY, EXACT_IMAGE_RESIZE_QUALITY - 1,
+                                          lambda q: fits(q, 100))
+        if quality is None:
+            log("⚠ Even minimum quality exceeds target")
+            quality = EXACT_IMAGE_MIN_QUALITY
+    
+    exact_size = size_at(quality, scale_percent)
+    label = "Lossless" if lossless else f"Q{quality}"
+    result = {
+        'quality': quality,
+        '_estimated_size': exact_size,
+        '_exact_size': True,
+        '_preset_info': label if scale_percent == 100 else f"{label} @{scale_percent}%",
+        '_calibration_time': time.time() - start_time,
+        '_auto_resize': auto_resize,
+        '_budget_utilization': (exact_size / target_size_bytes) * 100,
+    }
+    if scale_percent < 100:
+        result['_resolution_scale'] = scale_percent / 100.0
+    
+    log(f"✓ Selected: {result['_preset_info']}, exact {exact_size/(1024*1024):.2f} MB "
+        f"({encodes} in-memory encodes, {result['_calibration_time']:.2f}s)")
+    
+    if memo_key is not None:
+        with _exact_image_memo_lock:
+            _exact_image_memo[memo_key] = dict(result)
+            _exact_image_memo.move_to_end(memo_key)
+            while len(_exact_image_memo) > EXACT_IMAGE_MEMO_SIZE:
+                _exact_image_memo.popitem(last=False)
+    return result
+
+
+# =============================================================================
+# VIDEO MAX SIZE ESTIMATION AND OPTIMIZATION
+# =============================================================================
+
+def _encode_video_sample(file_path: str, preset: tuple, codec: str,
+                         start_time: float, sample_duration: float) -> int:
+    """Encode one video sample segment at a preset; returns its size in bytes (0 on failure)"""
+    crf, resolution, audio_kbps, _ = preset
     
-    temp_output = None
     try:
         # Determine output extension based on codec
         if 'webm' in codec.lower() or 'vp9' in codec.lower():
@@ -1205,13 +1553,7 @@ def estimate_video_size_at_preset(file_path: str, preset: tuple, codec: str,
             vcodec = 'libx264'
             acodec = 'aac'
         
-        with tempfile.NamedTemporaryFile(suffix=f'.{ext}', delete=False) as tmp_file:
-            temp_output = tmp_file.name
-        
         # Build FFmpeg command
-        # Start from middle of video for better representation
-        start_time = (duration - sample_duration) / 2
-        
         input_stream = ffmpeg.input(file_path, ss=start_time, t=sample_duration)
         video_stream = input_stream.video
         
@@ -1226,7 +1568,10 @@ def estimate_video_size_at_preset(file_path: str, preset: tuple, codec: str,
         output_args = {
             'vcodec': vcodec,
             'crf': crf,
+            'format': ext,
         }
+        if ext == 'mp4':
+            output_args['movflags'] = STREAMABLE_MP4_FLAGS
         
         if vcodec == 'libaom-av1':
             output_args['cpu-used'] = 8  # Fast for estimation
@@ -1235,56 +1580,92 @@ def estimate_video_size_at_preset(file_path: str, preset: tuple, codec: str,
             audio_stream = input_stream.audio
             output_args['acodec'] = acodec
             output_args['audio_bitrate'] = f'{audio_kbps}k'
-            stream = ffmpeg.output(video_stream, audio_stream, temp_output, **output_args)
+            stream = ffmpeg.output(video_stream, audio_stream, SAMPLE_PIPE, **output_args)
         else:
             output_args['an'] = None  # No audio
-            stream = ffmpeg.output(video_stream, temp_output, **output_args)
-        
-        stream = ffmpeg.overwrite_output(stream)
+            stream = ffmpeg.output(video_stream, SAMPLE_PIPE, **output_args)
         
         # Run FFmpeg
-        ffmpeg_path = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
-        cmd = stream.compile(cmd=ffmpeg_path)
-        
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=60
-        )
-        
-        if result.returncode == 0 and os.path.exists(temp_output):
-            sample_size = os.path.getsize(temp_output)
-            # Extrapolate to full video duration
-            full_size = int(sample_size * (duration / sample_duration))
-            return full_size
-        return 0
+        return _measure_sample_ffmpeg(stream, timeout=60)
         
     except Exception as e:
         return 0
-    finally:
-        if temp_output and os.path.exists(temp_output):
-            try:
-                os.remove(temp_output)
-            except:
-                pass
+
+
+def _sample_video_at_preset(file_path: str, preset: tuple, codec: str,
+                            sample_seconds: float = 2.0, sample_points: int = 1) -> dict:
+    """
+    Encode sample segment(s) at a preset and extrapolate to the full duration.
+    
+    Returns dict with: full_size (0 on failure), duration, sample_points and the
+    combine_stratified_samples() statistics (empty when every sample failed).
+    """
+    duration = get_video_duration(file_path)
+    if duration <= 0:
+        return {'full_size': 0}
+    
+    # Sample a portion of the video
+    sample_duration = min(sample_seconds, duration * 0.5)
+    if sample_duration < 0.5:
+        sample_duration = duration
+    
+    # Only spread samples when the video holds them without overlapping
+    points = max(1, min(sample_points, int(duration / (2 * sample_duration))))
+    if points == 1:
+        # Start from middle of video for better representation
+        offsets = [(duration - sample_duration) / 2]
+    else:
+        offsets = stratified_sample_offsets(0.0, duration, points, sample_duration)
+    
+    sample_sizes = _run_sample_encodes(
+        lambda offset: _encode_video_sample(file_path, preset, codec, offset, sample_duration),
+        offsets
+    )
+    combined = combine_stratified_samples([(size, sample_duration) for size in sample_sizes])
+    
+    # Extrapolate to full video duration
+    full_size = int(combined['rate'] * duration) if combined else 0
+    return {'full_size': full_size, 'duration': duration, 'sample_points': len(offsets), **combined}
+
+
+def estimate_video_size_at_preset(file_path: str, preset: tuple, codec: str,
+                                   sample_seconds: float = 2.0, sample_points: int = 1) -> int:
+    """
+    Estimate video size by encoding a short sample at a specific preset.
+    With sample_points > 1, segments spread across the video are encoded concurrently.
+    Returns estimated full video size in bytes.
+    """
+    return _sample_video_at_preset(file_path, preset, codec, sample_seconds, sample_points)['full_size']
 
 
 def estimate_all_video_preset_sizes(file_path: str, codec: str, base_params: dict,
                                      auto_resize: bool = False) -> dict:
     """
     Estimate video sizes for all presets using single reference encode + extrapolation.
+    The reference encode samples base_params 'estimate_sample_points' segments.
     """
     presets = VIDEO_QUALITY_PRESETS_AUTORESIZE if auto_resize else VIDEO_QUALITY_PRESETS_STANDARD
+    sample_points = max(1, int(base_params.get('estimate_sample_points', DEFAULT_SAMPLE_POINTS)))
+    
+    # The sample encode only depends on the source, codec and preset table
+    cache_settings = {'codec': codec, 'sample_seconds': 2.0, 'sample_points': sample_points,
+                      'presets': presets}
+    cached = _load_cached_calibration('video', file_path, cache_settings, presets)
+    if cached is not None:
+        return _apply_size_model('video', file_path, codec, cached)
     
     import time
     start_time = time.time()
     
     # Encode at reference preset
     ref_preset = presets[VIDEO_REFERENCE_PRESET_IDX]
-    reference_size = estimate_video_size_at_preset(file_path, ref_preset, codec, sample_seconds=2.0)
+    sample = _sample_video_at_preset(file_path, ref_preset, codec, sample_seconds=2.0,
+                                     sample_points=sample_points)
+    reference_size = sample['full_size']
+    method = 'calibrated'
     
     if reference_size <= 0:
+        method = 'heuristic_fallback'
         # Fallback: estimate based on original file size and duration
         try:
             original_size = os.path.getsize(file_path)
@@ -1304,12 +1685,20 @@ def estimate_all_video_preset_sizes(file_path: str, codec: str, base_params: dic
     
     calibration_time = time.time() - start_time
     
-    return {
+    calibration = {
         'preset_sizes': preset_sizes,
         'reference_size': reference_size,
         'calibration_time': calibration_time,
+        'method': method,
         'presets_used': presets,
     }
+    if method == 'calibrated':
+        calibration['sample_points'] = sample['sample_points']
+        calibration.update(_confidence_fields(sample, sample['duration']))
+    _store_calibration('video', file_path, cache_settings, calibration)
+    if method == 'calibrated':
+        calibration = _apply_size_model('video', file_path, codec, calibration)
+    return calibration
 
 
 def find_optimal_video_params_for_size(file_path: str, codec: str, base_params: dict,
@@ -1344,7 +1733,7 @@ def find_optimal_video_params_for_size(file_path: str, codec: str, base_params:
         log("Error: Could not estimate preset sizes")
         return {'crf': 28, 'audio_bitrate': 96}  # Default fallback
     
-    log(f"✓ Calibration complete in {calibration.get('calibration_time', 0):.1f}s")
+    _log_calibration(log, calibration)
     
     # Check max quality size vs target
     max_quality_size = preset_sizes[0]
@@ -1374,24 +1763,95 @@ def find_optimal_video_params_for_size(file_path: str, codec: str, base_params:
                     left = mid + 1
     
     # Build output params
-    best_preset = presets[best_idx]
-    crf, resolution, audio_kbps, factor = best_preset
+    result = _video_preset_result(presets, best_idx, calibration, target_size_bytes, auto_resize)
+    
+    log(f"✓ Selected: {result['_preset_info']}, Est: {preset_sizes[best_idx]/(1024*1024):.2f} MB")
+    
+    return result
+
+
+def _video_preset_result(presets: list, best_idx: int, calibration: dict,
+                         target_size_bytes: int, auto_resize: bool) -> dict:
+    """Build optimized video params for one preset of a calibrated preset table"""
+    crf, resolution, audio_kbps, factor = presets[best_idx]
+    preset_sizes = calibration['preset_sizes']
     
     result = {
         'crf': crf,
         'audio_bitrate': audio_kbps,
         '_estimated_size': preset_sizes[best_idx],
         '_preset_index': best_idx,
+        '_preset_sizes': list(preset_sizes),
         '_preset_info': f"CRF{crf}",
         '_calibration_time': calibration.get('calibration_time', 0),
         '_auto_resize': auto_resize,
         '_budget_utilization': (preset_sizes[best_idx] / target_size_bytes) * 100,
+        '_confidence': calibration.get('confidence', 'low'),
     }
+    result.update(_size_model_fields(calibration, best_idx))
     
     if resolution != 100:
         result['_resolution_scale'] = resolution / 100.0
         result['_preset_info'] = f"CRF{crf} @{resolution}%"
     
-    log(f"✓ Selected: {result['_preset_info']}, Est: {preset_sizes[best_idx]/(1024*1024):.2f} MB")
-    
     return result
+
+
+# =============================================================================
+# STRICT MAX SIZE REFINEMENT
+# =============================================================================
+
+def refine_max_size_result(kind: str, result: dict, actual_size: int, target_size_bytes: int) -> Optional[dict]:
+    """
+    Pick the next preset after an encode overshot the target.
+    
+    The preset size curve is re-scaled by the observed miss (actual / estimated)
+    and the highest-quality lower preset that then fits is chosen, so a large
+    miss skips several presets at once instead of re-encoding one step at a time.
+    
+    Args:
+        kind: 'gif', 'image' or 'video'
+        result: Optimizer result used for the encode that overshot
+                (from find_optimal_*_params_for_size or a previous refinement)
+        actual_size: Size of the encoded output in bytes
+        target_size_bytes: Target size in bytes
+    
+    Returns:
+        Optimizer result for the next preset, or None if already at the smallest preset
+    """
+    preset_sizes = result.get('_preset_sizes')
+    best_idx = result.get('_preset_index')
+    if not preset_sizes or best_idx is None:
+        return None
+    
+    auto_resize = result.get('_auto_resize', False)
+    if kind == 'gif':
+        presets = QUALITY_PRESETS_AUTORESIZE if auto_resize else QUALITY_PRESETS_STANDARD
+    elif kind == 'image':
+        presets = IMAGE_QUALITY_PRESETS_AUTORESIZE if auto_resize else IMAGE_QUALITY_PRESETS_STANDARD
+    else:
+        presets = VIDEO_QUALITY_PRESETS_AUTORESIZE if auto_resize else VIDEO_QUALITY_PRESETS_STANDARD
+    
+    if best_idx >= len(presets) - 1:
+        return None
+    
+    estimated = preset_sizes[best_idx]
+    miss_ratio = actual_size / estimated if estimated > 0 else 1.0
+    
+    next_idx = len(presets) - 1
+    for i in range(best_idx + 1, len(presets)):
+        if preset_sizes[i] * miss_ratio <= target_size_bytes:
+            next_idx = i
+            break
+    
+    calibration = {
+        'preset_sizes': preset_sizes,
+        'raw_preset_sizes': result.get('_raw_preset_sizes'),
+        'size_class': result.get('_size_class'),
+        'calibration_time': result.get('_calibration_time', 0),
+    }
+    if kind == 'gif':
+        return _gif_preset_result(result, presets, next_idx, calibration, target_size_bytes, auto_resize)
+    if kind == 'image':
+        return _image_preset_result(presets, next_idx, calibration, target_size_bytes, auto_resize)
+    return _video_preset_result(presets, next_idx, calibration, target_size_bytes, auto_resize)
@@ -0,0 +1,214 @@
+"""
+Adaptive Size Model
+Learns per-content-class corrections for Max Size estimates from real outputs.
+
+The preset tables in size_estimator extrapolate every preset size linearly from
+one reference encode using fixed size_factor ratios. That is systematically off
+for some content (high motion, grain, very small or very large frames). After a
+Max Size conversion finishes, the actual output size is compared with the raw
+estimate for the chosen preset and the log-ratio is folded into running
+statistics for the source's content class. Later estimates for the same class
+are scaled by the learned factor.
+
+Content classes bucket sources by estimator kind + codec/format, resolution,
+frame rate and a complexity score (source bits per pixel).
+"""
+import atexit
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+from client.core.cache_utils import get_app_cache_dir, atomic_write_json
+from client.core.media_probe import probe_media
+
+
+# Observations weigh in as a running mean over at most this many samples, so
+# the model keeps adapting (e.g. after an FFmpeg upgrade).
+MAX_EFFECTIVE_SAMPLES = 50
+
+# Pseudo-count pulling sparse classes towards "no correction"
+PRIOR_WEIGHT = 2.0
+
+# Corrections are clamped to this range so one bad sample can't wreck estimates
+MIN_CORRECTION = 0.25
+MAX_CORRECTION = 4.0
+
+RESOLUTION_BUCKETS = ((640, 'sd'), (1280, 'hd'), (1920, 'fhd'))
+FPS_BUCKETS = ((15, 'fps15'), (30, 'fps30'), (60, 'fps60'))
+# Source bits per pixel per frame (video) / bytes per pixel (image)
+VIDEO_COMPLEXITY_BUCKETS = ((0.05, 'low'), (0.15, 'mid'))
+IMAGE_COMPLEXITY_BUCKETS = ((0.5, 'low'), (1.5, 'mid'))
+
+
+def _bucket(value: float, buckets, top: str) -> str:
+    for limit, name in buckets:
+        if value <= limit:
+            return name
+    return top
+
+
+def content_class(kind: str, file_path: str, variant: str = '') -> Optional[str]:
+    """
+    Content class key for a source file.
+
+    Args:
+        kind: Estimator kind ('gif', 'image', 'video')
+        file_path: Source file
+        variant: Codec or output format the estimate is for
+
+    Returns:
+        Class key like 'video:H.264 (MP4):fhd:fps30:high', or None if the source can't be probed
+    """
+    info = probe_media(file_path)
+    if info is None or not info.width or not info.height:
+        return None
+
+    pixels = info.width * info.height
+    resolution = _bucket(max(info.width, info.height), RESOLUTION_BUCKETS, 'uhd')
+
+    if kind == 'image':
+        try:
+            bytes_per_pixel = os.path.getsize(file_path) / pixels
+        except OSError:
+            bytes_per_pixel = 0.0
+        complexity = _bucket(bytes_per_pixel, IMAGE_COMPLEXITY_BUCKETS, 'high')
+        return f"{kind}:{variant}:{resolution}:{complexity}"
+
+    fps = info.fps or 30.0
+    bitrate = info.bitrate
+    if not bitrate and info.duration > 0:
+        try:
+            bitrate = os.path.getsize(file_path) * 8 / info.duration
+        except OSError:
+            bitrate = 0
+    bits_per_pixel = bitrate / (pixels * fps) if bitrate else 0.0
+    complexity = _bucket(bits_per_pixel, VIDEO_COMPLEXITY_BUCKETS, 'high')
+    fps_bucket = _bucket(fps, FPS_BUCKETS, 'fps_high')
+    return f"{kind}:{variant}:{resolution}:{fps_bucket}:{complexity}"
+
+
+class SizeModel:
+    """
+    Thread-safe store of per-class, per-preset correction statistics.
+
+    Stats are kept as (count, mean log(actual / estimated)) both per preset index
+    and for the class as a whole; the per-preset entry is preferred when present.
+    """
+
+    def __init__(self, persist_path: Optional[str] = None):
+        self.persist_path = persist_path
+        self._stats: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+        if persist_path:
+            self._load()
+
+    def observe(self, class_key: str, preset_index: int, estimated_size: int, actual_size: int) -> None:
+        """Fold one (estimated, actual) pair into the class statistics."""
+        if not class_key or estimated_size <= 0 or actual_size <= 0:
+            return
+        log_ratio = math.log(actual_size / estimated_size)
+        with self._lock:
+            class_stats = self._stats.setdefault(class_key, {})
+            for slot in (str(preset_index), 'all'):
+                count, mean = class_stats.get(slot, (0, 0.0))
+                count += 1
+                mean += (log_ratio - mean) / min(count, MAX_EFFECTIVE_SAMPLES)
+                class_stats[slot] = [count, mean]
+        self.flush()
+
+    def correction(self, class_key: Optional[str], preset_index: int) -> float:
+        """Multiplicative correction for a raw estimate (1.0 when nothing is known)."""
+        if not class_key:
+            return 1.0
+        with self._lock:
+            class_stats = self._stats.get(class_key)
+            if not class_stats:
+                return 1.0
+            count, mean = class_stats.get(str(preset_index)) or class_stats.get('all', (0, 0.0))
+        weight = count / (count + PRIOR_WEIGHT)
+        return max(MIN_CORRECTION, min(MAX_CORRECTION, math.exp(mean * weight)))
+
+    def correct_sizes(self, class_key: Optional[str], preset_sizes: List[int]) -> List[int]:
+        """Apply per-preset corrections to a raw preset size table."""
+        return [int(size * self.correction(class_key, i)) for i, size in enumerate(preset_sizes)]
+
+    def reset(self, class_key: Optional[str] = None) -> None:
+        """Forget learned corrections for one class, or all of them."""
+        with self._lock:
+            if class_key is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(class_key, None)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the model to persist_path (no-op when persistence is disabled)."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            data = {k: dict(v) for k, v in self._stats.items()}
+            try:
+                atomic_write_json(self.persist_path, data)
+            except Exception as e:
+                print(f"[SizeModel] Failed to persist model: {e}")
+
+    def _load(self) -> None:
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._stats = {k: v for k, v in data.items() if isinstance(v, dict)}
+
+
+_size_model = SizeModel()
+
+
+def configure_size_model(persist: bool = False, persist_path: Optional[str] = None) -> SizeModel:
+    """
+    Replace the shared size model.
+
+    Args:
+        persist: Persist learned corrections to the app cache dir between sessions
+        persist_path: Explicit location for the persisted model (implies persist)
+    """
+    global _size_model
+    if persist and not persist_path:
+        persist_path = os.path.join(get_app_cache_dir('cache'), 'size_model.json')
+    _size_model.flush()
+    _size_model = SizeModel(persist_path=persist_path)
+    return _size_model
+
+
+def get_size_model() -> SizeModel:
+    """Get the shared size model instance."""
+    return _size_model
+
+
+def record_size_outcome(optimized: Dict, output_path: str) -> None:
+    """
+    Teach the model the real size of a finished Max Size conversion.
+
+    Args:
+        optimized: Result of a find_optimal_*_params_for_size call (or params updated
+                   with it); needs '_size_class', '_preset_index' and '_raw_estimated_size'
+        output_path: The written output file
+    """
+    if not optimized or not optimized.get('_size_class'):
+        return
+    try:
+        actual_size = os.path.getsize(output_path)
+    except OSError:
+        return
+    _size_model.observe(
+        optimized['_size_class'],
+        optimized.get('_preset_index', 0),
+        optimized.get('_raw_estimated_size', 0),
+        actual_size,
+    )
+
+
+atexit.register(lambda: _size_model.flush())
@@ -0,0 +1,604 @@
+"""
+Watch Folder
+Long-running hot-folder mode: converts files as they land in watched folders.
+
+    daemon = WatchDaemon(load_watch_config('watch.json', base_params), on_event=print_event)
+    daemon.run(stop_event)
+
+Pipeline:
+    watcher (inotify on Linux, scandir polling elsewhere)
+      -> SettleTracker (file size/mtime unchanged for settle_seconds)
+      -> bounded worker pool (max_workers), admitting at most max_pending files;
+         further settled files wait in the tracker (backpressure)
+      -> ConversionEngine.convert_source with the folder's params and output dir
+      -> ProcessedLedger (source fingerprints already handled, persisted)
+
+The ledger makes restarts cheap: existing files are rediscovered by the initial
+scan and skipped if their fingerprint was already processed. A changed file
+has a new fingerprint and is converted again. While idle, the inotify watcher
+blocks in select() and the polling watcher sleeps between directory listings.
+"""
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from client.core.cache_utils import (
+    get_app_cache_dir,
+    file_fingerprint,
+    fingerprint_key,
+    atomic_write_json,
+)
+from client.core.folder_scan import iter_supported_files
+
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_SETTLE_SECONDS = 3.0
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 64
+# Longest block in the watcher while nothing is settling (stop requests still wake it)
+IDLE_WAIT = 30.0
+MAX_LEDGER_ENTRIES = 100000
+LEDGER_COMPACT_EVENTS = 1000
+# Even files that look old (copies keep their mtime) are watched this long for growth
+MIN_OBSERVATION = 1.0
+
+
+@dataclass
+class WatchFolder:
+    """One watched folder and how its arrivals are converted"""
+    path: str
+    params: Dict
+    output_dir: str
+    recursive: bool = False
+
+
+@dataclass
+class WatchConfig:
+    folders: List[WatchFolder]
+    settle_seconds: float = DEFAULT_SETTLE_SECONDS
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+    max_workers: int = DEFAULT_MAX_WORKERS
+    max_pending: int = DEFAULT_MAX_PENDING
+    use_inotify: bool = True
+    state_path: Optional[str] = None
+
+
+def load_watch_config(path: str, base_params: Optional[Dict] = None) -> WatchConfig:
+    """
+    Load a watch config JSON file.
+
+    {
+      "settle_seconds": 3, "poll_interval": 2, "max_workers": 2, "max_pending": 64,
+      "folders": [
+        {"path": "in/web", "output_dir": "out/web", "recursive": false,
+         "params": {"type": "image", "format": "webp"}},
+        {"path": "in/social", "output_dir": "out/social", "params_file": "social.json"}
+      ]
+    }
+
+    Relative paths are resolved against the config file's folder. Folder params
+    are layered over base_params; output_dir is required so outputs never land
+    in (and get re-ingested from) the watched folder.
+
+    Raises:
+        ValueError: If the config is malformed
+        OSError: If the config or a params file can't be read
+    """
+    with open(path, 'r', encoding='utf-8') as fh:
+        data = json.load(fh)
+    if not isinstance(data, dict) or not data.get('folders'):
+        raise ValueError("Watch config needs a non-empty 'folders' list")
+    root = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value: str) -> str:
+        return os.path.abspath(os.path.join(root, os.path.expanduser(value)))
+
+    folders = []
+    for entry in data['folders']:
+        if not entry.get('path') or not entry.get('output_dir'):
+            raise ValueError("Each watched folder needs 'path' and 'output_dir'")
+        params = dict(base_params or {})
+        if entry.get('params_file'):
+            with open(resolve(entry['params_file']), 'r', encoding='utf-8') as fh:
+                params.update(json.load(fh))
+        params.update(entry.get('params', {}))
+        folder = WatchFolder(
+            path=resolve(entry['path']),
+            params=params,
+            output_dir=resolve(entry['output_dir']),
+            recursive=bool(entry.get('recursive', False)),
+        )
+        # A subfolder of a non-recursive watch is fine: it is never scanned
+        if (os.path.normcase(folder.output_dir) == os.path.normcase(folder.path)
+                or (folder.recursive and _is_within(folder.output_dir, folder.path))):
+            raise ValueError(f"output_dir {folder.output_dir} would be re-ingested from {folder.path}")
+        folder.params['output_dir'] = folder.output_dir
+        # One file per engine run; concurrency comes from the daemon's pool
+        folder.params['parallel_jobs'] = 1
+        folders.append(folder)
+
+    return WatchConfig(
+        folders=folders,
+        settle_seconds=float(data.get('settle_seconds', DEFAULT_SETTLE_SECONDS)),
+        poll_interval=float(data.get('poll_interval', DEFAULT_POLL_INTERVAL)),
+        max_workers=max(1, int(data.get('max_workers', DEFAULT_MAX_WORKERS))),
+        max_pending=max(1, int(data.get('max_pending', DEFAULT_MAX_PENDING))),
+        use_inotify=bool(data.get('use_inotify', True)),
+        state_path=resolve(data['state_path']) if data.get('state_path') else None,
+    )
+
+
+def _is_within(path: str, folder: str) -> bool:
+    path, folder = os.path.normcase(os.path.abspath(path)), os.path.normcase(os.path.abspath(folder))
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+
+# ============================================================================
+# Watchers
+# ============================================================================
+
+class PollingWatcher:
+    """
+    Portable watcher: lists the folders every poll_interval and reports files
+    that are new or whose size/mtime changed.
+    """
+
+    def __init__(self, folders: List[WatchFolder], extensions: Iterable[str],
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.folders = folders
+        self.extensions = frozenset(extensions)
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._snapshot: Dict[str, tuple] = {}
+        self._next_poll = 0.0
+
+    def scan(self) -> Set[str]:
+        """All supported files currently present (also primes the change snapshot)."""
+        snapshot = {}
+        for folder in self.folders:
+            for batch in iter_supported_files([folder.path], self.extensions, recursive=folder.recursive):
+                for path in batch:
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_size, st.st_mtime_ns)
+        changed = {path for path, sig in snapshot.items() if self._snapshot.get(path) != sig}
+        self._snapshot = snapshot
+        return changed
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Block up to timeout; returns changed files when a poll falls due."""
+        delay = max(0.0, min(timeout, self._next_poll - time.monotonic()))
+        if delay and self._wakeup.wait(delay):
+            self._wakeup.clear()
+            return set()
+        if time.monotonic() < self._next_poll:
+            return set()
+        self._next_poll = time.monotonic() + self.poll_interval
+        return self.scan()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.wake()
+
+
+class InotifyWatcher:
+    """
+    Linux watcher on inotify (via libc). Blocks in select() while idle.
+
+    Newly created subfolders of recursive folders get their own watch and are
+    scanned once, since files can land before the watch exists. On queue
+    overflow the watcher falls back to a full scan.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, folders: List[WatchFolder], extensions: Iterable[str]):
+        self.folders = folders
+        self.extensions = frozenset(extensions)
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._wake_r, self._wake_w = os.pipe()
+        self._watches: Dict[int, tuple] = {}  # wd -> (directory, recursive)
+        for folder in folders:
+            self._add_tree(folder.path, folder.recursive)
+
+    def _add_watch(self, directory: str, recursive: bool) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = (directory, recursive)
+
+    def _add_tree(self, directory: str, recursive: bool) -> None:
+        self._add_watch(directory, recursive)
+        if not recursive:
+            return
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            self._add_watch(entry.path, True)
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _supported(self, path: str) -> bool:
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def scan(self) -> Set[str]:
+        found = set()
+        for folder in self.folders:
+            for batch in iter_supported_files([folder.path], self.extensions, recursive=folder.recursive):
+                found.update(batch)
+        return found
+
+    def wait(self, timeout: float) -> Set[str]:
+        try:
+            readable, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        except (OSError, ValueError):
+            return set()
+        if self._wake_r in readable:
+            os.read(self._wake_r, 64)
+        if self._fd not in readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _cookie, name_len = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + name_len].split(b'\0', 1)[0]
+            offset += name_len
+            if mask & self.IN_Q_OVERFLOW:
+                return self.scan()
+            directory, recursive = self._watches.get(wd, (None, False))
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path, True)
+                    for batch in iter_supported_files([path], self.extensions, recursive=True):
+                        changed.update(batch)
+            elif self._supported(path):
+                changed.add(path)
+        return changed
+
+    def wake(self) -> None:
+        try:
+            os.write(self._wake_w, b'x')
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self.wake()
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def create_watcher(folders: List[WatchFolder], extensions: Iterable[str],
+                   poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+    """inotify watcher on Linux when available, polling watcher otherwise."""
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folders, extensions)
+        except (OSError, AttributeError) as e:
+            print(f"[WatchFolder] inotify unavailable ({e}), polling every {poll_interval}s")
+    return PollingWatcher(folders, extensions, poll_interval)
+
+
+# ============================================================================
+# Settling, ledger
+# ============================================================================
+
+class SettleTracker:
+    """Holds candidate files until their size and mtime stop changing for settle_seconds."""
+
+    def __init__(self, settle_seconds: float = DEFAULT_SETTLE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.settle_seconds = settle_seconds
+        self._clock = clock
+        self._entries: 'OrderedDict[str, list]' = OrderedDict()  # path -> [size, mtime_ns, stable_since]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe(self, path: str) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._entries.pop(path, None)
+            return
+        entry = self._entries.get(path)
+        if entry is None:
+            # Files untouched for a while (e.g. present at startup) get credit for their age
+            age = max(0.0, time.time() - st.st_mtime_ns / 1e9)
+            credit = max(0.0, min(age, self.settle_seconds) - min(MIN_OBSERVATION, self.settle_seconds))
+            self._entries[path] = [st.st_size, st.st_mtime_ns, self._clock() - credit]
+        elif (entry[0], entry[1]) != (st.st_size, st.st_mtime_ns):
+            self._entries[path] = [st.st_size, st.st_mtime_ns, self._clock()]
+
+    def settled(self, limit: Optional[int] = None) -> List[str]:
+        """Remove and return up to limit settled files (arrival order). Growing files reset their timer."""
+        now = self._clock()
+        ready = []
+        for path in list(self._entries):
+            if limit is not None and len(ready) >= limit:
+                break
+            self.observe(path)
+            entry = self._entries.get(path)
+            if entry is None or now - entry[2] < self.settle_seconds:
+                continue
+            del self._entries[path]
+            # Empty files are usually placeholders about to be written: drop them until
+            # the watcher reports a change instead of re-checking them every tick
+            if entry[0] > 0:
+                ready.append(path)
+        return ready
+
+    def next_check(self) -> Optional[float]:
+        """Seconds until the earliest candidate could settle (None when empty)."""
+        if not self._entries:
+            return None
+        now = self._clock()
+        return max(0.05, min(entry[2] + self.settle_seconds - now for entry in self._entries.values()))
+
+
+class ProcessedLedger:
+    """
+    Persisted set of source fingerprints the daemon already handled (done or failed).
+
+    Stored like the batch journal: a JSON snapshot plus an append-only log next
+    to it. mark() appends one line, so a busy folder costs O(1) per file instead
+    of a full rewrite. The log is folded into the snapshot on load, every
+    LEDGER_COMPACT_EVENTS marks and on close(); a torn last line is ignored.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = MAX_LEDGER_ENTRIES):
+        self.path = path
+        self.log_path = f"{path}.log" if path else None
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._log = None
+        self._events_since_compact = 0
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    data = json.load(fh)
+                if isinstance(data, dict):
+                    self._entries.update(data)
+            except (OSError, ValueError):
+                pass
+            if self._replay_log():
+                with self._lock:
+                    self._compact()
+
+    def _replay_log(self) -> bool:
+        """Apply logged marks over the snapshot; True if the log had any."""
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as fh:
+                lines = fh.readlines()
+        except OSError:
+            return False
+        for line in lines:
+            try:
+                key, state = json.loads(line)
+            except (ValueError, TypeError):
+                break  # Torn write at crash time; nothing after it was acknowledged
+            self._apply(key, state)
+        return bool(lines)
+
+    def _apply(self, key: str, state: str) -> None:
+        self._entries[key] = state
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _compact(self) -> None:
+        """Fold the log into a fresh snapshot (caller holds the lock)."""
+        try:
+            atomic_write_json(self.path, dict(self._entries))
+        except OSError as e:
+            print(f"[WatchFolder] Failed to persist ledger: {e}")
+            return
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        try:
+            open(self.log_path, 'w').close()
+        except OSError:
+            pass
+        self._events_since_compact = 0
+
+    @staticmethod
+    def _key(path: str) -> Optional[str]:
+        fingerprint = file_fingerprint(path)
+        return fingerprint_key(fingerprint) if fingerprint else None
+
+    def is_processed(self, path: str) -> bool:
+        key = self._key(path)
+        with self._lock:
+            return key is not None and key in self._entries
+
+    def mark(self, path: str, state: str) -> None:
+        key = self._key(path)
+        if key is None:
+            return
+        with self._lock:
+            self._apply(key, state)
+            if not self.path:
+                return
+            try:
+                if self._log is None:
+                    self._log = open(self.log_path, 'a', encoding='utf-8')
+                self._log.write(json.dumps([key, state]) + '\n')
+                self._log.flush()
+            except OSError as e:
+                print(f"[WatchFolder] Failed to append to ledger: {e}")
+            self._events_since_compact += 1
+            if self._events_since_compact >= LEDGER_COMPACT_EVENTS:
+                self._compact()
+
+    def close(self) -> None:
+        """Fold pending marks into the snapshot and release the log file."""
+        with self._lock:
+            if self.path and (self._log is not None or self._events_since_compact):
+                self._compact()
+
+
+# ============================================================================
+# Daemon
+# ============================================================================
+
+class WatchDaemon:
+    """
+    Hot-folder loop. on_event(event, **fields) receives 'queued', 'file_completed',
+    'converted', 'failed', 'skipped' and 'status' events from any thread.
+    """
+
+    def __init__(self, config: WatchConfig, on_event: Optional[Callable[..., None]] = None,
+                 engine_factory: Optional[Callable] = None):
+        from client.core.conversion_engine import ConversionEngine, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+
+        self.config = config
+        self.on_event = on_event or (lambda event, **fields: None)
+        self.engine_factory = engine_factory or ConversionEngine
+        self.extensions = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+        state_path = config.state_path or os.path.join(get_app_cache_dir('watch'), 'processed.json')
+        self.ledger = ProcessedLedger(state_path)
+        self.tracker = SettleTracker(config.settle_seconds)
+        self._pool = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix='watch')
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._engines = set()
+        self._watcher = None
+
+    def folder_for(self, path: str) -> Optional[WatchFolder]:
+        for folder in self.config.folders:
+            if _is_within(path, folder.path):
+                if not folder.recursive and os.path.dirname(os.path.abspath(path)) != os.path.abspath(folder.path):
+                    continue
+                return folder
+        return None
+
+    def _accept(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        if os.path.splitext(path)[1].lower() not in self.extensions:
+            return False
+        if any(_is_within(path, folder.output_dir) for folder in self.config.folders):
+            return False
+        return self.folder_for(path) is not None
+
+    def run(self, stop_event: threading.Event, once: bool = False) -> None:
+        """
+        Watch until stop_event is set. With once=True, process the files present
+        at startup (and anything arriving meanwhile) and return when idle.
+        """
+        self._watcher = create_watcher(self.config.folders, self.extensions,
+                                       self.config.poll_interval, self.config.use_inotify)
+        def wake_on_stop():
+            stop_event.wait()
+            self._watcher.wake()
+
+        threading.Thread(target=wake_on_stop, name='watch-stop', daemon=True).start()
+        kind = 'inotify' if isinstance(self._watcher, InotifyWatcher) else 'polling'
+        self.on_event('status', message=f"Watching {len(self.config.folders)} folder(s) ({kind})")
+        try:
+            for path in sorted(self._watcher.scan()):
+                if self._accept(path):
+                    self.tracker.observe(path)
+
+            while not stop_event.is_set():
+                self._admit_settled()
+                if once and not len(self.tracker) and not self._in_flight:
+                    break
+                next_check = self.tracker.next_check()
+                timeout = IDLE_WAIT if next_check is None else next_check
+                if self._in_flight:
+                    timeout = min(timeout, self.config.poll_interval)
+                for path in self._watcher.wait(timeout):
+                    if self._accept(path):
+                        self.tracker.observe(path)
+        finally:
+            stop_event.set()
+            for engine in list(self._engines):
+                engine.stop_conversion()
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._watcher.close()
+            self.ledger.close()
+
+    def _admit_settled(self) -> None:
+        """Move settled files into the pool while below max_pending (the rest wait in the tracker)."""
+        with self._in_flight_lock:
+            capacity = self.config.max_pending - self._in_flight
+        if capacity <= 0:
+            return
+        for path in self.tracker.settled(limit=capacity):
+            if self.ledger.is_processed(path):
+                continue
+            folder = self.folder_for(path)
+            if folder is None:
+                continue
+            with self._in_flight_lock:
+                self._in_flight += 1
+            self.on_event('queued', file=path, folder=folder.path)
+            self._pool.submit(self._convert, folder, path)
+
+    def _convert(self, folder: WatchFolder, path: str) -> None:
+        engine = self.engine_factory([path], dict(folder.params))
+        engine.file_completed.connect(self._on_file_completed)
+        engine.status_updated.connect(lambda message: self.on_event('status', message=message))
+        self._engines.add(engine)
+        try:
+            os.makedirs(folder.output_dir, exist_ok=True)
+            result = engine.convert_source(path)
+        except Exception as e:
+            result = False
+            self.on_event('status', message=f"Error converting {os.path.basename(path)}: {e}")
+        finally:
+            self._engines.discard(engine)
+            with self._in_flight_lock:
+                self._in_flight -= 1
+            if self._watcher is not None:
+                self._watcher.wake()
+
+        if engine.should_stop:
+            return  # Interrupted by shutdown: not recorded, redone after restart
+        state = 'skipped' if result is None else ('converted' if result else 'failed')
+        self.ledger.mark(path, state)
+        self.on_event(state, file=path)
+
+    def _on_file_completed(self, source: str, output: str) -> None:
+        self.on_event('file_completed', source=source, output=output)
@@ -230,6 +230,14 @@ class CommandPanel(QWidget):
             'nested_output_name': 'output',
             'suffix': '_converted',
             'overwrite': True,
+            'parallel_jobs': 0,  # 0 = auto-size worker pool, 1 = serial
+            'single_decode_variants': True,  # Encode video/image variants from one shared decode
+            'max_size_strict': False,  # Max Size: verify output size and re-encode on overshoot
+            'max_size_max_attempts': 3,  # Max Size strict: total encodes per file
+            'max_size_two_pass': False,  # Max Size strict: two-pass bitrate targeting for video
+            'estimate_sample_points': 4,  # Max Size: segments sampled across the timeline for calibration
+            'image_max_size_exact': True,  # Image Max Size: exact in-memory quality search (in-process encode)
+            'skip_up_to_date': False,  # Incremental mode (output footer toggle): skip up-to-date sources
         }
         
         # Delegate to active tab
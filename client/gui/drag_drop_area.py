@@ -18,6 +18,9 @@ from pathlib import Path
 from client.utils.resource_path import get_resource_path
 from client.gui.theme import Theme
 from client.gui.custom_widgets import PresetStatusButton, HoverIconButton, FileListItemWidget
+from client.gui.utils.thumbnail_service import get_thumbnail_service
+from client.gui.utils.folder_scanner import FolderScanWorker
+from client.core.folder_scan import iter_supported_files
 
 from enum import Enum
 
@@ -57,10 +60,11 @@ class DragDropArea(QWidget):
         self._current_processing_index = -1  # Track which file is being processed
         self._pending_files = None  # Files waiting for preset selection
         self._current_view_mode = ViewMode.FILES  # Default view mode
+        self._folder_scans = []  # Running background folder scans
         self.setup_ui()
     
-    def set_file_progress(self, file_index, progress):
-        """Set progress for a specific file in the list (0.0 to 1.0) - No-op now"""
+    def set_file_progress(self, file_progress):
+        """Set progress for files in the list ({file_index: 0.0 to 1.0}) - No-op now"""
         # Progress display removed - only show completion
         pass
     
@@ -261,15 +265,13 @@ class DragDropArea(QWidget):
                 elif os.path.isdir(path):
                     folders.append(path)
             
-            # Collect all files including from folders
-            all_files = files.copy()
-            for folder in folders:
-                folder_files = self.get_supported_files_from_folder(folder, True)
-                all_files.extend(folder_files)
-            
             # Add files directly to the list
-            if all_files:
-                self.add_files(all_files)
+            if files:
+                self.add_files(files)
+            
+            # Folder contents stream in from a background scan
+            if folders:
+                self.scan_folders(folders, True)
             
             event.acceptProposedAction()
         else:
@@ -316,14 +318,8 @@ class DragDropArea(QWidget):
         preview_label = QLabel("")
         layout.addWidget(preview_label)
         
-        def update_preview():
-            total_count = 0
-            for folder in folders:
-                total_count += self.count_supported_files(folder, include_subfolders.isChecked())
-            preview_label.setText(f"Found {total_count} supported file(s) total")
-        
-        include_subfolders.toggled.connect(update_preview)
-        update_preview()  # Initial count
+        # Counted in the background; the same scan supplies the files on OK
+        scan = self._attach_scan_preview(folders, include_subfolders, preview_label, " total")
         
         # Dialog buttons
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
@@ -332,16 +328,15 @@ class DragDropArea(QWidget):
         layout.addWidget(buttons)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            all_files = []
-            for folder in folders:
-                folder_files = self.get_supported_files_from_folder(folder, include_subfolders.isChecked())
-                all_files.extend(folder_files)
-                
-            if all_files:
-                self.add_files(all_files)
-                self.update_status(f"Added {len(all_files)} files from {len(folders)} folder(s)")
-            else:
-                QMessageBox.information(self, "No Files Found", "No supported files found in the dropped folder(s).")
+            def on_done(total):
+                if total:
+                    self.update_status(f"Added {total} files from {len(folders)} folder(s)")
+                else:
+                    QMessageBox.information(self, "No Files Found", "No supported files found in the dropped folder(s).")
+            
+            self._accept_scan_preview(scan, on_done)
+        else:
+            scan['worker'].cancel()
                 
     def update_status(self, message):
         """Emit a status update (to be connected by parent)"""
@@ -536,12 +531,8 @@ class DragDropArea(QWidget):
             preview_label = QLabel("")
             layout.addWidget(preview_label)
             
-            def update_preview():
-                count = self.count_supported_files(folder, include_subfolders.isChecked())
-                preview_label.setText(f"Found {count} supported file(s)")
-            
-            include_subfolders.toggled.connect(update_preview)
-            update_preview()  # Initial count
+            # Counted in the background; the same scan supplies the files on OK
+            scan = self._attach_scan_preview([folder], include_subfolders, preview_label)
             
             # Dialog buttons
             buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
@@ -550,46 +541,122 @@ class DragDropArea(QWidget):
             layout.addWidget(buttons)
             
             if dialog.exec() == QDialog.DialogCode.Accepted:
-                files = self.get_supported_files_from_folder(folder, include_subfolders.isChecked())
-                if files:
-                    self.add_files(files)
-                else:
-                    QMessageBox.information(self, "No Files Found", "No supported files found in the selected folder.")
+                def on_done(total):
+                    if not total:
+                        QMessageBox.information(self, "No Files Found", "No supported files found in the selected folder.")
+                
+                self._accept_scan_preview(scan, on_done)
+            else:
+                scan['worker'].cancel()
                     
-    def count_supported_files(self, folder_path, include_subfolders=False):
-        """Count supported files in folder"""
-        count = 0
-        folder = Path(folder_path)
-        
-        if include_subfolders:
-            # Recursive search
-            for file_path in folder.rglob('*'):
-                if file_path.is_file() and self.is_supported_file(file_path.suffix.lower()):
-                    count += 1
+    def supported_extensions(self):
+        """Flat list of all supported file extensions"""
+        return [ext for extensions in self.SUPPORTED_EXTENSIONS.values() for ext in extensions]
+    
+    def scan_folders(self, folders, include_subfolders=False, on_batch=None, on_finished=None):
+        """
+        Scan folders on a background thread, streaming supported files as they are found.
+        
+        Args:
+            folders: Folders to scan
+            include_subfolders: Recurse into subfolders
+            on_batch: Called on the GUI thread with each list of found files (default: add_files)
+            on_finished: Called with (total, cancelled) when the scan ends
+            
+        Returns:
+            The running FolderScanWorker (cancel() stops it; no batches are delivered afterwards)
+        """
+        worker = FolderScanWorker(folders, self.supported_extensions(), include_subfolders, self)
+        handler = on_batch or self.add_files
+        worker.batch_found.connect(lambda batch: None if worker.is_cancelled() else handler(batch))
+        if on_finished:
+            worker.scan_finished.connect(on_finished)
+        worker.finished.connect(lambda: self._on_folder_scan_done(worker))
+        self._folder_scans.append(worker)
+        worker.start()
+        return worker
+    
+    def cancel_folder_scans(self):
+        """Stop all running background folder scans"""
+        for worker in self._folder_scans:
+            worker.cancel()
+    
+    def _on_folder_scan_done(self, worker):
+        if worker in self._folder_scans:
+            self._folder_scans.remove(worker)
+        if worker.errors:
+            print(f"[FolderScan] Skipped {len(worker.errors)} unreadable folder(s): {worker.errors[0]}")
+        worker.deleteLater()
+    
+    def _attach_scan_preview(self, folders, include_subfolders, preview_label, total_suffix=""):
+        """
+        Keep a folder dialog's file count preview updated from a background scan.
+        
+        The scan restarts when the subfolder checkbox toggles. Found files are
+        collected so accepting the dialog doesn't walk the folders again.
+        Returns the scan state for _accept_scan_preview().
+        """
+        scan = {'worker': None, 'files': [], 'sink': None, 'total': None, 'on_done': None}
+        
+        def start_scan():
+            if scan['worker']:
+                scan['worker'].cancel()
+            scan['files'] = []
+            scan['sink'] = scan['files'].extend
+            scan['total'] = None
+            preview_label.setText("Scanning...")
+            
+            def on_batch(batch):
+                scan['sink'](batch)
+            
+            def on_finished(total, cancelled):
+                if cancelled or scan['worker'] is not worker:
+                    return
+                scan['total'] = total
+                preview_label.setText(f"Found {total} supported file(s){total_suffix}")
+                if scan['on_done']:
+                    scan['on_done'](total)
+            
+            def on_count(count):
+                if scan['worker'] is worker:
+                    preview_label.setText(f"Scanning... {count} supported file(s) found")
+            
+            worker = self.scan_folders(folders, include_subfolders.isChecked(), on_batch, on_finished)
+            worker.count_changed.connect(on_count)
+            scan['worker'] = worker
+        
+        include_subfolders.toggled.connect(start_scan)
+        start_scan()  # Initial count
+        return scan
+    
+    def _accept_scan_preview(self, scan, on_done):
+        """Add the files of an accepted folder dialog, streaming the rest if the scan is still running"""
+        if scan['files']:
+            self.add_files(list(scan['files']))
+        if scan['total'] is not None:
+            on_done(scan['total'])
         else:
-            # Only direct files in folder
-            for file_path in folder.iterdir():
-                if file_path.is_file() and self.is_supported_file(file_path.suffix.lower()):
-                    count += 1
-                    
-        return count
+            scan['sink'] = self.add_files
+            scan['on_done'] = on_done
+    
+    def count_supported_files(self, folder_path, include_subfolders=False):
+        """Count supported files in folder (blocking; dialogs use scan_folders instead)"""
+        return sum(len(batch) for batch in iter_supported_files(
+            [folder_path], self.supported_extensions(), recursive=include_subfolders))
         
     def get_supported_files_from_folder(self, folder_path, include_subfolders=False):
-        """Get list of supported files from folder"""
+        """Get list of supported files from folder (blocking; drops use scan_folders instead)"""
         files = []
-        folder = Path(folder_path)
+        
+        def on_error(path, error):
+            # Only the dropped folder itself is worth reporting; unreadable subfolders are skipped
+            if path == folder_path:
+                raise error
         
         try:
-            if include_subfolders:
-                # Recursive search
-                for file_path in folder.rglob('*'):
-                    if file_path.is_file() and self.is_supported_file(file_path.suffix.lower()):
-                        files.append(str(file_path))
-            else:
-                # Only direct files in folder
-                for file_path in folder.iterdir():
-                    if file_path.is_file() and self.is_supported_file(file_path.suffix.lower()):
-                        files.append(str(file_path))
+            for batch in iter_supported_files([folder_path], self.supported_extensions(),
+                                              recursive=include_subfolders, on_error=on_error):
+                files.extend(batch)
                         
             # Sort files for consistent ordering
             files.sort()
@@ -605,9 +672,11 @@ class DragDropArea(QWidget):
         """Add files to the conversion list"""
         added_files = []
         unsupported_count = 0
+        known_files = set(self.file_list)
         
         for file_path in files:
-            if file_path not in self.file_list:
+            if file_path not in known_files:
+                known_files.add(file_path)
                 # Check if file type is supported
                 file_ext = Path(file_path).suffix.lower()
                 if self.is_supported_file(file_ext):
@@ -676,6 +745,8 @@ class DragDropArea(QWidget):
         
     def clear_files(self):
         """Clear all files from the list"""
+        self.cancel_folder_scans()
+        get_thumbnail_service().cancel_pending()
         self.file_list.clear()
         self.file_list_widget.clear()
         self.update_placeholder_text()
@@ -827,11 +898,18 @@ class DragDropArea(QWidget):
             self.file_list.pop(index)
             
             # Remove from widget
+            self._release_item_thumbnail(index)
             self.file_list_widget.takeItem(index)
             
             # Update placeholder if empty
             self.update_placeholder_text()
             
+    def _release_item_thumbnail(self, row):
+        """Unregister a row's widget from the thumbnail service before the row is removed"""
+        widget = self.file_list_widget.itemWidget(self.file_list_widget.item(row))
+        if isinstance(widget, FileListItemWidget):
+            widget.cancel_thumbnail()
+    
     def remove_file_item(self, item):
         """Remove a file item when double-clicked"""
         if item:
@@ -896,6 +974,7 @@ class DragDropArea(QWidget):
                         
                         # Remove from both lists
                         self.file_list.remove(file_path)
+                        self._release_item_thumbnail(row)
                         self.file_list_widget.takeItem(row)
                 
                 # Update placeholder if empty
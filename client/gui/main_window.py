@@ -19,7 +19,9 @@ from .command_panel import CommandPanel
 from .output_footer import OutputFooter
 from .theme_manager import ThemeManager
 from .title_bar import TitleBarWindow
-from client.core.conversion_engine import ConversionEngine, ToolChecker
+from client.core.conversion_engine import ToolChecker
+from client.core.progress_channel import ProgressChannel
+from client.core.batch_journal import start_batch, load_last_batch
 from client.gui.custom_widgets import PresetStatusButton
 from client.utils.trial_manager import TrialManager
 from client.utils.font_manager import AppFonts, FONT_FAMILY_APP_NAME
@@ -34,6 +36,7 @@ from client.gui.components.status_panel import StatusPanel
 from client.gui.utils.window_behavior import FramelessWindowBehavior
 from client.gui.utils.dev_tools import EventDebugFilter, DEBUG_INTERACTIVITY
 from client.gui.utils.dialog_manager import DialogManager
+from client.gui.utils.conversion_thread import ConversionThread
 from client.gui.drag_drop_area import ViewMode
 from client.utils.session_manager import SessionManager
 from enum import Enum
@@ -128,6 +131,8 @@ class MainWindow(QMainWindow):
         # Reset drop area rendering after 1ms
         from PyQt6.QtCore import QTimer
         QTimer.singleShot(1, self.drag_drop_area.clear_files)
+        # Offer to finish a batch that was interrupted (crash, sleep, cancel)
+        QTimer.singleShot(500, self.offer_resume_last_batch)
         
     def setup_ui(self):
         """Setup the main user interface layout"""
@@ -503,26 +508,6 @@ class MainWindow(QMainWindow):
         """Set progress bar value (0-100)"""
         self.progress_bar.setValue(value)
     
-    @pyqtSlot(int, float)
-    def on_file_progress(self, file_index, progress):
-        """Handle individual file progress update"""
-        # Update file list item progress
-        self.drag_drop_area.set_file_progress(file_index, progress)
-        
-        # Update separated progress bars
-        if hasattr(self, 'file_progress_bar'):
-            self.file_progress_bar.set_progress(progress)
-            
-        if hasattr(self, 'total_progress_bar'):
-            # Calculate total progress
-            total_files = len(self.drag_drop_area.file_list)
-            if total_files > 0:
-                # Base progress from completed files
-                base_progress = self._completed_files_count / total_files
-                # Add fraction of current file
-                current_fraction = progress / total_files
-                self.total_progress_bar.set_progress(base_progress + current_fraction)
-        
     def connect_signals(self):
         """Connect signals between components"""
         # Connect drag-drop area signals
@@ -587,6 +572,7 @@ class MainWindow(QMainWindow):
             params['use_nested_output'] = False  # Fixed: was 'output_nested'
             params['output_custom'] = True
             params['output_dir'] = self.output_footer.get_custom_path()
+        params['skip_up_to_date'] = self.output_footer.get_skip_up_to_date()
         
         self.start_conversion(params)
     
@@ -675,17 +661,46 @@ class MainWindow(QMainWindow):
             self.dialogs.show_warning("Conversion Running", "A conversion is already in progress.")
             return
         
+        self._start_engine(files, params, start_batch(files, params))
+    
+    def offer_resume_last_batch(self):
+        """Ask to resume the last batch if it has unfinished files; re-queues only those"""
+        if self.conversion_engine and self.conversion_engine.isRunning():
+            return
+        journal = load_last_batch()
+        if journal is None:
+            return
+        remaining = len(journal.unfinished_files())
+        if not self.dialogs.confirm_action(
+            "Resume Batch",
+            f"The last conversion was interrupted with {remaining} file(s) left.\n\nResume it now?",
+            default_no=False
+        ):
+            journal.discard()
+            return
+        
+        files = journal.prepare_resume()
+        self.drag_drop_area.clear_files()
+        self.drag_drop_area.add_files(files)
+        self._start_engine(files, journal.params, journal)
+    
+    def _start_engine(self, files, params, journal=None):
+        """Create the conversion thread for files and start it"""
         # Update UI state
         if hasattr(self, 'output_footer'):
             self.output_footer.set_converting(True)
         
         # Create and start conversion engine
-        self.conversion_engine = ConversionEngine(files, params)
-        
-        # Connect engine signals
-        self.conversion_engine.progress_updated.connect(self.set_progress)
-        self.conversion_engine.file_progress_updated.connect(self.on_file_progress)
-        self.conversion_engine.status_updated.connect(self.update_status)
+        self.conversion_engine = ConversionThread(files, params, journal)
+        
+        # Progress and status arrive coalesced (one batch per frame); the channel
+        # must be connected before the completion slots so it flushes ahead of them
+        self._progress_channel = ProgressChannel(
+            self.conversion_engine,
+            log_level='debug' if self.DEVELOPMENT_MODE else 'info',
+            parent=self
+        )
+        self._progress_channel.updates_ready.connect(self.on_progress_updates)
         self.conversion_engine.file_completed.connect(self.on_file_completed)
         self.conversion_engine.conversion_finished.connect(self.on_conversion_finished)
         
@@ -708,11 +723,23 @@ class MainWindow(QMainWindow):
             self.conversion_engine.stop_conversion()
             # The button state will be reset in on_conversion_finished
     
-    @pyqtSlot(int, float)
-    def on_file_progress(self, file_index, progress):
-        """Handle individual file progress update"""
-        self.drag_drop_area.set_file_progress(file_index, progress)
+    def on_progress_updates(self, update):
+        """Apply one coalesced batch of engine progress/status updates"""
+        for message in update.statuses:
+            self.update_status(message)
+        if update.dropped_statuses:
+            self.update_status(f"... {update.dropped_statuses} more status message(s)")
+        if update.file_progress:
+            self.on_file_progress(update.file_progress)
+        if update.overall is not None:
+            self.set_progress(update.overall)
+    
+    def on_file_progress(self, file_progress):
+        """Handle individual file progress updates ({file_index: progress 0.0-1.0})"""
+        self.drag_drop_area.set_file_progress(file_progress)
         if hasattr(self, 'file_progress_bar'):
+            # Most recently updated file drives the bar
+            progress = next(reversed(file_progress.values()))
             self.file_progress_bar.set_progress(progress, animate=True, min_duration_ms=500)
     
     def on_file_completed(self, source_file, output_file):
@@ -741,6 +768,11 @@ class MainWindow(QMainWindow):
         
     def on_conversion_finished(self, success, message):
         """Handle conversion completion"""
+        if getattr(self, '_progress_channel', None):
+            self._progress_channel.stop()
+            self._progress_channel.deleteLater()
+            self._progress_channel = None
+        
         # Reset button state (handled by footer)
         # Reset footer state
         if hasattr(self, 'output_footer'):
@@ -971,14 +1003,11 @@ class MainWindow(QMainWindow):
                 elif os.path.isdir(path):
                     folders.append(path)
             
-            # Collect all files including from folders
+            # Store as pending in DragDropArea; folder contents stream in from a background scan
             all_files = files.copy()
-            for folder in folders:
-                folder_files = self.drag_drop_area.get_supported_files_from_folder(folder, True)
-                all_files.extend(folder_files)
-            
-            # Store as pending in DragDropArea
             self.drag_drop_area._pending_files = all_files
+            if folders:
+                self.drag_drop_area.scan_folders(folders, True, on_batch=all_files.extend)
             
             event.acceptProposedAction()
         else:
@@ -13,7 +13,7 @@ from PyQt6.QtGui import QColor, QFont
 
 from client.utils.font_manager import FONT_FAMILY, FONT_FAMILY_APP_NAME, FONT_SIZE_BUTTON
 from client.gui.theme import Theme
-from client.gui.custom_widgets import SegmentedControl
+from client.gui.custom_widgets import SegmentedControl, ThemedCheckBox
 
 
 
@@ -71,6 +71,14 @@ class OutputFooter(QWidget):
         # Spacer
         layout.addStretch()
         
+        # Incremental mode: skip sources whose outputs match the current source and settings
+        self.skip_up_to_date_toggle = ThemedCheckBox("Skip up-to-date")
+        self.skip_up_to_date_toggle.setToolTip(
+            "Skip files already converted from the same source with the same settings"
+        )
+        self.skip_up_to_date_toggle.setChecked(False)
+        layout.addWidget(self.skip_up_to_date_toggle)
+        
         # Right side: Start button
         self.start_btn = QPushButton("START")
         self.start_btn.setObjectName("BtnStart")
@@ -141,6 +149,10 @@ class OutputFooter(QWidget):
     def get_organized_name(self):
         """Get organized folder name"""
         return self.segment_control.get_organized_name()
+    
+    def get_skip_up_to_date(self):
+        """Whether sources with up-to-date outputs should be skipped"""
+        return self.skip_up_to_date_toggle.isChecked()
         
     def update_theme(self, is_dark):
         self._is_dark = is_dark
@@ -0,0 +1,41 @@
+"""
+Conversion Thread
+QThread adapter around the Qt-free ConversionEngine.
+
+The engine's signals are plain callbacks invoked on the worker thread; this
+adapter re-emits them as pyqtSignals so GUI slots get the usual queued
+delivery (and DirectConnection still works for listeners that want the
+worker thread, like ProgressChannel).
+"""
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from client.core.batch_journal import BatchJournal
+from client.core.conversion_engine import ConversionEngine
+
+
+class ConversionThread(QThread):
+    """Runs a ConversionEngine batch off the GUI thread (same signal contract as the engine)."""
+
+    progress_updated = pyqtSignal(int)  # Progress percentage
+    file_progress_updated = pyqtSignal(int, float)  # (file_index, progress 0.0-1.0)
+    status_updated = pyqtSignal(str)    # Status message
+    file_completed = pyqtSignal(str, str)  # (source, output) file paths
+    conversion_finished = pyqtSignal(bool, str)  # (success, message)
+
+    def __init__(self, files: List[str], params: Dict, journal: Optional[BatchJournal] = None, parent=None):
+        super().__init__(parent)
+        self.engine = ConversionEngine(files, params, journal)
+        self.engine.progress_updated.connect(self.progress_updated.emit)
+        self.engine.file_progress_updated.connect(self.file_progress_updated.emit)
+        self.engine.status_updated.connect(self.status_updated.emit)
+        self.engine.file_completed.connect(self.file_completed.emit)
+        self.engine.conversion_finished.connect(self.conversion_finished.emit)
+
+    def run(self):
+        self.engine.run()
+
+    def stop_conversion(self):
+        """Stop the conversion process"""
+        self.engine.stop_conversion()
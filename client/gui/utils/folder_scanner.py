@@ -0,0 +1,55 @@
+"""
+Folder Scanner
+Background QThread that expands dropped/selected folders without blocking the UI.
+
+Wraps client.core.folder_scan.iter_supported_files: batches are streamed to the
+GUI thread via batch_found and a running total via count_changed, so callers
+can add files and update previews while the walk is still in progress.
+"""
+from typing import Iterable, List
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from client.core.folder_scan import iter_supported_files
+
+
+class FolderScanWorker(QThread):
+    """
+    One-shot scan of one or more folders.
+
+    Signals:
+        batch_found(list): Supported file paths found since the last batch
+        count_changed(int): Running total of supported files found
+        scan_finished(int, bool): (total found, cancelled)
+    """
+    batch_found = pyqtSignal(list)
+    count_changed = pyqtSignal(int)
+    scan_finished = pyqtSignal(int, bool)
+
+    def __init__(self, folders: Iterable[str], extensions: Iterable[str], recursive: bool = False,
+                 parent=None):
+        super().__init__(parent)
+        self.folders: List[str] = list(folders)
+        self.extensions = list(extensions)
+        self.recursive = recursive
+        self.total = 0
+        self.errors: List[str] = []
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop the walk at the next directory entry (batches already emitted stay delivered)"""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        for batch in iter_supported_files(
+            self.folders, self.extensions, recursive=self.recursive,
+            should_stop=self.is_cancelled,
+            on_error=lambda path, e: self.errors.append(f"{path}: {e}"),
+        ):
+            self.total += len(batch)
+            self.batch_found.emit(batch)
+            self.count_changed.emit(self.total)
+        self.scan_finished.emit(self.total, self._cancelled)
@@ -0,0 +1,254 @@
+"""
+Thumbnail Service
+Loads file list thumbnails off the GUI thread.
+
+Images are decoded at thumbnail size via QImageReader.setScaledSize and video
+frames are extracted by ffmpeg already scaled down, on a small QThreadPool.
+Results are kept in an in-memory LRU and an on-disk PNG cache keyed by the
+source fingerprint (path, mtime, size), so re-adding the same folder is instant.
+
+Workers only produce QImage (QPixmap must not be created off the GUI thread);
+results are handed, on the GUI thread, only to the callbacks registered for that
+path, so a large drop costs one callback per item rather than every waiting
+widget seeing every result.
+"""
+import hashlib
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from client.core.cache_utils import get_app_cache_dir, file_fingerprint, fingerprint_key
+
+
+THUMBNAIL_SIZE = 48
+VIDEO_THUMBNAIL_TIMEOUT = 5
+MAX_MEMORY_ENTRIES = 512
+MAX_FAILED_ENTRIES = 4096
+MAX_DISK_ENTRIES = 5000
+MAX_WORKERS = 4
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.gif')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.webm', '.m4v')
+
+
+def thumbnail_cache_path(file_path: str, cache_dir: str, size: int = THUMBNAIL_SIZE) -> Optional[str]:
+    """On-disk cache location for a file's current version, or None if it can't be stat'ed."""
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None:
+        return None
+    digest = hashlib.sha1(f"{fingerprint_key(fingerprint)}|{size}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.png")
+
+
+def prune_disk_cache(cache_dir: str, max_entries: int = MAX_DISK_ENTRIES) -> int:
+    """Delete the least recently written thumbnails beyond max_entries. Returns the number removed."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.is_file() and e.name.endswith('.png')]
+    except OSError:
+        return 0
+    if len(entries) <= max_entries:
+        return 0
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    removed = 0
+    for entry in entries[:len(entries) - max_entries]:
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def load_image_thumbnail(file_path: str, size: int = THUMBNAIL_SIZE) -> QImage:
+    """Decode an image straight at thumbnail size (null QImage on failure)."""
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid() and (source_size.width() > size or source_size.height() > size):
+        reader.setScaledSize(source_size.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+    return reader.read()
+
+
+def extract_video_thumbnail(video_path: str, size: int = THUMBNAIL_SIZE) -> QImage:
+    """Extract an early frame from a video, scaled by ffmpeg and piped back as PNG (null QImage on failure)."""
+    ffmpeg_path = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+    cmd = [
+        str(ffmpeg_path),
+        '-ss', '0.5',
+        '-i', str(video_path),
+        '-vframes', '1',
+        '-vf', f'scale={size}:{size}:force_original_aspect_ratio=decrease',
+        '-f', 'image2pipe',
+        '-vcodec', 'png',
+        'pipe:1'
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            timeout=VIDEO_THUMBNAIL_TIMEOUT,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+    except subprocess.TimeoutExpired:
+        print(f"Video thumbnail extraction timed out for {video_path}")
+        return QImage()
+    except Exception as e:
+        print(f"Video thumbnail extraction failed: {e}")
+        return QImage()
+    if result.returncode != 0 or not result.stdout:
+        return QImage()
+    return QImage.fromData(result.stdout, 'PNG')
+
+
+class _ThumbnailTask(QRunnable):
+    """Pool job: disk cache lookup, else decode + store."""
+
+    def __init__(self, service: 'ThumbnailService', file_path: str, cache_path: Optional[str]):
+        super().__init__()
+        self.service = service
+        self.file_path = file_path
+        self.cache_path = cache_path
+
+    def run(self):
+        image = QImage()
+        try:
+            if self.cache_path and os.path.exists(self.cache_path):
+                image = QImage(self.cache_path)
+            if image.isNull():
+                image = self._decode()
+                if not image.isNull() and self.cache_path:
+                    self._store(image)
+        except Exception as e:
+            print(f"Failed to load thumbnail: {e}")
+            image = QImage()
+        # Queued to the GUI thread (service lives there)
+        self.service._task_finished.emit(self.file_path, image)
+
+    def _decode(self) -> QImage:
+        file_ext = os.path.splitext(self.file_path)[1].lower()
+        if file_ext in IMAGE_EXTENSIONS:
+            return load_image_thumbnail(self.file_path, self.service.size)
+        if file_ext in VIDEO_EXTENSIONS:
+            return extract_video_thumbnail(self.file_path, self.service.size)
+        return QImage()
+
+    def _store(self, image: QImage) -> None:
+        tmp_path = f"{self.cache_path}.{threading.get_ident()}.tmp"
+        try:
+            if image.save(tmp_path, 'PNG'):
+                os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+class ThumbnailService(QObject):
+    """
+    Asynchronous thumbnail loader shared by all file list items.
+
+    Usage:
+        image = service.request(path, on_ready)   # cached QImage, or None while loading
+        # on_ready(path, QImage) is called once the load succeeds
+
+    Only successful loads are delivered; callers keep their placeholder otherwise.
+    A path's callbacks are dropped once its load finishes, successful or not.
+    Must be created and used from the GUI thread.
+    """
+    _task_finished = pyqtSignal(str, QImage)
+
+    def __init__(self, cache_dir: Optional[str] = None, size: int = THUMBNAIL_SIZE,
+                 max_workers: int = MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.cache_dir = cache_dir
+        if self.cache_dir is None:
+            try:
+                self.cache_dir = get_app_cache_dir('thumbnails')
+            except OSError as e:
+                print(f"[ThumbnailService] Disk cache disabled: {e}")
+        self._memory: 'OrderedDict[tuple, QImage]' = OrderedDict()
+        self._failed: 'OrderedDict[tuple, None]' = OrderedDict()
+        self._pending = {}
+        self._callbacks: Dict[str, List[Callable[[str, QImage], None]]] = {}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(max_workers, os.cpu_count() or 1)))
+        self._task_finished.connect(self._on_task_finished)
+        if self.cache_dir:
+            threading.Thread(target=prune_disk_cache, args=(self.cache_dir,),
+                             name='thumbnail-prune', daemon=True).start()
+
+    def request(self, file_path: str,
+                callback: Optional[Callable[[str, QImage], None]] = None) -> Optional[QImage]:
+        """
+        Return the thumbnail if it is in memory, otherwise schedule a load and return None.
+
+        callback(file_path, image) is called on the GUI thread when a scheduled load succeeds.
+        """
+        fingerprint = file_fingerprint(file_path)
+        if fingerprint is None or fingerprint in self._failed:
+            return None
+        image = self._memory.get(fingerprint)
+        if image is not None:
+            self._memory.move_to_end(fingerprint)
+            return image
+        if callback is not None:
+            callbacks = self._callbacks.setdefault(file_path, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+        if file_path not in self._pending:
+            self._pending[file_path] = fingerprint
+            cache_path = thumbnail_cache_path(file_path, self.cache_dir, self.size) if self.cache_dir else None
+            self._pool.start(_ThumbnailTask(self, file_path, cache_path))
+        return None
+
+    def cancel_pending(self) -> None:
+        """Drop queued (not yet started) loads, e.g. when the file list is cleared."""
+        self._pool.clear()
+        self._pending.clear()
+        self._callbacks.clear()
+
+    def cancel(self, file_path: str, callback: Callable[[str, QImage], None]) -> None:
+        """Unregister a callback, e.g. when its widget is removed before the load finishes."""
+        callbacks = self._callbacks.get(file_path)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._callbacks[file_path]
+
+    def _on_task_finished(self, file_path: str, image: QImage) -> None:
+        fingerprint = self._pending.pop(file_path, None) or file_fingerprint(file_path)
+        callbacks = self._callbacks.pop(file_path, ())
+        if fingerprint is None:
+            return
+        if image.isNull():
+            self._failed[fingerprint] = None
+            while len(self._failed) > MAX_FAILED_ENTRIES:
+                self._failed.popitem(last=False)
+            return
+        self._memory[fingerprint] = image
+        self._memory.move_to_end(fingerprint)
+        while len(self._memory) > MAX_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+        for callback in callbacks:
+            callback(file_path, image)
+
+
+_thumbnail_service: Optional[ThumbnailService] = None
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Get the shared thumbnail service (created on first use, from the GUI thread)."""
+    global _thumbnail_service
+    if _thumbnail_service is None:
+        _thumbnail_service = ThumbnailService()
+    return _thumbnail_service
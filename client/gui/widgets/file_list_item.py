@@ -5,13 +5,16 @@ Extracted from custom_widgets.py for better organization.
 """
 
 import os
-import subprocess
-import tempfile
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton
 from PyQt6.QtGui import QPixmap, QCursor
 
 from client.gui.theme import Theme
+from client.gui.utils.thumbnail_service import (
+    get_thumbnail_service,
+    IMAGE_EXTENSIONS,
+    VIDEO_EXTENSIONS,
+)
 
 
 class FileListItemWidget(QWidget):
@@ -42,7 +45,11 @@ class FileListItemWidget(QWidget):
         self.thumbnail_label.setFixedSize(48, 48)
         self.thumbnail_label.setScaledContents(False)
         self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumbnail_label.setStyleSheet("background: #1a1a1a; border: 1px solid #444; border-radius: 4px;")
+        # Themed frame, plus icon font/color while the fallback icon is shown
+        self._thumb_frame_style = "background: #1a1a1a; border: 1px solid #444; border-radius: 4px;"
+        self._fallback_icon_color = "#888"
+        self._showing_fallback = False
+        self._apply_thumbnail_style()
         
         # Load thumbnail if file_path provided
         if file_path:
@@ -81,7 +88,9 @@ class FileListItemWidget(QWidget):
         thumb_border = Theme.border()
         
         self.text_label.setStyleSheet(f"background: transparent; border: none; color: {text_color};")
-        self.thumbnail_label.setStyleSheet(f"background: {thumb_bg}; border: 1px solid {thumb_border}; border-radius: {Theme.RADIUS_SM}px;")
+        self._thumb_frame_style = f"background: {thumb_bg}; border: 1px solid {thumb_border}; border-radius: {Theme.RADIUS_SM}px;"
+        self._fallback_icon_color = "#888" if is_dark else "#666"
+        self._apply_thumbnail_style()
         
     def sizeHint(self):
         """Return the recommended size for the widget"""
@@ -102,92 +111,56 @@ class FileListItemWidget(QWidget):
         return super().eventFilter(obj, event)
     
     def load_thumbnail(self, file_path):
-        """Load and display thumbnail for the file"""
-        try:
-            from pathlib import Path
-            
-            file_ext = Path(file_path).suffix.lower()
-            pixmap = None
-            
-            # For images, load directly
-            if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.gif']:
-                pixmap = QPixmap(file_path)
-            
-            # For videos, extract first frame
-            elif file_ext in ['.mp4', '.avi', '.mov', '.mkv', '.flv', '.webm', '.m4v']:
-                pixmap = self.extract_video_thumbnail(file_path)
-            
-            # If thumbnail loaded successfully, scale and display
-            if pixmap and not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    48, 48,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                self.thumbnail_label.setPixmap(scaled_pixmap)
-            else:
-                self.set_fallback_icon(file_ext)
-        except Exception as e:
-            print(f"Failed to load thumbnail: {e}")
-            from pathlib import Path
-            self.set_fallback_icon(Path(file_path).suffix.lower())
+        """Show a placeholder and load the real thumbnail in the background"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in IMAGE_EXTENSIONS and file_ext not in VIDEO_EXTENSIONS:
+            self.set_fallback_icon(file_ext)
+            return
+        
+        image = get_thumbnail_service().request(file_path, self._on_thumbnail_ready)
+        if image is not None:
+            self._set_thumbnail_image(image)
+            return
+        
+        # Placeholder until the service hands back the decoded thumbnail
+        self.set_fallback_icon(file_ext)
     
-    def extract_video_thumbnail(self, video_path):
-        """Extract first frame from video as thumbnail"""
-        try:
-            ffmpeg_path = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
-            
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                thumb_path = tmp.name
-            
-            try:
-                cmd = [
-                    str(ffmpeg_path),
-                    '-ss', '0.5',
-                    '-i', str(video_path),
-                    '-vframes', '1',
-                    '-vf', 'scale=128:-1',
-                    '-q:v', '2',
-                    '-y',
-                    thumb_path
-                ]
-                
-                result = subprocess.run(
-                    cmd, 
-                    capture_output=True, 
-                    timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                )
-                
-                if os.path.exists(thumb_path) and os.path.getsize(thumb_path) > 0:
-                    pixmap = QPixmap(thumb_path)
-                    try:
-                        os.remove(thumb_path)
-                    except:
-                        pass
-                    
-                    if not pixmap.isNull():
-                        return pixmap
-                
-            finally:
-                if os.path.exists(thumb_path):
-                    try:
-                        os.remove(thumb_path)
-                    except:
-                        pass
-            
-        except subprocess.TimeoutExpired:
-            print(f"Video thumbnail extraction timed out for {video_path}")
-        except Exception as e:
-            print(f"Video thumbnail extraction failed: {e}")
-        
-        return None
+    def cancel_thumbnail(self):
+        """Stop waiting for a background thumbnail load (call before the item is removed)"""
+        if self.file_path:
+            get_thumbnail_service().cancel(self.file_path, self._on_thumbnail_ready)
+    
+    def _on_thumbnail_ready(self, file_path, image):
+        """Swap in the thumbnail once the background load for this item finishes"""
+        if file_path == self.file_path:
+            self._set_thumbnail_image(image)
+    
+    def _set_thumbnail_image(self, image):
+        """Display a decoded thumbnail image"""
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.width() > 48 or pixmap.height() > 48:
+            pixmap = pixmap.scaled(
+                48, 48,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        self.thumbnail_label.setText("")
+        self.thumbnail_label.setPixmap(pixmap)
+        self._showing_fallback = False
+        self._apply_thumbnail_style()
+    
+    def _apply_thumbnail_style(self):
+        """Apply the themed thumbnail frame (with icon styling while the fallback icon is shown)"""
+        style = self._thumb_frame_style
+        if self._showing_fallback:
+            style += f" font-size: 24px; color: {self._fallback_icon_color};"
+        self.thumbnail_label.setStyleSheet(style)
     
     def set_fallback_icon(self, file_ext):
         """Set a fallback icon based on file type"""
-        if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.gif']:
+        if file_ext in IMAGE_EXTENSIONS:
             icon_text = "🖼"
-        elif file_ext in ['.mp4', '.avi', '.mov', '.mkv', '.flv', '.webm', '.m4v']:
+        elif file_ext in VIDEO_EXTENSIONS:
             icon_text = "🎬"
         elif file_ext in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a']:
             icon_text = "🎵"
@@ -195,10 +168,8 @@ class FileListItemWidget(QWidget):
             icon_text = "📄"
         
         self.thumbnail_label.setText(icon_text)
-        self.thumbnail_label.setStyleSheet(
-            "background: #1a1a1a; border: 1px solid #444; border-radius: 4px; "
-            "font-size: 24px; color: #888;"
-        )
+        self._showing_fallback = True
+        self._apply_thumbnail_style()
     
     def update_button_style(self, is_dark_theme):
         """Update button styling based on theme"""
@@ -248,14 +219,10 @@ class FileListItemWidget(QWidget):
         self.remove_btn.setStyleSheet(btn_style)
         self.text_label.setStyleSheet(text_style)
         
-        current_thumb_style = self.thumbnail_label.styleSheet()
         if is_dark_theme:
-            thumb_style = "background: #1a1a1a; border: 1px solid #444; border-radius: 4px;"
-            if "font-size" in current_thumb_style:
-                thumb_style += " font-size: 24px; color: #888;"
+            self._thumb_frame_style = "background: #1a1a1a; border: 1px solid #444; border-radius: 4px;"
+            self._fallback_icon_color = "#888"
         else:
-            thumb_style = "background: #f5f5f5; border: 1px solid #ddd; border-radius: 4px;"
-            if "font-size" in current_thumb_style:
-                thumb_style += " font-size: 24px; color: #666;"
-        
-        self.thumbnail_label.setStyleSheet(thumb_style)
+            self._thumb_frame_style = "background: #f5f5f5; border: 1px solid #ddd; border-radius: 4px;"
+            self._fallback_icon_color = "#666"
+        self._apply_thumbnail_style()
@@ -433,6 +433,34 @@ def main():
         if CRASH_REPORTING_AVAILABLE:
             log_info("Launching main application", "startup")
 
+        # Keep ffprobe results across sessions so re-adding the same files is free
+        try:
+            from client.core.media_probe import configure_probe_cache
+            configure_probe_cache(persist=True)
+        except Exception as e:
+            print(f"Warning: Could not enable persistent probe cache: {e}")
+
+        # Keep Max Size calibrations so re-running a batch skips the reference encodes
+        try:
+            from client.core.calibration_cache import configure_calibration_cache
+            configure_calibration_cache(persist=True)
+        except Exception as e:
+            print(f"Warning: Could not enable persistent calibration cache: {e}")
+
+        # Remember what each source was converted to so unchanged files are skipped
+        try:
+            from client.core.output_index import configure_output_index
+            configure_output_index(persist=True)
+        except Exception as e:
+            print(f"Warning: Could not enable persistent output index: {e}")
+
+        # Keep learned size-estimate corrections between sessions
+        try:
+            from client.core.size_model import configure_size_model
+            configure_size_model(persist=True)
+        except Exception as e:
+            print(f"Warning: Could not enable persistent size model: {e}")
+
         # Use extracted initialization function
         window = initialize_main_window(is_trial, skip_splash=dev_mode)
         window.show()
@@ -4,12 +4,11 @@ Presets Plugin - Media Analyzer
 Extracts video metadata using FFprobe for smart preset logic.
 Provides the `meta` context object for Jinja2 templates.
 """
-import subprocess
-import json
-import os
 from typing import Dict, Any, Optional, TYPE_CHECKING
 from pathlib import Path
 
+from client.core.media_probe import MediaInfo, probe_media
+
 if TYPE_CHECKING:
     from client.core.tool_registry.protocol import ToolRegistryProtocol
 
@@ -58,6 +57,9 @@ class MediaAnalyzer:
         """
         Analyze a media file and return metadata.
         
+        Uses the shared probe cache, so a file already probed by the
+        conversion engine or size estimator does not spawn another FFprobe.
+        
         Args:
             file_path: Path to media file
             
@@ -67,90 +69,30 @@ class MediaAnalyzer:
         if not self._ffprobe_path:
             return self._get_defaults()
         
-        try:
-            cmd = [
-                self._ffprobe_path,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                str(file_path)
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            
-            if result.returncode != 0:
-                print(f"[MediaAnalyzer] FFprobe failed: {result.stderr[:200]}")
-                return self._get_defaults()
-            
-            probe_data = json.loads(result.stdout)
-            return self._parse_probe_data(probe_data)
-            
-        except subprocess.TimeoutExpired:
-            print(f"[MediaAnalyzer] FFprobe timeout for {file_path}")
-            return self._get_defaults()
-        except json.JSONDecodeError as e:
-            print(f"[MediaAnalyzer] JSON parse error: {e}")
-            return self._get_defaults()
-        except Exception as e:
-            print(f"[MediaAnalyzer] Error analyzing {file_path}: {e}")
+        info = probe_media(str(file_path), ffprobe_cmd=self._ffprobe_path)
+        if info is None:
+            print(f"[MediaAnalyzer] FFprobe failed for {file_path}")
             return self._get_defaults()
+        
+        return self._meta_from_info(info)
     
-    def _parse_probe_data(self, data: Dict) -> Dict[str, Any]:
-        """Parse FFprobe JSON output into clean meta dict."""
+    def _meta_from_info(self, info: MediaInfo) -> Dict[str, Any]:
+        """Convert cached MediaInfo into clean meta dict."""
         meta = self._get_defaults()
         
-        # Get video stream
-        video_stream = None
-        audio_stream = None
-        
-        for stream in data.get("streams", []):
-            codec_type = stream.get("codec_type")
-            if codec_type == "video" and video_stream is None:
-                video_stream = stream
-            elif codec_type == "audio" and audio_stream is None:
-                audio_stream = stream
-        
-        if video_stream:
-            # Dimensions
-            meta["width"] = video_stream.get("width", 0)
-            meta["height"] = video_stream.get("height", 0)
-            meta["is_landscape"] = meta["width"] > meta["height"]
-            
-            # FPS - parse "30/1" or "60000/1001" format
-            fps_str = video_stream.get("r_frame_rate", "30/1")
-            try:
-                num, den = map(int, fps_str.split("/"))
-                meta["fps"] = round(num / den, 2) if den else 30.0
-            except:
-                meta["fps"] = 30.0
-            
-            # Codec
-            meta["codec"] = video_stream.get("codec_name", "unknown")
-            
-            # Bitrate
-            if "bit_rate" in video_stream:
-                try:
-                    meta["bitrate"] = int(video_stream["bit_rate"])
-                except:
-                    pass
-        
-        # Audio
-        meta["has_audio"] = audio_stream is not None
+        if info.has_video:
+            # Dimensions (display orientation, rotation metadata applied)
+            meta["width"] = info.width
+            meta["height"] = info.height
+            meta["is_landscape"] = info.is_landscape
+            meta["fps"] = round(info.fps, 2) if info.fps > 0 else 30.0
+            meta["codec"] = info.codec
+            if info.bitrate:
+                meta["bitrate"] = info.bitrate
         
-        # Duration from format
-        format_data = data.get("format", {})
-        if "duration" in format_data:
-            try:
-                meta["duration"] = float(format_data["duration"])
-            except:
-                pass
+        meta["has_audio"] = info.has_audio
+        if info.duration:
+            meta["duration"] = info.duration
         
         return meta
     
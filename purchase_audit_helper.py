@@ -1,19 +1,43 @@
 """
 Helper utilities for querying the purchases.jsonl audit log.
 Provides functions to analyze purchase history, search records, and export data.
+
+Lookups by license key, sale ID, source, customer, email, product and status
+flag go through the byte-offset index (server/storage/audit_index.py) and only
+read matching records; statistics are accumulated incrementally as the log grows.
 """
 
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# Add server to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server'))
+
+from storage.audit_index import AuditLogIndex
+
 
 class PurchaseAuditLog:
     """Utilities for querying and analyzing purchase audit trail"""
     
     def __init__(self, purchases_file='server/data/purchases.jsonl'):
         self.purchases_file = purchases_file
+        self.index = AuditLogIndex(purchases_file)
+        self._stats_totals = None
+        self._stats_offset = 0
+        self._stats_generation = None
+    
+    def _find(self, field, value):
+        """Indexed lookup (records in log order)"""
+        if not os.path.exists(self.purchases_file):
+            return []
+        try:
+            return self.index.find(field, value)
+        except Exception as e:
+            print(f"Error reading purchases: {e}")
+            return []
     
     def get_all_purchases(self):
         """Load all purchase records"""
@@ -33,47 +57,57 @@ class PurchaseAuditLog:
     
     def get_purchases_by_license_key(self, license_key):
         """Get all purchase records for a specific license"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('license_key') == license_key]
+        return self._find('license_key', license_key)
+    
+    def get_purchases_by_sale_id(self, sale_id):
+        """Get purchase records for a platform sale ID"""
+        return self._find('sale_id', sale_id)
     
     def get_purchases_by_source(self, source):
         """Get all purchases from a specific payment platform"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('source') == source]
+        return self._find('source', source)
     
     def get_purchases_by_customer(self, customer_id):
         """Get all purchases by a specific customer"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('customer_id') == customer_id]
+        return self._find('customer_id', customer_id)
     
     def get_purchases_by_email(self, email):
-        """Search purchases by customer email (from purchase records)"""
-        # Note: Email is not stored directly in purchases.jsonl
-        # Use license_key to find emails in licenses.json instead
-        purchases = self.get_all_purchases()
-        # Can extend this if email is added to purchase_info
-        return [p for p in purchases if email.lower() in str(p).lower()]
+        """
+        Search purchases by customer email (case-insensitive).
+        
+        Records carrying an email field are matched exactly through the index.
+        Older records have no email field, so those alone are scanned for the
+        email anywhere in the record, as this search always did.
+        """
+        if not os.path.exists(self.purchases_file):
+            return []
+        email = email.strip().lower()
+        try:
+            offsets = set(self.index.offsets('email', email))
+            legacy = self.index.offsets('missing', 'email')
+            for offset, record in zip(legacy, self.index.read_at(legacy)):
+                if email in str(record).lower():
+                    offsets.add(offset)
+            return self.index.read_at(sorted(offsets))
+        except Exception as e:
+            print(f"Error reading purchases: {e}")
+            return []
     
     def get_purchases_by_product(self, product_name):
         """Get purchases of a specific product"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases 
-                if p.get('product_name', '').lower() == product_name.lower()]
+        return self._find('product', product_name)
     
     def get_refunded_purchases(self):
         """Get all refunded transactions"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('is_refunded', False)]
+        return self._find('flag', 'is_refunded')
     
     def get_disputed_purchases(self):
         """Get all disputed transactions"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('is_disputed', False)]
+        return self._find('flag', 'is_disputed')
     
     def get_recurring_purchases(self):
         """Get all recurring/subscription purchases"""
-        purchases = self.get_all_purchases()
-        return [p for p in purchases if p.get('is_recurring', False)]
+        return self._find('flag', 'is_recurring')
     
     def get_high_value_purchases(self, min_price=100):
         """Get purchases above a certain price threshold"""
@@ -109,10 +143,57 @@ class PurchaseAuditLog:
         return result
     
     def get_purchase_stats(self):
-        """Get statistics about all purchases"""
-        purchases = self.get_all_purchases()
+        """Get statistics about all purchases (only records appended since the last call are read)"""
+        if os.path.exists(self.purchases_file):
+            self.index.refresh()
+        if self._stats_totals is None or self._stats_generation != self.index.generation:
+            self._stats_totals = {
+                'total_purchases': 0,
+                'sources': {},
+                'products': {},
+                'tiers': {},
+                'currencies': {},
+                'total_revenue': 0,
+                'refunded_count': 0,
+                'disputed_count': 0,
+                'recurring_count': 0,
+                'test_count': 0,
+                'non_refunded_count': 0
+            }
+            self._stats_offset = 0
+            self._stats_generation = self.index.generation
         
-        if not purchases:
+        totals = self._stats_totals
+        if os.path.exists(self.purchases_file):
+            for offset, p in self.index.read_from(self._stats_offset):
+                totals['total_purchases'] += 1
+                
+                # Count by source / product / tier / currency
+                for key, field in (('sources', 'source'), ('products', 'product_name'),
+                                   ('tiers', 'tier'), ('currencies', 'currency')):
+                    value = p.get(field, 'unknown')
+                    totals[key][value] = totals[key].get(value, 0) + 1
+                
+                # Revenue calculation
+                if not p.get('is_refunded', False):
+                    totals['non_refunded_count'] += 1
+                    try:
+                        totals['total_revenue'] += float(p.get('price', 0))
+                    except (ValueError, TypeError):
+                        pass
+                
+                # Status counts
+                if p.get('is_refunded', False):
+                    totals['refunded_count'] += 1
+                if p.get('is_disputed', False):
+                    totals['disputed_count'] += 1
+                if p.get('is_recurring', False):
+                    totals['recurring_count'] += 1
+                if p.get('is_test', False):
+                    totals['test_count'] += 1
+            self._stats_offset = self.index.indexed_offset
+        
+        if not totals['total_purchases']:
             return {
                 'total_purchases': 0,
                 'total_revenue': 0,
@@ -121,53 +202,8 @@ class PurchaseAuditLog:
                 'average_price': 0
             }
         
-        stats = {
-            'total_purchases': len(purchases),
-            'sources': {},
-            'products': {},
-            'tiers': {},
-            'currencies': {},
-            'total_revenue': 0,
-            'refunded_count': 0,
-            'disputed_count': 0,
-            'recurring_count': 0,
-            'test_count': 0
-        }
-        
-        for p in purchases:
-            # Count by source
-            source = p.get('source', 'unknown')
-            stats['sources'][source] = stats['sources'].get(source, 0) + 1
-            
-            # Count by product
-            product = p.get('product_name', 'unknown')
-            stats['products'][product] = stats['products'].get(product, 0) + 1
-            
-            # Count by tier
-            tier = p.get('tier', 'unknown')
-            stats['tiers'][tier] = stats['tiers'].get(tier, 0) + 1
-            
-            # Count by currency
-            currency = p.get('currency', 'unknown')
-            stats['currencies'][currency] = stats['currencies'].get(currency, 0) + 1
-            
-            # Revenue calculation
-            try:
-                if not p.get('is_refunded', False):
-                    price = float(p.get('price', 0))
-                    stats['total_revenue'] += price
-            except (ValueError, TypeError):
-                pass
-            
-            # Status counts
-            if p.get('is_refunded', False):
-                stats['refunded_count'] += 1
-            if p.get('is_disputed', False):
-                stats['disputed_count'] += 1
-            if p.get('is_recurring', False):
-                stats['recurring_count'] += 1
-            if p.get('is_test', False):
-                stats['test_count'] += 1
+        stats = {key: (dict(value) if isinstance(value, dict) else value)
+                 for key, value in totals.items() if key != 'non_refunded_count'}
         
         # Sort products by count
         stats['top_products'] = sorted(
@@ -177,11 +213,8 @@ class PurchaseAuditLog:
         )
         
         # Calculate average
-        if purchases:
-            non_refunded = [p for p in purchases if not p.get('is_refunded', False)]
-            if non_refunded:
-                total = sum(float(p.get('price', 0)) for p in non_refunded)
-                stats['average_price'] = total / len(non_refunded)
+        non_refunded = totals['non_refunded_count']
+        stats['average_price'] = stats['total_revenue'] / non_refunded if non_refunded else 0
         
         return stats
     
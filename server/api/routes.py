@@ -6,8 +6,10 @@ from services.license_manager import LicenseManager
 from services.email_service import EmailService
 from services.rate_limiter import rate_limiter
 from services.validation import validate_email, validate_license_key, validate_hardware_id, sanitize_string
+from storage.file_lock import lock_stats
 from config.settings import Config
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -381,6 +383,21 @@ def admin_platform_stats():
         }), 500
 
 
+@api_bp.route('/admin/lock-stats', methods=['GET'])
+@require_admin_key
+def admin_lock_stats():
+    """
+    Data file lock wait metrics for this worker process.
+    
+    ADMIN ONLY - Requires X-Admin-Key header
+    """
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'locks': lock_stats()
+    }), 200
+
+
 @api_bp.route('/admin/find-by-platform', methods=['GET'])
 @require_admin_key
 def admin_find_by_platform():
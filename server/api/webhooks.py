@@ -272,12 +272,11 @@ def gumroad_webhook():
     logger.info(f"Normalized purchase info: {json.dumps(purchase_info, indent=2)}")
     
     # Check if user had a trial (conversion scenario)
-    licenses = license_manager.load_licenses()
     had_trial = False
     trial_days_used = 0
     
-    for lic_key, lic_data in licenses.items():
-        if lic_data.get('email', '').lower() == email.lower() and license_manager.is_trial_license(lic_key):
+    for lic_key, lic_data in license_manager.find_licenses(email=email).items():
+        if license_manager.is_trial_data(lic_data):
             had_trial = True
             # Calculate trial usage
             try:
@@ -686,19 +685,17 @@ def _handle_msstore_purchase(data: dict, email: str, order_id: str, product_id:
         logger.warning(f"Failed to create backup: {e}")
     
     # Check for existing trial (conversion scenario)
-    trials = license_manager.load_trials()
     had_trial = False
     trial_days_used = 0
     
-    for trial_key, trial_data in trials.items():
-        if trial_data.get('email', '').lower() == email.lower():
-            had_trial = True
-            try:
-                created = datetime.fromisoformat(trial_data.get('created_date'))
-                trial_days_used = (datetime.now() - created).days
-            except:
-                trial_days_used = 0
-            break
+    for trial_key, trial_data in license_manager.find_trials(email=email).items():
+        had_trial = True
+        try:
+            created = datetime.fromisoformat(trial_data.get('created_date'))
+            trial_days_used = (datetime.now() - created).days
+        except:
+            trial_days_used = 0
+        break
     
     # Create license
     try:
@@ -965,15 +962,14 @@ def trial_status(license_key):
         }
     """
     try:
-        licenses = license_manager.load_licenses()
+        license_data = license_manager.get_license(license_key)
         
-        if license_key not in licenses:
+        if license_data is None:
             return jsonify({
                 "error": "License not found"
             }), 404
         
-        license_data = licenses[license_key]
-        is_trial = license_manager.is_trial_license(license_key)
+        is_trial = license_manager.is_trial_data(license_data)
         
         return jsonify({
             "success": True,
@@ -1026,15 +1022,14 @@ def license_offline_check(license_key):
                 "required": ["email", "hardware_id"]
             }), 400
         
-        licenses = license_manager.load_licenses()
+        license_data = license_manager.get_license(license_key)
         
-        if license_key not in licenses:
+        if license_data is None:
             return jsonify({
                 "error": "License not found"
             }), 404
         
-        license_data = licenses[license_key]
-        is_trial = license_manager.is_trial_license(license_key)
+        is_trial = license_manager.is_trial_data(license_data)
         
         # Trials NEVER work offline
         if is_trial:
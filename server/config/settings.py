@@ -6,6 +6,22 @@ class Config:
     LICENSES_FILE = os.path.join(DATA_FOLDER, 'licenses.json')
     TRIALS_FILE = os.path.join(DATA_FOLDER, 'trials.json')
     
+    # License storage backend: 'sqlite' (indexed, WAL) or 'json' (licenses.json / trials.json)
+    LICENSE_STORAGE = os.environ.get('LICENSE_STORAGE', 'sqlite')
+    LICENSES_DB_FILE = os.path.join(DATA_FOLDER, 'licenses.db')
+    
+    # Rate limiter state shared by all workers: 'sqlite' (default) or 'memory' (per process)
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'sqlite')
+    RATE_LIMIT_DB_FILE = os.path.join(DATA_FOLDER, 'rate_limits.db')
+    
+    # Seconds to wait for a cross-process lock on a JSON data file before failing
+    FILE_LOCK_TIMEOUT = float(os.environ.get('FILE_LOCK_TIMEOUT', 10))
+    
+    # Validation telemetry (last_validation / validation_count) write-behind:
+    # flushed every N seconds or once this many licenses are pending (0 = write immediately)
+    VALIDATION_FLUSH_INTERVAL = float(os.environ.get('VALIDATION_FLUSH_INTERVAL', 30))
+    VALIDATION_FLUSH_MAX_PENDING = int(os.environ.get('VALIDATION_FLUSH_MAX_PENDING', 100))
+    
     # Debug mode
     DEBUG = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
 
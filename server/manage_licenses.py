@@ -41,10 +41,10 @@ def create_license(manager, email, customer, days):
         print("\nERROR: Failed to create license\n")
 
 def revoke_license(manager, key):
-    licenses = manager.load_licenses()
-    if key in licenses:
-        licenses[key]['is_active'] = False
-        manager.save_licenses(licenses)
+    license_data = manager.get_license(key)
+    if license_data is not None:
+        license_data['is_active'] = False
+        manager.put_license(key, license_data)
         print(f"\nSUCCESS: Revoked license {key}\n")
     else:
         print(f"\nERROR: License {key} not found\n")
@@ -18,6 +18,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from storage.license_store import backup_sqlite_database
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +70,7 @@ class BackupManager:
             
             # Files to backup
             files_to_backup = [
+                'licenses.db',
                 'licenses.json',
                 'trials.json',
                 'purchases.jsonl',
@@ -91,6 +94,12 @@ class BackupManager:
                 dest = backup_path / f"{filename}.gz"
                 
                 try:
+                    if source.suffix == '.db':
+                        # Live SQLite database (WAL): take a consistent snapshot first
+                        snapshot = backup_path / filename
+                        backup_sqlite_database(str(source), str(snapshot))
+                        source = snapshot
+                    
                     with open(source, 'rb') as f_in:
                         with gzip.open(dest, 'wb', compresslevel=9) as f_out:
                             data = f_in.read()
@@ -107,6 +116,9 @@ class BackupManager:
                 except Exception as e:
                     logger.error(f"❌ Failed to backup {filename}: {e}")
                     continue
+                finally:
+                    if source.parent == backup_path:
+                        source.unlink(missing_ok=True)
             
             if not backed_up_files:
                 logger.error("❌ No files were backed up")
@@ -264,9 +276,21 @@ class BackupManager:
             dest_file = self.data_dir / original_filename
             
             try:
-                with gzip.open(gz_file, 'rb') as f_in:
-                    with open(dest_file, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                if dest_file.suffix == '.db':
+                    # Restore into the live database through SQLite so open
+                    # connections (and their WAL) see the restored data
+                    snapshot = backup_path / original_filename
+                    try:
+                        with gzip.open(gz_file, 'rb') as f_in:
+                            with open(snapshot, 'wb') as f_out:
+                                shutil.copyfileobj(f_in, f_out)
+                        backup_sqlite_database(str(snapshot), str(dest_file))
+                    finally:
+                        snapshot.unlink(missing_ok=True)
+                else:
+                    with gzip.open(gz_file, 'rb') as f_in:
+                        with open(dest_file, 'wb') as f_out:
+                            shutil.copyfileobj(f_in, f_out)
                 
                 restored_count += 1
                 logger.info(f"✅ Restored: {original_filename}")
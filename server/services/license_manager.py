@@ -2,19 +2,17 @@ import json
 import os
 import logging
 import secrets
-import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple, List
 from enum import Enum
 from config.settings import Config
+from storage.audit_index import AuditLogIndex
+from storage.file_lock import get_file_lock
+from storage.license_store import LICENSES, PLATFORM_ID_FIELDS, TRIALS, LicenseStore, create_license_store
+from storage.validation_buffer import ValidationTelemetryBuffer
 
 logger = logging.getLogger(__name__)
 
-# Thread locks for file operations (prevents race conditions)
-_licenses_lock = threading.Lock()
-_trials_lock = threading.Lock()
-_purchases_lock = threading.Lock()
-
 
 class Platform(str, Enum):
     """
@@ -53,100 +51,65 @@ def get_platform_sale_id_field(platform: str) -> str:
     Returns:
         str: The field name for this platform's unique transaction ID
     """
-    platform_id_fields = {
-        Platform.GUMROAD.value: 'sale_id',
-        Platform.MSSTORE.value: 'order_id',
-        Platform.STRIPE.value: 'payment_intent_id',
-        Platform.DIRECT.value: 'admin_ref',
-        Platform.TRIAL.value: 'trial_id',
-    }
-    return platform_id_fields.get(platform, 'sale_id')
+    return PLATFORM_ID_FIELDS.get(platform, 'sale_id')
 
 
 class LicenseManager:
-    def __init__(self):
+    def __init__(self, store: Optional[LicenseStore] = None):
         self.license_file = Config.LICENSES_FILE
         self.trials_file = Config.TRIALS_FILE
         self.purchases_file = os.path.join(os.path.dirname(self.license_file), 'purchases.jsonl')
-        self.ensure_license_file()
-        self.ensure_trials_file()
-    
-    def ensure_license_file(self):
-        """Ensure license file exists"""
-        if not os.path.exists(self.license_file):
-            os.makedirs(os.path.dirname(self.license_file), exist_ok=True)
-            with open(self.license_file, 'w') as f:
-                json.dump({}, f)
+        # Byte-offset index over purchases.jsonl (sidecar purchases.jsonl.idx)
+        self.purchase_index = AuditLogIndex(self.purchases_file)
+        # Backend chosen by Config.LICENSE_STORAGE (SQLite by default, JSON files optional)
+        self.store = store if store is not None else create_license_store()
+        # last_validation / validation_count are buffered and written in batches
+        self.validation_buffer = ValidationTelemetryBuffer(
+            self.store, Config.VALIDATION_FLUSH_INTERVAL, Config.VALIDATION_FLUSH_MAX_PENDING)
     
-    def ensure_trials_file(self):
-        """Ensure trials.json file exists"""
-        if not os.path.exists(self.trials_file):
-            os.makedirs(os.path.dirname(self.trials_file), exist_ok=True)
-            with open(self.trials_file, 'w') as f:
-                json.dump({}, f)
+    def _purchases_lock(self):
+        """Cross-process write lock for appending to purchases.jsonl"""
+        return get_file_lock(self.purchases_file).write()
     
     def load_licenses(self):
-        """Load licenses from file with thread safety"""
-        with _licenses_lock:
-            try:
-                with open(self.license_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load licenses: {e}")
-                return {}
+        """Load all licenses (full read - prefer get_license/find_licenses for lookups)"""
+        return self.store.load_all(LICENSES)
     
     def save_licenses(self, licenses):
-        """Save licenses to file with thread safety and atomic write"""
-        with _licenses_lock:
-            try:
-                # Write to temp file first, then rename (atomic on most filesystems)
-                temp_file = self.license_file + '.tmp'
-                with open(temp_file, 'w') as f:
-                    json.dump(licenses, f, indent=2)
-                
-                # Atomic rename
-                os.replace(temp_file, self.license_file)
-                return True
-            except Exception as e:
-                logger.error(f"Failed to save licenses: {e}")
-                # Clean up temp file if it exists
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-                return False
+        """Replace all licenses (prefer put_license for single-record updates)"""
+        return self.store.save_all(LICENSES, licenses)
     
     def load_trials(self):
-        """Load trials from file with thread safety"""
-        with _trials_lock:
-            try:
-                with open(self.trials_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load trials: {e}")
-                return {}
+        """Load all trial licenses (full read - prefer get_trial/find_trials for lookups)"""
+        return self.store.load_all(TRIALS)
     
     def save_trials(self, trials):
-        """Save trials to file with thread safety and atomic write"""
-        with _trials_lock:
-            try:
-                # Write to temp file first, then rename (atomic on most filesystems)
-                temp_file = self.trials_file + '.tmp'
-                with open(temp_file, 'w') as f:
-                    json.dump(trials, f, indent=2)
-                
-                # Atomic rename
-                os.replace(temp_file, self.trials_file)
-                return True
-            except Exception as e:
-                logger.error(f"Failed to save trials: {e}")
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-                return False
+        """Replace all trial licenses"""
+        return self.store.save_all(TRIALS, trials)
+    
+    def get_license(self, license_key) -> Optional[Dict]:
+        """Get one license by key (None if not found)"""
+        return self.store.get(LICENSES, license_key)
+    
+    def put_license(self, license_key, license_data) -> bool:
+        """Insert or update one license"""
+        return self.store.put(LICENSES, license_key, license_data)
+    
+    def get_trial(self, license_key) -> Optional[Dict]:
+        """Get one trial license by key (None if not found)"""
+        return self.store.get(TRIALS, license_key)
+    
+    def put_trial(self, license_key, trial_data) -> bool:
+        """Insert or update one trial license"""
+        return self.store.put(TRIALS, license_key, trial_data)
+    
+    def find_licenses(self, **criteria) -> Dict[str, Dict]:
+        """Indexed license lookup, e.g. find_licenses(email=...) (see storage.license_store.INDEX_FIELDS)"""
+        return self.store.find(LICENSES, **criteria)
+    
+    def find_trials(self, **criteria) -> Dict[str, Dict]:
+        """Indexed trial lookup, e.g. find_trials(hardware_id=...)"""
+        return self.store.find(TRIALS, **criteria)
     
     def generate_license_key(self):
         """Generate a unique license key"""
@@ -182,13 +145,11 @@ class LicenseManager:
             platform: Platform enum value or string (auto-detected from purchase_info if not provided)
         """
         try:
-            licenses = self.load_licenses()
-            
             if not license_key:
                 license_key = self.generate_license_key()
             
             # Check if license key already exists
-            if license_key in licenses:
+            if self.get_license(license_key) is not None:
                 logger.warning(f"License key {license_key} already exists")
                 return license_key
 
@@ -228,14 +189,12 @@ class LicenseManager:
                 'platform_transaction_id': platform_transaction_id,  # e.g., sale_id, order_id
             }
             
-            licenses[license_key] = license_data
-            
-            if self.save_licenses(licenses):
+            if self.put_license(license_key, license_data):
                 logger.info(f"Created license {license_key} for {email} (platform: {resolved_platform})")
                 
                 # Log full purchase details separately for audit trail
                 if purchase_info:
-                    self.log_purchase(license_key, purchase_info)
+                    self.log_purchase(license_key, purchase_info, email=email)
                 
                 return license_key
             else:
@@ -245,18 +204,20 @@ class LicenseManager:
             logger.error(f"Failed to create license: {e}")
             return None
     
-    def log_purchase(self, license_key, purchase_info):
+    def log_purchase(self, license_key, purchase_info, email=None):
         """Log detailed purchase information to audit trail (purchases.jsonl) with thread safety"""
-        with _purchases_lock:
+        with self._purchases_lock():
             try:
                 purchase_record = {
                     'timestamp': datetime.now().isoformat(),
                     'license_key': license_key,
+                    **({'email': email} if email else {}),
                     **purchase_info  # Unpack all purchase details
                 }
                 
                 with open(self.purchases_file, 'a') as f:
                     f.write(json.dumps(purchase_record) + '\n')
+                self.purchase_index.refresh()
                 
                 logger.info(f"Purchase logged for license {license_key}")
                 return True
@@ -275,12 +236,10 @@ class LicenseManager:
             dict: {'eligible': bool, 'reason': str, 'message': str}
         """
         try:
-            # Check trials.json for existing trials
-            trials = self.load_trials()
             now = datetime.now()
             
             # Check if trial already exists for this email
-            for trial_key, trial_data in trials.items():
+            for trial_key, trial_data in self.find_trials(email=email).items():
                 if trial_data.get('email') == email:
                     # Check is_active flag first (most important)
                     is_active = trial_data.get('is_active', False)
@@ -307,7 +266,7 @@ class LicenseManager:
                         logger.error(f"Invalid expiry_date format for trial {trial_key}: {e}")
             
             # Check if trial already exists for this hardware_id
-            for trial_key, trial_data in trials.items():
+            for trial_key, trial_data in self.find_trials(hardware_id=hardware_id).items():
                 if trial_data.get('hardware_id') == hardware_id:
                     # Check is_active flag first (most important)
                     is_active = trial_data.get('is_active', False)
@@ -334,8 +293,7 @@ class LicenseManager:
                         logger.error(f"Invalid expiry_date format for trial {trial_key}: {e}")
             
             # Also check if user already has a full license
-            licenses = self.load_licenses()
-            for license_key, license_data in licenses.items():
+            for license_key, license_data in self.find_licenses(email=email).items():
                 if license_data.get('email') == email and license_data.get('is_active'):
                     # Check if it's NOT a trial (full license)
                     try:
@@ -392,8 +350,6 @@ class LicenseManager:
                     'message': eligibility['message']
                 }
             
-            # Load trials from trials.json (NOT licenses.json)
-            trials = self.load_trials()
             license_key = self.generate_license_key()
             
             # Trial expires in 7 days
@@ -413,10 +369,8 @@ class LicenseManager:
                 'converted_to_full': False
             }
             
-            # Save to trials.json
-            trials[license_key] = trial_data
-            
-            if self.save_trials(trials):
+            # Save to trial storage (NOT licenses)
+            if self.put_trial(license_key, trial_data):
                 logger.info(f"✅ Created trial license {license_key[:8]}... for {email} on device {hardware_id}")
                 logger.info(f"   Trial saved to trials.json (expires: {expiry_date.isoformat()})")
                 
@@ -431,7 +385,7 @@ class LicenseManager:
                     'purchase_date': datetime.now().isoformat(),
                     'is_recurring': False
                 }
-                self.log_purchase(license_key, trial_info)
+                self.log_purchase(license_key, trial_info, email=email)
                 
                 return {
                     'success': True,
@@ -463,12 +417,13 @@ class LicenseManager:
         Returns:
             bool: True if trial, False otherwise
         """
+        license_data = self.get_license(license_key)
+        return license_data is not None and self.is_trial_data(license_data)
+    
+    @staticmethod
+    def is_trial_data(license_data):
+        """Check if a license record has a trial duration (7 days or less)"""
         try:
-            licenses = self.load_licenses()
-            if license_key not in licenses:
-                return False
-            
-            license_data = licenses[license_key]
             created = datetime.fromisoformat(license_data['created_date'])
             expiry = datetime.fromisoformat(license_data['expiry_date'])
             days_diff = (expiry - created).days
@@ -492,20 +447,13 @@ class LicenseManager:
             dict: Validation result
         """
         try:
-            licenses = self.load_licenses()
-            trials = self.load_trials()
-            
-            # Check both licenses.json and trials.json
-            license_data = None
+            # Check licenses first, then trials
             is_trial = False
-            
-            if license_key in licenses:
-                license_data = licenses[license_key]
-                is_trial = False
-            elif license_key in trials:
-                license_data = trials[license_key]
+            license_data = self.get_license(license_key)
+            if license_data is None:
+                license_data = self.get_trial(license_key)
                 is_trial = True
-            else:
+            if license_data is None:
                 return {'success': False, 'error': 'invalid_license'}
             
             # Check if this is a converted trial
@@ -565,10 +513,12 @@ class LicenseManager:
             
             # Check hardware binding
             stored_hardware_id = license_data.get('hardware_id')
+            activated = False
             if stored_hardware_id is None:
                 # First activation - bind to this device
                 license_data['hardware_id'] = hardware_id
                 license_data['device_name'] = device_name
+                activated = True
                 logger.info(f"Bound license {license_key} to device {hardware_id}")
             elif stored_hardware_id != hardware_id:
                 return {
@@ -579,16 +529,18 @@ class LicenseManager:
             
             # Update validation info (only if online)
             if not is_offline:
-                license_data['last_validation'] = datetime.now().isoformat()
-                license_data['validation_count'] = license_data.get('validation_count', 0) + 1
-                
-                # Save to correct file based on license type
-                if is_trial:
-                    trials[license_key] = license_data
-                    self.save_trials(trials)
+                validated_at = datetime.now().isoformat()
+                if activated:
+                    # Device binding is a state change: write it (with this validation) now
+                    license_data['last_validation'] = validated_at
+                    license_data['validation_count'] = license_data.get('validation_count', 0) + 1
+                    if is_trial:
+                        self.put_trial(license_key, license_data)
+                    else:
+                        self.put_license(license_key, license_data)
                 else:
-                    licenses[license_key] = license_data
-                    self.save_licenses(licenses)
+                    # Telemetry only: coalesced write-behind
+                    self.validation_buffer.record(TRIALS if is_trial else LICENSES, license_key, validated_at)
             
             return {
                 'success': True,
@@ -604,13 +556,10 @@ class LicenseManager:
     def transfer_license(self, email, license_key, new_hardware_id, new_device_name="Unknown"):
         """Transfer license to a new device"""
         try:
-            licenses = self.load_licenses()
-            
-            if license_key not in licenses:
+            license_data = self.get_license(license_key)
+            if license_data is None:
                 return {'success': False, 'error': 'invalid_license'}
             
-            license_data = licenses[license_key]
-            
             if license_data['email'] != email:
                 return {'success': False, 'error': 'email_mismatch'}
             
@@ -620,8 +569,7 @@ class LicenseManager:
             license_data['device_name'] = new_device_name
             license_data['last_validation'] = datetime.now().isoformat()
             
-            licenses[license_key] = license_data
-            self.save_licenses(licenses)
+            self.put_license(license_key, license_data)
             
             logger.info(f"Transferred license {license_key} from {old_device} to {new_device_name}")
             
@@ -644,11 +592,7 @@ class LicenseManager:
             str: Our license key or None if not found
         """
         try:
-            licenses = self.load_licenses()
-            for our_key, license_data in licenses.items():
-                if license_data.get('source_license_key') == source_license_key:
-                    return our_key
-            return None
+            return next(iter(self.find_licenses(source_license_key=source_license_key)), None)
         except Exception as e:
             logger.error(f"Error finding license by source key: {e}")
             return None
@@ -663,16 +607,8 @@ class LicenseManager:
             str: Our license key or None if not found
         """
         try:
-            licenses = self.load_licenses()
-            for our_key, license_data in licenses.items():
-                # Check in purchase_info.sale_id
-                purchase_info = license_data.get('purchase_info', {})
-                if purchase_info.get('sale_id') == sale_id:
-                    return our_key
-                # Also check legacy format (direct sale_id field)
-                if license_data.get('sale_id') == sale_id:
-                    return our_key
-            return None
+            # Indexed on sale_id, purchase_info.sale_id (legacy format)
+            return next(iter(self.find_licenses(sale_id=sale_id)), None)
         except Exception as e:
             logger.error(f"Error finding license by sale_id: {e}")
             return None
@@ -698,29 +634,11 @@ class LicenseManager:
             if not transaction_id:
                 return None
                 
-            licenses = self.load_licenses()
-            
-            for our_key, license_data in licenses.items():
-                # Check platform match
-                license_platform = license_data.get('platform', '')
-                if license_platform != platform:
-                    continue
-                
-                # Check platform_transaction_id (new field)
-                if license_data.get('platform_transaction_id') == transaction_id:
-                    return our_key
-                
-                # Legacy support: Check old field names based on platform
-                id_field = get_platform_sale_id_field(platform)
-                if license_data.get(id_field) == transaction_id:
-                    return our_key
-                
-                # Also check in purchase_info for audit-logged data
-                purchase_info = license_data.get('purchase_info', {})
-                if purchase_info.get(id_field) == transaction_id:
-                    return our_key
-            
-            return None
+            # Indexed on platform_transaction_id, falling back to the platform's legacy
+            # ID field (get_platform_sale_id_field, on the record or in purchase_info)
+            # and then sale_id for records created before platform tracking
+            matches = self.find_licenses(platform=platform, platform_transaction_id=transaction_id)
+            return next(iter(matches), None)
             
         except Exception as e:
             logger.error(f"Error finding license by platform ID: {e}")
@@ -742,21 +660,8 @@ class LicenseManager:
             Dict[str, Dict]: Dictionary of {license_key: license_data} for matching platform
         """
         try:
-            licenses = self.load_licenses()
-            platform_licenses = {}
-            
-            for license_key, license_data in licenses.items():
-                # Check explicit platform field
-                if license_data.get('platform') == platform:
-                    platform_licenses[license_key] = license_data
-                    continue
-                
-                # Legacy fallback: Check source in purchase audit log
-                purchase_info = license_data.get('purchase_info', {})
-                if purchase_info.get('source') == platform:
-                    platform_licenses[license_key] = license_data
-            
-            return platform_licenses
+            # Indexed on the platform field, falling back to purchase_info.source (legacy)
+            return self.find_licenses(platform=platform)
             
         except Exception as e:
             logger.error(f"Error finding licenses by platform: {e}")
@@ -897,19 +802,14 @@ class LicenseManager:
             dict: Success/failure status
         """
         try:
-            licenses = self.load_licenses()
-            
-            if license_key not in licenses:
+            license_data = self.get_license(license_key)
+            if license_data is None:
                 return {'success': False, 'error': 'invalid_license'}
             
-            license_data = licenses[license_key]
-            
             # Deactivate license
             license_data['is_active'] = False
             
-            licenses[license_key] = license_data
-            
-            if self.save_licenses(licenses):
+            if self.put_license(license_key, license_data):
                 logger.info(f"Refunded license {license_key} - Reason: {refund_reason}")
                 
                 # Log refund to audit trail
@@ -928,31 +828,31 @@ class LicenseManager:
     
     def log_refund(self, license_key, refund_reason):
         """Log refund to audit trail"""
-        try:
-            refund_record = {
-                'timestamp': datetime.now().isoformat(),
-                'event': 'refund',
-                'license_key': license_key,
-                'refund_reason': refund_reason
-            }
-            
-            with open(self.purchases_file, 'a') as f:
-                f.write(json.dumps(refund_record) + '\n')
-            
-            logger.info(f"Refund logged for license {license_key}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to log refund: {e}")
-            return False
+        with self._purchases_lock():
+            try:
+                refund_record = {
+                    'timestamp': datetime.now().isoformat(),
+                    'event': 'refund',
+                    'license_key': license_key,
+                    'refund_reason': refund_reason
+                }
+                
+                with open(self.purchases_file, 'a') as f:
+                    f.write(json.dumps(refund_record) + '\n')
+                self.purchase_index.refresh()
+                
+                logger.info(f"Refund logged for license {license_key}")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to log refund: {e}")
+                return False
     
     def _get_refund_info_from_audit(self, license_key):
         """Get refund info from audit log"""
         try:
-            with open(self.purchases_file, 'r') as f:
-                for line in f:
-                    record = json.loads(line)
-                    if record.get('license_key') == license_key and record.get('event') == 'refund':
-                        return {'timestamp': record.get('timestamp'), 'refund_reason': record.get('refund_reason')}
+            for record in self.purchase_index.find('license_key', license_key):
+                if record.get('event') == 'refund':
+                    return {'timestamp': record.get('timestamp'), 'refund_reason': record.get('refund_reason')}
             return None
         except:
             return None
@@ -964,13 +864,10 @@ class LicenseManager:
             dict: License data with refund status
         """
         try:
-            licenses = self.load_licenses()
-            
-            if license_key not in licenses:
+            license_data = self.get_license(license_key)
+            if license_data is None:
                 return {'success': False, 'error': 'invalid_license'}
             
-            license_data = licenses[license_key]
-            
             # Get refund info from audit log if refunded
             refund_info = None
             if not license_data.get('is_active'):
@@ -996,22 +893,17 @@ class LicenseManager:
             dict: Complete license and purchase data
         """
         try:
-            licenses = self.load_licenses()
-            
-            if license_key not in licenses:
+            license_data = self.get_license(license_key)
+            if license_data is None:
                 return {'success': False, 'error': 'invalid_license'}
             
-            license_data = licenses[license_key]
-            
-            # Read purchase info from audit log
+            # Read purchase info from audit log (indexed by license key)
             purchase_data = None
             try:
-                with open(self.purchases_file, 'r') as f:
-                    for line in f:
-                        record = json.loads(line)
-                        if record.get('license_key') == license_key and record.get('event') != 'refund':
-                            purchase_data = record
-                            break
+                for record in self.purchase_index.find('license_key', license_key):
+                    if record.get('event') != 'refund':
+                        purchase_data = record
+                        break
             except:
                 pass
             
@@ -1043,17 +935,8 @@ class LicenseManager:
             Full license dictionary
         """
         try:
-            trials = self.load_trials()
-            licenses = self.load_licenses()
-            
-            # Find trial license by email in trials.json
-            trial_key = None
-            trial_data = None
-            for t_key, t_data in trials.items():
-                if t_data.get('email', '').lower() == email.lower():
-                    trial_key = t_key
-                    trial_data = t_data
-                    break
+            # Find trial license by email (case-insensitive index)
+            trial_key, trial_data = next(iter(self.find_trials(email=email).items()), (None, None))
             
             if trial_data:
                 # Calculate trial usage stats
@@ -1067,9 +950,8 @@ class LicenseManager:
                 trial_data['is_active'] = False  # Deactivate trial
                 trial_data['trial_duration_days'] = trial_duration_days
                 
-                # Update trial in trials.json
-                trials[trial_key] = trial_data
-                self.save_trials(trials)
+                # Update trial record
+                self.put_trial(trial_key, trial_data)
                 
                 logger.info(
                     f"✅ Trial converted to full license\n"
@@ -1107,9 +989,8 @@ class LicenseManager:
                 'trial_duration_days': trial_data.get('trial_duration_days', 0) if trial_data else 0
             }
             
-            # Save full license to licenses.json
-            licenses[new_license_key] = full_license
-            self.save_licenses(licenses)
+            # Save full license
+            self.put_license(new_license_key, full_license)
             
             logger.info(f"✅ Full license created: {new_license_key[:8]}... for {email}")
             
@@ -1126,18 +1007,14 @@ class LicenseManager:
         Keeps trial record for audit trail but marks as superseded
         """
         try:
-            licenses = self.load_licenses()
-            email_lower = email.lower()
-            
-            for license_key, license_data in licenses.items():
-                if license_data.get('email', '').lower() == email_lower and self.is_trial_license(license_key):
+            for license_key, license_data in self.find_licenses(email=email).items():
+                if self.is_trial_data(license_data):
                     if license_data.get('is_active'):
                         license_data['is_active'] = False
                         license_data['deactivated_at'] = datetime.now().isoformat()
                         license_data['deactivation_reason'] = 'superseded_by_full'
                         
-                        licenses[license_key] = license_data
-                        self.save_licenses(licenses)
+                        self.put_license(license_key, license_data)
                         
                         logger.info(f"✅ Trial deactivated for {email} (superseded by full license)")
                         return True
@@ -1165,20 +1042,16 @@ class LicenseManager:
                     'message': 'Please provide a valid email address'
                 }
             
-            licenses = self.load_licenses()
-            email_lower = email.lower().strip()
-            
             # Search for licenses matching this email
             found_licenses = []
-            for license_key, license_data in licenses.items():
-                if license_data.get('email', '').lower() == email_lower:
-                    found_licenses.append({
-                        'license_key': license_key,
-                        'is_active': license_data.get('is_active', False),
-                        'created_date': license_data.get('created_date'),
-                        'expiry_date': license_data.get('expiry_date'),
-                        'device_name': license_data.get('device_name')
-                    })
+            for license_key, license_data in self.find_licenses(email=email.strip()).items():
+                found_licenses.append({
+                    'license_key': license_key,
+                    'is_active': license_data.get('is_active', False),
+                    'created_date': license_data.get('created_date'),
+                    'expiry_date': license_data.get('expiry_date'),
+                    'device_name': license_data.get('device_name')
+                })
             
             if not found_licenses:
                 return {
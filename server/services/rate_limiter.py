@@ -1,33 +1,42 @@
 """
 Rate Limiting Service for API Protection
 Implements industry-standard rate limiting to prevent abuse and DDoS attacks
+
+Limits use GCRA (generic cell rate algorithm): each (action, caller) keeps a
+constant-size state - theoretical arrival time, block deadline, violation
+count - instead of a list of timestamps. `max_requests` per `window_seconds`
+may arrive in a burst; capacity then comes back at one request every
+window_seconds / max_requests. State is kept in a shared store
+(storage/rate_limit_store.py), so limits hold across worker processes.
 """
 
-import time
-import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
 import hashlib
+import logging
+import math
+import time
+from typing import Callable, Optional
+
+from storage.rate_limit_store import RateLimitBackend, StateUpdate, create_rate_limit_backend
 
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
     """
-    Token bucket rate limiter with sliding window
-    
+    GCRA rate limiter with a shared backend
+
     Security measures implemented:
     1. IP-based rate limiting
     2. Email-based rate limiting
     3. Hardware ID tracking
     4. Exponential backoff
-    5. Sliding window algorithm
+    5. Constant-size state per caller, shared across workers
     """
-    
-    def __init__(self):
-        # Rate limit storage: {identifier: {'requests': [(timestamp, count)], 'blocked_until': timestamp}}
-        self.requests = defaultdict(lambda: {'requests': [], 'blocked_until': None, 'violation_count': 0})
-        
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None, clock: Callable[[], float] = time.time):
+        self._backend = backend
+        self.clock = clock
+
         # Rate limit configurations (industry standards)
         self.limits = {
             'trial_create': {
@@ -46,10 +55,14 @@ class RateLimiter:
                 'block_duration': 900     # Block for 15 minutes
             }
         }
-        
-        # Cleanup old entries every 1000 checks
-        self.check_counter = 0
-    
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        # Opened on first use so importing the module doesn't touch the data folder
+        if self._backend is None:
+            self._backend = create_rate_limit_backend()
+        return self._backend
+
     def _generate_identifier(self, email=None, ip_address=None, hardware_id=None):
         """Generate unique identifier from multiple factors"""
         parts = []
@@ -59,137 +72,120 @@ class RateLimiter:
             parts.append(f"ip:{ip_address}")
         if hardware_id:
             parts.append(f"hw:{hardware_id}")
-        
+
         identifier = "|".join(parts)
         # Hash for privacy
         return hashlib.sha256(identifier.encode()).hexdigest()[:16]
-    
-    def _cleanup_old_requests(self):
-        """Remove old request records to prevent memory leak"""
-        current_time = time.time()
-        max_age = 86400  # Keep records for 24 hours max
-        
-        for identifier in list(self.requests.keys()):
-            data = self.requests[identifier]
-            # Remove requests older than max_age
-            data['requests'] = [
-                (ts, count) for ts, count in data['requests']
-                if current_time - ts < max_age
-            ]
-            # Remove empty entries
-            if not data['requests'] and not data['blocked_until']:
-                del self.requests[identifier]
-    
+
+    def _gcra(self, limit_config, now) -> StateUpdate:
+        """State transition for one request: state is [tat, blocked_until, violation_count]"""
+        window = limit_config['window_seconds']
+        interval = window / limit_config['max_requests']
+
+        def step(state):
+            tat, blocked_until, violations = state or (now, 0.0, 0)
+
+            # Check if currently blocked
+            if blocked_until and now < blocked_until:
+                retry_after = int(blocked_until - now)
+                return state, max(tat, blocked_until), {
+                    'allowed': False,
+                    'reason': 'rate_limit_exceeded',
+                    'retry_after': retry_after,
+                    'message': f'Too many requests. Please try again in {retry_after} seconds.',
+                    'blocked': True
+                }
+
+            # Clear block if expired
+            if blocked_until:
+                blocked_until, violations = 0.0, 0
+
+            tat = max(tat, now)
+            if tat + interval - now > window + 1e-9:
+                # Block user
+                violations += 1
+                # Exponential backoff: double block time for repeat offenders
+                block_multiplier = min(2 ** (violations - 1), 8)
+                block_duration = limit_config['block_duration'] * block_multiplier
+                blocked_until = now + block_duration
+                return [tat, blocked_until, violations], max(tat, blocked_until), {
+                    'allowed': False,
+                    'reason': 'rate_limit_exceeded',
+                    'retry_after': int(block_duration),
+                    'message': f'Too many requests. Blocked for {int(block_duration/60)} minutes.',
+                    'violations': violations
+                }
+
+            # Allow request and record it
+            tat += interval
+            return [tat, 0.0, violations], tat, {
+                'allowed': True,
+                'reason': 'ok',
+                'remaining': int((window - (tat - now)) / interval + 1e-9),
+                'reset_after': math.ceil(tat - now)
+            }
+
+        return step
+
     def check_rate_limit(self, action, email=None, ip_address=None, hardware_id=None):
         """
         Check if request should be allowed
-        
+
         Args:
             action: 'trial_create', 'forgot_license', or 'login_validate'
             email: User email
             ip_address: Request IP address
             hardware_id: Hardware identifier
-        
+
         Returns:
             dict: {'allowed': bool, 'reason': str, 'retry_after': int}
         """
-        # Cleanup periodically
-        self.check_counter += 1
-        if self.check_counter % 1000 == 0:
-            self._cleanup_old_requests()
-        
         if action not in self.limits:
             logger.warning(f"Unknown rate limit action: {action}")
             return {'allowed': True, 'reason': 'unknown_action'}
-        
+
         limit_config = self.limits[action]
         identifier = self._generate_identifier(email, ip_address, hardware_id)
-        current_time = time.time()
-        
-        data = self.requests[identifier]
-        
-        # Check if currently blocked
-        if data['blocked_until'] and current_time < data['blocked_until']:
-            retry_after = int(data['blocked_until'] - current_time)
+
+        try:
+            result = self.backend.update(f"{action}:{identifier}", self._gcra(limit_config, self.clock()))
+        except Exception as e:
+            # Fail open: a storage hiccup must not lock customers out
+            logger.error(f"Rate limit backend error for {action}: {e}")
+            return {'allowed': True, 'reason': 'backend_unavailable'}
+
+        if result['allowed']:
+            logger.info(
+                f"Rate limit check passed for {action}: "
+                f"email={email}, remaining={result['remaining']}/{limit_config['max_requests']}"
+            )
+        elif result.pop('blocked', False):
             logger.warning(
                 f"Rate limit block active for {action}: "
-                f"email={email}, retry_after={retry_after}s"
+                f"email={email}, retry_after={result['retry_after']}s"
             )
-            return {
-                'allowed': False,
-                'reason': 'rate_limit_exceeded',
-                'retry_after': retry_after,
-                'message': f'Too many requests. Please try again in {retry_after} seconds.'
-            }
-        
-        # Clear block if expired
-        if data['blocked_until'] and current_time >= data['blocked_until']:
-            data['blocked_until'] = None
-            data['violation_count'] = 0
-        
-        # Remove old requests outside the window
-        window_start = current_time - limit_config['window_seconds']
-        data['requests'] = [
-            (ts, count) for ts, count in data['requests']
-            if ts >= window_start
-        ]
-        
-        # Count requests in current window
-        request_count = sum(count for ts, count in data['requests'])
-        
-        # Check if limit exceeded
-        if request_count >= limit_config['max_requests']:
-            # Block user
-            data['violation_count'] += 1
-            # Exponential backoff: double block time for repeat offenders
-            block_multiplier = min(2 ** (data['violation_count'] - 1), 8)
-            block_duration = limit_config['block_duration'] * block_multiplier
-            data['blocked_until'] = current_time + block_duration
-            
+        else:
             logger.warning(
                 f"Rate limit exceeded for {action}: "
                 f"email={email}, ip={ip_address}, hw={hardware_id}, "
-                f"count={request_count}, violations={data['violation_count']}, "
-                f"blocked_for={block_duration}s"
+                f"violations={result.pop('violations')}, blocked_for={result['retry_after']}s"
             )
-            
-            return {
-                'allowed': False,
-                'reason': 'rate_limit_exceeded',
-                'retry_after': int(block_duration),
-                'message': f'Too many requests. Blocked for {int(block_duration/60)} minutes.'
-            }
-        
-        # Allow request and record it
-        data['requests'].append((current_time, 1))
-        remaining = limit_config['max_requests'] - request_count - 1
-        
-        logger.info(
-            f"Rate limit check passed for {action}: "
-            f"email={email}, remaining={remaining}/{limit_config['max_requests']}"
-        )
-        
-        return {
-            'allowed': True,
-            'reason': 'ok',
-            'remaining': remaining,
-            'reset_after': limit_config['window_seconds']
-        }
-    
+        return result
+
     def record_request(self, action, email=None, ip_address=None, hardware_id=None):
         """Record a request (called after successful processing)"""
-        identifier = self._generate_identifier(email, ip_address, hardware_id)
         # Already recorded in check_rate_limit
         pass
-    
+
     def reset_limit(self, email=None, ip_address=None, hardware_id=None):
         """Admin function to reset rate limit for a user"""
         identifier = self._generate_identifier(email, ip_address, hardware_id)
-        if identifier in self.requests:
-            del self.requests[identifier]
+        reset = False
+        for action in self.limits:
+            reset = self.backend.delete(f"{action}:{identifier}") or reset
+        if reset:
             logger.info(f"Rate limit reset for: email={email}, ip={ip_address}, hw={hardware_id}")
-            return True
-        return False
+        return reset
 
 
 # Global rate limiter instance
@@ -19,12 +19,9 @@ Trial flow:
 
 import json
 import os
-import threading
 from datetime import datetime
 from config.settings import Config
-
-# Thread lock for file operations
-_trial_usage_lock = threading.Lock()
+from storage.file_lock import get_file_lock
 
 
 class TrialManager:
@@ -33,6 +30,8 @@ class TrialManager:
     def __init__(self):
         self.trials_file = Config.TRIALS_FILE
         self.rules_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'trial_rules.json')
+        # Cross-process reader/writer lock, shared with LicenseManager's JSON storage of trials.json
+        self.lock = get_file_lock(self.trials_file)
         self.ensure_file()
 
     def load_rules(self):
@@ -53,8 +52,8 @@ class TrialManager:
                 json.dump({}, f)
 
     def load_trials(self):
-        """Load trials with thread safety"""
-        with _trial_usage_lock:
+        """Load trials under a shared (read) lock"""
+        with self.lock.read():
             try:
                 with open(self.trials_file, 'r') as f:
                     return json.load(f)
@@ -62,8 +61,8 @@ class TrialManager:
                 return {}
 
     def save_trials(self, trials):
-        """Save trials with thread safety and atomic write"""
-        with _trial_usage_lock:
+        """Save trials under an exclusive (write) lock with atomic write"""
+        with self.lock.write():
             try:
                 temp_file = self.trials_file + '.tmp'
                 with open(temp_file, 'w') as f:
@@ -105,6 +104,11 @@ class TrialManager:
 
     def increment_trial(self, hardware_id, files_count=1):
         """Increment trial usage count"""
+        # Read-modify-write: hold the write lock so concurrent workers can't lose increments
+        with self.lock.write():
+            return self._increment_trial(hardware_id, files_count)
+
+    def _increment_trial(self, hardware_id, files_count):
         trials = self.load_trials()
         rules = self.load_rules()
         max_files = rules.get("max_files", 30)
@@ -145,12 +149,13 @@ class TrialManager:
 
     def reset_trial(self, hardware_id):
         """Reset trial usage for a hardware ID (admin function)"""
-        trials = self.load_trials()
-        if hardware_id in trials:
-            trials[hardware_id]["batches_used"] = 0
-            trials[hardware_id]["files_used"] = 0
-            if "conversions_used" in trials[hardware_id]:
-                del trials[hardware_id]["conversions_used"]
-            self.save_trials(trials)
-            return {"success": True, "message": "Trial reset"}
-        return {"success": False, "message": "Hardware ID not found"}
+        with self.lock.write():
+            trials = self.load_trials()
+            if hardware_id in trials:
+                trials[hardware_id]["batches_used"] = 0
+                trials[hardware_id]["files_used"] = 0
+                if "conversions_used" in trials[hardware_id]:
+                    del trials[hardware_id]["conversions_used"]
+                self.save_trials(trials)
+                return {"success": True, "message": "Trial reset"}
+            return {"success": False, "message": "Hardware ID not found"}
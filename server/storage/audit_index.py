@@ -0,0 +1,232 @@
+"""
+Audit Log Index
+Byte-offset index for the append-only purchases.jsonl audit log, so lookups
+seek straight to matching records instead of parsing the whole file.
+
+The index lives in a sidecar file (purchases.jsonl.idx), itself append-only,
+one line per audit record:
+
+    [start_offset, end_offset, [[field, value], ...]]
+
+refresh() indexes whatever was appended to the log since the last indexed
+offset - by this process or any other - and appends the new entries to the
+sidecar. A fresh process loads the sidecar and only scans the tail. If the log
+was replaced or truncated (e.g. restored from backup) the last entry no longer
+matches and the index is rebuilt from scratch.
+
+Indexed fields: license_key, email (lowercase), sale_id, source, customer_id,
+product (lowercase product_name) and flag (is_refunded / is_disputed /
+is_recurring / is_test when true). Records written before purchases carried an
+email are indexed under ('missing', 'email') so email searches can fall back to
+scanning just those.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from storage.file_lock import get_file_lock
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.idx'
+FLAG_FIELDS = ('is_refunded', 'is_disputed', 'is_recurring', 'is_test')
+
+
+def index_pairs(record: Dict) -> List[List[str]]:
+    """(field, value) pairs an audit record is indexed under."""
+    pairs = []
+    for field in ('license_key', 'sale_id', 'source', 'customer_id'):
+        value = record.get(field)
+        if value not in (None, ''):
+            pairs.append([field, str(value)])
+    for field, source_field in (('email', 'email'), ('product', 'product_name')):
+        value = record.get(source_field)
+        if isinstance(value, str) and value:
+            pairs.append([field, value.lower()])
+    pairs.extend(['flag', flag] for flag in FLAG_FIELDS if record.get(flag))
+    if not any(field == 'email' for field, _ in pairs):
+        pairs.append(['missing', 'email'])
+    return pairs
+
+
+class AuditLogIndex:
+    def __init__(self, log_path: str, index_path: Optional[str] = None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + INDEX_SUFFIX
+        self._lock = threading.Lock()
+        self._postings: Dict[Tuple[str, str], List[int]] = {}
+        self._indexed_offset = 0
+        self._last_entry: Optional[list] = None
+        self._loaded = False
+        # Bumped whenever the index starts over, so incremental readers can too
+        self.generation = 0
+
+    @property
+    def indexed_offset(self) -> int:
+        """Log byte offset up to which records are indexed."""
+        return self._indexed_offset
+
+    # --- building ---
+
+    def _reset(self) -> None:
+        self.generation += 1
+        self._postings = {}
+        self._indexed_offset = 0
+        self._last_entry = None
+
+    def _add(self, entry: list) -> None:
+        start, end, pairs = entry
+        for field, value in pairs:
+            self._postings.setdefault((field, value), []).append(start)
+        self._indexed_offset = end
+        self._last_entry = entry
+
+    def _load_sidecar(self) -> None:
+        self._reset()
+        stale = False
+        try:
+            with open(self.index_path, 'r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # Partial write
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    # Several processes may index the same tail; keep the first copy
+                    if entry[0] < self._indexed_offset:
+                        continue
+                    if entry[0] > self._indexed_offset:
+                        break
+                    if entry[2] and not any(field in ('email', 'missing') for field, _ in entry[2]):
+                        stale = True  # Written before records without email were marked
+                    self._add(entry)
+        except FileNotFoundError:
+            return
+
+        if stale or not self._sidecar_matches_log():
+            logger.warning(f"Audit index {self.index_path} does not match the log; rebuilding")
+            self._reset()
+            self._truncate_sidecar()
+
+    def _sidecar_matches_log(self) -> bool:
+        if self._last_entry is None:
+            return True
+        start, end, pairs = self._last_entry
+        try:
+            if os.path.getsize(self.log_path) < end:
+                return False
+            with open(self.log_path, 'rb') as f:
+                f.seek(start)
+                line = f.read(end - start)
+            return index_pairs(json.loads(line)) == pairs
+        except (OSError, ValueError):
+            return False
+
+    def _truncate_sidecar(self) -> None:
+        try:
+            with open(self.index_path, 'w'):
+                pass
+        except OSError as e:
+            logger.error(f"Failed to reset audit index {self.index_path}: {e}")
+
+    def refresh(self) -> int:
+        """
+        Index records appended since the last indexed offset.
+
+        Returns:
+            int: Number of records newly indexed
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_sidecar()
+                self._loaded = True
+            try:
+                size = os.path.getsize(self.log_path)
+            except OSError:
+                size = 0
+            if size < self._indexed_offset:
+                # Log replaced by something shorter: start over
+                self._reset()
+                self._truncate_sidecar()
+            if size == self._indexed_offset:
+                return 0
+
+            new_entries = []
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._indexed_offset)
+                offset = self._indexed_offset
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Record still being written
+                    try:
+                        pairs = index_pairs(json.loads(line)) if line.strip() else []
+                    except ValueError:
+                        pairs = []
+                    entry = [offset, offset + len(line), pairs]
+                    offset += len(line)
+                    self._add(entry)
+                    new_entries.append(entry)
+
+            if new_entries:
+                try:
+                    # Other processes may be appending the same tail
+                    with get_file_lock(self.index_path).write():
+                        with open(self.index_path, 'a') as f:
+                            f.write(''.join(json.dumps(entry) + '\n' for entry in new_entries))
+                except OSError as e:
+                    logger.error(f"Failed to update audit index {self.index_path}: {e}")
+            return len(new_entries)
+
+    def rebuild(self) -> int:
+        """Drop the sidecar and index the whole log again."""
+        with self._lock:
+            self._reset()
+            self._truncate_sidecar()
+            self._loaded = True
+        return self.refresh()
+
+    # --- lookups ---
+
+    def offsets(self, field: str, value: str) -> List[int]:
+        """Log offsets of records indexed under (field, value), in log order."""
+        self.refresh()
+        if field in ('email', 'product'):
+            value = value.lower()
+        with self._lock:
+            return list(self._postings.get((field, str(value)), ()))
+
+    def find(self, field: str, value: str) -> List[Dict]:
+        """Records indexed under (field, value), in log order."""
+        return self.read_at(self.offsets(field, value))
+
+    def read_at(self, offsets: List[int]) -> List[Dict]:
+        """Records starting at the given log offsets, in the order given."""
+        records = []
+        if not offsets:
+            return records
+        with open(self.log_path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(json.loads(f.readline()))
+        return records
+
+    def read_from(self, offset: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """(offset, record) for every complete record at or after offset, up to the indexed end."""
+        self.refresh()
+        end = self._indexed_offset
+        if offset >= end:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            while offset < end:
+                line = f.readline()
+                start, offset = offset, offset + len(line)
+                if line.strip():
+                    try:
+                        yield start, json.loads(line)
+                    except ValueError:
+                        continue
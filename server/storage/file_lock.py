@@ -0,0 +1,171 @@
+"""
+File Locks
+Reader/writer locks for the JSON data files that hold across worker processes
+(multi-worker WSGI), not just threads.
+
+Each data file gets a sidecar lock file (<file>.lock) locked with fcntl.flock:
+shared for readers, exclusive for writers. The data file itself can't be
+locked because writes replace it (temp file + os.replace). Every acquisition
+opens its own descriptor, so threads of one process contend like processes
+do; a thread that already holds a file's lock may re-enter it (a write lock
+covers nested reads), but a read lock can't be upgraded to a write lock.
+
+Locks give up after Config.FILE_LOCK_TIMEOUT seconds with FileLockTimeout and
+record wait metrics (see lock_stats()). Without fcntl (Windows development
+machines) locking falls back to a per-process exclusive lock.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = '.lock'
+DEFAULT_TIMEOUT_SECONDS = 10.0
+SLOW_WAIT_SECONDS = 1.0
+
+_POLL_MIN_SECONDS = 0.001
+_POLL_MAX_SECONDS = 0.05
+
+
+class FileLockTimeout(TimeoutError):
+    """A file lock could not be acquired within its timeout."""
+
+
+class FileRWLock:
+    def __init__(self, path: str, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.path = path
+        self.lock_path = path + LOCK_SUFFIX
+        self.timeout = timeout
+        self._held = threading.local()  # mode ('read' / 'write') and depth for this thread
+        self._fallback = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'read_acquired': 0,
+            'write_acquired': 0,
+            'timeouts': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+        }
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._acquire('read'):
+            yield
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._acquire('write'):
+            yield
+
+    @contextmanager
+    def _acquire(self, mode: str) -> Iterator[None]:
+        held = getattr(self._held, 'mode', None)
+        if held is not None:
+            if held == 'read' and mode == 'write':
+                raise RuntimeError(f"Cannot upgrade read lock to write lock: {self.path}")
+            self._held.depth += 1
+            try:
+                yield
+            finally:
+                self._held.depth -= 1
+            return
+
+        started = time.monotonic()
+        handle = self._lock(mode, started)
+        self._record(mode, time.monotonic() - started)
+        self._held.mode, self._held.depth = mode, 0
+        try:
+            yield
+        finally:
+            self._held.mode = None
+            self._unlock(handle)
+
+    def _lock(self, mode: str, started: float):
+        deadline = started + self.timeout
+        if not FCNTL_AVAILABLE:
+            if not self._fallback.acquire(timeout=self.timeout):
+                self._timed_out(mode)
+            return None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        handle = open(self.lock_path, 'a+')
+        operation = (fcntl.LOCK_SH if mode == 'read' else fcntl.LOCK_EX) | fcntl.LOCK_NB
+        delay = _POLL_MIN_SECONDS
+        while True:
+            try:
+                fcntl.flock(handle.fileno(), operation)
+                return handle
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    handle.close()
+                    self._timed_out(mode)
+                time.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+    def _unlock(self, handle) -> None:
+        if handle is None:
+            self._fallback.release()
+            return
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            handle.close()
+
+    def _timed_out(self, mode: str) -> None:
+        with self._stats_lock:
+            self._stats['timeouts'] += 1
+        logger.error(f"Timed out after {self.timeout:.1f}s waiting for {mode} lock on {self.path}")
+        raise FileLockTimeout(f"Could not acquire {mode} lock on {self.path} within {self.timeout:.1f}s")
+
+    def _record(self, mode: str, waited: float) -> None:
+        with self._stats_lock:
+            self._stats[f'{mode}_acquired'] += 1
+            self._stats['wait_seconds_total'] += waited
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+        if waited >= SLOW_WAIT_SECONDS:
+            logger.warning(f"Waited {waited:.2f}s for {mode} lock on {self.path}")
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        acquired = stats['read_acquired'] + stats['write_acquired']
+        stats['wait_seconds_avg'] = stats['wait_seconds_total'] / acquired if acquired else 0.0
+        return stats
+
+
+_locks: Dict[str, FileRWLock] = {}
+_locks_guard = threading.Lock()
+
+
+def get_file_lock(path: str, timeout: float = None) -> FileRWLock:
+    """The process-wide lock for a data file (one instance per path, so metrics and re-entry are shared)."""
+    path = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            if timeout is None:
+                try:
+                    from config.settings import Config
+                    timeout = Config.FILE_LOCK_TIMEOUT
+                except ImportError:
+                    timeout = DEFAULT_TIMEOUT_SECONDS
+            lock = _locks[path] = FileRWLock(path, timeout)
+        return lock
+
+
+def lock_stats() -> Dict[str, Dict]:
+    """Wait metrics of every file lock used by this process, keyed by file name."""
+    with _locks_guard:
+        locks = list(_locks.values())
+    return {os.path.basename(lock.path): lock.stats() for lock in locks}
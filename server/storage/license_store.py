@@ -0,0 +1,442 @@
+"""
+License Storage
+Pluggable persistence for LicenseManager's licenses and trial licenses.
+
+Backends (Config.LICENSE_STORAGE):
+- 'sqlite' (default): one SQLite database in WAL mode. Every record is a row
+  holding its JSON plus indexed lookup columns (email, hardware_id, sale_id,
+  platform + platform_transaction_id, source_license_key), so validation and
+  lookups read one row instead of parsing every license.
+- 'json': the original licenses.json / trials.json files, loaded and written
+  whole (kept for small deployments and rollback), under cross-process
+  reader/writer file locks shared with TrialManager.
+
+The first time the SQLite database is opened it imports the JSON files once
+(in one transaction); the JSON files are left in place untouched.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from storage.file_lock import FileRWLock, get_file_lock
+
+logger = logging.getLogger(__name__)
+
+LICENSES = 'licenses'
+TRIALS = 'trials'
+TABLES = (LICENSES, TRIALS)
+
+# Lookup fields every backend can filter on (see index_values)
+INDEX_FIELDS = ('email', 'hardware_id', 'sale_id', 'platform', 'platform_transaction_id', 'source_license_key')
+
+# Field each platform's records carried their transaction ID in before
+# platform_transaction_id existed (top level or in purchase_info)
+PLATFORM_ID_FIELDS = {
+    'gumroad': 'sale_id',
+    'msstore': 'order_id',
+    'stripe': 'payment_intent_id',
+    'direct': 'admin_ref',
+    'trial': 'trial_id',
+}
+
+BUSY_TIMEOUT_SECONDS = 10.0
+_MIGRATED_META_KEY = 'json_migrated_at'
+# Bump when index_values changes so existing rows get their lookup columns recomputed
+INDEX_VERSION = 2
+_INDEX_VERSION_META_KEY = 'index_version'
+
+
+def index_values(record: Dict) -> Dict[str, Optional[str]]:
+    """
+    Lookup values of a license record.
+
+    Legacy records are covered the way LicenseManager's lookups always treated
+    them: sale_id may live in purchase_info, platform may only be known from
+    purchase_info.source, and records without platform_transaction_id carry
+    their transaction ID in the platform's own field (PLATFORM_ID_FIELDS, e.g.
+    order_id for MS Store), on the record or in purchase_info, else as sale_id.
+    """
+    purchase_info = record.get('purchase_info') or {}
+    email = record.get('email')
+    sale_id = record.get('sale_id') or purchase_info.get('sale_id')
+    platform = record.get('platform') or purchase_info.get('source')
+    id_field = PLATFORM_ID_FIELDS.get(platform, 'sale_id')
+    transaction_id = (record.get('platform_transaction_id') or record.get(id_field)
+                      or purchase_info.get(id_field) or sale_id)
+    return {
+        'email': email.lower() if isinstance(email, str) else None,
+        'hardware_id': record.get('hardware_id'),
+        'sale_id': sale_id,
+        'platform': platform,
+        'platform_transaction_id': transaction_id,
+        'source_license_key': record.get('source_license_key'),
+    }
+
+
+def _matches(record: Dict, criteria: Dict[str, str]) -> bool:
+    values = index_values(record)
+    return all(values[field] == value for field, value in criteria.items())
+
+
+def _normalize_criteria(criteria: Dict[str, str]) -> Dict[str, str]:
+    unknown = set(criteria) - set(INDEX_FIELDS)
+    if unknown:
+        raise ValueError(f"Not an indexed field: {', '.join(sorted(unknown))}")
+    if isinstance(criteria.get('email'), str):
+        criteria = dict(criteria, email=criteria['email'].lower())
+    return criteria
+
+
+class LicenseStore(ABC):
+    """
+    Storage interface: records are plain dicts keyed by license key, in two
+    tables (LICENSES, TRIALS). Record order is insertion order.
+    """
+
+    @abstractmethod
+    def get(self, table: str, key: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    def put(self, table: str, key: str, record: Dict) -> bool:
+        """Insert or replace one record; False if it could not be written."""
+
+    @abstractmethod
+    def update(self, table: str, mutations: Dict[str, Callable[[Dict], None]]) -> int:
+        """
+        Atomically read-modify-write existing records: each mutation is called
+        with the current record and edits it in place. Missing keys are skipped.
+
+        Returns:
+            int: Number of records written (-1 if the write failed)
+        """
+
+    @abstractmethod
+    def find(self, table: str, **criteria) -> Dict[str, Dict]:
+        """
+        Records whose index_values match all criteria (email is compared
+        case-insensitively), e.g. find(LICENSES, platform='gumroad', platform_transaction_id=sale_id).
+        A None criterion matches nothing.
+        """
+
+    @abstractmethod
+    def load_all(self, table: str) -> Dict[str, Dict]:
+        pass
+
+    @abstractmethod
+    def save_all(self, table: str, records: Dict[str, Dict]) -> bool:
+        """Replace the whole table with records; False if it could not be written."""
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLicenseStore(LicenseStore):
+    """licenses.json / trials.json, read and rewritten whole (atomic temp file + rename)."""
+
+    def __init__(self, paths: Dict[str, str]):
+        self.paths = dict(paths)
+        for path in self.paths.values():
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    json.dump({}, f)
+
+    def _lock(self, table: str) -> FileRWLock:
+        return get_file_lock(self.paths[table])
+
+    def _read(self, table: str) -> Dict[str, Dict]:
+        try:
+            with open(self.paths[table], 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load {table}: {e}")
+            return {}
+
+    def _write(self, table: str, records: Dict[str, Dict]) -> bool:
+        path = self.paths[table]
+        temp_file = path + '.tmp'
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(records, f, indent=2)
+            os.replace(temp_file, path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save {table}: {e}")
+            try:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            except OSError:
+                pass
+            return False
+
+    def get(self, table: str, key: str) -> Optional[Dict]:
+        return self.load_all(table).get(key)
+
+    def put(self, table: str, key: str, record: Dict) -> bool:
+        with self._lock(table).write():
+            records = self._read(table)
+            records[key] = record
+            return self._write(table, records)
+
+    def update(self, table: str, mutations: Dict[str, Callable[[Dict], None]]) -> int:
+        with self._lock(table).write():
+            records = self._read(table)
+            keys = [key for key in mutations if key in records]
+            for key in keys:
+                mutations[key](records[key])
+            if not keys:
+                return 0
+            return len(keys) if self._write(table, records) else -1
+
+    def find(self, table: str, **criteria) -> Dict[str, Dict]:
+        criteria = _normalize_criteria(criteria)
+        if None in criteria.values():
+            return {}
+        return {key: record for key, record in self.load_all(table).items() if _matches(record, criteria)}
+
+    def load_all(self, table: str) -> Dict[str, Dict]:
+        with self._lock(table).read():
+            return self._read(table)
+
+    def save_all(self, table: str, records: Dict[str, Dict]) -> bool:
+        with self._lock(table).write():
+            return self._write(table, records)
+
+
+class SqliteLicenseStore(LicenseStore):
+    """
+    SQLite (WAL) backend. Connections are per thread; writes run in
+    BEGIN IMMEDIATE transactions so concurrent workers queue on the busy
+    timeout instead of failing.
+    """
+
+    def __init__(self, db_path: str, json_paths: Optional[Dict[str, str]] = None):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._create_schema()
+        if json_paths:
+            self.import_json(json_paths)
+
+    # --- connection / schema ---
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: no implicit transactions, _transaction() issues BEGIN itself
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _create_schema(self) -> None:
+        with self._transaction() as conn:
+            for table in TABLES:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        license_key TEXT PRIMARY KEY,
+                        data TEXT NOT NULL,
+                        email TEXT,
+                        hardware_id TEXT,
+                        sale_id TEXT,
+                        platform TEXT,
+                        platform_transaction_id TEXT,
+                        source_license_key TEXT
+                    )""")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_email ON {table}(email)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_hardware_id ON {table}(hardware_id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_sale_id ON {table}(sale_id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_platform_txn "
+                             f"ON {table}(platform, platform_transaction_id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_source_key ON {table}(source_license_key)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            version = conn.execute("SELECT value FROM meta WHERE name = ?", (_INDEX_VERSION_META_KEY,)).fetchone()
+            if version is None or version[0] != str(INDEX_VERSION):
+                # Rows written by an older index_values: recompute their lookup columns
+                for table in TABLES:
+                    for key, data in conn.execute(f"SELECT license_key, data FROM {table}").fetchall():
+                        self._upsert(conn, table, key, json.loads(data))
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                             (_INDEX_VERSION_META_KEY, str(INDEX_VERSION)))
+
+    @staticmethod
+    def _check_table(table: str) -> str:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        return table
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, table: str, key: str, record: Dict) -> None:
+        values = index_values(record)
+        # ON CONFLICT ... DO UPDATE keeps the rowid, so updates don't reorder records
+        conn.execute(
+            f"""INSERT INTO {table} (license_key, data, {', '.join(INDEX_FIELDS)})
+                VALUES (?, ?, {', '.join('?' for _ in INDEX_FIELDS)})
+                ON CONFLICT(license_key) DO UPDATE SET data = excluded.data,
+                {', '.join(f'{field} = excluded.{field}' for field in INDEX_FIELDS)}""",
+            (key, json.dumps(record), *(values[field] for field in INDEX_FIELDS)),
+        )
+
+    # --- LicenseStore ---
+
+    def get(self, table: str, key: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            f"SELECT data FROM {self._check_table(table)} WHERE license_key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, table: str, key: str, record: Dict) -> bool:
+        try:
+            with self._transaction() as conn:
+                self._upsert(conn, self._check_table(table), key, record)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save {table} record {key}: {e}")
+            return False
+
+    def update(self, table: str, mutations: Dict[str, Callable[[Dict], None]]) -> int:
+        table = self._check_table(table)
+        written = 0
+        try:
+            with self._transaction() as conn:
+                for key, mutate in mutations.items():
+                    row = conn.execute(f"SELECT data FROM {table} WHERE license_key = ?", (key,)).fetchone()
+                    if row is None:
+                        continue
+                    record = json.loads(row[0])
+                    mutate(record)
+                    self._upsert(conn, table, key, record)
+                    written += 1
+            return written
+        except sqlite3.Error as e:
+            logger.error(f"Failed to update {table}: {e}")
+            return -1
+
+    def find(self, table: str, **criteria) -> Dict[str, Dict]:
+        criteria = _normalize_criteria(criteria)
+        if None in criteria.values():
+            return {}
+        where = ' AND '.join(f"{field} = ?" for field in criteria) or '1'
+        rows = self._connection().execute(
+            f"SELECT license_key, data FROM {self._check_table(table)} WHERE {where} ORDER BY rowid",
+            tuple(criteria.values()),
+        )
+        return {key: json.loads(data) for key, data in rows}
+
+    def load_all(self, table: str) -> Dict[str, Dict]:
+        rows = self._connection().execute(
+            f"SELECT license_key, data FROM {self._check_table(table)} ORDER BY rowid")
+        return {key: json.loads(data) for key, data in rows}
+
+    def save_all(self, table: str, records: Dict[str, Dict]) -> bool:
+        table = self._check_table(table)
+        try:
+            with self._transaction() as conn:
+                existing = {row[0] for row in conn.execute(f"SELECT license_key FROM {table}")}
+                conn.executemany(f"DELETE FROM {table} WHERE license_key = ?",
+                                 [(key,) for key in existing - set(records)])
+                for key, record in records.items():
+                    self._upsert(conn, table, key, record)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save {table}: {e}")
+            return False
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # --- migration ---
+
+    def import_json(self, json_paths: Dict[str, str], force: bool = False) -> Dict[str, int]:
+        """
+        One-shot import of licenses.json / trials.json (skipped once done, unless force).
+
+        trials.json is shared with TrialManager's per-device usage counters; only
+        entries that are trial licenses (have an expiry_date) are imported.
+
+        Returns:
+            dict: {table: records imported}
+        """
+        imported = {}
+        with self._transaction() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE name = ?", (_MIGRATED_META_KEY,)).fetchone()
+            if done and not force:
+                return imported
+            for table, path in json_paths.items():
+                table = self._check_table(table)
+                if not os.path.exists(path):
+                    continue
+                with open(path, 'r') as f:
+                    records = json.load(f)
+                count = 0
+                for key, record in records.items():
+                    if not isinstance(record, dict) or (table == TRIALS and 'expiry_date' not in record):
+                        continue
+                    self._upsert(conn, table, key, record)
+                    count += 1
+                imported[table] = count
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, datetime('now'))",
+                         (_MIGRATED_META_KEY,))
+        if imported:
+            logger.info(f"Imported JSON license data into {self.db_path}: {imported}")
+        return imported
+
+
+def backup_sqlite_database(source_path: str, dest_path: str) -> None:
+    """
+    Copy a live SQLite database with the online backup API (consistent even
+    while other connections write). Also used in reverse to restore.
+    """
+    source = sqlite3.connect(source_path, timeout=BUSY_TIMEOUT_SECONDS)
+    try:
+        dest = sqlite3.connect(dest_path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            source.backup(dest)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+
+
+def create_license_store(config=None) -> LicenseStore:
+    """Build the backend selected by Config.LICENSE_STORAGE."""
+    if config is None:
+        from config.settings import Config as config
+    json_paths = {LICENSES: config.LICENSES_FILE, TRIALS: config.TRIALS_FILE}
+    backend = (getattr(config, 'LICENSE_STORAGE', 'sqlite') or 'sqlite').lower()
+    if backend == 'json':
+        return JsonLicenseStore(json_paths)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown LICENSE_STORAGE backend: {backend}")
+    return SqliteLicenseStore(config.LICENSES_DB_FILE, json_paths)
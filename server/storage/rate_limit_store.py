@@ -0,0 +1,155 @@
+"""
+Rate Limit Store
+Shared state for the API rate limiter (services/rate_limiter.py), one small
+entry per (action, caller) key.
+
+Backends (Config.RATE_LIMIT_BACKEND):
+- 'sqlite' (default): data/rate_limits.db in WAL mode, shared by every worker
+  process on the host
+- 'memory': per-process dict (single worker / tests)
+
+Any store with an atomic per-key read-modify-write and key expiry can stand in
+(e.g. Redis via WATCH/MULTI or a Lua script, with expires_at as EXPIREAT).
+Expiry is lazy: reads ignore expired entries and every update deletes a few
+expired ones, so there is no periodic full scan.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+# update() callback: current state (None if absent/expired) -> (new state or None to delete, expires_at, result)
+StateUpdate = Callable[[Optional[list]], Tuple[Optional[list], float, dict]]
+
+# Expired entries removed per update (amortized cleanup)
+EXPIRE_BATCH = 8
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+class RateLimitBackend(ABC):
+    """
+    Key/state storage for RateLimiter.
+
+    update() must run the callback atomically for its key across every
+    process sharing the backend.
+    """
+
+    @abstractmethod
+    def update(self, key: str, fn: StateUpdate) -> dict:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process backend (limits are not shared between workers)."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._entries: 'OrderedDict[str, Tuple[list, float]]' = OrderedDict()  # Least recently updated first
+        self._lock = threading.Lock()
+
+    def update(self, key: str, fn: StateUpdate) -> dict:
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(key)
+            state = entry[0] if entry and entry[1] > now else None
+            new_state, expires_at, result = fn(state)
+            if new_state is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = (new_state, expires_at)
+                self._entries.move_to_end(key)
+            self._expire_some(now)
+            return result
+
+    def _expire_some(self, now: float) -> None:
+        for _ in range(EXPIRE_BATCH):
+            if not self._entries:
+                return
+            key, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                return
+            del self._entries[key]
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteRateLimitBackend(RateLimitBackend):
+    """Backend shared by every process on the host (one SQLite file, WAL mode)."""
+
+    def __init__(self, db_path: str, clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.clock = clock
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS rate_limits (
+                                key TEXT PRIMARY KEY,
+                                state TEXT NOT NULL,
+                                expires_at REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_expires ON rate_limits(expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def update(self, key: str, fn: StateUpdate) -> dict:
+        with self._transaction() as conn:
+            now = self.clock()
+            row = conn.execute("SELECT state, expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            state = json.loads(row[0]) if row and row[1] > now else None
+            new_state, expires_at, result = fn(state)
+            if new_state is None:
+                conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO rate_limits (key, state, expires_at) VALUES (?, ?, ?)",
+                             (key, json.dumps(new_state), expires_at))
+            conn.execute("DELETE FROM rate_limits WHERE key IN "
+                         "(SELECT key FROM rate_limits WHERE expires_at <= ? LIMIT ?)", (now, EXPIRE_BATCH))
+            return result
+
+    def delete(self, key: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,)).rowcount > 0
+
+
+def create_rate_limit_backend(config=None) -> RateLimitBackend:
+    """Build the backend selected by Config.RATE_LIMIT_BACKEND."""
+    if config is None:
+        from config.settings import Config as config
+    backend = (getattr(config, 'RATE_LIMIT_BACKEND', 'sqlite') or 'sqlite').lower()
+    if backend == 'memory':
+        return MemoryRateLimitBackend()
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+    return SqliteRateLimitBackend(config.RATE_LIMIT_DB_FILE)
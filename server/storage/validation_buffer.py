@@ -0,0 +1,127 @@
+"""
+Validation Telemetry Buffer
+Write-behind coalescing for the fields validate_license touches on every app
+launch (last_validation, validation_count).
+
+Validations are counted in memory per (table, license key) and written in one
+batch - one SQLite transaction or one JSON rewrite - when max_pending licenses
+are waiting, flush_interval seconds after the first buffered validation, and
+at interpreter exit. Flushes are additive (count += delta, last_validation =
+latest) and go through LicenseStore.update, so they never overwrite a
+synchronous state change (activation, transfer, refund) made in between, and
+several worker processes can buffer the same license.
+
+Stored telemetry may lag by up to flush_interval; nothing that decides access
+depends on it at that granularity (the offline grace period is in days).
+flush_interval <= 0 writes every validation immediately.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _telemetry_mutation(count: int, last_validation: str) -> Callable[[Dict], None]:
+    def apply(record: Dict) -> None:
+        record['validation_count'] = (record.get('validation_count') or 0) + count
+        if not record.get('last_validation') or record['last_validation'] < last_validation:
+            record['last_validation'] = last_validation
+    return apply
+
+
+class ValidationTelemetryBuffer:
+    def __init__(self, store, flush_interval: float = 30.0, max_pending: int = 100):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        # (table, license_key) -> [validations, latest ISO timestamp]
+        self._pending: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.flushes = 0
+        atexit.register(self.flush)
+
+    def record(self, table: str, license_key: str, validated_at: str) -> None:
+        """Count one successful validation of license_key at validated_at (ISO timestamp)."""
+        if self.flush_interval <= 0:
+            self.store.update(table, {license_key: _telemetry_mutation(1, validated_at)})
+            return
+
+        with self._lock:
+            entry = self._pending.get((table, license_key))
+            if entry is None:
+                self._pending[(table, license_key)] = [1, validated_at]
+            else:
+                entry[0] += 1
+                entry[1] = max(entry[1], validated_at)
+            full = len(self._pending) >= self.max_pending
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write all buffered telemetry now.
+
+        Returns:
+            int: Number of license records written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            by_table: Dict[str, Dict[str, Callable[[Dict], None]]] = {}
+            for (table, key), (count, last_validation) in batch.items():
+                by_table.setdefault(table, {})[key] = _telemetry_mutation(count, last_validation)
+
+            written = 0
+            for table, mutations in by_table.items():
+                result = self.store.update(table, mutations)
+                if result < 0:
+                    self._requeue(table, batch)
+                else:
+                    written += result
+            self.flushes += 1
+            logger.debug(f"Flushed validation telemetry: {len(batch)} licenses, {written} written")
+            return written
+
+    def _requeue(self, table: str, batch: Dict[Tuple[str, str], List]) -> None:
+        """Put a failed table's batch back, merged with what arrived meanwhile."""
+        with self._lock:
+            for (entry_table, key), (count, last_validation) in batch.items():
+                if entry_table != table:
+                    continue
+                entry = self._pending.setdefault((table, key), [0, last_validation])
+                entry[0] += count
+                entry[1] = max(entry[1], last_validation)
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            # Validations arriving during the flush start a fresh timer
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Validation telemetry flush failed: {e}")
+
+    def close(self) -> None:
+        """Stop the timer and flush what is left."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+        atexit.unregister(self.flush)
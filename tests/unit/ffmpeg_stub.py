@@ -0,0 +1,25 @@
+"""
+Scoped ffmpeg-python stub for unit tests.
+
+ffmpeg-python may not be installed where the unit tests run. Import the client
+modules inside stub_ffmpeg() so the stub exists only during that import and no
+module mock leaks into other test modules; tests then patch
+client.core.<module>.ffmpeg rather than the 'ffmpeg' module name.
+"""
+import importlib.util
+import sys
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+
+@contextmanager
+def stub_ffmpeg():
+    """Install a MagicMock 'ffmpeg' module for the duration of the block (only if it is missing)."""
+    stubbed = 'ffmpeg' not in sys.modules and importlib.util.find_spec('ffmpeg') is None
+    if stubbed:
+        sys.modules['ffmpeg'] = MagicMock()
+    try:
+        yield
+    finally:
+        if stubbed:
+            sys.modules.pop('ffmpeg', None)
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# purchase_audit_helper lives at the repo root and puts server/ on the path itself
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from purchase_audit_helper import PurchaseAuditLog
+from storage.audit_index import AuditLogIndex
+
+
+class TestAuditLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, 'purchases.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, *records, raw=''):
+        with open(self.log, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            f.write(raw)
+
+    def test_lookups_seek_to_matches(self):
+        self._append({'license_key': 'A', 'sale_id': 'S1', 'source': 'gumroad', 'email': 'Buyer@X.com'},
+                     {'license_key': 'B', 'source': 'msstore', 'is_refunded': True},
+                     {'license_key': 'A', 'event': 'refund'})
+        index = AuditLogIndex(self.log)
+        self.assertEqual([r.get('event') for r in index.find('license_key', 'A')], [None, 'refund'])
+        self.assertEqual(index.find('sale_id', 'S1')[0]['license_key'], 'A')
+        self.assertEqual(index.find('email', 'buyer@x.com')[0]['license_key'], 'A')
+        self.assertEqual([r['license_key'] for r in index.find('flag', 'is_refunded')], ['B'])
+        self.assertEqual(index.find('license_key', 'missing'), [])
+
+    def test_new_process_scans_only_the_tail(self):
+        self._append({'license_key': 'A'}, {'license_key': 'B'})
+        self.assertEqual(AuditLogIndex(self.log).refresh(), 2)
+
+        # Half-written record is left for the next refresh
+        self._append({'license_key': 'C'}, raw='{"license_key": "D"')
+        index = AuditLogIndex(self.log)
+        self.assertEqual(index.refresh(), 1)
+        self.assertEqual(index.find('license_key', 'D'), [])
+        self._append(raw=', "source": "gumroad"}\n')
+        self.assertEqual(index.find('license_key', 'D')[0]['source'], 'gumroad')
+
+    def test_replaced_log_is_reindexed(self):
+        self._append({'license_key': 'A'}, {'license_key': 'B'})
+        AuditLogIndex(self.log).refresh()
+        os.remove(self.log)
+        self._append({'license_key': 'X', 'padding': 'longer record'}, {'license_key': 'Y'})
+        index = AuditLogIndex(self.log)
+        self.assertEqual(index.find('license_key', 'A'), [])
+        self.assertEqual(index.find('license_key', 'Y')[0]['license_key'], 'Y')
+
+
+class TestPurchaseAuditLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, 'purchases.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, *records):
+        with open(self.log, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+    def test_email_search_covers_records_without_email_field(self):
+        self._append({'license_key': 'OLD', 'purchase_info': {'email': 'buyer@x.com'}},
+                     {'license_key': 'OTHER', 'purchase_info': {'email': 'someone@y.com'}},
+                     {'license_key': 'NEW', 'email': 'Buyer@X.com'},
+                     {'license_key': 'NEW2', 'email': 'other@x.com', 'note': 'buyer@x.com'})
+        audit = PurchaseAuditLog(self.log)
+        self.assertEqual([r['license_key'] for r in audit.get_purchases_by_email(' BUYER@x.com')], ['OLD', 'NEW'])
+
+    def test_sidecar_without_missing_email_marks_is_rebuilt(self):
+        self._append({'license_key': 'OLD', 'purchase_info': {'email': 'buyer@x.com'}})
+        with open(self.log + '.idx', 'w') as f:
+            f.write(json.dumps([0, os.path.getsize(self.log), [['license_key', 'OLD']]]) + '\n')
+        self.assertEqual(len(AuditLogIndex(self.log).offsets('missing', 'email')), 1)
+
+    def test_stats_are_incremental(self):
+        audit = PurchaseAuditLog(self.log)
+        self.assertEqual(audit.get_purchase_stats()['total_purchases'], 0)
+
+        self._append({'license_key': 'A', 'source': 'gumroad', 'product_name': 'Pro', 'price': 10},
+                     {'license_key': 'B', 'source': 'gumroad', 'product_name': 'Pro', 'price': 30,
+                      'is_refunded': True})
+        stats = audit.get_purchase_stats()
+        self.assertEqual((stats['total_purchases'], stats['total_revenue'], stats['refunded_count']), (2, 10.0, 1))
+
+        self._append({'license_key': 'C', 'source': 'msstore', 'product_name': 'Pro', 'price': 20})
+        stats = audit.get_purchase_stats()
+        self.assertEqual(stats['sources'], {'gumroad': 2, 'msstore': 1})
+        self.assertEqual(stats['top_products'], [('Pro', 3)])
+        self.assertEqual(stats['average_price'], 15.0)
+        self.assertEqual([p['license_key'] for p in audit.get_purchases_by_product('pro')], ['A', 'B', 'C'])
+
+
+if __name__ == '__main__':
+    unittest.main()
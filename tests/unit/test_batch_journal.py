@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from client.core import batch_journal
+from client.core.batch_journal import BatchJournal, load_last_batch
+
+PARAMS = {'type': 'image', 'format': 'webp', 'quality': 80}
+
+
+class TestBatchJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'last_batch.json')
+        self.inputs = []
+        for name in ('a.png', 'b.png', 'c.png'):
+            file_path = os.path.join(self.tmp.name, name)
+            with open(file_path, 'wb') as fh:
+                fh.write(b'pixels')
+            self.inputs.append(file_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, data=b'encoded'):
+        with open(path, 'wb') as fh:
+            fh.write(data)
+
+    def test_resume_requeues_only_unfinished_units(self):
+        journal = BatchJournal.create(self.path, self.inputs, PARAMS)
+        done_out = os.path.join(self.tmp.name, 'a.webp')
+        journal.mark_running(self.inputs[0])
+        journal.output_planned(self.inputs[0], done_out)
+        self._write(done_out)
+        journal.output_written(self.inputs[0], done_out)
+        journal.mark_finished(self.inputs[0], True)
+
+        # Crash while the second file is half written (no close(): state is in the log)
+        partial_out = os.path.join(self.tmp.name, 'b.webp')
+        journal.mark_running(self.inputs[1])
+        journal.output_planned(self.inputs[1], partial_out)
+        self._write(partial_out, b'trunc')
+        journal._log.close()
+
+        resumed = load_last_batch(self.path)
+        self.assertEqual(resumed.params, PARAMS)
+        files = resumed.prepare_resume()
+        self.assertEqual(files, [os.path.abspath(p) for p in self.inputs[1:]])
+        self.assertTrue(os.path.exists(done_out))
+        self.assertFalse(os.path.exists(partial_out))
+
+    def test_completed_variants_of_unfinished_unit_are_kept(self):
+        journal = BatchJournal.create(self.path, self.inputs[:1], PARAMS)
+        first = os.path.join(self.tmp.name, 'a_q90.webp')
+        second = os.path.join(self.tmp.name, 'a_q50.webp')
+        journal.mark_running(self.inputs[0])
+        for output in (first, second):
+            journal.output_planned(self.inputs[0], output)
+            self._write(output)
+        journal.output_written(self.inputs[0], first)
+        journal.close()
+
+        files = BatchJournal.load(self.path).prepare_resume()
+        self.assertEqual(len(files), 1)
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+
+    def test_preexisting_outputs_are_never_deleted(self):
+        existing = os.path.join(self.tmp.name, 'a.webp')
+        self._write(existing, b'user file')
+        journal = BatchJournal.create(self.path, self.inputs[:1], PARAMS)
+        journal.mark_running(self.inputs[0])
+        journal.output_planned(self.inputs[0], existing)
+        journal.close()
+
+        BatchJournal.load(self.path).prepare_resume()
+        self.assertTrue(os.path.exists(existing))
+
+    def test_finished_batch_is_not_offered(self):
+        journal = BatchJournal.create(self.path, self.inputs, PARAMS)
+        for file_path in self.inputs:
+            journal.mark_running(file_path)
+            journal.mark_finished(file_path, file_path != self.inputs[2] or None)
+        journal.close()
+        self.assertIsNone(load_last_batch(self.path))
+        self.assertEqual(BatchJournal.load(self.path).counts()['skipped'], 1)
+
+    def test_missing_output_of_done_unit_is_redone(self):
+        journal = BatchJournal.create(self.path, self.inputs[:1], PARAMS)
+        output = os.path.join(self.tmp.name, 'a.webp')
+        journal.output_planned(self.inputs[0], output)
+        self._write(output)
+        journal.output_written(self.inputs[0], output)
+        journal.mark_finished(self.inputs[0], True)
+        journal.close()
+        os.remove(output)
+        self.assertEqual(BatchJournal.load(self.path).unfinished_files(), [os.path.abspath(self.inputs[0])])
+
+    def test_torn_log_line_is_ignored(self):
+        journal = BatchJournal.create(self.path, self.inputs[:1], PARAMS)
+        journal.mark_running(self.inputs[0])
+        journal._log.write('{"event": "sta')
+        journal._log.close()
+        self.assertEqual(BatchJournal.load(self.path).counts()['running'], 1)
+
+    def test_checkpoint_truncates_log(self):
+        original = batch_journal.CHECKPOINT_EVENTS
+        batch_journal.CHECKPOINT_EVENTS = 2
+        try:
+            journal = BatchJournal.create(self.path, self.inputs[:1], PARAMS)
+            journal.mark_running(self.inputs[0])
+            journal.mark_finished(self.inputs[0], False)
+            self.assertEqual(os.path.getsize(journal.log_path), 0)
+            self.assertEqual(BatchJournal.load(self.path).counts()['failed'], 1)
+        finally:
+            batch_journal.CHECKPOINT_EVENTS = original
+
+
+if __name__ == '__main__':
+    unittest.main()
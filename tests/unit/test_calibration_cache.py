@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core import calibration_cache
+    from client.core.calibration_cache import CalibrationCache
+    from client.core import size_estimator
+
+CALIBRATION = {'preset_sizes': [300, 200, 100], 'reference_size': 200, 'method': 'calibrated'}
+
+
+class TestCalibrationCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'clip.mp4')
+        with open(self.source, 'wb') as fh:
+            fh.write(b'frames')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_settings_change_misses(self):
+        cache = CalibrationCache()
+        cache.put('gif', self.source, {'gif_resize_values': ['640']}, CALIBRATION)
+        self.assertEqual(cache.get('gif', self.source, {'gif_resize_values': ['640']})['reference_size'], 200)
+        self.assertIsNone(cache.get('gif', self.source, {'gif_resize_values': ['320']}))
+        self.assertIsNone(cache.get('video', self.source, {'gif_resize_values': ['640']}))
+
+    def test_source_change_misses(self):
+        cache = CalibrationCache()
+        cache.put('image', self.source, {}, CALIBRATION)
+        with open(self.source, 'ab') as fh:
+            fh.write(b'edited')
+        self.assertIsNone(cache.get('image', self.source, {}))
+
+    def test_lru_bound(self):
+        cache = CalibrationCache(max_entries=2)
+        for width in ('1', '2', '3'):
+            cache.put('gif', self.source, {'w': width}, CALIBRATION)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('gif', self.source, {'w': '1'}))
+
+    def test_persistence_roundtrip(self):
+        persist_path = os.path.join(self.tmp.name, 'calibration.json')
+        CalibrationCache(persist_path=persist_path).put('image', self.source, {}, CALIBRATION)
+        reloaded = CalibrationCache(persist_path=persist_path)
+        self.assertEqual(reloaded.get('image', self.source, {})['preset_sizes'], [300, 200, 100])
+
+
+class TestEstimatorUsesCalibrationCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'photo.png')
+        with open(self.source, 'wb') as fh:
+            fh.write(b'pixels')
+        self.cache = CalibrationCache()
+        patcher = patch.object(calibration_cache, '_calibration_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('client.core.size_estimator.estimate_image_size_at_preset', return_value=50000)
+    def test_second_run_skips_reference_encode(self, mock_encode):
+        first = size_estimator.estimate_all_image_preset_sizes(self.source, 'webp')
+        second = size_estimator.estimate_all_image_preset_sizes(self.source, 'webp')
+        self.assertEqual(mock_encode.call_count, 1)
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['preset_sizes'], first['preset_sizes'])
+
+        # A different output format needs its own calibration
+        size_estimator.estimate_all_image_preset_sizes(self.source, 'jpg')
+        self.assertEqual(mock_encode.call_count, 2)
+
+    @patch('client.core.size_estimator.estimate_image_size_at_preset', return_value=0)
+    def test_fallback_estimates_are_not_cached(self, mock_encode):
+        size_estimator.estimate_all_image_preset_sizes(self.source, 'webp')
+        size_estimator.estimate_all_image_preset_sizes(self.source, 'webp')
+        self.assertEqual(mock_encode.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adjust path to find client module
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(ROOT)
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client import cli
+    from client.core.conversion_engine import ConversionEngine
+
+
+class TestExpandInputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'sub'))
+        for name in ('a.png', 'b.mp4', 'notes.txt', os.path.join('sub', 'c.jpg')):
+            with open(os.path.join(self.tmp.name, name), 'wb') as fh:
+                fh.write(b'x')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _names(self, files):
+        return [os.path.relpath(f, self.tmp.name) for f in files]
+
+    def test_folder_glob_and_file_inputs_are_deduplicated(self):
+        exts = {'.png', '.mp4', '.jpg'}
+        files = cli.expand_inputs([self.tmp.name, os.path.join(self.tmp.name, '*.png')], exts)
+        self.assertEqual(self._names(files), ['a.png', 'b.mp4'])
+        files = cli.expand_inputs([self.tmp.name], exts, recursive=True)
+        self.assertEqual(self._names(files), ['a.png', 'b.mp4', os.path.join('sub', 'c.jpg')])
+
+    def test_missing_input_is_a_usage_error(self):
+        with self.assertRaises(cli.CliError):
+            cli.expand_inputs([os.path.join(self.tmp.name, 'missing.png')], {'.png'})
+
+    def test_params_and_overrides(self):
+        self.assertEqual(cli.load_params('{"type": "image"}'), {'type': 'image'})
+        self.assertEqual(cli.parse_assignment('quality=80'), ('quality', 80))
+        self.assertEqual(cli.parse_assignment('format=webp'), ('format', 'webp'))
+        with self.assertRaises(cli.CliError):
+            cli.load_params('[1, 2]')
+
+
+class TestConvertCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'a.png')
+        with open(self.source, 'wb') as fh:
+            fh.write(b'x')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streams_json_lines(self):
+        def fake_convert(engine, file_path):
+            print("engine diagnostics")
+            engine.file_completed.emit(file_path, file_path + '.webp')
+            return True
+
+        stdout = io.StringIO()
+        with patch.object(ConversionEngine, 'convert_file', fake_convert), \
+                patch('client.core.conversion_engine.init_bundled_tools'):
+            code = cli.main(['convert', self.tmp.name, '--no-cache', '--set', 'type=image', '--jobs', '1'],
+                            stdout=stdout)
+
+        self.assertEqual(code, cli.EXIT_OK)
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(events[0], {'event': 'start', 'files': 1, 'jobs': 1})
+        self.assertIn({'event': 'file_completed', 'source': os.path.abspath(self.source),
+                       'output': os.path.abspath(self.source) + '.webp'}, events)
+        self.assertEqual(events[-1]['event'], 'finished')
+        self.assertTrue(events[-1]['success'])
+
+    def test_core_import_does_not_load_qt(self):
+        code = ("import sys; from unittest.mock import MagicMock; sys.modules['ffmpeg'] = MagicMock(); "
+                "import client.cli, client.core.conversion_engine; "
+                "sys.exit(1 if any(m.startswith('PyQt6') for m in sys.modules) else 0)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr.decode(errors='replace'))
+
+
+if __name__ == '__main__':
+    unittest.main()
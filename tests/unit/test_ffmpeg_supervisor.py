@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from client.core.ffmpeg_supervisor import (
+    compile_ffmpeg_args,
+    FFmpegError,
+    FFmpegSupervisor,
+    ProgressParser,
+    StderrTail,
+    STDERR_TAIL_LINES,
+)
+
+# Stand-in for ffmpeg: prints a Duration line and -progress blocks, quits on 'q'
+FAKE_FFMPEG = r'''
+import sys, threading, time
+blocks, exit_code, wait_for_quit = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3] == 'wait'
+sys.stderr.write("  Duration: 00:00:10.00, start: 0.000000, bitrate: 800 kb/s\n")
+for i in range(300):
+    sys.stderr.write(f"noise line {i}\n")
+sys.stderr.flush()
+for i in range(1, blocks + 1):
+    sys.stdout.write(f"frame={i * 30}\nfps=30.0\nout_time_us={i * 1000000}\ntotal_size={i * 1000}\n"
+                     f"speed=2.0x\nprogress={'end' if i == blocks else 'continue'}\n")
+    sys.stdout.flush()
+if wait_for_quit:
+    if sys.stdin.read(1) == 'q':
+        sys.exit(255)
+    time.sleep(30)
+sys.exit(exit_code)
+'''
+
+
+def fake_ffmpeg(blocks=3, exit_code=0, wait=False):
+    return [sys.executable, '-c', FAKE_FFMPEG, str(blocks), str(exit_code), 'wait' if wait else 'run']
+
+
+class TestProgressParser(unittest.TestCase):
+    def test_blocks_split_across_chunks(self):
+        parser = ProgressParser()
+        self.assertEqual(parser.feed(b'frame=10\nout_time_us=1500'), [])
+        events = parser.feed(b'000\nspeed=1.5x\nprogress=continue\nframe=20\nprogress=end\n')
+        self.assertEqual(len(events), 2)
+        self.assertAlmostEqual(events[0].out_time, 1.5)
+        self.assertEqual(events[0].frame, 10)
+        self.assertEqual(events[0].speed, 1.5)
+        self.assertFalse(events[0].finished)
+        self.assertTrue(events[1].finished)
+
+    def test_unknown_values(self):
+        events = ProgressParser().feed(b'out_time_us=N/A\nout_time_ms=2000000\nspeed=N/A\nprogress=continue\n')
+        self.assertEqual(events[0].out_time, 2.0)
+        self.assertEqual(events[0].speed, 0.0)
+
+
+class TestCompileArgs(unittest.TestCase):
+    def _spec(self, args):
+        spec = MagicMock()
+        spec.global_args.return_value = spec
+        spec.compile.return_value = list(args)
+        return spec
+
+    def test_never_prompts_for_overwrite(self):
+        args = compile_ffmpeg_args(self._spec(['ffmpeg', '-i', 'in.mp4', 'out.mp4']), cmd='ffmpeg')
+        self.assertEqual(args[:2], ['ffmpeg', '-n'])
+
+        args = compile_ffmpeg_args(self._spec(['ffmpeg', '-i', 'in.mp4', 'out.mp4', '-y']), cmd='ffmpeg')
+        self.assertNotIn('-n', args)
+
+
+class TestStderrTail(unittest.TestCase):
+    def test_ring_buffer_and_duration(self):
+        tail = StderrTail(max_lines=3)
+        tail.feed(b'  Duration: 01:02:03.50, start\r\nline a\rline b\nline ')
+        tail.feed(b'c\nline d')
+        tail.close()
+        self.assertAlmostEqual(tail.duration, 3723.5)
+        self.assertEqual(tail.text(), 'line b\nline c\nline d')
+
+
+class TestFFmpegSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.supervisor = FFmpegSupervisor()
+
+    def tearDown(self):
+        self.supervisor.shutdown()
+
+    def test_progress_events_and_success(self):
+        events = []
+        self.assertTrue(self.supervisor.run(fake_ffmpeg(blocks=3), on_progress=events.append))
+        self.assertEqual([e.out_time for e in events], [1.0, 2.0, 3.0])
+        self.assertEqual(events[0].duration, 10.0)
+        self.assertAlmostEqual(events[1].fraction, 0.2)
+        self.assertTrue(events[-1].finished)
+        self.assertEqual(self.supervisor.active_jobs(), [])
+
+    def test_failure_raises_with_bounded_stderr(self):
+        with self.assertRaises(FFmpegError) as ctx:
+            self.supervisor.run(fake_ffmpeg(exit_code=1))
+        self.assertEqual(ctx.exception.returncode, 1)
+        lines = ctx.exception.stderr.splitlines()
+        self.assertEqual(len(lines), STDERR_TAIL_LINES)
+        self.assertEqual(lines[-1], 'noise line 299')
+
+    def test_cancel_sends_quit(self):
+        job = self.supervisor.start(fake_ffmpeg(blocks=1, wait=True))
+        time.sleep(0.3)
+        started = time.monotonic()
+        job.cancel()
+        self.assertFalse(job.result())
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(job.returncode, 255)
+
+    def test_should_stop_and_timeout(self):
+        job = self.supervisor.start(fake_ffmpeg(blocks=1, wait=True))
+        self.assertFalse(job.result(should_stop=lambda: True))
+
+        with self.assertRaises(FFmpegError):
+            self.supervisor.run(fake_ffmpeg(blocks=1, wait=True), timeout=0.5)
+
+    def test_counts_piped_output(self):
+        code = "import sys; sys.stdout.buffer.write(b'x' * 300000); sys.stdout.flush()"
+        events = []
+        job = self.supervisor.start([sys.executable, '-c', code], on_progress=events.append, count_stdout=True)
+        self.assertTrue(job.result(timeout=10))
+        self.assertEqual(job.stdout_bytes, 300000)
+        self.assertEqual(events, [])
+
+    def test_missing_binary(self):
+        with self.assertRaises(FFmpegError):
+            self.supervisor.run(['/nonexistent/ffmpeg', '-version'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Server modules import each other as top-level packages (config, services, storage)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../server')))
+
+from config.settings import Config
+from services.trial_manager import TrialManager
+from storage import file_lock
+from storage.file_lock import FileLockTimeout, FileRWLock, get_file_lock
+
+
+def _hold_write_lock(path, acquired, release):
+    with FileRWLock(path).write():
+        acquired.set()
+        release.wait(10)
+
+
+def _increment_trials(path, rules_path, rounds):
+    Config.TRIALS_FILE = path
+    manager = TrialManager()
+    manager.rules_file = rules_path
+    for _ in range(rounds):
+        manager.increment_trial('hw-1')
+
+
+@unittest.skipUnless(file_lock.FCNTL_AVAILABLE, "fcntl not available")
+class TestFileRWLock(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'trials.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_readers_share_and_writers_exclude(self):
+        lock = FileRWLock(self.path, timeout=0.2)
+        inside = threading.Barrier(2, timeout=2)
+
+        def reader():
+            with lock.read():
+                inside.wait()   # Both readers hold the lock at once
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+        with lock.write():
+            with lock.read():   # Re-entry under the write lock
+                pass
+            blocked = []
+            thread = threading.Thread(target=lambda: self._try(lock.read, blocked))
+            thread.start()
+            thread.join()
+        self.assertEqual(blocked, [FileLockTimeout])
+        stats = lock.stats()
+        self.assertEqual((stats['read_acquired'], stats['write_acquired'], stats['timeouts']), (2, 1, 1))
+
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+
+    @staticmethod
+    def _try(acquire, errors):
+        try:
+            with acquire():
+                pass
+        except FileLockTimeout:
+            errors.append(FileLockTimeout)
+
+    def test_lock_holds_across_processes(self):
+        acquired, release = multiprocessing.Event(), multiprocessing.Event()
+        holder = multiprocessing.Process(target=_hold_write_lock, args=(self.path, acquired, release))
+        holder.start()
+        try:
+            self.assertTrue(acquired.wait(10))
+            with self.assertRaises(FileLockTimeout):
+                with FileRWLock(self.path, timeout=0.1).read():
+                    pass
+        finally:
+            release.set()
+            holder.join(10)
+        with FileRWLock(self.path, timeout=2).read():
+            pass
+
+    def test_trial_increments_are_not_lost_across_processes(self):
+        rules_path = os.path.join(self.tmp.name, 'trial_rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump({'max_files': 100}, f)
+        with open(self.path, 'w') as f:
+            json.dump({}, f)
+        workers = [multiprocessing.Process(target=_increment_trials, args=(self.path, rules_path, 5))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)['hw-1']['files_used'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
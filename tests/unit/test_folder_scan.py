@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from client.core.folder_scan import iter_supported_files
+
+EXTENSIONS = ['.jpg', '.mp4']
+
+
+class TestIterSupportedFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for rel in ('b.jpg', 'a.MP4', 'notes.txt', 'sub/c.jpg', 'sub/deeper/d.mp4', 'z_sub/e.jpg'):
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as fh:
+                fh.write(b'x')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scan(self, **kwargs):
+        files = []
+        for batch in iter_supported_files([self.root], EXTENSIONS, **kwargs):
+            files.extend(batch)
+        return [os.path.relpath(f, self.root).replace(os.sep, '/') for f in files]
+
+    def test_top_level_only(self):
+        self.assertEqual(self._scan(), ['a.MP4', 'b.jpg'])
+
+    def test_recursive_is_depth_first_in_name_order(self):
+        self.assertEqual(self._scan(recursive=True),
+                         ['a.MP4', 'b.jpg', 'sub/c.jpg', 'sub/deeper/d.mp4', 'z_sub/e.jpg'])
+
+    def test_batches_respect_batch_size(self):
+        batches = list(iter_supported_files([self.root], EXTENSIONS, recursive=True, batch_size=2))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(sum(len(batch) for batch in batches), 5)
+
+    def test_should_stop_ends_walk(self):
+        calls = []
+
+        def should_stop():
+            calls.append(1)
+            return len(calls) > 3
+
+        self.assertLess(len(self._scan(recursive=True, should_stop=should_stop)), 5)
+
+    def test_unreadable_root_reports_error(self):
+        errors = []
+        missing = os.path.join(self.root, 'missing')
+        batches = list(iter_supported_files([missing], EXTENSIONS, on_error=lambda p, e: errors.append(p)))
+        self.assertEqual(batches, [])
+        self.assertEqual(errors, [missing])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core.gif_converter import GifConverter
+
+
+def make_variants(resizes, fps_values, colors_values, dithers):
+    variants = []
+    for resize in resizes:
+        for fps in fps_values:
+            for colors in colors_values:
+                for dither in dithers:
+                    params = {
+                        'type': 'gif', 'overwrite': True,
+                        'gif_resize_values': [resize], 'gif_resize_mode': 'By width (pixels)',
+                        'ffmpeg_fps': fps, 'ffmpeg_colors': colors,
+                        'dither': dither, 'ffmpeg_dither': dither,
+                    }
+                    desc = f"resize={resize}, fps={fps}, colors={colors}, dither={dither}"
+                    variants.append((params, f"out_{resize}_{fps}_{colors}_{dither}.gif", desc))
+    return variants
+
+
+class TestGifVariantPlanner(unittest.TestCase):
+    def setUp(self):
+        self.engine = MagicMock()
+        self.engine.params = {'max_outputs_per_process': 8}
+        self.engine.should_stop = False
+        self.converter = GifConverter(self.engine)
+
+    def test_groups_by_decode_then_palette(self):
+        # 2 resize x 2 fps x 3 colors x 2 dither = 24 variants
+        variants = make_variants(['640', '320'], [10, 15], [64, 128, 256], [0, 3])
+        groups = self.converter._plan_gif_variant_groups(variants)
+
+        # One decode per resize+fps pair, capped at 8 outputs -> 4 x ceil(6/8)
+        self.assertEqual(len(groups), 4)
+        for palette_groups in groups:
+            # One palettegen per colors value, shared by the dither variants
+            self.assertEqual(len(palette_groups), 3)
+            for palette_group in palette_groups:
+                self.assertEqual(len(palette_group), 2)
+                self.assertEqual(len({v[0]['ffmpeg_colors'] for v in palette_group}), 1)
+
+    def test_output_cap_splits_large_groups(self):
+        self.engine.params['max_outputs_per_process'] = 4
+        variants = make_variants(['640'], [10], [64, 128, 256], [0, 3])
+        groups = self.converter._plan_gif_variant_groups(variants)
+        self.assertEqual([sum(len(p) for p in g) for g in groups], [4, 2])
+
+
+class TestGifVariantPlanRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = MagicMock()
+        self.engine.params = {'max_outputs_per_process': 8}
+        self.engine.should_stop = False
+        self.converter = GifConverter(self.engine)
+        self.variants = [
+            (params, os.path.join(self.tmp.name, path), desc)
+            for params, path, desc in make_variants(['640'], [10, 15], [64, 256], [3])
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reports_each_variant_of_shared_pass(self):
+        def encode(file_path, palette_groups):
+            # Write every output except the first
+            for palette_group in palette_groups:
+                for _, output_path, _ in palette_group:
+                    if output_path != self.variants[0][1]:
+                        with open(output_path, 'wb') as fh:
+                            fh.write(b'GIF89a')
+            return True
+
+        self.converter._encode_gif_variant_group = MagicMock(side_effect=encode)
+        self.assertEqual(self.converter._run_gif_variant_plan('clip.mp4', self.variants), 3)
+        self.assertEqual(self.converter._encode_gif_variant_group.call_count, 2)
+        completed = [c[0][1] for c in self.engine.file_completed.emit.call_args_list]
+        self.assertEqual(sorted(completed), sorted(v[1] for v in self.variants[1:]))
+
+    def test_failed_pass_retries_variants_individually(self):
+        self.converter._encode_gif_variant_group = MagicMock(side_effect=Exception('graph error'))
+        self.converter._convert_video_to_gif_ffmpeg_only = MagicMock(return_value=True)
+        self.assertEqual(self.converter._run_gif_variant_plan('clip.mp4', self.variants), 4)
+        self.assertEqual(self.converter._convert_video_to_gif_ffmpeg_only.call_count, 4)
+        self.assertEqual(self.engine.params, {'max_outputs_per_process': 8})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core import image_backend
+    from client.core import size_estimator
+    from client.core.conversion_engine import ConversionEngine
+    from client.core.image_backend import (
+        can_convert_with_pillow, convert_image_pillow, encode_options, iter_resize_cascade, plan_image_size,
+    )
+
+if image_backend.PILLOW_AVAILABLE:
+    from PIL import Image
+
+
+class TestPlanImageSize(unittest.TestCase):
+    def test_resize_modes(self):
+        self.assertEqual(plan_image_size((4000, 3000), {'current_resize': '50%'}), (2000, 1500))
+        self.assertEqual(plan_image_size((4000, 3000), {'current_resize': '800'}), (800, 600))
+        self.assertEqual(plan_image_size((3000, 4000), {'current_resize': 'L1000'}), (750, 1000))
+        self.assertEqual(plan_image_size((600, 400), {'current_resize': 'L1000'}), (600, 400))  # No upscaling
+        self.assertEqual(plan_image_size((4000, 3000), {'_max_size_resolution_scale': 0.5}), (2000, 1500))
+
+    def test_quality_mapping(self):
+        self.assertEqual(encode_options('jpg', {'quality': 100}), {'quality': 95})
+        self.assertEqual(encode_options('png', {'quality': 85}), {'compress_level': 1})
+        self.assertEqual(encode_options('webp', {'quality': 70}), {'quality': 70, 'method': 4})
+
+    def test_backend_selection(self):
+        self.assertEqual(can_convert_with_pillow('a.PNG', 'webp', {}), image_backend.PILLOW_AVAILABLE)
+        self.assertFalse(can_convert_with_pillow('a.gif', 'webp', {}))
+        self.assertFalse(can_convert_with_pillow('a.png', 'avif', {}))
+        self.assertFalse(can_convert_with_pillow('a.png', 'webp', {'image_backend': 'ffmpeg'}))
+        self.assertFalse(can_convert_with_pillow('a.png', 'webp', {'image_size_mode': 'max_size',
+                                                                   'image_max_size_exact': False}))
+
+
+@unittest.skipUnless(image_backend.PILLOW_AVAILABLE, "Pillow not installed")
+class TestConvertImagePillow(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _source(self, name='src.jpg', size=(400, 300), exif_orientation=None):
+        path = os.path.join(self.tmp.name, name)
+        exif = Image.Exif()
+        if exif_orientation:
+            exif[0x0112] = exif_orientation
+        Image.new('RGB', size, (200, 40, 40)).save(path, exif=exif)
+        return path
+
+    def _convert(self, source, format_ext, params):
+        output = os.path.join(self.tmp.name, 'out', f'result.{format_ext}')
+        convert_image_pillow(source, output, format_ext, params)
+        with Image.open(output) as im:
+            return im.format, im.size
+
+    def test_resize_ratio_preset_and_rotation(self):
+        source = self._source()
+        self.assertEqual(self._convert(source, 'webp', {'current_resize': '200', 'overwrite': True}),
+                         ('WEBP', (200, 150)))
+        self.assertEqual(self._convert(source, 'png', {'image_preset_ratio': '1:1', 'overwrite': True}),
+                         ('PNG', (1080, 1080)))
+        self.assertEqual(self._convert(source, 'jpg', {'rotation_angle': '90° clockwise', 'overwrite': True}),
+                         ('JPEG', (300, 400)))
+
+    def test_exif_orientation_is_applied(self):
+        source = self._source(exif_orientation=6)  # Stored landscape, displayed portrait
+        self.assertEqual(self._convert(source, 'jpg', {'overwrite': True}), ('JPEG', (300, 400)))
+
+    def test_existing_output_is_kept_without_overwrite(self):
+        source = self._source()
+        output = os.path.join(self.tmp.name, 'taken.png')
+        with open(output, 'wb') as fh:
+            fh.write(b'keep')
+        with self.assertRaises(FileExistsError):
+            convert_image_pillow(source, output, 'png', {'overwrite': False})
+        with open(output, 'rb') as fh:
+            self.assertEqual(fh.read(), b'keep')
+
+
+    def test_resize_cascade_runs_largest_first(self):
+        image = Image.new('RGB', (400, 300))
+        cascade = [(resize, im.size) for resize, im in iter_resize_cascade(image, {}, ['100', None, '200'])]
+        self.assertEqual(cascade, [(None, (400, 300)), ('200', (200, 150)), ('100', (100, 75))])
+
+
+@unittest.skipUnless(image_backend.PILLOW_AVAILABLE, "Pillow not installed")
+class TestEngineImageBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'photo.png')
+        Image.new('RGBA', (64, 48), (0, 128, 255, 128)).save(self.source)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _engine(self, **params):
+        engine = ConversionEngine([self.source], {'type': 'image', 'format': 'webp', 'overwrite': True,
+                                                  'suffix': '_web', **params})
+        completed = MagicMock()
+        engine.file_completed.connect(completed)
+        return engine, completed
+
+    def test_converts_in_process(self):
+        engine, completed = self._engine()
+        with patch.object(ConversionEngine, '_convert_image_ffmpeg') as ffmpeg_path:
+            self.assertTrue(engine.convert_file(self.source))
+        ffmpeg_path.assert_not_called()
+        output = completed.call_args[0][1]
+        with Image.open(output) as im:
+            self.assertEqual((im.format, im.size), ('WEBP', (64, 48)))
+
+    def test_falls_back_to_ffmpeg(self):
+        # Undecodable source
+        with open(self.source, 'wb') as fh:
+            fh.write(b'not a png')
+        engine, _ = self._engine()
+        with patch.object(ConversionEngine, '_convert_image_ffmpeg', return_value=True) as ffmpeg_path:
+            self.assertTrue(engine.convert_file(self.source))
+        ffmpeg_path.assert_called_once()
+
+        # Explicit opt-out
+        engine, _ = self._engine(image_backend='ffmpeg')
+        with patch.object(ConversionEngine, '_convert_image_ffmpeg', return_value=True) as ffmpeg_path:
+            self.assertTrue(engine.convert_file(self.source))
+        ffmpeg_path.assert_called_once()
+
+    def test_variants_decode_once(self):
+        engine, completed = self._engine(multiple_qualities=True, quality_variants=[90, 40],
+                                         multiple_resize=True, resize_variants=['32', '16'])
+        with patch('client.core.conversion_engine.open_still_image',
+                   wraps=image_backend.open_still_image) as decode, \
+                patch.object(ConversionEngine, '_convert_image_ffmpeg') as ffmpeg_path:
+            self.assertTrue(engine.convert_file(self.source))
+        decode.assert_called_once_with(self.source)
+        ffmpeg_path.assert_not_called()
+
+        outputs = sorted(call[0][1] for call in completed.call_args_list)
+        self.assertEqual(len(outputs), 4)
+        expected = sorted(engine.get_output_path_with_variants(self.source, 'webp', q, r)
+                          for q in (90, 40) for r in ('32', '16'))
+        self.assertEqual(outputs, expected)
+        for output in outputs:
+            with Image.open(output) as im:
+                self.assertIn(im.size, [(32, 24), (16, 12)])
+
+
+@unittest.skipUnless(image_backend.PILLOW_AVAILABLE, "Pillow not installed")
+class TestExactImageMaxSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'noise.png')
+        Image.effect_noise((320, 240), 48).convert('RGB').save(self.source)
+        size_estimator._exact_image_memo.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_is_exact_and_memoized(self):
+        target = 35000
+        result = size_estimator.find_exact_image_params_for_size(self.source, 'jpg', {}, target)
+        self.assertLessEqual(result['_estimated_size'], target)
+        self.assertTrue(result['_exact_size'])
+
+        # One quality step up no longer fits
+        rendered = image_backend.render_image(image_backend.open_still_image(self.source), {})
+        self.assertGreater(image_backend.encoded_size(rendered, 'jpg', {'quality': result['quality'] + 1}), target)
+
+        with patch('client.core.size_estimator.open_still_image') as decode:
+            again = size_estimator.find_exact_image_params_for_size(self.source, 'jpg', {}, target)
+        decode.assert_not_called()
+        self.assertEqual(again, result)
+
+    def test_auto_resize_scales_before_dropping_quality(self):
+        result = size_estimator.find_exact_image_params_for_size(self.source, 'jpg', {}, 20000, auto_resize=True)
+        self.assertEqual(result['quality'], size_estimator.EXACT_IMAGE_RESIZE_QUALITY)
+        self.assertLess(result['_resolution_scale'], 1.0)
+
+    def test_png_keeps_compression_and_searches_scale(self):
+        result = size_estimator.find_exact_image_params_for_size(self.source, 'png', {}, 60000, auto_resize=True)
+        self.assertEqual(result['quality'], size_estimator.EXACT_IMAGE_PNG_QUALITY)
+        self.assertLess(result['_resolution_scale'], 1.0)
+        self.assertLessEqual(result['_estimated_size'], 60000)
+
+    def test_engine_output_matches_exact_size(self):
+        params = {'type': 'image', 'format': 'webp', 'overwrite': True, 'suffix': '_max',
+                  'image_size_mode': 'max_size', 'image_max_size_mb': 35000 / (1024 * 1024)}
+        engine = ConversionEngine([self.source], params)
+        completed = MagicMock()
+        engine.file_completed.connect(completed)
+        results = []
+
+        def search(*args, **kwargs):
+            results.append(size_estimator.find_exact_image_params_for_size(*args, **kwargs))
+            return results[-1]
+
+        with patch('client.core.conversion_engine.find_exact_image_params_for_size', search), \
+                patch.object(ConversionEngine, '_convert_image_ffmpeg') as ffmpeg_path:
+            self.assertTrue(engine.convert_file(self.source))
+        ffmpeg_path.assert_not_called()
+
+        output_size = os.path.getsize(completed.call_args[0][1])
+        self.assertEqual(output_size, results[0]['_estimated_size'])
+        self.assertLessEqual(output_size, 35000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,21 +6,10 @@ from unittest.mock import patch, MagicMock
 # Adjust path to find client module
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-# Mock PyQt6 before importing ConversionEngine to avoid potential issues in headless environment
-class MockSignal:
-    def __init__(self, *args, **kwargs):
-        self.emit = MagicMock()
+from tests.unit.ffmpeg_stub import stub_ffmpeg
 
-mock_pyqt = MagicMock()
-sys.modules['PyQt6'] = mock_pyqt
-sys.modules['PyQt6.QtCore'] = mock_pyqt
-mock_pyqt.QThread = MagicMock
-mock_pyqt.pyqtSignal = MockSignal
-
-# Mock ffmpeg as well
-sys.modules['ffmpeg'] = MagicMock()
-
-from client.core.conversion_engine import ConversionEngine
+with stub_ffmpeg():
+    from client.core.conversion_engine import ConversionEngine
 
 class TestInstagramPreset(unittest.TestCase):
     def setUp(self):
@@ -34,8 +23,8 @@ class TestInstagramPreset(unittest.TestCase):
         self.files = ['input.mp4']
         self.engine = ConversionEngine(self.files, self.params)
 
-    @patch('ffmpeg.input')
-    @patch('ffmpeg.output')
+    @patch('client.core.conversion_engine.ffmpeg.input')
+    @patch('client.core.conversion_engine.ffmpeg.output')
     @patch('client.core.conversion_engine.get_video_duration')
     @patch('client.core.conversion_engine.has_audio_stream')
     @patch('client.core.conversion_engine.get_video_dimensions')
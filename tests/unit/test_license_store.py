@@ -0,0 +1,229 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Server modules import each other as top-level packages (config, services, storage)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../server')))
+
+from services.license_manager import LicenseManager
+from storage.audit_index import AuditLogIndex
+from storage.license_store import (
+    LICENSES, TRIALS, JsonLicenseStore, SqliteLicenseStore, backup_sqlite_database,
+)
+from storage.validation_buffer import ValidationTelemetryBuffer
+
+
+def _license(email, days=365, **fields):
+    now = datetime.now()
+    return {'email': email, 'created_date': now.isoformat(),
+            'expiry_date': (now + timedelta(days=days)).isoformat(),
+            'is_active': True, 'hardware_id': None, **fields}
+
+
+class StoreContract:
+    """Behaviour both backends must share"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_get_put_and_order(self):
+        self.store.put(LICENSES, 'A', _license('a@x.com'))
+        self.store.put(LICENSES, 'B', _license('b@x.com'))
+        self.store.put(LICENSES, 'A', _license('a@x.com', is_active=False))  # Update keeps position
+        self.assertEqual(list(self.store.load_all(LICENSES)), ['A', 'B'])
+        self.assertFalse(self.store.get(LICENSES, 'A')['is_active'])
+        self.assertIsNone(self.store.get(TRIALS, 'A'))
+
+    def test_indexed_lookups(self):
+        self.store.put(LICENSES, 'G1', _license('Buyer@X.com', platform='gumroad',
+                                                platform_transaction_id='sale-1', source_license_key='GUM-1'))
+        self.store.put(LICENSES, 'LEGACY', _license('old@x.com', purchase_info={'source': 'gumroad',
+                                                                               'sale_id': 'sale-0'}))
+        self.store.put(LICENSES, 'M1', _license('buyer@x.com', platform='msstore', platform_transaction_id='ord-1'))
+        self.store.put(TRIALS, 'T1', _license('buyer@x.com', days=7, hardware_id='hw-1'))
+
+        self.assertEqual(list(self.store.find(LICENSES, email='BUYER@x.com')), ['G1', 'M1'])
+        self.assertEqual(list(self.store.find(LICENSES, source_license_key='GUM-1')), ['G1'])
+        self.assertEqual(list(self.store.find(LICENSES, sale_id='sale-0')), ['LEGACY'])
+        self.assertEqual(list(self.store.find(LICENSES, platform='gumroad', platform_transaction_id='sale-0')),
+                         ['LEGACY'])
+        self.assertEqual(list(self.store.find(LICENSES, platform='gumroad', platform_transaction_id='ord-1')), [])
+        self.assertEqual(list(self.store.find(LICENSES, platform='gumroad')), ['G1', 'LEGACY'])
+        self.assertEqual(list(self.store.find(TRIALS, hardware_id='hw-1')), ['T1'])
+        self.assertEqual(self.store.find(LICENSES, email=None), {})
+        with self.assertRaises(ValueError):
+            self.store.find(LICENSES, expiry_date='2030')
+
+    def test_legacy_platform_id_fields(self):
+        self.store.put(LICENSES, 'MS', _license('a@x.com', platform='msstore', order_id='ord-9'))
+        self.store.put(LICENSES, 'ST', _license('b@x.com', purchase_info={'source': 'stripe',
+                                                                          'payment_intent_id': 'pi-9'}))
+        self.assertEqual(list(self.store.find(LICENSES, platform='msstore', platform_transaction_id='ord-9')),
+                         ['MS'])
+        self.assertEqual(list(self.store.find(LICENSES, platform='stripe', platform_transaction_id='pi-9')),
+                         ['ST'])
+
+    def test_update_mutates_existing_records_only(self):
+        self.store.put(LICENSES, 'A', _license('a@x.com', validation_count=2))
+
+        def bump(record):
+            record['validation_count'] += 1
+
+        self.assertEqual(self.store.update(LICENSES, {'A': bump, 'MISSING': bump}), 1)
+        self.assertEqual(self.store.get(LICENSES, 'A')['validation_count'], 3)
+        self.assertIsNone(self.store.get(LICENSES, 'MISSING'))
+
+    def test_save_all_replaces_table(self):
+        self.store.put(LICENSES, 'A', _license('a@x.com'))
+        self.store.save_all(LICENSES, {'B': _license('b@x.com')})
+        self.assertEqual(list(self.store.load_all(LICENSES)), ['B'])
+        self.assertEqual(self.store.find(LICENSES, email='a@x.com'), {})
+
+
+class TestJsonLicenseStore(StoreContract, unittest.TestCase):
+    def make_store(self):
+        return JsonLicenseStore({LICENSES: os.path.join(self.tmp.name, 'licenses.json'),
+                                 TRIALS: os.path.join(self.tmp.name, 'trials.json')})
+
+
+class TestSqliteLicenseStore(StoreContract, unittest.TestCase):
+    def make_store(self):
+        return SqliteLicenseStore(os.path.join(self.tmp.name, 'licenses.db'))
+
+    def test_wal_mode_and_backup(self):
+        self.store.put(LICENSES, 'A', _license('a@x.com'))
+        mode = self.store._connection().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+        copy_path = os.path.join(self.tmp.name, 'copy.db')
+        backup_sqlite_database(self.store.db_path, copy_path)
+        copy = SqliteLicenseStore(copy_path)
+        self.assertEqual(list(copy.load_all(LICENSES)), ['A'])
+        copy.close()
+
+    def test_rows_from_older_index_are_reindexed(self):
+        self.store.put(LICENSES, 'MS', _license('a@x.com', platform='msstore', order_id='ord-9'))
+        conn = self.store._connection()
+        conn.execute("UPDATE licenses SET platform_transaction_id = NULL")
+        conn.execute("DELETE FROM meta WHERE name = 'index_version'")
+        self.store.close()
+
+        self.store = SqliteLicenseStore(os.path.join(self.tmp.name, 'licenses.db'))
+        self.assertEqual(list(self.store.find(LICENSES, platform='msstore', platform_transaction_id='ord-9')),
+                         ['MS'])
+
+    def test_one_shot_json_migration(self):
+        paths = {LICENSES: os.path.join(self.tmp.name, 'licenses.json'),
+                 TRIALS: os.path.join(self.tmp.name, 'trials.json')}
+        with open(paths[LICENSES], 'w') as f:
+            json.dump({'L1': _license('a@x.com'), 'L2': _license('b@x.com')}, f)
+        with open(paths[TRIALS], 'w') as f:
+            # TrialManager's usage counters share trials.json and are not trial licenses
+            json.dump({'T1': _license('a@x.com', days=7), 'hw-9': {'files_used': 3}}, f)
+
+        db_path = os.path.join(self.tmp.name, 'migrated.db')
+        store = SqliteLicenseStore(db_path, paths)
+        self.assertEqual(list(store.load_all(LICENSES)), ['L1', 'L2'])
+        self.assertEqual(list(store.load_all(TRIALS)), ['T1'])
+        store.put(LICENSES, 'L1', _license('a@x.com', is_active=False))
+        store.close()
+
+        # Reopening does not import again (would undo the update)
+        store = SqliteLicenseStore(db_path, paths)
+        self.assertFalse(store.get(LICENSES, 'L1')['is_active'])
+        store.close()
+
+
+class TestValidationTelemetryBuffer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SqliteLicenseStore(os.path.join(self.tmp.name, 'licenses.db'))
+        self.store.put(LICENSES, 'A', _license('a@x.com', validation_count=0, last_validation=None))
+        self.store.put(LICENSES, 'B', _license('b@x.com', validation_count=0, last_validation=None))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_coalesces_until_threshold(self):
+        buffer = ValidationTelemetryBuffer(self.store, flush_interval=3600, max_pending=2)
+        for ts in ('2026-01-01T10:00:00', '2026-01-01T12:00:00', '2026-01-01T11:00:00'):
+            buffer.record(LICENSES, 'A', ts)
+        self.assertEqual(self.store.get(LICENSES, 'A')['validation_count'], 0)   # Still buffered
+
+        buffer.record(LICENSES, 'B', '2026-01-01T09:00:00')                      # Second key: flush
+        self.assertEqual(buffer.pending_count(), 0)
+        self.assertEqual(buffer.flushes, 1)
+        record = self.store.get(LICENSES, 'A')
+        self.assertEqual((record['validation_count'], record['last_validation']), (3, '2026-01-01T12:00:00'))
+        buffer.close()
+
+    def test_flush_keeps_synchronous_changes(self):
+        buffer = ValidationTelemetryBuffer(self.store, flush_interval=3600)
+        buffer.record(LICENSES, 'A', '2026-01-01T10:00:00')
+        # A refund lands before the flush
+        refunded = self.store.get(LICENSES, 'A')
+        refunded['is_active'] = False
+        self.store.put(LICENSES, 'A', refunded)
+        buffer.close()
+        record = self.store.get(LICENSES, 'A')
+        self.assertFalse(record['is_active'])
+        self.assertEqual(record['validation_count'], 1)
+
+
+class TestLicenseManagerOnSqlite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SqliteLicenseStore(os.path.join(self.tmp.name, 'licenses.db'))
+        self.manager = LicenseManager(store=self.store)
+        self.manager.purchases_file = os.path.join(self.tmp.name, 'purchases.jsonl')
+        self.manager.purchase_index = AuditLogIndex(self.manager.purchases_file)
+
+    def tearDown(self):
+        self.manager.validation_buffer.close()
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_trial_then_full_license_flow(self):
+        trial = self.manager.create_trial_license('user@x.com', 'hw-1', 'Laptop')
+        self.assertTrue(trial['success'])
+        self.assertFalse(self.manager.check_trial_eligibility('user@x.com', 'hw-2')['eligible'])
+        self.assertFalse(self.manager.check_trial_eligibility('other@x.com', 'hw-1')['eligible'])
+        self.assertTrue(self.manager.validate_license('user@x.com', trial['license_key'], 'hw-1')['is_trial'])
+
+        key = self.manager.create_license('user@x.com', purchase_info={'source': 'gumroad', 'sale_id': 'S-1',
+                                                                       'source_license_key': 'GUM-1'})
+        self.assertEqual(self.manager.find_license_by_platform_id('gumroad', 'S-1'), key)
+        self.assertEqual(self.manager.find_license_by_source_key('GUM-1'), key)
+        self.assertEqual(self.manager.find_license_by_email(' USER@x.com ')['license_key'], key)
+
+        result = self.manager.validate_license('user@x.com', key, 'hw-1')
+        self.assertTrue(result['success'])
+        self.assertFalse(result['is_trial'])
+        self.assertEqual(self.manager.get_license(key)['validation_count'], 1)   # Activation: written now
+
+        self.manager.validate_license('user@x.com', key, 'hw-1')
+        self.manager.validate_license('user@x.com', key, 'hw-1')
+        self.assertEqual(self.manager.get_license(key)['validation_count'], 1)   # Telemetry: buffered
+        self.manager.validation_buffer.flush()
+        self.assertEqual(self.manager.get_license(key)['validation_count'], 3)
+
+        self.assertTrue(self.manager.deactivate_by_platform_id('gumroad', 'S-1')['success'])
+        self.assertEqual(self.manager.get_refund_status(key)['refund_reason'], 'platform_refund')
+        self.assertEqual(self.manager.get_license_info(key)['purchase']['sale_id'], 'S-1')
+        self.assertEqual(self.manager.validate_license('user@x.com', key, 'hw-1')['error'], 'license_deactivated')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from client.core.cache_utils import atomic_write_json
+from client.core.media_probe import MediaInfo, MediaProbeCache
+
+PORTRAIT_PHONE_PROBE = {
+    'streams': [
+        {
+            'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080,
+            'r_frame_rate': '30000/1001', 'pix_fmt': 'yuv420p', 'bit_rate': '8000000',
+            'side_data_list': [{'side_data_type': 'Display Matrix', 'rotation': -90}],
+        },
+        {'codec_type': 'audio', 'codec_name': 'aac'},
+    ],
+    'format': {'duration': '12.5'},
+}
+
+
+class TestMediaInfo(unittest.TestCase):
+    def test_from_probe_applies_rotation(self):
+        info = MediaInfo.from_probe(PORTRAIT_PHONE_PROBE)
+        self.assertEqual((info.width, info.height), (1080, 1920))
+        self.assertEqual((info.stream_width, info.stream_height), (1920, 1080))
+        self.assertFalse(info.is_landscape)
+        self.assertAlmostEqual(info.fps, 29.97, places=2)
+        self.assertEqual(info.duration, 12.5)
+        self.assertTrue(info.has_audio)
+        self.assertEqual(info.codec, 'h264')
+        self.assertEqual(info.pix_fmt, 'yuv420p')
+        self.assertEqual(info.bitrate, 8000000)
+
+    def test_from_probe_audio_only(self):
+        info = MediaInfo.from_probe({'streams': [{'codec_type': 'audio'}], 'format': {'duration': '3'}})
+        self.assertFalse(info.has_video)
+        self.assertTrue(info.has_audio)
+        self.assertEqual((info.width, info.height), (0, 0))
+
+
+class TestMediaProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f'clip_{i}.mp4')
+            with open(path, 'wb') as fh:
+                fh.write(b'x' * (i + 1))
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('client.core.media_probe.run_ffprobe', return_value=PORTRAIT_PHONE_PROBE)
+    def test_one_probe_per_file_version(self, mock_probe):
+        cache = MediaProbeCache()
+        for _ in range(5):
+            cache.get(self.files[0])
+        self.assertEqual(mock_probe.call_count, 1)
+        self.assertEqual(cache.hits, 4)
+
+        # Touching the file changes its fingerprint and forces a re-probe
+        with open(self.files[0], 'ab') as fh:
+            fh.write(b'more')
+        cache.get(self.files[0])
+        self.assertEqual(mock_probe.call_count, 2)
+
+    @patch('client.core.media_probe.run_ffprobe', return_value=PORTRAIT_PHONE_PROBE)
+    def test_lru_eviction(self, mock_probe):
+        cache = MediaProbeCache(max_entries=2)
+        cache.get(self.files[0])
+        cache.get(self.files[1])
+        cache.get(self.files[0])  # refresh 0, so 1 is least recently used
+        cache.get(self.files[2])
+        self.assertEqual(len(cache), 2)
+        cache.get(self.files[0])
+        self.assertEqual(mock_probe.call_count, 3)
+        cache.get(self.files[1])
+        self.assertEqual(mock_probe.call_count, 4)
+
+    @patch('client.core.media_probe.run_ffprobe', side_effect=RuntimeError('boom'))
+    def test_failures_are_not_cached(self, mock_probe):
+        cache = MediaProbeCache()
+        self.assertIsNone(cache.get(self.files[0]))
+        self.assertIsNone(cache.get(self.files[0]))
+        self.assertEqual(mock_probe.call_count, 2)
+
+    @patch('client.core.media_probe.run_ffprobe', return_value=PORTRAIT_PHONE_PROBE)
+    def test_persistence_roundtrip(self, mock_probe):
+        persist_path = os.path.join(self.tmp.name, 'probe.json')
+        cache = MediaProbeCache(persist_path=persist_path)
+        original = cache.get(self.files[0])
+        cache.flush()
+
+        reloaded = MediaProbeCache(persist_path=persist_path)
+        self.assertEqual(reloaded.get(self.files[0]), original)
+        self.assertEqual(mock_probe.call_count, 1)
+
+
+class TestAtomicWriteJson(unittest.TestCase):
+    def test_concurrent_writers_leave_valid_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.json')
+            errors = []
+
+            def writer(n):
+                try:
+                    for i in range(100):
+                        atomic_write_json(path, {'writer': n, 'i': i, 'pad': 'x' * (i * 50)})
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            self.assertEqual(errors, [])
+            with open(path, 'r', encoding='utf-8') as fh:
+                self.assertEqual(json.load(fh)['i'], 99)
+            self.assertEqual(os.listdir(tmp), ['cache.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core.conversion_engine import ConversionEngine
+    from client.core.output_index import OutputIndex, output_params_hash
+
+PARAMS = {'type': 'image', 'format': 'webp', 'quality': 80, 'suffix': '_converted'}
+
+
+class TestOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = self._write('photo.png', b'pixels')
+        self.output = self._write('photo_converted.webp', b'encoded')
+        self.hash = output_params_hash(PARAMS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+        return path
+
+    def _converted(self, index):
+        index.record_output(self.source, self.output)
+        index.complete(self.source, self.hash, True)
+
+    def test_unchanged_source_and_params_is_up_to_date(self):
+        index = OutputIndex()
+        self.assertFalse(index.is_up_to_date(self.source, self.hash))
+        self._converted(index)
+        self.assertTrue(index.is_up_to_date(self.source, self.hash))
+
+    def test_operational_params_do_not_change_hash(self):
+        self.assertEqual(output_params_hash(dict(PARAMS, overwrite=False, parallel_jobs=4)), self.hash)
+        self.assertNotEqual(output_params_hash(dict(PARAMS, quality=60)), self.hash)
+        self.assertNotEqual(output_params_hash(dict(PARAMS, suffix='_small')), self.hash)
+
+    def test_changed_source_or_output_is_stale(self):
+        index = OutputIndex()
+        self._converted(index)
+        self._write('photo_converted.webp', b'edited by hand')
+        self.assertFalse(index.is_up_to_date(self.source, self.hash))
+
+        self._converted(index)
+        self._write('photo.png', b'new pixels')
+        self.assertFalse(index.is_up_to_date(self.source, self.hash))
+
+    def test_deleted_output_is_stale(self):
+        index = OutputIndex()
+        self._converted(index)
+        os.remove(self.output)
+        self.assertFalse(index.is_up_to_date(self.source, self.hash))
+
+    def test_failed_run_drops_entry(self):
+        index = OutputIndex()
+        self._converted(index)
+        index.record_output(self.source, self.output)
+        index.complete(self.source, self.hash, False)
+        self.assertFalse(index.is_up_to_date(self.source, self.hash))
+
+    def test_persistence_roundtrip(self):
+        persist_path = os.path.join(self.tmp.name, 'output_index.json')
+        index = OutputIndex(persist_path=persist_path)
+        self._converted(index)
+        index.flush()
+        self.assertTrue(OutputIndex(persist_path=persist_path).is_up_to_date(self.source, self.hash))
+
+
+class TestEngineSkipsUpToDate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f'input_{i}.png')
+            with open(path, 'wb') as fh:
+                fh.write(b'pixels')
+            self.files.append(path)
+        self.params = dict(PARAMS, parallel_jobs=1, skip_up_to_date=True)
+        self.index = OutputIndex()
+        self.finished = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self):
+        with patch('client.core.conversion_engine.get_output_index', return_value=self.index):
+            engine = ConversionEngine(self.files, dict(self.params))
+        engine.conversion_finished.connect(self.finished)
+        converted = []
+
+        def fake_convert(file_path):
+            output = file_path.replace('.png', '.webp')
+            with open(output, 'wb') as fh:
+                fh.write(b'encoded ' + open(file_path, 'rb').read())
+            engine.file_completed.emit(file_path, output)
+            converted.append(file_path)
+            return True
+
+        engine.convert_file = fake_convert
+        engine.run()
+        return converted
+
+    def test_only_changed_source_is_reencoded(self):
+        self.assertEqual(self._run(), self.files)
+        with open(self.files[1], 'ab') as fh:
+            fh.write(b' edited')
+        self.assertEqual(self._run(), [self.files[1]])
+        success, message = self.finished.call_args[0]
+        self.assertTrue(success)
+        self.assertIn('1 files processed successfully, 2 up to date (skipped)', message)
+
+
+if __name__ == '__main__':
+    unittest.main()
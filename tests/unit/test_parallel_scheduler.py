@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core.conversion_engine import ConversionEngine, get_parallel_job_count
+
+
+class TestParallelJobCount(unittest.TestCase):
+    def test_serial_when_requested(self):
+        self.assertEqual(get_parallel_job_count({'type': 'image', 'parallel_jobs': 1}, 10, cpu_count=16), 1)
+
+    def test_single_file_is_serial(self):
+        self.assertEqual(get_parallel_job_count({'type': 'image'}, 1, cpu_count=16), 1)
+
+    def test_explicit_count_capped_by_files(self):
+        self.assertEqual(get_parallel_job_count({'type': 'image', 'parallel_jobs': 6}, 3, cpu_count=16), 3)
+
+    def test_auto_sizes_from_codec_threads(self):
+        # Images are single-threaded: bounded by the global cap
+        self.assertEqual(get_parallel_job_count({'type': 'image'}, 50, cpu_count=16), 8)
+        # GIF jobs use ~2 cores each
+        self.assertEqual(get_parallel_job_count({'type': 'gif'}, 50, cpu_count=8), 4)
+        # x264 already saturates the machine on its own
+        self.assertEqual(get_parallel_job_count({'type': 'video', 'codec': 'H.264 (MP4)'}, 50, cpu_count=8), 1)
+
+
+class TestParallelRun(unittest.TestCase):
+    def setUp(self):
+        self.files = [f'input_{i}.jpg' for i in range(6)]
+        self.params = {'type': 'image', 'format': 'jpg', 'parallel_jobs': 3}
+        self.engine = ConversionEngine(self.files, self.params)
+        self.finished = MagicMock()
+        self.file_progress = MagicMock()
+        self.progress = MagicMock()
+        self.engine.conversion_finished.connect(self.finished)
+        self.engine.file_progress_updated.connect(self.file_progress)
+        self.engine.progress_updated.connect(self.progress)
+
+    def test_workers_get_isolated_params_and_indexes(self):
+        seen = {}
+        lock = threading.Lock()
+
+        def fake_convert(file_path):
+            # Mutate params like convert_file does for loop/gif mapping
+            self.engine.params['quality'] = file_path
+            with lock:
+                seen[file_path] = (self.engine._current_file_index, self.engine.params['quality'])
+            return True
+
+        self.engine.convert_file = fake_convert
+        self.engine.run()
+
+        for i, file_path in enumerate(self.files):
+            self.assertEqual(seen[file_path], (i, file_path))
+        # Shared params are untouched by workers
+        self.assertNotIn('quality', self.params)
+
+        finished_args = self.finished.call_args[0]
+        self.assertEqual(finished_args, (True, "Conversion completed: 6 files processed successfully"))
+
+        # Every file reports progress against its own index
+        indexes = {c[0][0] for c in self.file_progress.call_args_list}
+        self.assertEqual(indexes, set(range(len(self.files))))
+        self.assertEqual(self.progress.call_args[0][0], 100)
+
+    def test_stop_skips_queued_files(self):
+        converted = []
+
+        def fake_convert(file_path):
+            converted.append(file_path)
+            self.engine.should_stop = True
+            return True
+
+        self.engine.params['parallel_jobs'] = 2
+        self.engine.convert_file = fake_convert
+        self.engine.run()
+
+        self.assertLessEqual(len(converted), 2)
+        self.assertEqual(self.finished.call_args[0],
+                         (False, "Conversion cancelled by user"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# setdefault: keep mocks already installed by other test modules in the same session
+mock_pyqt = MagicMock()
+sys.modules.setdefault('PyQt6', mock_pyqt)
+sys.modules.setdefault('PyQt6.QtCore', mock_pyqt)
+
+from client.core.progress_channel import ProgressCoalescer, status_level, LOG_LEVELS
+
+
+class TestProgressCoalescer(unittest.TestCase):
+    def test_nothing_pending(self):
+        self.assertIsNone(ProgressCoalescer().take())
+
+    def test_superseded_values_are_dropped(self):
+        coalescer = ProgressCoalescer()
+        for i in range(100):
+            coalescer.post_overall(i)
+            coalescer.post_file_progress(0, i / 100)
+        coalescer.post_file_progress(1, 0.5)
+        coalescer.post_file_progress(0, 0.99)
+
+        update = coalescer.take()
+        self.assertEqual(update.overall, 99)
+        self.assertEqual(update.file_progress, {1: 0.5, 0: 0.99})
+        # Most recently updated file last
+        self.assertEqual(list(update.file_progress), [1, 0])
+        self.assertIsNone(coalescer.take())
+
+    def test_debug_statuses_gated_by_level(self):
+        info = ProgressCoalescer(log_level='info')
+        debug = ProgressCoalescer(log_level='debug')
+        for coalescer in (info, debug):
+            coalescer.post_status("DEBUG: FFmpeg codec: libx264")
+            coalescer.post_status("Processing: clip.mp4")
+        self.assertEqual(info.take().statuses, ["Processing: clip.mp4"])
+        self.assertEqual(debug.take().statuses, ["DEBUG: FFmpeg codec: libx264", "Processing: clip.mp4"])
+
+    def test_status_batch_is_bounded(self):
+        coalescer = ProgressCoalescer(max_statuses=3)
+        for i in range(5):
+            coalescer.post_status(f"Processing: {i}")
+        update = coalescer.take()
+        self.assertEqual(update.statuses, ["Processing: 2", "Processing: 3", "Processing: 4"])
+        self.assertEqual(update.dropped_statuses, 2)
+
+    def test_concurrent_posts(self):
+        coalescer = ProgressCoalescer()
+
+        def worker(index):
+            for i in range(1000):
+                coalescer.post_file_progress(index, i / 1000)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(coalescer.take().file_progress, {n: 0.999 for n in range(4)})
+
+    def test_status_levels(self):
+        self.assertEqual(status_level("DEBUG: x"), LOG_LEVELS['debug'])
+        self.assertEqual(status_level("Error converting a.mp4: boom"), LOG_LEVELS['error'])
+        self.assertEqual(status_level("⚠ Using heuristic estimation"), LOG_LEVELS['warning'])
+        self.assertEqual(status_level("Processing: a.mp4"), LOG_LEVELS['info'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Server modules import each other as top-level packages (config, services, storage)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../server')))
+
+from services.rate_limiter import RateLimiter
+from storage.rate_limit_store import MemoryRateLimitBackend, SqliteRateLimitBackend
+
+
+class FakeClock:
+    def __init__(self, now=1000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = MemoryRateLimitBackend(clock=self.clock)
+        self.limiter = RateLimiter(self.backend, clock=self.clock)
+
+    def _check(self, action='forgot_license', email='a@x.com'):
+        return self.limiter.check_rate_limit(action, email=email, ip_address='1.2.3.4')
+
+    def test_burst_then_steady_refill(self):
+        # forgot_license: 5 per hour, one request back every 12 minutes
+        self.assertEqual([self._check()['remaining'] for _ in range(5)], [4, 3, 2, 1, 0])
+        self.assertFalse(self._check()['allowed'])
+        self.assertTrue(self._check(email='b@x.com')['allowed'])
+        self.assertTrue(self._check('trial_create')['allowed'])
+
+        self.clock.now += 300 + 720   # Block over, one request refilled
+        self.assertEqual(self._check()['remaining'], 0)
+        self.assertEqual(self._check()['reason'], 'rate_limit_exceeded')
+
+    def test_block_and_exponential_backoff(self):
+        for _ in range(5):
+            self._check()
+        first = self._check()
+        self.assertEqual(first['retry_after'], 300)
+        self.assertEqual(first['message'], 'Too many requests. Blocked for 5 minutes.')
+
+        self.clock.now += 100
+        blocked = self._check()
+        self.assertEqual((blocked['allowed'], blocked['retry_after']), (False, 200))
+        self.assertNotIn('blocked', blocked)
+
+        # Violations are forgiven once a block expires, as before
+        self.clock.now += 200
+        self.assertEqual(self._check()['retry_after'], 300)
+
+        self.assertTrue(self.limiter.reset_limit(email='a@x.com', ip_address='1.2.3.4'))
+        self.assertTrue(self._check()['allowed'])
+        self.assertFalse(self.limiter.reset_limit(email='nobody@x.com'))
+
+    def test_unknown_action_is_allowed(self):
+        self.assertEqual(self._check('upload'), {'allowed': True, 'reason': 'unknown_action'})
+        self.assertEqual(len(self.backend), 0)
+
+    def test_expired_entries_are_dropped_lazily(self):
+        for i in range(20):
+            self._check(email=f'user{i}@x.com')
+        self.assertEqual(len(self.backend), 20)
+        self.clock.now += 3600
+        self._check(email='late@x.com')
+        self._check(email='late@x.com')
+        self._check(email='late@x.com')
+        self.assertEqual(len(self.backend), 1)
+
+
+class TestSqliteRateLimitBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, 'rate_limits.db')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _count(self, backend):
+        return backend._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def test_limits_are_shared_between_workers(self):
+        workers = [RateLimiter(SqliteRateLimitBackend(self.db, clock=self.clock), clock=self.clock)
+                   for _ in range(2)]
+        results = [workers[i % 2].check_rate_limit('trial_create', email='a@x.com')['allowed']
+                   for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(workers[0].check_rate_limit('trial_create', email='a@x.com')['retry_after'], 3600)
+
+        self.assertTrue(workers[1].reset_limit(email='a@x.com'))
+        self.assertTrue(workers[0].check_rate_limit('trial_create', email='a@x.com')['allowed'])
+
+    def test_expired_rows_are_deleted_on_update(self):
+        backend = SqliteRateLimitBackend(self.db, clock=self.clock)
+        limiter = RateLimiter(backend, clock=self.clock)
+        for i in range(10):
+            limiter.check_rate_limit('login_validate', email=f'user{i}@x.com')
+        self.assertEqual(self._count(backend), 10)
+
+        self.clock.now += 600
+        limiter.check_rate_limit('login_validate', email='late@x.com')
+        limiter.check_rate_limit('login_validate', email='late@x.com')
+        self.assertEqual(self._count(backend), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
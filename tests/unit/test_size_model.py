@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core import calibration_cache, size_model
+    from client.core.calibration_cache import CalibrationCache
+    from client.core.media_probe import MediaInfo
+    from client.core.size_model import SizeModel, content_class, record_size_outcome
+    from client.core import size_estimator
+
+HD_CLIP = MediaInfo(width=1920, height=1080, stream_width=1920, stream_height=1080,
+                    duration=10.0, fps=30.0, has_video=True, bitrate=20_000_000)
+
+
+class TestSizeModel(unittest.TestCase):
+    def test_no_data_means_no_correction(self):
+        model = SizeModel()
+        self.assertEqual(model.correction('video:x:fhd:fps30:high', 3), 1.0)
+        self.assertEqual(model.correct_sizes(None, [100, 200]), [100, 200])
+
+    def test_learns_consistent_underestimate(self):
+        model = SizeModel()
+        for _ in range(20):
+            model.observe('cls', 5, estimated_size=1000, actual_size=1500)
+        self.assertAlmostEqual(model.correction('cls', 5), 1.5, delta=0.1)
+        # Other presets of the class fall back to the class-wide correction
+        self.assertAlmostEqual(model.correction('cls', 2), 1.5, delta=0.1)
+        self.assertEqual(model.correction('other', 5), 1.0)
+
+    def test_single_outlier_is_damped_and_clamped(self):
+        model = SizeModel()
+        model.observe('cls', 0, estimated_size=1000, actual_size=100000)
+        correction = model.correction('cls', 0)
+        self.assertLess(correction, 100)
+        self.assertLessEqual(correction, size_model.MAX_CORRECTION)
+
+    def test_persistence_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'size_model.json')
+            SizeModel(persist_path=path).observe('cls', 1, 1000, 2000)
+            self.assertGreater(SizeModel(persist_path=path).correction('cls', 1), 1.0)
+
+    @patch('client.core.size_model.probe_media', return_value=HD_CLIP)
+    def test_content_class_buckets(self, _probe):
+        self.assertEqual(content_class('video', 'clip.mp4', 'H.264 (MP4)'), 'video:H.264 (MP4):fhd:fps30:high')
+
+
+class TestEstimatorAppliesCorrections(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'clip.mp4')
+        with open(self.source, 'wb') as fh:
+            fh.write(b'frames')
+        self.output = os.path.join(self.tmp.name, 'out.mp4')
+
+        # Fresh in-memory stores and a probed 1080p30 source for every test
+        for patcher in (
+            patch.object(size_model, '_size_model', SizeModel()),
+            patch.object(calibration_cache, '_calibration_cache', CalibrationCache()),
+            patch('client.core.size_model.probe_media', return_value=HD_CLIP),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('client.core.size_estimator._sample_video_at_preset',
+           return_value={'full_size': 10_000_000, 'duration': 10.0, 'sample_points': 1})
+    def test_recorded_outcome_corrects_next_estimate(self, _encode):
+        target = 8 * 1024 * 1024
+        first = size_estimator.find_optimal_video_params_for_size(self.source, 'H.264 (MP4)', {}, target)
+        self.assertEqual(first['_raw_estimated_size'], first['_estimated_size'])
+
+        # Real outputs keep coming out twice as large as estimated
+        with open(self.output, 'wb') as fh:
+            fh.write(b'x' * (first['_raw_estimated_size'] * 2))
+        for _ in range(10):
+            record_size_outcome(first, self.output)
+
+        calibration = size_estimator.estimate_all_video_preset_sizes(self.source, 'H.264 (MP4)', {})
+        self.assertTrue(calibration.get('cached'))
+        idx = first['_preset_index']
+        self.assertGreater(calibration['preset_sizes'][idx], calibration['raw_preset_sizes'][idx] * 1.5)
+
+        second = size_estimator.find_optimal_video_params_for_size(self.source, 'H.264 (MP4)', {}, target)
+        self.assertGreater(second['_preset_index'], idx)
+
+
+if __name__ == '__main__':
+    unittest.main()
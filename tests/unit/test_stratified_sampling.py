@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core import size_estimator
+    from client.core.calibration_cache import CalibrationCache
+    from client.core.size_estimator import (
+        combine_stratified_samples,
+        stratified_sample_offsets,
+        VIDEO_REFERENCE_PRESET_IDX,
+    )
+
+
+class TestStratifiedOffsets(unittest.TestCase):
+    def test_one_segment_per_stratum(self):
+        offsets = stratified_sample_offsets(0.0, 40.0, 4, 2.0)
+        self.assertEqual(offsets, [4.0, 14.0, 24.0, 34.0])
+
+    def test_offsets_respect_cut_range(self):
+        offsets = stratified_sample_offsets(10.0, 8.0, 4, 1.5)
+        for offset in offsets:
+            self.assertGreaterEqual(offset, 10.0)
+            self.assertLessEqual(offset + 1.5, 18.0)
+
+    def test_single_point_samples_range_start(self):
+        self.assertEqual(stratified_sample_offsets(5.0, 30.0, 1, 2.0), [5.0])
+
+
+class TestCombineStratifiedSamples(unittest.TestCase):
+    def test_identical_segments_have_zero_spread(self):
+        combined = combine_stratified_samples([(1000, 2.0)] * 4)
+        self.assertEqual(combined['rate'], 500.0)
+        self.assertEqual(combined['relative_error'], 0.0)
+
+    def test_spread_widens_interval(self):
+        steady = combine_stratified_samples([(1000, 2.0), (1100, 2.0), (950, 2.0), (1050, 2.0)])
+        bursty = combine_stratified_samples([(400, 2.0), (2000, 2.0), (600, 2.0), (1000, 2.0)])
+        self.assertLess(steady['relative_error'], bursty['relative_error'])
+        self.assertLess(bursty['rate_low'], bursty['rate'])
+        self.assertGreater(bursty['rate_high'], bursty['rate'])
+
+    def test_outlier_segment_counts_in_full(self):
+        # Each stratum is an equal share of the timeline, so the rate is unbiased
+        combined = combine_stratified_samples([(200, 2.0), (200, 2.0), (200, 2.0), (800, 2.0)])
+        self.assertAlmostEqual(combined['rate'], 175.0)
+        self.assertLess(combined['rate_low'], 175.0)
+        self.assertGreater(combined['rate_high'], 175.0)
+
+    def test_longer_segments_weigh_more(self):
+        combined = combine_stratified_samples([(1000, 1.0), (4000, 2.0), (400, 1.0)])
+        self.assertGreater(combined['rate'], (1000 + 2000 + 400) / 3)
+
+    def test_failed_segments_are_ignored(self):
+        combined = combine_stratified_samples([(1000, 2.0), (0, 2.0)])
+        self.assertEqual(combined['rate'], 500.0)
+        self.assertIsNone(combined['relative_error'])
+        self.assertEqual(combine_stratified_samples([(0, 2.0)]), {})
+
+
+class TestVideoStratifiedCalibration(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(size_estimator, 'get_calibration_cache', return_value=CalibrationCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(size_estimator, 'get_video_duration', return_value=60.0)
+    def test_segments_are_combined_into_reference_size(self, _duration):
+        offsets_seen = []
+
+        def fake_encode(file_path, preset, codec, start_time, sample_duration):
+            offsets_seen.append(start_time)
+            return 200_000 if start_time < 30 else 300_000
+
+        with patch.object(size_estimator, '_encode_video_sample', side_effect=fake_encode), \
+                patch.object(size_estimator, '_apply_size_model', side_effect=lambda k, f, v, c: c):
+            result = size_estimator.estimate_all_video_preset_sizes(
+                'clip.mp4', 'H.264 (MP4)', {'estimate_sample_points': 4})
+
+        self.assertEqual(sorted(offsets_seen), [6.5, 21.5, 36.5, 51.5])
+        # 2s segments: mean rate 125 KB/s over 60s
+        self.assertEqual(result['reference_size'], 7_500_000)
+        self.assertEqual(result['sample_points'], 4)
+        self.assertIn(result['confidence'], ('high', 'medium', 'low'))
+        low, high = result['confidence_interval']
+        self.assertLess(low, result['reference_size'])
+        self.assertGreater(high, result['reference_size'])
+        self.assertEqual(result['preset_sizes'][VIDEO_REFERENCE_PRESET_IDX], 7_500_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
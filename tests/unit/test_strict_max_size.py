@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core.conversion_engine import ConversionEngine
+    from client.core.size_estimator import (
+        IMAGE_QUALITY_PRESETS_STANDARD,
+        _image_preset_result,
+        refine_max_size_result,
+    )
+
+MB = 1024 * 1024
+
+
+def image_result(best_idx, preset_sizes):
+    return _image_preset_result(IMAGE_QUALITY_PRESETS_STANDARD, best_idx,
+                                {'preset_sizes': preset_sizes}, 10 * MB, False)
+
+
+class TestRefineMaxSizeResult(unittest.TestCase):
+    def setUp(self):
+        count = len(IMAGE_QUALITY_PRESETS_STANDARD)
+        # Monotonically shrinking preset sizes: 20 MB down to 1 MB
+        self.sizes = [int((20 - i * 19 / (count - 1)) * MB) for i in range(count)]
+
+    def test_small_miss_steps_one_preset(self):
+        result = image_result(5, self.sizes)
+        refined = refine_max_size_result('image', result, int(self.sizes[5] * 1.02), int(self.sizes[6] * 1.05))
+        self.assertEqual(refined['_preset_index'], 6)
+
+    def test_large_miss_skips_presets(self):
+        result = image_result(5, self.sizes)
+        target = self.sizes[5]
+        # Output came out at twice the estimate: jump straight to a preset at half the size
+        refined = refine_max_size_result('image', result, self.sizes[5] * 2, target)
+        self.assertGreater(refined['_preset_index'], 6)
+        self.assertLessEqual(self.sizes[refined['_preset_index']] * 2, target)
+
+    def test_smallest_preset_has_no_refinement(self):
+        last = len(IMAGE_QUALITY_PRESETS_STANDARD) - 1
+        self.assertIsNone(refine_max_size_result('image', image_result(last, self.sizes), 50 * MB, MB))
+
+
+class TestEnforceMaxSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = ConversionEngine([], {'overwrite': False, 'max_size_max_attempts': 3})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as fh:
+            fh.write(b'x' * size)
+        return path
+
+    def test_reencodes_until_output_fits(self):
+        first = self._write('out_q90.jpg', 300)
+        encodes = []
+
+        def encode():
+            encodes.append(self.engine.params['overwrite'])
+            return self._write(f'out_{len(encodes)}.jpg', 250 if len(encodes) == 1 else 150)
+
+        next_result = MagicMock(side_effect=lambda r, actual: {'_preset_info': 'smaller'})
+        final = self.engine._enforce_max_size('in.jpg', {}, 200, first, next_result, MagicMock(), encode)
+
+        self.assertEqual(os.path.basename(final), 'out_2.jpg')
+        self.assertEqual(encodes, [True, True])  # Retries always overwrite
+        self.assertFalse(self.engine.params['overwrite'])
+        # Oversized intermediate outputs are removed
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['out_2.jpg'])
+
+    def test_stops_after_max_attempts(self):
+        first = self._write('out.jpg', 300)
+        encode = MagicMock(side_effect=lambda: self._write('out.jpg', 300))
+        next_result = MagicMock(return_value={'_preset_info': 'smaller'})
+        final = self.engine._enforce_max_size('in.jpg', {}, 200, first, next_result, MagicMock(), encode)
+        self.assertEqual(final, first)
+        self.assertEqual(encode.call_count, 2)
+
+    def test_no_smaller_preset_keeps_output(self):
+        first = self._write('out.jpg', 300)
+        encode = MagicMock()
+        final = self.engine._enforce_max_size('in.jpg', {}, 200, first, MagicMock(return_value=None),
+                                              MagicMock(), encode)
+        self.assertEqual(final, first)
+        encode.assert_not_called()
+
+    def test_two_pass_refinement_scales_bitrate(self):
+        refined = self.engine._refine_two_pass({'_two_pass_video_kbps': 2000}, 12 * MB, 10 * MB)
+        self.assertLess(refined['_two_pass_video_kbps'], 2000 * 10 / 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# setdefault: keep mocks already installed by other test modules in the same session
+mock_pyqt = MagicMock()
+sys.modules.setdefault('PyQt6', mock_pyqt)
+sys.modules.setdefault('PyQt6.QtCore', mock_pyqt)
+sys.modules.setdefault('PyQt6.QtGui', mock_pyqt)
+
+from client.gui.utils.thumbnail_service import thumbnail_cache_path, prune_disk_cache
+
+
+class TestThumbnailDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'thumbs')
+        os.makedirs(self.cache_dir)
+        self.source = os.path.join(self.tmp.name, 'photo.jpg')
+        with open(self.source, 'wb') as fh:
+            fh.write(b'jpeg')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cache_path_follows_file_version(self):
+        first = thumbnail_cache_path(self.source, self.cache_dir)
+        self.assertEqual(first, thumbnail_cache_path(self.source, self.cache_dir))
+        self.assertEqual(os.path.dirname(first), self.cache_dir)
+
+        with open(self.source, 'ab') as fh:
+            fh.write(b'edited')
+        self.assertNotEqual(first, thumbnail_cache_path(self.source, self.cache_dir))
+        self.assertNotEqual(first, thumbnail_cache_path(self.source, self.cache_dir, size=96))
+
+    def test_missing_source_has_no_cache_path(self):
+        self.assertIsNone(thumbnail_cache_path(os.path.join(self.tmp.name, 'gone.jpg'), self.cache_dir))
+
+    def test_prune_keeps_newest_entries(self):
+        now = time.time()
+        for i in range(5):
+            path = os.path.join(self.cache_dir, f'{i}.png')
+            with open(path, 'wb') as fh:
+                fh.write(b'png')
+            os.utime(path, (now - 100 + i, now - 100 + i))
+
+        self.assertEqual(prune_disk_cache(self.cache_dir, max_entries=3), 2)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['2.png', '3.png', '4.png'])
+        self.assertEqual(prune_disk_cache(self.cache_dir, max_entries=3), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core.conversion_engine import ConversionEngine
+
+
+class TestSingleDecodeVideoVariants(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, 'clip.mp4')
+        self.params = {
+            'type': 'video',
+            'codec': 'H.264 (MP4)',
+            'overwrite': True,
+            'multiple_size_variants': True,
+            'video_variants': ['1920', '1280', '854'],
+            'multiple_qualities': True,
+            'quality_variants': [40, 70],
+            'max_outputs_per_process': 4,
+        }
+        self.engine = ConversionEngine([self.input_path], self.params)
+        self.completed = MagicMock()
+        self.engine.file_completed.connect(self.completed)
+        self.outputs = []
+
+        def fake_output_path(file_path, fmt, size_variant, quality_variant):
+            path = os.path.join(self.tmp.name, f'out_{size_variant}_{quality_variant}.{fmt}')
+            self.outputs.append(path)
+            return path
+
+        self.engine.get_output_path_with_video_variants = fake_output_path
+        self.engine._build_video_variant_input = MagicMock(return_value=(MagicMock(), MagicMock()))
+        self.engine._apply_video_size_variant = MagicMock(side_effect=lambda stream, *_: stream)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_outputs(self, skip=()):
+        def run(_stream):
+            for path in self.outputs:
+                if path not in skip:
+                    with open(path, 'wb') as fh:
+                        fh.write(b'data')
+            return True
+        return run
+
+    def test_groups_respect_output_cap(self):
+        self.engine.run_ffmpeg_with_cancellation = MagicMock(side_effect=self._write_outputs())
+        self.assertTrue(self.engine._convert_video_multiple_variants(self.input_path))
+
+        # 6 variants with a cap of 4 outputs -> 2 decodes instead of 6
+        self.assertEqual(self.engine.run_ffmpeg_with_cancellation.call_count, 2)
+        self.assertEqual(self.engine._build_video_variant_input.call_count, 2)
+        completed = [c[0][1] for c in self.completed.call_args_list]
+        self.assertEqual(sorted(completed), sorted(self.outputs))
+
+    def test_missing_output_is_reported_per_variant(self):
+        with patch.object(self.engine, 'run_ffmpeg_with_cancellation') as run:
+            run.side_effect = lambda s: self._write_outputs(skip=self.outputs[:1])(s)
+            self.assertFalse(self.engine._convert_video_multiple_variants(self.input_path))
+
+        completed = [c[0][1] for c in self.completed.call_args_list]
+        self.assertEqual(len(completed), 5)
+        self.assertNotIn(self.outputs[0], completed)
+
+    def test_failed_group_falls_back_to_single_variants(self):
+        self.engine.run_ffmpeg_with_cancellation = MagicMock(side_effect=Exception('graph error'))
+        self.engine._convert_single_video_variant = MagicMock(return_value=True)
+        self.assertTrue(self.engine._convert_video_multiple_variants(self.input_path))
+        self.assertEqual(self.engine._convert_single_video_variant.call_count, 6)
+
+    def test_disabled_mode_encodes_each_variant_separately(self):
+        self.engine.params['single_decode_variants'] = False
+        self.engine._convert_single_video_variant = MagicMock(return_value=True)
+        self.assertTrue(self.engine._convert_video_multiple_variants(self.input_path))
+        self.assertEqual(self.engine._convert_single_video_variant.call_count, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Adjust path to find client module
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.unit.ffmpeg_stub import stub_ffmpeg
+
+with stub_ffmpeg():
+    from client.core import conversion_engine  # noqa: F401 (WatchDaemon imports it lazily)
+    from client.core.signals import Signal
+    from client.core.watch_folder import (
+        InotifyWatcher, ProcessedLedger, SettleTracker, WatchConfig, WatchDaemon, WatchFolder, load_watch_config,
+    )
+
+
+class FakeEngine:
+    """Stands in for ConversionEngine: 'converts' by copying into output_dir"""
+    file_completed = Signal(str, str)
+    status_updated = Signal(str)
+    converted = []
+
+    def __init__(self, files, params):
+        self.params = params
+        self.should_stop = False
+
+    def convert_source(self, file_path):
+        output = os.path.join(self.params['output_dir'], os.path.basename(file_path) + '.out')
+        with open(output, 'wb') as fh:
+            fh.write(b'converted')
+        FakeEngine.converted.append(file_path)
+        self.file_completed.emit(file_path, output)
+        return True
+
+    def stop_conversion(self):
+        self.should_stop = True
+
+
+class TestSettleTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'clip.mp4')
+        self.now = 1000.0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_growing_file_waits_until_stable(self):
+        tracker = SettleTracker(settle_seconds=3.0, clock=lambda: self.now)
+        with open(self.path, 'wb') as fh:
+            fh.write(b'part')
+            fh.flush()
+            tracker.observe(self.path)
+            self.now += 2.5
+            fh.write(b'more')
+        self.assertEqual(tracker.settled(), [])   # Grew: timer restarted
+        self.now += 2.0
+        self.assertEqual(tracker.settled(), [])
+        self.now += 1.5
+        self.assertEqual(tracker.settled(), [self.path])
+        self.assertEqual(len(tracker), 0)
+
+    def test_limit_applies_backpressure(self):
+        tracker = SettleTracker(settle_seconds=0.0, clock=lambda: self.now)
+        for name in ('a.png', 'b.png', 'c.png'):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'wb') as fh:
+                fh.write(b'x')
+            tracker.observe(path)
+        self.assertEqual(len(tracker.settled(limit=2)), 2)
+        self.assertEqual(len(tracker), 1)
+
+    def test_empty_file_is_dropped_until_it_changes(self):
+        tracker = SettleTracker(settle_seconds=3.0, clock=lambda: self.now)
+        open(self.path, 'wb').close()
+        tracker.observe(self.path)
+        self.now += 3.5
+        self.assertEqual(tracker.settled(), [])
+        self.assertEqual(len(tracker), 0)
+        self.assertIsNone(tracker.next_check())   # No busy re-checking while idle
+
+        with open(self.path, 'wb') as fh:
+            fh.write(b'frames')
+        tracker.observe(self.path)   # Watcher reports the write
+        self.now += 3.5
+        self.assertEqual(tracker.settled(), [self.path])
+
+
+class TestProcessedLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, 'processed.json')
+        self.files = []
+        for i in range(40):
+            path = os.path.join(self.tmp.name, f'{i}.png')
+            with open(path, 'wb') as fh:
+                fh.write(b'x' * i)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_marks_survive_a_crash(self):
+        ledger = ProcessedLedger(self.state_path)
+        threads = [threading.Thread(target=lambda chunk: [ledger.mark(f, 'converted') for f in chunk],
+                                    args=(self.files[i::4],)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # No close(): the reload has to replay the append log
+        reloaded = ProcessedLedger(self.state_path)
+        self.assertTrue(all(reloaded.is_processed(f) for f in self.files))
+        self.assertEqual(os.path.getsize(f"{self.state_path}.log"), 0)
+
+    def test_torn_log_line_is_ignored(self):
+        ledger = ProcessedLedger(self.state_path)
+        ledger.mark(self.files[0], 'converted')
+        with open(f"{self.state_path}.log", 'a', encoding='utf-8') as fh:
+            fh.write('["half')
+        reloaded = ProcessedLedger(self.state_path)
+        self.assertTrue(reloaded.is_processed(self.files[0]))
+        self.assertFalse(reloaded.is_processed(self.files[1]))
+
+
+class TestWatchDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inbox = os.path.join(self.tmp.name, 'in')
+        self.outbox = os.path.join(self.tmp.name, 'out')
+        os.makedirs(self.inbox)
+        self.state_path = os.path.join(self.tmp.name, 'processed.json')
+        FakeEngine.converted = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _drop(self, name, data=b'pixels'):
+        path = os.path.join(self.inbox, name)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+        # Backdate so the file counts as settled right away
+        os.utime(path, (0, 0))
+        return path
+
+    def _run_once(self):
+        config = WatchConfig(
+            folders=[WatchFolder(self.inbox, {'output_dir': self.outbox}, self.outbox)],
+            settle_seconds=0.0, poll_interval=0.05, max_workers=2, use_inotify=False,
+            state_path=self.state_path,
+        )
+        events = []
+        lock = threading.Lock()
+
+        def on_event(event, **fields):
+            with lock:
+                events.append((event, fields))
+
+        WatchDaemon(config, on_event=on_event, engine_factory=FakeEngine).run(threading.Event(), once=True)
+        return events
+
+    def test_processes_arrivals_and_skips_them_after_restart(self):
+        a = self._drop('a.png')
+        b = self._drop('b.mp4')
+        self._drop('notes.txt')
+        self._drop('placeholder.png', b'')   # Must not keep --once from going idle
+        events = self._run_once()
+        self.assertEqual(sorted(FakeEngine.converted), sorted([a, b]))
+        self.assertEqual(sum(1 for e, _ in events if e == 'converted'), 2)
+
+        # Restart: ledger remembers both; only the edited file is redone
+        FakeEngine.converted = []
+        self._drop('a.png', b'new pixels')
+        self._run_once()
+        self.assertEqual(FakeEngine.converted, [a])
+
+    def test_config_rejects_output_inside_watched_folder(self):
+        config_path = os.path.join(self.tmp.name, 'watch.json')
+        with open(config_path, 'w') as fh:
+            json.dump({'folders': [{'path': 'in', 'output_dir': 'in'}]}, fh)
+        with self.assertRaises(ValueError):
+            load_watch_config(config_path)
+
+        with open(config_path, 'w') as fh:
+            json.dump({'folders': [{'path': 'in', 'output_dir': 'out', 'params': {'type': 'image'}}]}, fh)
+        folder = load_watch_config(config_path, {'suffix': '_web'}).folders[0]
+        self.assertEqual(folder.path, self.inbox)
+        self.assertEqual(folder.params, {'suffix': '_web', 'type': 'image',
+                                         'output_dir': self.outbox, 'parallel_jobs': 1})
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux-only")
+class TestInotifyWatcher(unittest.TestCase):
+    def test_reports_new_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = InotifyWatcher([WatchFolder(tmp, {}, os.path.join(tmp, 'out'))], {'.png'})
+            try:
+                path = os.path.join(tmp, 'a.png')
+                with open(path, 'wb') as fh:
+                    fh.write(b'x')
+                self.assertIn(path, watcher.wait(2.0))
+                self.assertEqual(watcher.wait(0.05), set())
+            finally:
+                watcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()